@@ -0,0 +1,4 @@
+class PasswordPoolSaturated(Exception):
+    def __init__(self, retry_after: int = 1):
+        super().__init__("Too many concurrent password operations, retry later")
+        self.retry_after = retry_after
@@ -0,0 +1,20 @@
+class BookingNotFound(Exception):
+    pass
+
+class OfferNotFound(Exception):
+    pass
+
+class TimeslotNotFound(Exception):
+    pass
+
+class TimeslotOfferMismatch(Exception):
+    pass
+
+class TimeslotAlreadyBooked(Exception):
+    pass
+
+class NotOfferOwner(Exception):
+    pass
+
+class InvalidBookingAction(Exception):
+    pass
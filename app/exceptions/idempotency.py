@@ -0,0 +1,5 @@
+class IdempotencyKeyInProgress(Exception):
+    pass
+
+class IdempotencyKeyMismatch(Exception):
+    pass
@@ -0,0 +1,5 @@
+class InvalidTimeslot(Exception):
+    pass
+
+class TimeslotOverlap(Exception):
+    pass
@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
+import os
 import time
 from sqlalchemy import text
 from sqlalchemy.exc import OperationalError
@@ -14,25 +15,45 @@ from app.routers.tutor_profiles import router as tutor_profiles_router
 from app.routers.reviews import router as reviews_router
 from app.routers.timeslots import router as timeslots_router
 from app.routers.search import router as search_router
-from app.services.offer import get_offers_by_department
-from app.database import BaseSQL, engine
+from app.routers.export import router as export_router
+from app.routers.metrics import router as metrics_router
+from app.database import BaseSQL, engine, dispose_async_engine, create_missing_indexes, drop_obsolete_indexes
+from app.services.password_pool import password_pool
+from app.services.instrumentation import InstrumentationMiddleware
 
-def wait_for_db(max_retries: int = 60, delay_sec: float = 1.0):
-    # Attend que Postgres soit prêt (jusqu'à ~60s)
-    for _ in range(max_retries):
+DB_WAIT_TIMEOUT = float(os.getenv("DB_WAIT_TIMEOUT", "60"))
+
+def wait_for_db(timeout: float = DB_WAIT_TIMEOUT, first_delay: float = 0.05, max_delay: float = 2.0,
+                sleep=time.sleep) -> int:
+    """
+    Attend que la base réponde à SELECT 1 : essai immédiat, puis attente
+    exponentielle (50 ms, 100 ms, ... plafonnée à max_delay) jusqu'à `timeout`.
+    Renvoie le nombre de tentatives.
+    """
+    deadline = time.monotonic() + timeout
+    delay, attempts = first_delay, 0
+    while True:
+        attempts += 1
         try:
             with engine.connect() as conn:
                 conn.execute(text("SELECT 1"))
-            return
+            return attempts
         except OperationalError:
-            time.sleep(delay_sec)
-    raise RuntimeError("Database not ready after waiting")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RuntimeError(f"Database not ready after {timeout:.0f}s ({attempts} attempts)")
+            sleep(min(delay, remaining))
+            delay = min(delay * 2, max_delay)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     wait_for_db()
     BaseSQL.metadata.create_all(bind=engine)
+    create_missing_indexes(engine)
+    drop_obsolete_indexes(engine)
     yield
+    password_pool.shutdown()
+    await dispose_async_engine()
 
 app = FastAPI(
     title="SuperProf-like API",
@@ -49,6 +70,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(InstrumentationMiddleware)
+
 app.include_router(health_router)
 app.include_router(user_router)
 app.include_router(offer_router)
@@ -57,4 +80,6 @@ app.include_router(auth_router)
 app.include_router(tutor_profiles_router)
 app.include_router(reviews_router)
 app.include_router(timeslots_router)
-app.include_router(search_router)
\ No newline at end of file
+app.include_router(search_router)
+app.include_router(export_router)
+app.include_router(metrics_router)
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, ForeignKey, Enum
+from sqlalchemy import Column, String, ForeignKey, Enum, DateTime, Index
 from sqlalchemy.orm import relationship
 import uuid, enum
+from datetime import datetime
 
 from app.database import BaseSQL
 
@@ -16,6 +17,16 @@ class Booking(BaseSQL):
     offer_id = Column(String, ForeignKey("offers.id"), nullable=False)
     student_id = Column(String, ForeignKey("users.id"), nullable=False)
     status = Column(Enum(BookingStatus), nullable=False, default=BookingStatus.PENDING)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
-    offer = relationship("Offer")
-    student = relationship("User")
\ No newline at end of file
+    offer = relationship("Offer", lazy="raise_on_sql")
+    student = relationship("User", lazy="raise_on_sql")
+
+    __table_args__ = (
+        # clé de tri de la pagination keyset
+        Index("ix_bookings_created_at_id", "created_at", "id"),
+        # listes filtrées (by-student, list/mine, by-offer, by-tutor, ?status=) dans l'ordre de la page
+        Index("ix_bookings_student_created_at_id", "student_id", "created_at", "id"),
+        Index("ix_bookings_offer_created_at_id", "offer_id", "created_at", "id"),
+        Index("ix_bookings_status_created_at_id", "status", "created_at", "id"),
+    )
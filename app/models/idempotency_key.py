@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+
+from app.database import BaseSQL
+
+
+class IdempotencyKey(BaseSQL):
+    """
+    Première réponse d'une écriture envoyée avec un en-tête Idempotency-Key
+    (app.services.idempotency). status_code NULL : requête encore en cours.
+    """
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    # empreinte méthode + chemin + corps : une clé réutilisée pour une autre requête est refusée
+    fingerprint = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    body = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, ForeignKey, Numeric
+from sqlalchemy import Column, String, ForeignKey, Numeric, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import relationship
 import uuid
 
@@ -13,4 +14,14 @@ class Offer(BaseSQL):
     description = Column(String, nullable=True)
     price_hour = Column(Numeric(precision=10, scale=2), nullable=False)
 
-    tutor = relationship("User", back_populates="offers")
+    # Document plein-texte (sujet + description + bio du tuteur), sans accents.
+    # Alimenté par app.services.offer_search ; seulement utilisé sous Postgres.
+    search_vector = Column(String().with_variant(TSVECTOR(), "postgresql"), nullable=True)
+
+    tutor = relationship("User", back_populates="offers", lazy="raise_on_sql")
+
+    __table_args__ = (
+        # offres d'un tuteur (by-tutor, mine, jointure des réservations reçues)
+        Index("ix_offers_tutor_id_id", "tutor_id", "id"),
+        Index("ix_offers_search_vector", "search_vector", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
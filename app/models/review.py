@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -10,11 +10,18 @@ class Review(BaseSQL):
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()), index=True)
     tutor_id = Column(String, ForeignKey("users.id"), nullable=False)
-    student_id = Column(String, ForeignKey("users.id"), nullable=False)
+    student_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
 
     rating = Column(Integer, nullable=False)  # 1..5
     comment = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    tutor = relationship("User", foreign_keys=[tutor_id])
-    student = relationship("User", foreign_keys=[student_id])
+    tutor = relationship("User", foreign_keys=[tutor_id], lazy="raise_on_sql")
+    student = relationship("User", foreign_keys=[student_id], lazy="raise_on_sql")
+
+    __table_args__ = (
+        # avis d'un tuteur, plus récents d'abord (couvre aussi les agrégats par tutor_id)
+        Index("ix_reviews_tutor_created_at_id", "tutor_id", "created_at", "id"),
+        # export complet dans l'ordre keyset
+        Index("ix_reviews_created_at_id", "created_at", "id"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, String, ForeignKey, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime
@@ -15,6 +15,13 @@ class Timeslot(BaseSQL):
     end_utc = Column(DateTime, nullable=False)
 
     is_booked = Column(Boolean, default=False, nullable=False)
-    booking_id = Column(String, ForeignKey("bookings.id"), nullable=True)
+    booking_id = Column(String, ForeignKey("bookings.id"), nullable=True, index=True)
 
-    offer = relationship("Offer")
+    offer = relationship("Offer", lazy="raise_on_sql")
+
+    __table_args__ = (
+        # créneaux d'une offre par date de début (of-offer, mine)
+        Index("ix_timeslots_offer_start_id", "offer_id", "start_utc", "id"),
+        # recherche de créneaux ouverts tous tuteurs confondus, sur une fenêtre de dates
+        Index("ix_timeslots_start_id", "start_utc", "id"),
+    )
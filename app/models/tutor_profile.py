@@ -16,7 +16,7 @@ class TutorProfile(BaseSQL):
     years_experience = Column(Integer, nullable=True)
     photo_url = Column(String, nullable=True)
 
-    user = relationship("User", back_populates="tutor_profile")
+    user = relationship("User", back_populates="tutor_profile", lazy="raise_on_sql")
 
     __table_args__ = (
         UniqueConstraint('user_id', name='uniq_tutor_profile_user'),
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime
+
+from app.database import BaseSQL
+
+class TutorRating(BaseSQL):
+    """
+    Agrégat des avis d'un tuteur, tenu à jour à chaque nouvel avis
+    (app.services.rating) pour ne pas refaire COUNT/AVG sur reviews.
+    """
+    __tablename__ = "tutor_ratings"
+
+    tutor_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+
+    # Histogramme des notes 1..5
+    stars_1 = Column(Integer, nullable=False, default=0)
+    stars_2 = Column(Integer, nullable=False, default=0)
+    stars_3 = Column(Integer, nullable=False, default=0)
+    stars_4 = Column(Integer, nullable=False, default=0)
+    stars_5 = Column(Integer, nullable=False, default=0)
+
+    last_review_at = Column(DateTime, nullable=True)
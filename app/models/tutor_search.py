@@ -0,0 +1,55 @@
+from sqlalchemy import Column, String, Integer, Float, Numeric, DateTime, Index
+
+from app.database import BaseSQL
+
+class TutorSearch(BaseSQL):
+    """
+    Projection à plat d'un tuteur pour /search/tutors : une ligne par tuteur
+    ayant un profil, recalculée par app.services.tutor_search quand ses
+    données sources (utilisateur, profil, offres, avis, créneaux) changent.
+    """
+    __tablename__ = "tutor_search"
+
+    tutor_id = Column(String, primary_key=True)
+    profile_id = Column(String, nullable=False)
+
+    first_name = Column(String, nullable=False, default="")
+    last_name = Column(String, nullable=False, default="")
+    email = Column(String, nullable=False)
+    postal_code = Column(String, nullable=True)
+    department = Column(String, nullable=True)
+
+    bio = Column(String, nullable=True)
+    photo_url = Column(String, nullable=True)
+    languages = Column(String, nullable=True)
+    years_experience = Column(Integer, nullable=True)
+
+    # Offres : matières pour l'affichage ("Maths, Piano"), fourchette de prix
+    subjects = Column(String, nullable=False, default="")
+    offer_count = Column(Integer, nullable=False, default=0)
+    min_price = Column(Numeric(precision=10, scale=2), nullable=True)
+    max_price = Column(Numeric(precision=10, scale=2), nullable=True)
+
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_avg = Column(Float, nullable=True)
+
+    # Premier créneau libre à venir au moment du dernier recalcul
+    next_available_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # synchronisation de l'index de facettes (lignes modifiées depuis ...)
+        Index("ix_tutor_search_updated_at", "updated_at"),
+    )
+
+class TutorSearchSubject(BaseSQL):
+    """
+    Une ligne par (tuteur, matière normalisée) : matières de l'index de
+    facettes sans parcourir les offres.
+    """
+    __tablename__ = "tutor_search_subjects"
+
+    tutor_id = Column(String, primary_key=True)
+    subject = Column(String, primary_key=True)      # normalize_text(offer.subject)
+    department = Column(String, nullable=True)
+    min_price = Column(Numeric(precision=10, scale=2), nullable=False)
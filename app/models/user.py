@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Enum
+from sqlalchemy import Column, String, Enum, Index
 from sqlalchemy.orm import relationship
 import uuid, enum
 
@@ -24,6 +24,13 @@ class User(BaseSQL):
     department = Column(String, nullable=True)
 
 
-    # Relation tuteur -> ses offres
-    offers = relationship("Offer", back_populates="tutor", cascade="all,delete", lazy="selectin")
-    tutor_profile = relationship("TutorProfile", uselist=False, back_populates="user")
\ No newline at end of file
+    # Relation tuteur -> ses offres.
+    # Aucune relation n'est chargée implicitement (lazy="raise_on_sql", comme sur les
+    # autres modèles) : une requête qui en a besoin la demande via selectinload/joinedload.
+    offers = relationship("Offer", back_populates="tutor", cascade="all,delete", lazy="raise_on_sql")
+    tutor_profile = relationship("TutorProfile", uselist=False, back_populates="user", lazy="raise_on_sql")
+
+    __table_args__ = (
+        # tuteurs d'un département (recherche, recommandations, index géo)
+        Index("ix_users_role_department", "role", "department"),
+    )
\ No newline at end of file
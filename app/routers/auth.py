@@ -3,13 +3,17 @@ from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.serializers.auth import Login, Register, AuthToken, Me
-from app.services.auth import create_user_with_password, generate_access_token, decode_jwt
+from app.services.auth import create_user_with_password, generate_access_token, decode_jwt, create_access_token, revoke_token
 from app.models.user import User, UserRole
 from app.exceptions.user import UserAlreadyExists, UserNotFound, IncorrectPassword
+from app.exceptions.auth import PasswordPoolSaturated
 from app.routers.utils import verify_authorization_header
 
 auth_router = APIRouter(prefix="/auth", tags=["auth"])
 
+def _saturated(e: PasswordPoolSaturated) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
 # @auth_router.post("/token", response_model=AuthToken)
 # def get_access_token(payload: Login, db: Session = Depends(get_db)) -> AuthToken:
 #     try:
@@ -31,10 +35,12 @@ def register_user(payload: Register, db: Session = Depends(get_db)) -> AuthToken
             last_name=payload.last_name,
             role=payload.role,
         )
-        token = generate_access_token(db, email=user.email, password=payload.password)
-        return AuthToken(access_token=token)
+        # le mot de passe vient d'être haché : inutile de le revérifier (600k itérations)
+        return AuthToken(access_token=create_access_token(user))
     except UserAlreadyExists as e:
         raise HTTPException(status_code=409, detail=str(e))
+    except PasswordPoolSaturated as e:
+        raise _saturated(e)
 
 @auth_router.post("/token", response_model=AuthToken)
 def get_access_token(payload: Login, db: Session = Depends(get_db)) -> AuthToken:
@@ -45,12 +51,17 @@ def get_access_token(payload: Login, db: Session = Depends(get_db)) -> AuthToken
         raise HTTPException(status_code=404, detail=str(e))
     except IncorrectPassword as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except PasswordPoolSaturated as e:
+        raise _saturated(e)
 
 @auth_router.get("/me", response_model=Me)
 def get_me(auth=Depends(verify_authorization_header), db: Session = Depends(get_db)) -> Me:
     # auth contains {"user_id": "..."}
-    from app.models.user import User
-    u = db.query(User).get(auth["user_id"])
+    u = db.get(User, auth["user_id"])
     if not u:
         raise HTTPException(status_code=404, detail="User not found")
-    return u
\ No newline at end of file
+    return u
+
+@auth_router.post("/logout", status_code=204)
+def logout(auth=Depends(verify_authorization_header)):
+    revoke_token(auth)
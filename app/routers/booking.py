@@ -1,26 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.offer import Offer
 from app.models.booking import Booking, BookingStatus
-from app.models.user import User, UserRole
-from app.serializers.booking import BookingCreate, BookingOut
-from app.routers.utils import get_user_id
-from app.models.timeslot import Timeslot
+from app.models.user import UserRole
+from app.serializers.booking import BookingCreate, BookingOut, BookingDecisionBatchIn, BOOKING_ROWS
+from app.serializers.batch import BatchResult
+from app.serializers.pagination import Page
+from app.routers.utils import get_user_id, require_role, paginate, batch_result, idempotent
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.services import booking as booking_service
+from app.services.response_cache import invalidate
+from app.exceptions.booking import (
+    BookingNotFound, OfferNotFound, TimeslotNotFound, TimeslotOfferMismatch,
+    TimeslotAlreadyBooked, NotOfferOwner, InvalidBookingAction,
+)
 
 booking_router = APIRouter(prefix="/bookings", tags=["bookings"])
 
-@booking_router.get("/", response_model=list[BookingOut])
+# Plus récentes d'abord ; l'id départage les créations simultanées
+BOOKING_ORDER = (Booking.created_at, Booking.id)
+
+DECIDE_ERRORS = {BookingNotFound: 404, NotOfferOwner: 403, InvalidBookingAction: 400}
+
+def _page(q, status, limit, cursor):
+    if status:
+        q = q.filter(Booking.status == status)
+    return paginate(q, BOOKING_ORDER, limit, cursor, descending=True, rows=BOOKING_ROWS)
+
+@booking_router.get("/", response_model=Page[BookingOut])
 def list_bookings(
     db: Session = Depends(get_db),
     status: BookingStatus | None = Query(None),
-    skip: int = 0,
-    limit: int = 50,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
 ):
-    q = db.query(Booking)
-    if status:
-        q = q.filter(Booking.status == status)
-    return q.offset(skip).limit(limit).all()
+    return _page(db.query(Booking), status, limit, cursor)
 
 @booking_router.get("/{booking_id}", response_model=BookingOut)
 def get_booking(booking_id: str, db: Session = Depends(get_db)):
@@ -29,33 +44,30 @@ def get_booking(booking_id: str, db: Session = Depends(get_db)):
         raise HTTPException(404, "Booking not found")
     return bk
 
-@booking_router.get("/by-student/{student_id}", response_model=list[BookingOut])
+@booking_router.get("/by-student/{student_id}", response_model=Page[BookingOut])
 def list_bookings_by_student(
     student_id: str, db: Session = Depends(get_db),
     status: BookingStatus | None = Query(None),
-    skip: int = 0, limit: int = 50,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
 ):
-    q = db.query(Booking).filter(Booking.student_id == student_id)
-    if status:
-        q = q.filter(Booking.status == status)
-    return q.offset(skip).limit(limit).all()
+    return _page(db.query(Booking).filter(Booking.student_id == student_id), status, limit, cursor)
 
-@booking_router.get("/by-offer/{offer_id}", response_model=list[BookingOut])
+@booking_router.get("/by-offer/{offer_id}", response_model=Page[BookingOut])
 def list_bookings_by_offer(
     offer_id: str, db: Session = Depends(get_db),
     status: BookingStatus | None = Query(None),
-    skip: int = 0, limit: int = 50,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
 ):
-    q = db.query(Booking).filter(Booking.offer_id == offer_id)
-    if status:
-        q = q.filter(Booking.status == status)
-    return q.offset(skip).limit(limit).all()
+    return _page(db.query(Booking).filter(Booking.offer_id == offer_id), status, limit, cursor)
 
-@booking_router.get("/by-tutor/{tutor_id}", response_model=list[BookingOut])
+@booking_router.get("/by-tutor/{tutor_id}", response_model=Page[BookingOut])
 def list_bookings_by_tutor(
     tutor_id: str, db: Session = Depends(get_db),
     status: BookingStatus | None = Query(None),
-    skip: int = 0, limit: int = 50,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
 ):
     # via join Offer -> Booking
     q = (
@@ -63,74 +75,70 @@ def list_bookings_by_tutor(
         .join(Offer, Offer.id == Booking.offer_id)
         .filter(Offer.tutor_id == tutor_id)
     )
-    if status:
-        q = q.filter(Booking.status == status)
-    return q.offset(skip).limit(limit).all()
+    return _page(q, status, limit, cursor)
 
 @booking_router.post("/", response_model=BookingOut, status_code=201)
-def create_booking(payload: BookingCreate, db: Session = Depends(get_db), me_id: str = Depends(get_user_id)):
-    student = db.query(User).filter(User.id == me_id).first()
-    if not student or student.role != UserRole.student:
-        raise HTTPException(403, "Only students can create bookings")
-    offer = db.query(Offer).filter(Offer.id == payload.offer_id).first()
-    if not offer:
-        raise HTTPException(404, "Offer not found")
-    timeslot = None
-    if payload.timeslot_id:
-        timeslot = db.query(Timeslot).filter(Timeslot.id == payload.timeslot_id).first()
-        if not timeslot:
-            raise HTTPException(404, "Timeslot not found")
-        if timeslot.offer_id != offer.id:
-            raise HTTPException(400, "Timeslot does not belong to this offer")
-        if timeslot.is_booked:
-            raise HTTPException(409, "Timeslot already booked")
+def create_booking(payload: BookingCreate, request: Request, db: Session = Depends(get_db),
+                   me_id: str = Depends(require_role(UserRole.student, detail="Only students can create bookings")),
+                   idempotency_key: str | None = Header(None, alias="Idempotency-Key")):
+    def build():
+        try:
+            return booking_service.create_booking(
+                db, student_id=me_id, offer_id=payload.offer_id, timeslot_id=payload.timeslot_id, commit=False
+            )
+        except (OfferNotFound, TimeslotNotFound) as e:
+            raise HTTPException(404, str(e))
+        except TimeslotOfferMismatch as e:
+            raise HTTPException(400, str(e))
+        except TimeslotAlreadyBooked as e:
+            raise HTTPException(409, str(e))
 
-    booking = Booking(offer_id=offer.id, student_id=student.id, status=BookingStatus.PENDING)
-    db.add(booking)
-    db.commit()
-    db.refresh(booking)
-
-    if timeslot:
-        timeslot.is_booked = True
-        timeslot.booking_id = booking.id
-        db.add(timeslot)
-        db.commit()
-        db.refresh(timeslot)
+    response = idempotent(db, me_id, idempotency_key, request, payload, BookingOut, 201, build)
+    if payload.timeslot_id:
+        # le créneau disparaît des prochains créneaux de la carte tuteur
+        invalidate(f"offer:{payload.offer_id}")
+    return response
 
-    return booking
+@booking_router.post("/decide-batch", response_model=BatchResult[BookingOut])
+def decide_bookings_batch(payload: BookingDecisionBatchIn, db: Session = Depends(get_db),
+                          me_id: str = Depends(get_user_id)):
+    """
+    ACCEPT / REJECT de plusieurs réservations en une transaction ; les éléments
+    refusés sont listés dans `errors`.
+    """
+    decided, errors = booking_service.decide_bookings(
+        db, tutor_id=me_id, decisions=[(item.booking_id, item.action) for item in payload.items]
+    )
+    if decided:
+        invalidate(f"tutor:{me_id}")    # un REJECT libère le créneau
+    return batch_result(decided, errors, DECIDE_ERRORS)
 
 @booking_router.post("/{booking_id}/{action}", response_model=BookingOut)
 def decide_booking(booking_id: str, action: str, db: Session = Depends(get_db), me_id: str = Depends(get_user_id)):
-    booking = db.query(Booking).filter(Booking.id == booking_id).first()
-    if not booking:
-        raise HTTPException(404, "Booking not found")
-    offer = db.query(Offer).filter(Offer.id == booking.offer_id).first()
-    if not offer or offer.tutor_id != me_id:
-        raise HTTPException(403, "Not your offer")
-    if action.upper() not in ("ACCEPT", "REJECT"):
-        raise HTTPException(400, "Action must be ACCEPT or REJECT")
-    if action.upper() == "REJECT":
-        # free any linked timeslot
-        ts = db.query(Timeslot).filter(Timeslot.booking_id == booking.id).first()
-        if ts:
-            ts.is_booked = False
-            ts.booking_id = None
-            db.add(ts)
-            db.commit()
-    booking.status = BookingStatus.ACCEPTED if action.upper()=="ACCEPT" else BookingStatus.REJECTED
-    db.commit()
-    db.refresh(booking)
+    try:
+        booking = booking_service.decide_booking(db, booking_id=booking_id, tutor_id=me_id, action=action)
+    except BookingNotFound as e:
+        raise HTTPException(404, str(e))
+    except NotOfferOwner as e:
+        raise HTTPException(403, str(e))
+    except InvalidBookingAction as e:
+        raise HTTPException(400, str(e))
+    invalidate(f"tutor:{me_id}")    # un REJECT libère le créneau
     return booking
 
-@booking_router.get("/list/mine", response_model=list[BookingOut])
-def my_bookings(db: Session = Depends(get_db), user_id: str = Depends(get_user_id)):
-    return db.query(Booking).filter(Booking.student_id == user_id).all()
+@booking_router.get("/list/mine", response_model=Page[BookingOut])
+def my_bookings(db: Session = Depends(get_db), user_id: str = Depends(get_user_id),
+                limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                cursor: str | None = Query(None, description="next_cursor of the previous page")):
+    return _page(db.query(Booking).filter(Booking.student_id == user_id), None, limit, cursor)
 
-@booking_router.get("/list/on-my-offers", response_model=list[BookingOut])
-def bookings_on_my_offers(db: Session = Depends(get_db), user_id: str = Depends(get_user_id)):
-    return (
+@booking_router.get("/list/on-my-offers", response_model=Page[BookingOut])
+def bookings_on_my_offers(db: Session = Depends(get_db), user_id: str = Depends(get_user_id),
+                          limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                          cursor: str | None = Query(None, description="next_cursor of the previous page")):
+    q = (
         db.query(Booking)
         .join(Offer, Booking.offer_id == Offer.id)
         .filter(Offer.tutor_id == user_id)
-        .all()
-    )
\ No newline at end of file
+    )
+    return _page(q, None, limit, cursor)
\ No newline at end of file
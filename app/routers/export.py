@@ -0,0 +1,77 @@
+from datetime import datetime
+from enum import Enum
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.booking import BookingStatus
+from app.services import export as export_service
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+class ExportDataset(str, Enum):
+    bookings = "bookings"
+    offers = "offers"
+    reviews = "reviews"
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+MEDIA_TYPES = {ExportFormat.ndjson: "application/x-ndjson", ExportFormat.csv: "text/csv; charset=utf-8"}
+ENCODERS = {ExportFormat.ndjson: export_service.encode_ndjson, ExportFormat.csv: export_service.encode_csv}
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """
+    gzip listé dans Accept-Encoding avec un poids non nul ("gzip;q=0" : refusé).
+    """
+    for item in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        if coding.lower() != "gzip":
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        return q > 0
+    return False
+
+
+@router.get("/{dataset}.{fmt}", response_class=StreamingResponse)
+def export_dataset(
+    request: Request,
+    dataset: ExportDataset,
+    fmt: ExportFormat,
+    db: Session = Depends(get_db),
+    status: BookingStatus | None = Query(None, description="bookings only"),
+    tutor_id: str | None = Query(None),
+    since: datetime | None = Query(None, description="created_at >= since (bookings, reviews)"),
+    until: datetime | None = Query(None, description="created_at < until (bookings, reviews)"),
+    cursor: str | None = Query(None, description="_cursor of the last row received, to resume"),
+):
+    """
+    Flux complet du jeu de données, trié par sa clé keyset ; gzip si le client l'accepte.
+    """
+    ds = export_service.DATASETS[dataset.value]
+    try:
+        stmt = export_service.export_statement(ds, status=status, tutor_id=tutor_id,
+                                               since=since, until=until, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    chunks = ENCODERS[fmt](ds, export_service.iter_batches(db.get_bind(), stmt))
+    headers = {"Content-Disposition": f'attachment; filename="{dataset.value}.{fmt.value}"'}
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        chunks = export_service.gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=MEDIA_TYPES[fmt], headers=headers)
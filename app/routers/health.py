@@ -1,4 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database import get_db, started_async_engine
+from app.services import health
 
 health_router = APIRouter()
 
@@ -16,3 +21,42 @@ def read_hello():
 @health_router.get("/health")
 def read_health():
     return {"message": "Api is running fine!"}
+
+
+@health_router.get("/health/live")
+def read_liveness():
+    """
+    Le processus répond (aucune dépendance vérifiée) : en échec, redémarrer le worker.
+    """
+    return {"status": "alive"}
+
+
+@health_router.get("/health/ready")
+def read_readiness(response: Response, db: Session = Depends(get_db)):
+    """
+    Prêt à recevoir du trafic : pools de connexions non saturés (moteur sync des
+    écritures, moteur async des lectures) et base joignable (SELECT 1 en cache,
+    HEALTH_CHECK_TTL). 503 sinon : le load balancer doit router ailleurs plutôt
+    que laisser les requêtes attendre une connexion.
+    Les pools sont vérifiés d'abord : sur un pool saturé, le SELECT 1 attendrait
+    lui-même DB_POOL_TIMEOUT ; la sonde répond alors sans lui (dernier résultat connu).
+    """
+    pool = health.pool_stats(db.get_bind().pool)
+    async_engine = started_async_engine()
+    async_pool = health.pool_stats(async_engine.pool) if async_engine is not None else None
+    saturated = any(p is not None and p.get("saturated", False) for p in (pool, async_pool))
+    if saturated:
+        database = health.database_check.last
+    else:
+        database = health.database_check.status(lambda: db.execute(text("SELECT 1")))
+    ready = not saturated and database["ok"]
+    if not ready:
+        response.status_code = 503
+    return {
+        "status": "ready" if ready else "unavailable",
+        "database": database,
+        "pool": pool,
+        "async_pool": async_pool,
+        "schema_version": health.schema_version(),
+        "latency": health.recent_latency(),
+    }
@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.services.metrics import route_metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def read_metrics():
+    """
+    Métriques par route au format texte Prometheus (compteurs du worker courant).
+    """
+    return PlainTextResponse(route_metrics.render(), media_type="text/plain; version=0.0.4")
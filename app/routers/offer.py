@@ -1,76 +1,110 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.offer import Offer
-from app.models.user import User, UserRole
-from app.serializers.offer import OfferCreate, OfferOut
-from app.routers.utils import get_user_id
+from app.models.user import UserRole
+from app.serializers.offer import OfferCreate, OfferOut, OfferBatchIn, OFFER_ROWS
+from app.serializers.batch import BatchResult
+from app.serializers.pagination import Page
+from app.routers.utils import get_user_id, require_role, paginate, cached_response, batch_result, idempotent
 from app.routers.utils import verify_authorization_header
-from app.services.user import get_user_by_id
-from app.services.offer import get_offers_by_department
+from app.exceptions.user import UserNotFound
+from app.services.offer import create_offers
 from app.services.geo_service import postal_code_to_department
+from app.services import offer_search
+from app.services.response_cache import invalidate
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 
 offer_router = APIRouter(prefix="/offers", tags=["offers"])
 
 @offer_router.post("/", response_model=OfferOut, status_code=201)
-def create_offer(payload: OfferCreate, db: Session = Depends(get_db), me_id: str = Depends(get_user_id)):
-    tutor = db.query(User).filter(User.id == me_id).first()
-    if not tutor or tutor.role != UserRole.tutor:
-        raise HTTPException(403, "Only tutors can create offers")
+def create_offer(payload: OfferCreate, request: Request, db: Session = Depends(get_db),
+                 me_id: str = Depends(require_role(UserRole.tutor, detail="Only tutors can create offers")),
+                 idempotency_key: str | None = Header(None, alias="Idempotency-Key")):
+    def build():
+        offer = Offer(
+            tutor_id=me_id,
+            subject=payload.subject,
+            description=payload.description,
+            price_hour=payload.price_hour,
+        )
+        db.add(offer)
+        db.flush()
+        offer_search.index_offer(db, offer)
+        return offer
 
-    offer = Offer(
-        tutor_id=me_id,
-        subject=payload.subject,
-        description=payload.description,
-        price_hour=payload.price_hour,
-    )
-    db.add(offer)
-    db.commit()
-    db.refresh(offer)
-    return offer
+    response = idempotent(db, me_id, idempotency_key, request, payload, OfferOut, 201, build)
+    invalidate(f"tutor:{me_id}", "offers")
+    return response
+
+@offer_router.post("/batch", response_model=BatchResult[OfferOut], status_code=201)
+def create_offers_batch(payload: OfferBatchIn, db: Session = Depends(get_db),
+                        me_id: str = Depends(require_role(UserRole.tutor, detail="Only tutors can create offers"))):
+    """
+    Plusieurs offres en une insertion et une transaction.
+    """
+    created = create_offers(db, tutor_id=me_id, items=payload.items)
+    invalidate(f"tutor:{me_id}", "offers")
+    return batch_result(created, [], {})
 
-@offer_router.get("/", response_model=list[OfferOut])
-def list_offers(q: str | None = Query(None, description="search by subject"),
-                db: Session = Depends(get_db)):
-    query = db.query(Offer)
-    if q:
-        query = query.filter(Offer.subject.ilike(f"%{q}%"))
-    return query.all()
+@offer_router.get("/", response_model=Page[OfferOut])
+async def list_offers(request: Request,
+                      q: str | None = Query(None, description="search in subject, description and tutor bio"),
+                      limit: int = Query(20, ge=1, le=100),
+                      cursor: str | None = Query(None, description="next_cursor of the previous page"),
+                      db: AsyncSession = Depends(get_async_db)):
+    async def build():
+        try:
+            items, next_cursor = await db.run_sync(
+                lambda s: offer_search.search_offers(s, q=q, limit=limit, cursor=cursor,
+                                                     columns=OFFER_ROWS.columns if OFFER_ROWS.enabled else None)
+            )
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        if OFFER_ROWS.enabled:
+            return OFFER_ROWS.page(items, next_cursor)
+        return {"items": items, "next_cursor": next_cursor}
+    # toute offre créée ou bio modifiée peut changer le classement : tag global
+    return await cached_response(request, Page[OfferOut], build, tags=["offers"])
 
-@offer_router.get("/by-tutor/{tutor_id}", response_model=list[OfferOut])
-def list_offers_by_tutor(tutor_id: str, db: Session = Depends(get_db)):
-    return db.query(Offer).filter(Offer.tutor_id == tutor_id).all()
+@offer_router.get("/by-tutor/{tutor_id}", response_model=Page[OfferOut])
+async def list_offers_by_tutor(request: Request, tutor_id: str, db: AsyncSession = Depends(get_async_db),
+                               limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                               cursor: str | None = Query(None, description="next_cursor of the previous page")):
+    async def build():
+        return await db.run_sync(
+            lambda s: paginate(s.query(Offer).filter(Offer.tutor_id == tutor_id), (Offer.id,), limit, cursor,
+                               rows=OFFER_ROWS)
+        )
+    return await cached_response(request, Page[OfferOut], build, tags=[f"tutor:{tutor_id}"])
 
-@offer_router.get("/mine", response_model=list[OfferOut])
-def list_my_offers(auth=Depends(verify_authorization_header), db: Session = Depends(get_db)):
-    return db.query(Offer).filter(Offer.tutor_id == auth["user_id"]).all()
+@offer_router.get("/mine", response_model=Page[OfferOut])
+async def list_my_offers(auth=Depends(verify_authorization_header), db: AsyncSession = Depends(get_async_db),
+                         limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                         cursor: str | None = Query(None, description="next_cursor of the previous page")):
+    return await db.run_sync(
+        lambda s: paginate(s.query(Offer).filter(Offer.tutor_id == auth["user_id"]), (Offer.id,), limit, cursor,
+                           rows=OFFER_ROWS)
+    )
 
 @offer_router.get("/recommendations", response_model=list[OfferOut])
-def get_recommended_offers(
+async def get_recommended_offers(
     limit: int = Query(3, ge=1, le=10, description="Nombre d'offres à retourner"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: str = Depends(get_user_id)
 ):
     """
-    Retourne des offres de tuteurs du même département que l'utilisateur connecté.
+    Offres classées pour l'utilisateur connecté : proximité, notes, prix habituel,
+    matières déjà réservées et disponibilités du tuteur (app.services.recommendations).
     Nécessite une authentification.
     """
-    # Récupérer l'utilisateur connecté
+    # NumPy n'est chargé qu'à la première recommandation, pas au démarrage du worker
+    from app.services.recommendations import recommender
     try:
-        user = get_user_by_id(user_id=user_id, db=db)
-    except:
+        await recommender.ensure(db)
+        return await db.run_sync(lambda s: recommender.recommend(s, user_id, limit))
+    except UserNotFound:
         raise HTTPException(status_code=404, detail="User not found")
-    
-    # Vérifier que l'utilisateur a un département
-    if not user.department:
-        raise HTTPException(
-            status_code=400, 
-            detail="Vous devez renseigner votre code postal pour recevoir des recommandations"
-        )
-    
-    # Récupérer les offres du même département
-    offers = get_offers_by_department(db=db, department=user.department, limit=limit)
-    
-    return offers
 
@@ -1,39 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
-from app.database import get_db
-from app.routers.utils import get_user_id
+from app.database import get_db, get_async_db
+from app.routers.utils import require_role, paginate, cached_response
 from app.models.user import User, UserRole
 from app.models.review import Review
-from app.serializers.review import ReviewIn, ReviewOut
+from app.serializers.review import ReviewIn, ReviewOut, RatingSummary
+from app.serializers.pagination import Page
+from app.services import rating as rating_service
+from app.services.response_cache import invalidate
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/reviews", tags=["reviews"])
 
-def _get_user(db: Session, user_id: str) -> User:
-    u = db.query(User).filter(User.id == user_id).first()
-    if not u:
+def _get_role(db: Session, user_id: str) -> UserRole:
+    role = db.execute(select(User.role).where(User.id == user_id)).scalar()
+    if role is None:
         raise HTTPException(404, "User not found")
-    return u
+    return role
 
 @router.post("/for/{tutor_id}", response_model=ReviewOut)
-def create_review_for_tutor(tutor_id: str, payload: ReviewIn, db: Session = Depends(get_db), user_id: str = Depends(get_user_id)):
-    me = _get_user(db, user_id)
-    if me.role != UserRole.student:
-        raise HTTPException(403, "Only students can create reviews")
-    tutor = _get_user(db, tutor_id)
-    if tutor.role != UserRole.tutor:
+def create_review_for_tutor(tutor_id: str, payload: ReviewIn, db: Session = Depends(get_db),
+                            user_id: str = Depends(require_role(UserRole.student, detail="Only students can create reviews"))):
+    if _get_role(db, tutor_id) != UserRole.tutor:
         raise HTTPException(400, "Target user is not a tutor")
-    rev = Review(tutor_id=tutor.id, student_id=me.id, rating=payload.rating, comment=payload.comment)
-    db.add(rev); db.commit(); db.refresh(rev)
+    rev = Review(tutor_id=tutor_id, student_id=user_id, rating=payload.rating, comment=payload.comment)
+    db.add(rev); db.flush()
+    rating_service.record_review(db, rev)
+    db.commit(); db.refresh(rev)
+    invalidate(f"tutor:{tutor_id}")
     return rev
 
-@router.get("/of-tutor/{tutor_id}", response_model=list[ReviewOut])
-def list_reviews_of_tutor(tutor_id: str, db: Session = Depends(get_db)):
-    return db.query(Review).filter(Review.tutor_id == tutor_id).order_by(Review.created_at.desc()).all()
+@router.get("/of-tutor/{tutor_id}", response_model=Page[ReviewOut])
+async def list_reviews_of_tutor(request: Request, tutor_id: str, db: AsyncSession = Depends(get_async_db),
+                                limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                                cursor: str | None = Query(None, description="next_cursor of the previous page")):
+    def page(s: Session):
+        q = s.query(Review).filter(Review.tutor_id == tutor_id)
+        return paginate(q, (Review.created_at, Review.id), limit, cursor, descending=True)
 
-@router.get("/of-tutor/{tutor_id}/summary")
-def rating_summary(tutor_id: str, db: Session = Depends(get_db)):
-    q = db.query(func.count(Review.id), func.avg(Review.rating)).filter(Review.tutor_id == tutor_id)
-    count, avg = q.first()
-    return {"tutor_id": tutor_id, "rating_count": int(count or 0), "rating_avg": float(avg) if avg is not None else None}
+    async def build():
+        return await db.run_sync(page)
+    return await cached_response(request, Page[ReviewOut], build, tags=[f"tutor:{tutor_id}"])
+
+@router.get("/of-tutor/{tutor_id}/summary", response_model=RatingSummary)
+async def rating_summary(tutor_id: str, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(rating_service.get_summary, tutor_id)
+
+@router.get("/summaries", response_model=list[RatingSummary])
+async def rating_summaries(tutor_ids: list[str] = Query(..., max_length=100, description="?tutor_ids=a&tutor_ids=b"),
+                           db: AsyncSession = Depends(get_async_db)):
+    summaries = await db.run_sync(rating_service.get_summaries, tutor_ids)
+    return list(summaries.values())
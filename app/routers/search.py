@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any
 
-from app.database import get_db
-from app.services.geo_service import get_tutors_by_department
+from app.database import get_async_db
+from app.routers.utils import cached_response
+from app.services.geo_service import search_tutors
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.services.tutor_search import SORTS, language_codes
 
 router = APIRouter(
     prefix="/search",
@@ -11,12 +14,26 @@ router = APIRouter(
 )
 
 @router.get("/tutors", response_model=Dict[str, Any])
-def search_tutors_by_location(
+async def search_tutors_by_location(
+    request: Request,
     postal_code: str = Query(..., min_length=5, max_length=5, description="Code postal français (5 chiffres)"),
-    db: Session = Depends(get_db)
+    radius_km: float | None = Query(None, gt=0, le=200, description="Rayon de recherche autour du code postal (km)"),
+    subject: str | None = Query(None, max_length=100, description="Matière (début du nom, sans accents ni casse)"),
+    min_price: float | None = Query(None, ge=0, description="Prix horaire minimum (offre la moins chère)"),
+    max_price: float | None = Query(None, gt=0, description="Prix horaire maximum (offre la moins chère)"),
+    languages: list[str] = Query([], description="Langues parlées, toutes requises (FR, EN...)"),
+    min_experience: int | None = Query(None, ge=0, description="Années d'expérience minimum"),
+    min_rating: float | None = Query(None, ge=0, le=5, description="Note moyenne minimum"),
+    sort: str | None = Query(None, description="name (défaut), price, rating, availability ou distance (rayon, défaut)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="next_cursor de la page précédente"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Renvoie les profs d'un département précis
+    Renvoie les profs d'un département précis,
+    ou ceux situés à moins de `radius_km` du code postal (triés par distance),
+    filtrés par matière, prix, langues, expérience et note, avec les comptes
+    de facettes du résultat complet (`facets`) et une pagination par curseur.
     """
     
     # Validation du format du code postal
@@ -25,33 +42,66 @@ def search_tutors_by_location(
             status_code=400, 
             detail="Le code postal doit contenir uniquement des chiffres"
         )
+    if sort is not None and sort not in SORTS:
+        raise HTTPException(status_code=400, detail=f"Tri inconnu : {', '.join(SORTS)}")
+    if sort == "distance" and radius_km is None:
+        raise HTTPException(status_code=400, detail="Le tri par distance nécessite radius_km")
+    # languages=FR&languages=EN ou languages=FR,EN
+    filters = {"subject": subject, "min_price": min_price, "max_price": max_price,
+               "languages": [code for value in languages for code in language_codes(value)],
+               "min_experience": min_experience, "min_rating": min_rating,
+               "sort": sort, "limit": limit, "cursor": cursor}
     
-    try:
-        # Appel du service (logique métier)
-        tutors = get_tutors_by_department(db=db, postal_code=postal_code)
-        
-        # Vérification si des tuteurs ont été trouvés
-        if tutors is None:
+    async def build():
+        try:
+            # Appel du service (logique métier)
+            # NumPy n'est chargé qu'à la première recherche, pas au démarrage du worker
+            from app.services.tutor_facets import tutor_facet_index
+            await tutor_facet_index.ensure(db)
+            try:
+                result = await db.run_sync(lambda s: search_tutors(s, postal_code, radius_km, **filters))
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Curseur invalide")
+
+            # Vérification si des tuteurs ont été trouvés
+            if result is None:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Code postal invalide ou département non reconnu"
+                )
+
+            # Construction de la réponse
+            response = {
+                "count": result["count"],
+                "search_zip": postal_code,
+                "data": result["items"],
+                "facets": result["facets"],
+                "next_cursor": result["next_cursor"],
+            }
+            if radius_km is not None:
+                response["radius_km"] = radius_km
+            departments[:] = sorted(result["departments"])
+            return response
+
+        except HTTPException:
+            # Re-lever les HTTPException déjà gérées
+            raise
+
+        except Exception as e:
+            # Logger l'erreur pour le débogage (optionnel)
+            print(f"Erreur lors de la recherche de tuteurs: {str(e)}")
             raise HTTPException(
-                status_code=400,
-                detail="Code postal invalide ou département non reconnu"
+                status_code=500,
+                detail="Erreur interne lors de la recherche des tuteurs"
             )
-        
-        # Construction de la réponse
-        return {
-            "count": len(tutors),
-            "search_zip": postal_code,
-            "data": tutors
-        }
-        
-    except HTTPException:
-        # Re-lever les HTTPException déjà gérées
-        raise
-        
-    except Exception as e:
-        # Logger l'erreur pour le débogage (optionnel)
-        print(f"Erreur lors de la recherche de tuteurs: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail="Erreur interne lors de la recherche des tuteurs"
-        )
\ No newline at end of file
+
+    # Les comptes de facettes dépendent de tous les tuteurs de la zone : tags des
+    # départements couverts, invalidés au recalcul d'un de leurs tuteurs dans le
+    # modèle de lecture ; rayon : aussi "geo" (tuteur qui entre dans la zone).
+    departments: list[str] = []
+    area = ["geo"] if radius_km is not None else []
+    return await cached_response(
+        request, Dict[str, Any], build,
+        tags=lambda response: [*area, *(f"dept:{d}" for d in departments),
+                               *(f"tutor:{t['user_id']}" for t in response["data"])],
+    )
\ No newline at end of file
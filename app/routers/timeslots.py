@@ -1,53 +1,144 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
 
-from app.database import get_db
-from app.routers.utils import get_user_id
-from app.models.user import User, UserRole
+from app.database import get_db, get_async_db
+from app.routers.utils import require_role, paginate, batch_result
+from app.models.user import UserRole
 from app.models.offer import Offer
 from app.models.timeslot import Timeslot
-from app.serializers.timeslot import TimeslotIn, TimeslotOut
+from app.serializers.timeslot import (
+    TimeslotIn, TimeslotOut, TIMESLOT_ROWS, OpenSlotOut, RecurringAvailabilityIn, RecurringAvailabilityOut,
+    TimeslotBatchIn,
+)
+from app.serializers.batch import BatchResult
+from app.serializers.pagination import Page
+from app.services import availability
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.services.response_cache import invalidate
+from app.exceptions.booking import OfferNotFound, NotOfferOwner
+from app.exceptions.timeslot import InvalidTimeslot, TimeslotOverlap
 
 router = APIRouter(prefix="/timeslots", tags=["timeslots"])
 
-def _get_me(db: Session, user_id: str) -> User:
-    u = db.query(User).filter(User.id == user_id).first()
-    if not u:
-        raise HTTPException(404, "User not found")
-    return u
+TIMESLOT_ORDER = (Timeslot.start_utc, Timeslot.id)
+
+CREATE_ERRORS = {OfferNotFound: 404, NotOfferOwner: 403, InvalidTimeslot: 400, TimeslotOverlap: 409}
+
+def _window(start: datetime | None, end: datetime | None) -> tuple[datetime, datetime]:
+    try:
+        return availability.window(start, end)
+    except InvalidTimeslot as e:
+        raise HTTPException(400, str(e))
+
+def _between(q, start: datetime | None, end: datetime | None):
+    if start:
+        q = q.filter(Timeslot.start_utc >= availability.to_utc(start))
+    if end:
+        q = q.filter(Timeslot.start_utc < availability.to_utc(end))
+    return q
 
 @router.post("/", response_model=TimeslotOut)
-def create_timeslot(payload: TimeslotIn, db: Session = Depends(get_db), user_id: str = Depends(get_user_id)):
-    me = _get_me(db, user_id)
-    if me.role != UserRole.tutor:
-        raise HTTPException(403, "Only tutors can create timeslots")
-    offer = db.query(Offer).filter(Offer.id == payload.offer_id).first()
-    if not offer:
-        raise HTTPException(404, "Offer not found")
-    if offer.tutor_id != me.id:
-        raise HTTPException(403, "You can only create timeslots for your offers")
-
-    if payload.start_utc >= payload.end_utc:
-        raise HTTPException(400, "start_utc must be before end_utc")
-
-    t = Timeslot(
-        offer_id=offer.id,
-        start_utc=payload.start_utc,
-        end_utc=payload.end_utc,
-        is_booked=False
+def create_timeslot(payload: TimeslotIn, db: Session = Depends(get_db),
+                    user_id: str = Depends(require_role(UserRole.tutor, detail="Only tutors can create timeslots"))):
+    try:
+        slot = availability.create_timeslot(db, tutor_id=user_id, offer_id=payload.offer_id,
+                                            start=payload.start_utc, end=payload.end_utc)
+    except OfferNotFound as e:
+        raise HTTPException(404, str(e))
+    except NotOfferOwner as e:
+        raise HTTPException(403, str(e))
+    except InvalidTimeslot as e:
+        raise HTTPException(400, str(e))
+    except TimeslotOverlap as e:
+        raise HTTPException(409, str(e))
+    # prochains créneaux des cartes tuteur
+    invalidate(f"tutor:{user_id}")
+    return slot
+
+@router.post("/batch", response_model=BatchResult[TimeslotOut])
+def create_timeslots_batch(payload: TimeslotBatchIn, db: Session = Depends(get_db),
+                           user_id: str = Depends(require_role(UserRole.tutor, detail="Only tutors can create timeslots"))):
+    """
+    Plusieurs créneaux en une transaction ; les éléments refusés sont listés dans `errors`.
+    """
+    created, errors = availability.create_timeslots(
+        db, tutor_id=user_id, items=[(item.offer_id, item.start_utc, item.end_utc) for item in payload.items]
     )
-    db.add(t); db.commit(); db.refresh(t)
-    return t
-
-@router.get("/of-offer/{offer_id}", response_model=list[TimeslotOut])
-def list_timeslots_of_offer(offer_id: str, db: Session = Depends(get_db)):
-    return db.query(Timeslot).filter(Timeslot.offer_id == offer_id).order_by(Timeslot.start_utc.asc()).all()
-
-@router.get("/mine", response_model=list[TimeslotOut])
-def list_my_timeslots(db: Session = Depends(get_db), user_id: str = Depends(get_user_id)):
-    me = _get_me(db, user_id)
-    if me.role != UserRole.tutor:
-        raise HTTPException(403, "Only tutors can list their timeslots")
+    if created:
+        invalidate(f"tutor:{user_id}")
+    return batch_result(created, errors, CREATE_ERRORS)
+
+@router.post("/recurring", response_model=RecurringAvailabilityOut, status_code=201)
+def create_recurring_timeslots(payload: RecurringAvailabilityIn, db: Session = Depends(get_db),
+                               user_id: str = Depends(require_role(UserRole.tutor, detail="Only tutors can create timeslots"))):
+    try:
+        result = availability.generate_weekly(
+            db, tutor_id=user_id, offer_id=payload.offer_id, weekdays=payload.weekdays,
+            start_time=payload.start_time, duration_minutes=payload.duration_minutes,
+            first_day=payload.from_date, last_day=payload.to_date, tz=payload.timezone,
+        )
+    except OfferNotFound as e:
+        raise HTTPException(404, str(e))
+    except NotOfferOwner as e:
+        raise HTTPException(403, str(e))
+    except InvalidTimeslot as e:
+        raise HTTPException(400, str(e))
+    invalidate(f"tutor:{user_id}")
+    return result
+
+@router.get("/of-offer/{offer_id}", response_model=Page[TimeslotOut])
+def list_timeslots_of_offer(offer_id: str, db: Session = Depends(get_db),
+                            start: datetime | None = Query(None, alias="from"),
+                            end: datetime | None = Query(None, alias="to"),
+                            limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                            cursor: str | None = Query(None, description="next_cursor of the previous page")):
+    q = _between(db.query(Timeslot).filter(Timeslot.offer_id == offer_id), start, end)
+    return paginate(q, TIMESLOT_ORDER, limit, cursor, rows=TIMESLOT_ROWS)
+
+@router.get("/mine", response_model=Page[TimeslotOut])
+def list_my_timeslots(db: Session = Depends(get_db),
+                      user_id: str = Depends(require_role(UserRole.tutor, detail="Only tutors can list their timeslots")),
+                      start: datetime | None = Query(None, alias="from"),
+                      end: datetime | None = Query(None, alias="to"),
+                      limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                      cursor: str | None = Query(None, description="next_cursor of the previous page")):
     # all timeslots across my offers
-    return db.query(Timeslot).join(Offer, Timeslot.offer_id == Offer.id).filter(Offer.tutor_id == me.id).order_by(Timeslot.start_utc.asc()).all()
+    q = db.query(Timeslot).join(Offer, Timeslot.offer_id == Offer.id).filter(Offer.tutor_id == user_id)
+    return paginate(_between(q, start, end), TIMESLOT_ORDER, limit, cursor, rows=TIMESLOT_ROWS)
+
+@router.get("/free", response_model=Page[TimeslotOut])
+async def list_free_timeslots(offer_id: str | None = Query(None), tutor_id: str | None = Query(None),
+                              start: datetime | None = Query(None, alias="from", description="default: now"),
+                              end: datetime | None = Query(None, alias="to", description="default: from + 30 days"),
+                              limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                              cursor: str | None = Query(None, description="next_cursor of the previous page"),
+                              db: AsyncSession = Depends(get_async_db)):
+    """
+    Créneaux libres d'une offre ou d'un tuteur qui commencent entre `from` et `to`.
+    """
+    if not offer_id and not tutor_id:
+        raise HTTPException(400, "offer_id or tutor_id is required")
+    start, end = _window(start, end)
+    return await db.run_sync(lambda s: paginate(
+        availability.free_slots_query(s, start=start, end=end, offer_id=offer_id, tutor_id=tutor_id),
+        TIMESLOT_ORDER, limit, cursor, rows=TIMESLOT_ROWS,
+    ))
+
+@router.get("/search", response_model=Page[OpenSlotOut])
+async def search_open_timeslots(subject: str | None = Query(None),
+                                department: str | None = Query(None, description="code département (75, 2A, 971...)"),
+                                start: datetime | None = Query(None, alias="from", description="default: now"),
+                                end: datetime | None = Query(None, alias="to", description="default: from + 30 days"),
+                                limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                                cursor: str | None = Query(None, description="next_cursor of the previous page"),
+                                db: AsyncSession = Depends(get_async_db)):
+    """
+    Créneaux ouverts tous tuteurs confondus, triés par date de début.
+    """
+    start, end = _window(start, end)
+    return await db.run_sync(lambda s: paginate(
+        availability.open_slots_query(s, start=start, end=end, subject=subject, department=department),
+        TIMESLOT_ORDER, limit, cursor,
+    ))
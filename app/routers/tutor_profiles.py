@@ -1,62 +1,127 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.routers.utils import get_user_id
-from app.models.user import User, UserRole
+from app.database import get_db, get_async_db
+from app.routers.utils import require_role, cached_response, type_adapter
+from app.models.user import UserRole
 from app.models.tutor_profile import TutorProfile
 from app.serializers.tutor_profile import TutorProfileIn, TutorProfileOut
+from app.serializers.tutor_card import TutorCardOut
+from app.services import offer_search, tutor_card, tutor_search
+from app.services.response_cache import invalidate, response_cache, make_etag, etag_matches
+from app.services.user import get_user_department
 
 router = APIRouter(prefix="/tutors", tags=["tutors"])
 
-def _get_me(db: Session, user_id: str) -> User:
-    u = db.query(User).filter(User.id == user_id).first()
-    if not u:
-        raise HTTPException(404, "User not found")
-    return u
+def _profile_created(db: Session, user_id: str):
+    # La recherche ne renvoie que les tuteurs ayant un profil : il apparaît dans son département
+    invalidate(f"tutor:{user_id}", f"dept:{get_user_department(user_id, db)}", "geo")
 
 @router.get("/me/profile", response_model=TutorProfileOut)
-def get_my_profile(db: Session = Depends(get_db), user_id: str = Depends(get_user_id)):
-    me = _get_me(db, user_id)
-    if me.role != UserRole.tutor:
-        raise HTTPException(403, "Only tutors can access their profile")
-    prof = db.query(TutorProfile).filter(TutorProfile.user_id == me.id).first()
+def get_my_profile(db: Session = Depends(get_db),
+                   user_id: str = Depends(require_role(UserRole.tutor, detail="Only tutors can access their profile"))):
+    prof = db.query(TutorProfile).filter(TutorProfile.user_id == user_id).first()
     if not prof:
         # create empty profile on-the-fly
-        prof = TutorProfile(user_id=me.id)
+        prof = TutorProfile(user_id=user_id)
         db.add(prof); db.commit(); db.refresh(prof)
+        _profile_created(db, user_id)
     return prof
 
 @router.put("/me/profile", response_model=TutorProfileOut)
-def upsert_my_profile(payload: TutorProfileIn, db: Session = Depends(get_db), user_id: str = Depends(get_user_id)):
-    me = _get_me(db, user_id)
-    if me.role != UserRole.tutor:
-        raise HTTPException(403, "Only tutors can update their profile")
-
-    prof = db.query(TutorProfile).filter(TutorProfile.user_id == me.id).first()
+def upsert_my_profile(payload: TutorProfileIn, db: Session = Depends(get_db),
+                      user_id: str = Depends(require_role(UserRole.tutor, detail="Only tutors can update their profile"))):
+    prof = db.query(TutorProfile).filter(TutorProfile.user_id == user_id).first()
     if not prof:
-        prof = TutorProfile(user_id=me.id)
+        prof = TutorProfile(user_id=user_id)
         db.add(prof)
         db.commit()
         db.refresh(prof)
+        _profile_created(db, user_id)
 
     data = payload.model_dump(exclude_unset=True)  # <<--- important en Pydantic v2
 
-    # Normalisation côté serveur au cas où le front envoie "fr,en" en string
-    if "languages" in data and isinstance(data["languages"], str):
-        data["languages"] = [s.strip() for s in data["languages"].split(",") if s.strip()]
+    # Normalisation côté serveur ("fr, en" -> "FR,EN") : forme filtrée par /search/tutors
+    if data.get("languages") is not None:
+        data["languages"] = ",".join(tutor_search.language_codes(data["languages"])) or None
 
     for k, v in data.items():
         setattr(prof, k, v)
 
+    # la bio fait partie du document de recherche des offres
+    if "bio" in data:
+        offer_search.reindex_tutor(db, user_id, bio=prof.bio)
+
     db.add(prof)
     db.commit()
     db.refresh(prof)
+    invalidate(f"tutor:{user_id}", *(["offers"] if "bio" in data else []))
     return prof
 
 @router.get("/{tutor_id}/profile", response_model=TutorProfileOut)
-def get_public_profile(tutor_id: str, db: Session = Depends(get_db)):
-    prof = db.query(TutorProfile).filter(TutorProfile.user_id == tutor_id).first()
-    if not prof:
-        raise HTTPException(404, "Tutor profile not found")
-    return prof
+async def get_public_profile(request: Request, tutor_id: str, db: AsyncSession = Depends(get_async_db)):
+    async def build():
+        prof = await db.run_sync(lambda s: s.query(TutorProfile).filter(TutorProfile.user_id == tutor_id).first())
+        if not prof:
+            raise HTTPException(404, "Tutor profile not found")
+        return prof
+    return await cached_response(request, TutorProfileOut, build, tags=[f"tutor:{tutor_id}"])
+
+# ---- Cartes tuteur ----
+
+MAX_CARDS = 100
+
+async def _card_bodies(db: AsyncSession, tutor_ids: list[str]) -> dict[str, bytes]:
+    """
+    Corps JSON des cartes, mis en cache un par tuteur ("card:{id}") : une page de
+    résultats ne recharge que les tuteurs absents du cache, en une fois.
+    Tags : le tuteur (profil, offres, notes, créneaux) et chacune de ses offres
+    (réservation d'un créneau).
+    """
+    bodies, missing = {}, []
+    for tutor_id in tutor_ids:
+        entry = response_cache.get(f"card:{tutor_id}")
+        if entry is None:
+            missing.append(tutor_id)
+        else:
+            bodies[tutor_id] = entry[1]
+    if missing:
+        adapter = type_adapter(TutorCardOut)
+        for tutor_id, card in (await db.run_sync(tutor_card.load_cards, missing)).items():
+            body = adapter.dump_json(adapter.validate_python(card, from_attributes=True))
+            tags = [f"tutor:{tutor_id}", *(f"offer:{o['id']}" for o in card["offers"])]
+            response_cache.set(f"card:{tutor_id}", make_etag(body), body, tags)
+            bodies[tutor_id] = body
+    return bodies
+
+def _json_response(request: Request, body: bytes) -> Response:
+    etag = make_etag(body)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/cards", response_model=list[TutorCardOut])
+async def get_tutor_cards(request: Request,
+                          ids: list[str] = Query(..., description="?ids=a&ids=b ou ?ids=a,b"),
+                          db: AsyncSession = Depends(get_async_db)):
+    """
+    Cartes de plusieurs tuteurs (page de résultats), dans l'ordre demandé ;
+    les ids inconnus sont ignorés.
+    """
+    tutor_ids = list(dict.fromkeys(i.strip() for value in ids for i in value.split(",") if i.strip()))
+    if len(tutor_ids) > MAX_CARDS:
+        raise HTTPException(400, f"At most {MAX_CARDS} ids")
+    bodies = await _card_bodies(db, tutor_ids)
+    return _json_response(request, b"[" + b",".join(bodies[i] for i in tutor_ids if i in bodies) + b"]")
+
+@router.get("/{tutor_id}/card", response_model=TutorCardOut)
+async def get_tutor_card(request: Request, tutor_id: str, db: AsyncSession = Depends(get_async_db)):
+    """
+    Profil, résumé des notes, offres et prochains créneaux libres de chaque offre.
+    """
+    body = (await _card_bodies(db, [tutor_id])).get(tutor_id)
+    if body is None:
+        raise HTTPException(404, "Tutor not found")
+    return _json_response(request, body)
@@ -1,6 +1,18 @@
-from typing import Union
-from fastapi import Header, HTTPException
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Iterable, Union
+from fastapi import Depends, Header, HTTPException, Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.user import User, UserRole
 from app.services.auth import decode_jwt
+from app.exceptions.idempotency import IdempotencyKeyInProgress, IdempotencyKeyMismatch
+from app.serializers.fast import FastJSONResponse, RowSerializer
+from app.services import idempotency
+from app.services.pagination import keyset_page
+from app.services.response_cache import response_cache, make_etag, etag_matches
 
 async def verify_authorization_header(authorization: str | None = Header(None)) -> dict[str, Union[int, dict]]:
     if not authorization or not authorization.startswith("Bearer "):
@@ -14,3 +26,146 @@ async def get_user_id(authorization: str | None = Header(None)) -> str:
         return str(auth["user_id"])
     except KeyError:
         raise HTTPException(status_code=401, detail="Invalid token")
+
+def require_role(*roles: UserRole, detail: str = "Forbidden"):
+    """
+    Dépendance : renvoie l'id de l'utilisateur connecté si son rôle est autorisé.
+    Le rôle est lu dans le token (aucune requête SQL) ; les anciens tokens
+    sans claim "role" retombent sur une lecture de la colonne users.role.
+    """
+    allowed = {UserRole(r).value for r in roles}
+
+    def dependency(auth: dict = Depends(verify_authorization_header), db: Session = Depends(get_db)) -> str:
+        user_id = auth.get("user_id")
+        if not user_id:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        role = auth.get("role")
+        if role is None:
+            role = db.execute(select(User.role).where(User.id == str(user_id))).scalar()
+            if role is None:
+                raise HTTPException(status_code=404, detail="User not found")
+            role = UserRole(role).value
+        if role not in allowed:
+            raise HTTPException(status_code=403, detail=detail)
+        return str(user_id)
+
+    return dependency
+
+def paginate(query, keys, limit: int, cursor: str | None, descending: bool = False,
+             rows: RowSerializer | None = None) -> dict | Response:
+    """
+    keyset_page + curseur invalide -> 400. Renvoie le corps d'une réponse Page,
+    ou directement une FastJSONResponse si `rows` est fourni (projection sur les
+    colonnes du schéma, sans validation par élément).
+    """
+    fast = rows is not None and rows.enabled
+    if fast:
+        # les clés de tri absentes du schéma (created_at...) sont lues en plus, pour le curseur
+        query = query.with_entities(*rows.columns, *[k for k in keys if k.key not in rows.fields])
+    try:
+        items, next_cursor = keyset_page(query, keys, limit, cursor, descending=descending)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if fast:
+        return rows.page(items, next_cursor)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def batch_result(items: list, errors: list[tuple[int, Exception]], statuses: dict[type, int]) -> dict:
+    """
+    Corps d'un BatchResult : chaque erreur d'élément porte le code HTTP
+    qu'aurait renvoyé l'appel unitaire.
+    """
+    return {"items": items,
+            "errors": [{"index": i, "status": statuses[type(e)], "detail": str(e)} for i, e in errors]}
+
+
+# ---- Cache des lectures publiques ----
+
+@lru_cache(maxsize=None)
+def type_adapter(model) -> TypeAdapter:
+    """
+    TypeAdapter du schéma de sortie `model`, construit une fois par schéma
+    (routes qui valident et encodent elles-mêmes leurs corps en cache).
+    """
+    return TypeAdapter(model)
+
+
+def cache_key(request: Request) -> str:
+    """
+    Gabarit de la route + paramètres de chemin + paramètres de requête triés
+    (les paramètres vides sont ignorés).
+    """
+    route = request.scope.get("route")
+    template = route.path if route is not None else request.url.path
+    path_params = sorted(request.path_params.items())
+    query = sorted((k, v) for k, v in request.query_params.multi_items() if v != "")
+    return f"{template}|{path_params}|{query}"
+
+
+async def cached_response(request: Request, model: Any, build: Callable[[], Awaitable[Any]],
+                          tags: Iterable[str] | Callable[[Any], Iterable[str]]) -> Response:
+    """
+    Sert la réponse depuis le cache si possible, sinon appelle build(), valide le
+    résultat avec `model` (le response_model de la route) et met le corps en cache
+    sous `tags` (liste, ou fonction du résultat). ETag + If-None-Match -> 304.
+    Une exception levée par build() (404, 400...) n'est pas mise en cache.
+    """
+    key = cache_key(request)
+    entry = response_cache.get(key)
+    if entry is None:
+        result = await build()
+        if isinstance(result, Response):
+            # déjà encodée (chemin rapide)
+            body = result.body
+        else:
+            adapter = type_adapter(model)
+            body = adapter.dump_json(adapter.validate_python(result, from_attributes=True))
+        etag = make_etag(body)
+        response_cache.set(key, etag, body, tags(result) if callable(tags) else tags)
+    else:
+        etag, body = entry
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# ---- Écritures idempotentes ----
+
+def idempotent(db: Session, user_id: str, key: str | None, request: Request, payload: Any,
+               model: Any, status_code: int, build: Callable[[], Any]) -> Any:
+    """
+    build() écrit sans valider (flush) : le commit est fait ici, avec la réponse
+    enregistrée quand une clé est fournie. Sans clé : build() puis commit. Avec
+    une clé Idempotency-Key : build() est exécuté au plus une fois pour
+    (utilisateur, clé) ; les répétitions rejouent le statut et le corps de la
+    première réponse (en-tête Idempotent-Replayed), erreurs 4xx comprises. Clé
+    réutilisée pour une autre requête -> 422, première requête toujours en cours
+    après l'attente -> 409.
+    """
+    if key is None:
+        result = build()
+        db.commit()
+        return result
+    if not key.strip() or len(key) > idempotency.MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail="Invalid Idempotency-Key")
+
+    def handler():
+        try:
+            result = build()
+        except HTTPException as e:
+            db.rollback()       # écritures partielles éventuelles : seule l'erreur est enregistrée
+            return e.status_code, {"detail": e.detail}
+        adapter = type_adapter(model)
+        return status_code, adapter.dump_python(adapter.validate_python(result, from_attributes=True), mode="json")
+
+    fp = idempotency.fingerprint(request.method, request.url.path, payload.model_dump(mode="json"))
+    try:
+        status, body, replayed = idempotency.execute(db, user_id, key, fp, handler)
+    except IdempotencyKeyMismatch:
+        raise HTTPException(status_code=422, detail="Idempotency-Key already used for a different request")
+    except IdempotencyKeyInProgress:
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+    return FastJSONResponse(body, status_code=status, headers={"Idempotent-Replayed": "true"} if replayed else None)
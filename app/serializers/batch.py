@@ -0,0 +1,18 @@
+import os
+from typing import Generic, TypeVar
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+# Taille maximale d'un lot (POST /.../batch)
+MAX_BATCH_ITEMS = int(os.getenv("MAX_BATCH_ITEMS", "500"))
+
+class BatchError(BaseModel):
+    index: int          # position de l'élément dans la requête
+    status: int         # code HTTP qu'aurait renvoyé l'appel unitaire
+    detail: str
+
+class BatchResult(BaseModel, Generic[T]):
+    # éléments traités, dans l'ordre de la requête (sans ceux en erreur)
+    items: list[T]
+    errors: list[BatchError] = []
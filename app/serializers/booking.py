@@ -1,12 +1,21 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from enum import Enum
 from typing import Optional
-from app.models.booking import BookingStatus
+from app.models.booking import Booking, BookingStatus
+from app.serializers.fast import RowSerializer
+from app.serializers.batch import MAX_BATCH_ITEMS
 
 class BookingCreate(BaseModel):
     offer_id: str
     timeslot_id: Optional[str] = None
 
+class BookingDecisionIn(BaseModel):
+    booking_id: str
+    action: str = Field(description="ACCEPT ou REJECT")
+
+class BookingDecisionBatchIn(BaseModel):
+    items: list[BookingDecisionIn] = Field(min_length=1, max_length=MAX_BATCH_ITEMS)
+
 class BookingStatus(str, Enum):
     PENDING = "PENDING"
     ACCEPTED = "ACCEPTED"
@@ -19,4 +28,7 @@ class BookingOut(BaseModel):
     offer_id: str
     student_id: str
     status: BookingStatus
-    timeslot_id: str | None = None
\ No newline at end of file
+    timeslot_id: str | None = None
+
+# Listes : projection + encodage orjson (app.serializers.fast)
+BOOKING_ROWS = RowSerializer(BookingOut, Booking)
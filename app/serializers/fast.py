@@ -0,0 +1,85 @@
+"""
+Sérialisation rapide des listes : les lignes sont lues en tuples (Row) sur les
+seules colonnes du schéma de sortie, converties en dicts sans validation
+Pydantic (données issues de la base, donc de confiance) puis encodées par orjson.
+Le response_model de la route reste déclaré : le schéma OpenAPI ne change pas.
+
+FAST_JSON_RESPONSES=0 repasse toutes les routes par la validation classique.
+"""
+import os
+from decimal import Decimal
+from types import NoneType, UnionType
+from typing import Any, Union, get_args, get_origin
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "1") != "0"
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        # OPT_UTC_Z : datetimes UTC en "...Z", comme Pydantic
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+def _base_type(annotation):
+    if get_origin(annotation) in (Union, UnionType):
+        args = [a for a in get_args(annotation) if a is not NoneType]
+        return args[0] if len(args) == 1 else None
+    return annotation
+
+
+def _to_float(value):
+    return float(value) if isinstance(value, Decimal) else value
+
+
+class RowSerializer:
+    """
+    Projection d'un modèle ORM sur les champs d'un schéma de sortie.
+
+        OFFER_ROWS = RowSerializer(OfferOut, Offer)
+        query.with_entities(*OFFER_ROWS.columns) -> rows -> OFFER_ROWS.dump(rows)
+
+    Seule conversion appliquée : Decimal -> float pour les champs `float`
+    (Numeric), qu'orjson ne sait pas encoder. Enum et datetime sont natifs.
+    Un champ sans colonne sur le modèle prend la valeur par défaut du schéma.
+    """
+
+    def __init__(self, schema: type[BaseModel], entity):
+        self.schema = schema
+        mapped = [(name, info) for name, info in schema.model_fields.items() if hasattr(entity, name)]
+        self.fields = tuple(name for name, _ in mapped)
+        self.columns = tuple(getattr(entity, name) for name in self.fields)
+        self._floats = tuple(i for i, (_, info) in enumerate(mapped) if _base_type(info.annotation) is float)
+        self._defaults = {
+            name: info.get_default(call_default_factory=True)
+            for name, info in schema.model_fields.items() if not hasattr(entity, name)
+        }
+        self._order = tuple(schema.model_fields)
+
+    @property
+    def enabled(self) -> bool:
+        return FAST_JSON_RESPONSES
+
+    def dump(self, rows) -> list[dict]:
+        fields, floats, defaults = self.fields, self._floats, self._defaults
+        if not floats and not defaults:
+            return [dict(zip(fields, row)) for row in rows]
+        out = []
+        for row in rows:
+            values = list(row)
+            for i in floats:
+                values[i] = _to_float(values[i])
+            item = dict(zip(fields, values))
+            if defaults:
+                # même ordre de clés que le schéma
+                item = {name: item[name] if name in item else defaults[name] for name in self._order}
+            out.append(item)
+        return out
+
+    def page(self, rows, next_cursor: str | None) -> FastJSONResponse:
+        return FastJSONResponse({"items": self.dump(rows), "next_cursor": next_cursor})
@@ -1,11 +1,17 @@
 from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional
+from app.models.offer import Offer
+from app.serializers.fast import RowSerializer
+from app.serializers.batch import MAX_BATCH_ITEMS
 
 class OfferCreate(BaseModel):
     subject: str = Field(min_length=1)
     description: Optional[str] = None
     price_hour: float
 
+class OfferBatchIn(BaseModel):
+    items: list[OfferCreate] = Field(min_length=1, max_length=MAX_BATCH_ITEMS)
+
 class OfferOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -13,4 +19,7 @@ class OfferOut(BaseModel):
     tutor_id: str
     subject: str
     description: str | None
-    price_hour: float
\ No newline at end of file
+    price_hour: float
+
+# Listes : projection + encodage orjson (app.serializers.fast)
+OFFER_ROWS = RowSerializer(OfferOut, Offer)
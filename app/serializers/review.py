@@ -14,3 +14,10 @@ class ReviewOut(ReviewIn):
     tutor_id: str
     student_id: str
     created_at: datetime
+
+class RatingSummary(BaseModel):
+    tutor_id: str
+    rating_count: int
+    rating_avg: Optional[float] = None
+    histogram: dict[str, int]
+    last_review_at: Optional[datetime] = None
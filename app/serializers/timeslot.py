@@ -1,6 +1,9 @@
-from pydantic import BaseModel
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field
+from datetime import date, datetime, time
 from typing import Optional
+from app.models.timeslot import Timeslot
+from app.serializers.fast import RowSerializer
+from app.serializers.batch import MAX_BATCH_ITEMS
 
 class TimeslotIn(BaseModel):
     offer_id: str
@@ -14,3 +17,34 @@ class TimeslotOut(TimeslotIn):
     id: str
     is_booked: bool
     booking_id: Optional[str] = None
+
+# Listes : projection + encodage orjson (app.serializers.fast)
+TIMESLOT_ROWS = RowSerializer(TimeslotOut, Timeslot)
+
+class OpenSlotOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    offer_id: str
+    start_utc: datetime
+    end_utc: datetime
+    tutor_id: str
+    subject: str
+    price_hour: float
+    department: Optional[str] = None
+
+class RecurringAvailabilityIn(BaseModel):
+    offer_id: str
+    weekdays: list[int] = Field(min_length=1, description="0 = lundi ... 6 = dimanche")
+    start_time: time = Field(description="heure locale de début (fuseau `timezone`)")
+    duration_minutes: int = Field(gt=0)
+    from_date: date
+    to_date: date = Field(description="inclus")
+    timezone: str = "Europe/Paris"
+
+class RecurringAvailabilityOut(BaseModel):
+    created: int
+    skipped: int
+
+class TimeslotBatchIn(BaseModel):
+    items: list[TimeslotIn] = Field(min_length=1, max_length=MAX_BATCH_ITEMS)
@@ -0,0 +1,20 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.serializers.offer import OfferOut
+from app.serializers.review import RatingSummary
+from app.serializers.timeslot import TimeslotOut
+from app.serializers.tutor_profile import TutorProfileOut
+
+class TutorCardOffer(OfferOut):
+    next_slots: list[TimeslotOut]
+
+class TutorCardOut(BaseModel):
+    tutor_id: str
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    department: Optional[str] = None
+    profile: Optional[TutorProfileOut] = None
+    rating: RatingSummary
+    offers: list[TutorCardOffer]
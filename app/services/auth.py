@@ -1,7 +1,6 @@
-import base64
-import hashlib
-import hmac
 import os
+import time
+import uuid
 from typing import Optional
 
 import jwt
@@ -10,41 +9,51 @@ from sqlalchemy.orm import Session
 
 from app.models.user import User, UserRole
 from app.exceptions.user import UserAlreadyExists, UserNotFound, IncorrectPassword
+from app.exceptions.auth import PasswordPoolSaturated
+from app.services.passwords import hash_password, check_password, needs_rehash
+from app.services.password_pool import password_pool
+from app.services.token_cache import token_cache
 
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "should-be-an-environment-variable")
 JWT_SECRET_ALGORITHM = os.getenv("JWT_SECRET_ALGORITHM", "HS256")
+JWT_ACCESS_TOKEN_TTL = int(os.getenv("JWT_ACCESS_TOKEN_TTL", str(12 * 3600)))
 
 # ---- Password hashing (PBKDF2-HMAC-SHA256) ----
-
-def hash_password(password: str, iterations: int = 600_000) -> str:
-    salt = os.urandom(16)
-    dk = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
-    return f"pbkdf2_sha256${iterations}${base64.b64encode(salt).decode()}${base64.b64encode(dk).decode()}"
-
-def check_password(password: str, stored_hash: str) -> bool:
-    try:
-        algorithm, iterations, salt_b64, hash_b64 = stored_hash.split("$")
-        assert algorithm == "pbkdf2_sha256"
-    except Exception:
-        raise ValueError("Invalid hash format")
-    iterations = int(iterations)
-    salt = base64.b64decode(salt_b64)
-    stored_dk = base64.b64decode(hash_b64)
-    new_dk = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
-    return hmac.compare_digest(stored_dk, new_dk)
+# hash_password / check_password : voir app.services.passwords.
+# Sur le chemin des requêtes, ils passent par password_pool (processus dédiés).
 
 # ---- JWT ----
 
-def _encode_jwt(user_id: str) -> str:
-    return jwt.encode({"user_id": user_id}, JWT_SECRET_KEY, algorithm=JWT_SECRET_ALGORITHM)
+def _encode_jwt(user_id: str, role: str | None = None) -> str:
+    now = int(time.time())
+    claims = {"user_id": user_id, "iat": now, "exp": now + JWT_ACCESS_TOKEN_TTL, "jti": uuid.uuid4().hex}
+    if role is not None:
+        claims["role"] = role
+    return jwt.encode(claims, JWT_SECRET_KEY, algorithm=JWT_SECRET_ALGORITHM)
+
+def create_access_token(user: User) -> str:
+    # le rôle voyage dans le token : require_role n'a pas besoin de relire l'utilisateur
+    return _encode_jwt(user.id, role=UserRole(user.role).value)
 
 def decode_jwt(token: str) -> dict:
-    try:
-        return jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_SECRET_ALGORITHM])
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError as err:
-        raise HTTPException(status_code=401, detail=f"Invalid token: '{err}'")
+    claims = token_cache.get(token)
+    if claims is None:
+        try:
+            claims = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_SECRET_ALGORITHM])
+        except jwt.ExpiredSignatureError:
+            raise HTTPException(status_code=401, detail="Token expired")
+        except jwt.InvalidTokenError as err:
+            raise HTTPException(status_code=401, detail=f"Invalid token: '{err}'")
+        token_cache.put(token, claims)
+    if token_cache.is_revoked(claims):
+        raise HTTPException(status_code=401, detail="Token revoked")
+    return claims
+
+def revoke_token(claims: dict):
+    token_cache.revoke(claims)
+
+def revoke_user_tokens(user_id: str):
+    token_cache.revoke_user(user_id)
 
 # def generate_access_token(db: Session, email: str, password: str) -> str:
 #     user: Optional[User] = db.query(User).filter(User.email == email).first()
@@ -87,7 +96,7 @@ def create_user_with_password(
         first_name=first_name,
         last_name=last_name,
         role=UserRole(role),
-        hashed_password=hash_password(pwd),
+        hashed_password=password_pool.run(hash_password, pwd),
     )
     db.add(u)
     db.commit()
@@ -100,6 +109,14 @@ def generate_access_token(db: Session, *, email: str, password: str) -> str:
     if not user:
         raise UserNotFound("User not found")
     pwd = (password or "").strip()
-    if not user.hashed_password or not check_password(pwd, user.hashed_password):
+    if not user.hashed_password or not password_pool.run(check_password, pwd, user.hashed_password):
         raise IncorrectPassword("Incorrect password")
-    return _encode_jwt(user.id)
\ No newline at end of file
+
+    # Rehash transparent si l'algorithme / le nombre d'itérations a changé
+    if needs_rehash(user.hashed_password):
+        try:
+            user.hashed_password = password_pool.run(hash_password, pwd)
+            db.commit()
+        except PasswordPoolSaturated:
+            pass  # on réessaiera au prochain login
+    return create_access_token(user)
\ No newline at end of file
@@ -0,0 +1,266 @@
+"""
+Disponibilités des tuteurs : créneaux libres sur une fenêtre, recherche de
+créneaux ouverts entre tuteurs, contrôle des chevauchements et génération
+de disponibilités hebdomadaires récurrentes.
+
+Un tuteur ne peut pas avoir deux créneaux qui se chevauchent, toutes offres
+confondues. La durée d'un créneau est bornée (MAX_SLOT_HOURS) : les créneaux
+qui peuvent chevaucher [start, end) commencent donc dans
+[start - MAX_SLOT_HOURS, end), une plage de l'index (offer_id, start_utc).
+
+Les dates sont stockées en UTC naïf ; les entrées avec fuseau sont converties.
+"""
+import bisect
+import os
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from itertools import accumulate
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models.offer import Offer
+from app.models.timeslot import Timeslot
+from app.models.user import User
+from app.exceptions.booking import OfferNotFound, NotOfferOwner
+from app.exceptions.timeslot import InvalidTimeslot, TimeslotOverlap
+from app.services import tutor_search
+
+MAX_SLOT_DURATION = timedelta(hours=int(os.getenv("MAX_SLOT_HOURS", "12")))
+# Horizon maximal d'une génération récurrente
+MAX_RECURRENCE_DAYS = 366
+SLOT_INSERT_BATCH = 500
+
+
+def to_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class IntervalIndex:
+    """
+    Intervalles [start, end) triés par début + maximum cumulé des fins :
+    « un intervalle chevauche-t-il [s, e) ? » en O(log n), même si les
+    intervalles indexés se chevauchent entre eux (données anciennes).
+    """
+
+    def __init__(self, intervals):
+        intervals = sorted(intervals)
+        self._starts = [s for s, _ in intervals]
+        self._max_ends = list(accumulate((e for _, e in intervals), max))
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        i = bisect.bisect_left(self._starts, end)     # intervalles qui commencent avant `end`
+        return i > 0 and self._max_ends[i - 1] > start
+
+
+# ---- Lecture ----
+
+def tutor_intervals(db: Session, tutor_id: str, start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+    """
+    Créneaux du tuteur (toutes offres) qui chevauchent [start, end)
+    """
+    rows = db.execute(
+        select(Timeslot.start_utc, Timeslot.end_utc)
+        .join(Offer, Offer.id == Timeslot.offer_id)
+        .where(Offer.tutor_id == tutor_id,
+               Timeslot.start_utc > start - MAX_SLOT_DURATION,
+               Timeslot.start_utc < end,
+               Timeslot.end_utc > start)
+    ).all()
+    return [(s, e) for s, e in rows]
+
+
+def window(start: datetime | None, end: datetime | None, default_days: int = 30) -> tuple[datetime, datetime]:
+    start = to_utc(start) if start else datetime.utcnow()
+    end = to_utc(end) if end else start + timedelta(days=default_days)
+    if end <= start:
+        raise InvalidTimeslot("`to` must be after `from`")
+    return start, end
+
+
+def free_slots_query(db: Session, *, start: datetime, end: datetime,
+                     offer_id: str | None = None, tutor_id: str | None = None):
+    """
+    Créneaux libres d'une offre ou d'un tuteur qui commencent dans [start, end)
+    (Query à paginer sur (start_utc, id)).
+    """
+    q = db.query(Timeslot).filter(Timeslot.is_booked.is_(False),
+                                  Timeslot.start_utc >= start, Timeslot.start_utc < end)
+    if offer_id:
+        q = q.filter(Timeslot.offer_id == offer_id)
+    if tutor_id:
+        q = q.join(Offer, Offer.id == Timeslot.offer_id).filter(Offer.tutor_id == tutor_id)
+    return q
+
+
+def open_slots_query(db: Session, *, start: datetime, end: datetime,
+                     subject: str | None = None, department: str | None = None):
+    """
+    Créneaux libres tous tuteurs confondus, avec l'offre et le département du tuteur.
+    """
+    q = (
+        db.query(Timeslot.id, Timeslot.offer_id, Timeslot.start_utc, Timeslot.end_utc,
+                 Offer.tutor_id, Offer.subject, Offer.price_hour, User.department)
+        .join(Offer, Offer.id == Timeslot.offer_id)
+        .join(User, User.id == Offer.tutor_id)
+        .filter(Timeslot.is_booked.is_(False), Timeslot.start_utc >= start, Timeslot.start_utc < end)
+    )
+    if subject:
+        q = q.filter(Offer.subject.ilike(f"%{subject.strip()}%"))
+    if department:
+        q = q.filter(User.department == department)
+    return q
+
+
+# ---- Écriture ----
+
+def _owned_offer(db: Session, tutor_id: str, offer_id: str):
+    owner = db.execute(select(Offer.tutor_id).where(Offer.id == offer_id)).scalar()
+    if owner is None:
+        raise OfferNotFound("Offer not found")
+    if owner != tutor_id:
+        raise NotOfferOwner("You can only create timeslots for your offers")
+    _lock_tutor(db, tutor_id)
+
+
+def _lock_tutor(db: Session, tutor_id: str):
+    # Sérialise les créations de créneaux d'un même tuteur (no-op hors Postgres)
+    db.execute(select(User.id).where(User.id == tutor_id).with_for_update())
+
+
+def _insert_slots(db: Session, tutor_id: str, rows: list[dict]):
+    for i in range(0, len(rows), SLOT_INSERT_BATCH):
+        db.execute(insert(Timeslot), rows[i:i + SLOT_INSERT_BATCH])
+    if rows:
+        # insertion Core : hors unité de travail, événement explicite
+        tutor_search.tutor_changed(db, tutor_id, tutor_search.AVAILABILITY)
+
+
+def _check_duration(start: datetime, end: datetime):
+    if start >= end:
+        raise InvalidTimeslot("start_utc must be before end_utc")
+    if end - start > MAX_SLOT_DURATION:
+        raise InvalidTimeslot(f"A timeslot cannot last more than {MAX_SLOT_DURATION}")
+
+
+def create_timeslot(db: Session, *, tutor_id: str, offer_id: str, start: datetime, end: datetime) -> Timeslot:
+    """
+    Lève OfferNotFound, NotOfferOwner, InvalidTimeslot ou TimeslotOverlap.
+    """
+    start, end = to_utc(start), to_utc(end)
+    _check_duration(start, end)
+    _owned_offer(db, tutor_id, offer_id)
+    if tutor_intervals(db, tutor_id, start, end):
+        db.rollback()
+        raise TimeslotOverlap("This timeslot overlaps another of your timeslots")
+
+    slot = Timeslot(offer_id=offer_id, start_utc=start, end_utc=end, is_booked=False)
+    db.add(slot)
+    db.commit()
+    db.refresh(slot)
+    return slot
+
+
+def create_timeslots(db: Session, *, tutor_id: str, items) -> tuple[list[dict], list[tuple[int, Exception]]]:
+    """
+    Création en lot : `items` = [(offer_id, start, end), ...]. Propriété des offres
+    vérifiée en une requête, chevauchements contrôlés contre l'existant (une lecture)
+    et entre éléments du lot, puis insertion multi-lignes dans une seule transaction.
+
+    Renvoie (créneaux créés dans l'ordre du lot, [(index, exception), ...]) ; les
+    éléments en erreur (OfferNotFound, NotOfferOwner, InvalidTimeslot,
+    TimeslotOverlap) n'empêchent pas la création des autres.
+    """
+    offer_ids = {offer_id for offer_id, _, _ in items}
+    owners = dict(db.execute(select(Offer.id, Offer.tutor_id).where(Offer.id.in_(offer_ids))).all())
+    errors, candidates = [], []
+    for i, (offer_id, start, end) in enumerate(items):
+        start, end = to_utc(start), to_utc(end)
+        try:
+            if offer_id not in owners:
+                raise OfferNotFound("Offer not found")
+            if owners[offer_id] != tutor_id:
+                raise NotOfferOwner("You can only create timeslots for your offers")
+            _check_duration(start, end)
+        except (OfferNotFound, NotOfferOwner, InvalidTimeslot) as e:
+            errors.append((i, e))
+            continue
+        candidates.append((start, end, i, offer_id))
+
+    created = []
+    if candidates:
+        _lock_tutor(db, tutor_id)
+        candidates.sort()
+        busy = IntervalIndex(tutor_intervals(db, tutor_id, candidates[0][0], max(c[1] for c in candidates)))
+        # triés par début : un candidat chevauche un créneau déjà accepté du lot
+        # ssi la plus grande fin acceptée dépasse son début
+        accepted_end = None
+        for start, end, i, offer_id in candidates:
+            if busy.overlaps(start, end) or (accepted_end is not None and accepted_end > start):
+                errors.append((i, TimeslotOverlap("This timeslot overlaps another of your timeslots")))
+                continue
+            accepted_end = end if accepted_end is None else max(accepted_end, end)
+            created.append((i, {"id": str(uuid.uuid4()), "offer_id": offer_id, "start_utc": start, "end_utc": end,
+                                "is_booked": False, "booking_id": None}))
+        created.sort(key=lambda c: c[0])
+
+    rows = [row for _, row in created]
+    _insert_slots(db, tutor_id, rows)
+    db.commit()
+    return rows, sorted(errors, key=lambda e: e[0])
+
+
+def weekly_occurrences(weekdays, start_time: time, duration: timedelta, first_day: date, last_day: date,
+                       tz: ZoneInfo):
+    """
+    (début, fin) en UTC de chaque occurrence, jour par jour de first_day à last_day inclus.
+    L'heure est locale au fuseau `tz` (changements d'heure compris).
+    """
+    days = set(weekdays)
+    day = first_day
+    while day <= last_day:
+        if day.weekday() in days:
+            start = to_utc(datetime.combine(day, start_time, tzinfo=tz))
+            yield start, start + duration
+        day += timedelta(days=1)
+
+
+def generate_weekly(db: Session, *, tutor_id: str, offer_id: str, weekdays, start_time: time,
+                    duration_minutes: int, first_day: date, last_day: date, tz: str = "Europe/Paris") -> dict:
+    """
+    Matérialise des créneaux hebdomadaires récurrents, insérés par lots dans une
+    seule transaction. Les occurrences passées ou en conflit avec un créneau
+    existant du tuteur sont ignorées (comptées dans `skipped`).
+    """
+    duration = timedelta(minutes=duration_minutes)
+    if not weekdays or any(d not in range(7) for d in weekdays):
+        raise InvalidTimeslot("weekdays must be between 0 (Monday) and 6 (Sunday)")
+    if duration <= timedelta(0) or duration > MAX_SLOT_DURATION:
+        raise InvalidTimeslot(f"A timeslot cannot last more than {MAX_SLOT_DURATION}")
+    if last_day < first_day or (last_day - first_day).days >= MAX_RECURRENCE_DAYS:
+        raise InvalidTimeslot(f"The date range must span 1 to {MAX_RECURRENCE_DAYS} days")
+    try:
+        zone = ZoneInfo(tz)
+    except Exception:
+        raise InvalidTimeslot(f"Unknown timezone: {tz}")
+
+    _owned_offer(db, tutor_id, offer_id)
+    occurrences = list(weekly_occurrences(weekdays, start_time, duration, first_day, last_day, zone))
+    now = datetime.utcnow()
+    created, skipped = [], 0
+    if occurrences:
+        # Une seule lecture des créneaux existants sur la période, puis contrôle en mémoire.
+        # Les occurrences ne se chevauchent pas entre elles (durée <= MAX_SLOT_DURATION < 24 h).
+        busy = IntervalIndex(tutor_intervals(db, tutor_id, occurrences[0][0], occurrences[-1][1]))
+        for start, end in occurrences:
+            if start < now or busy.overlaps(start, end):
+                skipped += 1
+            else:
+                created.append({"offer_id": offer_id, "start_utc": start, "end_utc": end, "is_booked": False})
+
+    _insert_slots(db, tutor_id, created)
+    db.commit()
+    return {"created": len(created), "skipped": skipped}
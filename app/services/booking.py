@@ -0,0 +1,151 @@
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models.booking import Booking, BookingStatus
+from app.models.offer import Offer
+from app.models.timeslot import Timeslot
+from app.exceptions.booking import (
+    BookingNotFound, OfferNotFound, TimeslotNotFound, TimeslotOfferMismatch,
+    TimeslotAlreadyBooked, NotOfferOwner, InvalidBookingAction,
+)
+from app.services import tutor_search
+
+ACTIONS = {"ACCEPT": BookingStatus.ACCEPTED, "REJECT": BookingStatus.REJECTED}
+
+
+def create_booking(db: Session, *, student_id: str, offer_id: str, timeslot_id: str | None = None,
+                   commit: bool = True) -> Booking:
+    """
+    Crée une réservation et, si un créneau est demandé, le réserve dans la même
+    transaction via un UPDATE conditionnel (is_booked = false) : deux étudiants
+    concurrents ne peuvent pas obtenir le même créneau, le perdant reçoit
+    TimeslotAlreadyBooked. commit=False : flush seulement, l'appelant valide.
+    """
+    if db.execute(select(Offer.id).where(Offer.id == offer_id)).first() is None:
+        raise OfferNotFound("Offer not found")
+
+    booking = Booking(offer_id=offer_id, student_id=student_id, status=BookingStatus.PENDING)
+    db.add(booking)
+
+    if timeslot_id:
+        db.flush()  # INSERT du booking (timeslots.booking_id le référence)
+        claimed = db.execute(
+            update(Timeslot)
+            .where(Timeslot.id == timeslot_id,
+                   Timeslot.offer_id == offer_id,
+                   Timeslot.is_booked.is_(False))
+            .values(is_booked=True, booking_id=booking.id)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if claimed != 1:
+            db.rollback()
+            _raise_claim_error(db, timeslot_id, offer_id)
+        tutor_search.offer_slots_changed(db, offer_id)
+
+    if not commit:
+        db.flush()
+        return booking
+    db.commit()
+    db.refresh(booking)
+    return booking
+
+
+def _raise_claim_error(db: Session, timeslot_id: str, offer_id: str):
+    # Chemin d'échec uniquement : on relit le créneau pour renvoyer la bonne erreur
+    row = db.execute(select(Timeslot.offer_id).where(Timeslot.id == timeslot_id)).first()
+    if row is None:
+        raise TimeslotNotFound("Timeslot not found")
+    if row.offer_id != offer_id:
+        raise TimeslotOfferMismatch("Timeslot does not belong to this offer")
+    raise TimeslotAlreadyBooked("Timeslot already booked")
+
+
+def decide_booking(db: Session, *, booking_id: str, tutor_id: str, action: str) -> Booking:
+    """
+    ACCEPT / REJECT par le tuteur de l'offre. Un REJECT libère le créneau lié
+    dans la même transaction que le changement de statut.
+    """
+    row = db.execute(
+        select(Booking, Offer.tutor_id)
+        .join(Offer, Offer.id == Booking.offer_id)
+        .where(Booking.id == booking_id)
+    ).first()
+    if row is None:
+        raise BookingNotFound("Booking not found")
+    booking, owner_id = row
+    if owner_id != tutor_id:
+        raise NotOfferOwner("Not your offer")
+    status = ACTIONS.get(action.upper())
+    if status is None:
+        raise InvalidBookingAction("Action must be ACCEPT or REJECT")
+
+    if status == BookingStatus.REJECTED:
+        db.execute(
+            update(Timeslot)
+            .where(Timeslot.booking_id == booking.id)
+            .values(is_booked=False, booking_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        tutor_search.tutor_changed(db, tutor_id, tutor_search.AVAILABILITY)
+    booking.status = status
+    db.commit()
+    db.refresh(booking)
+    return booking
+
+
+def decide_bookings(db: Session, *, tutor_id: str, decisions) -> tuple[list[dict], list[tuple[int, Exception]]]:
+    """
+    ACCEPT / REJECT en lot : `decisions` = [(booking_id, action), ...]. Une lecture
+    des réservations et de leur tuteur, un UPDATE par statut cible (+ libération des
+    créneaux des REJECT), un commit.
+
+    Renvoie (réservations modifiées dans l'ordre du lot, [(index, exception), ...]) ;
+    les éléments en erreur (BookingNotFound, NotOfferOwner, InvalidBookingAction)
+    n'empêchent pas le traitement des autres.
+    """
+    rows = db.execute(
+        select(Booking.id, Booking.offer_id, Booking.student_id, Offer.tutor_id)
+        .join(Offer, Offer.id == Booking.offer_id)
+        .where(Booking.id.in_({booking_id for booking_id, _ in decisions}))
+    ).all()
+    found = {row.id: row for row in rows}
+
+    decided, errors, seen = [], [], set()
+    targets: dict[BookingStatus, list[str]] = {}
+    for i, (booking_id, action) in enumerate(decisions):
+        row = found.get(booking_id)
+        status = ACTIONS.get(action.upper())
+        try:
+            if row is None:
+                raise BookingNotFound("Booking not found")
+            if row.tutor_id != tutor_id:
+                raise NotOfferOwner("Not your offer")
+            if status is None:
+                raise InvalidBookingAction("Action must be ACCEPT or REJECT")
+            if booking_id in seen:
+                raise InvalidBookingAction("Booking appears more than once in the batch")
+        except (BookingNotFound, NotOfferOwner, InvalidBookingAction) as e:
+            errors.append((i, e))
+            continue
+        seen.add(booking_id)
+        targets.setdefault(status, []).append(booking_id)
+        decided.append({"id": row.id, "offer_id": row.offer_id, "student_id": row.student_id, "status": status})
+
+    rejected = targets.get(BookingStatus.REJECTED)
+    if rejected:
+        db.execute(
+            update(Timeslot)
+            .where(Timeslot.booking_id.in_(rejected))
+            .values(is_booked=False, booking_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        tutor_search.tutor_changed(db, tutor_id, tutor_search.AVAILABILITY)
+    for status, booking_ids in targets.items():
+        db.execute(
+            update(Booking)
+            .where(Booking.id.in_(booking_ids))
+            .values(status=status)
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+    return decided, errors
@@ -0,0 +1,160 @@
+"""
+Export en flux (NDJSON / CSV) des réservations, offres et avis.
+
+Les lignes sont lues par lots sur un curseur côté serveur (yield_per ->
+stream_results, curseur nommé sous psycopg2) et encodées lot par lot :
+la mémoire ne dépend pas du nombre de lignes exportées.
+
+Ordre stable = clé keyset du jeu de données. Chaque ligne porte son `_cursor` :
+en cas de coupure, ?cursor=<dernier _cursor reçu> reprend juste après.
+"""
+import csv
+import io
+import os
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Iterable, Iterator
+
+import orjson
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.booking import Booking
+from app.models.offer import Offer
+from app.models.review import Review
+from app.services.pagination import decode_cursor, encode_cursor
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+CURSOR_FIELD = "_cursor"
+
+
+@dataclass(frozen=True)
+class Dataset:
+    columns: tuple                 # colonnes exportées, dans l'ordre du fichier
+    order: tuple                   # clé keyset (sous-ensemble de columns, dernière colonne unique)
+    tutor: object                  # colonne filtrée par ?tutor_id=
+    joins: tuple = ()
+    status: object | None = None   # colonne filtrée par ?status=
+    date: object | None = None     # colonne filtrée par ?since= / ?until=
+    names: tuple = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "names", tuple(c.key for c in self.columns))
+
+
+DATASETS = {
+    "bookings": Dataset(
+        columns=(Booking.id, Booking.offer_id, Offer.tutor_id, Booking.student_id, Booking.status, Booking.created_at),
+        order=(Booking.created_at, Booking.id),
+        joins=((Offer, Offer.id == Booking.offer_id),),
+        tutor=Offer.tutor_id, status=Booking.status, date=Booking.created_at,
+    ),
+    "offers": Dataset(
+        columns=(Offer.id, Offer.tutor_id, Offer.subject, Offer.description, Offer.price_hour),
+        order=(Offer.id,),
+        tutor=Offer.tutor_id,
+    ),
+    "reviews": Dataset(
+        columns=(Review.id, Review.tutor_id, Review.student_id, Review.rating, Review.comment, Review.created_at),
+        order=(Review.created_at, Review.id),
+        tutor=Review.tutor_id, date=Review.created_at,
+    ),
+}
+
+
+def export_statement(dataset: Dataset, *, status=None, tutor_id: str | None = None,
+                     since: datetime | None = None, until: datetime | None = None, cursor: str | None = None):
+    """
+    Requête ordonnée sur la clé keyset. Lève ValueError si un filtre ne
+    s'applique pas au jeu de données ou si le curseur est invalide.
+    """
+    stmt = select(*dataset.columns)
+    for target, on in dataset.joins:
+        stmt = stmt.join(target, on)
+    if status is not None:
+        if dataset.status is None:
+            raise ValueError("status filter is not supported for this export")
+        stmt = stmt.where(dataset.status == status)
+    if tutor_id:
+        stmt = stmt.where(dataset.tutor == tutor_id)
+    if since or until:
+        if dataset.date is None:
+            raise ValueError("date filters are not supported for this export")
+        if since:
+            stmt = stmt.where(dataset.date >= since)
+        if until:
+            stmt = stmt.where(dataset.date < until)
+    if cursor:
+        after = decode_cursor(cursor, size=len(dataset.order))
+        stmt = stmt.where(tuple_(*dataset.order) > tuple_(*after))
+    return stmt.order_by(*dataset.order)
+
+
+def iter_batches(bind, stmt, batch_size: int | None = None) -> Iterator[list]:
+    # Session dédiée : le flux survit à la requête qui l'a lancé
+    with Session(bind=bind) as db:
+        result = db.execute(stmt.execution_options(yield_per=batch_size or EXPORT_BATCH_SIZE))
+        for batch in result.partitions():
+            yield batch
+
+
+# ---- Encodage ----
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _key_positions(dataset: Dataset) -> list[int]:
+    return [dataset.names.index(c.key) for c in dataset.order]
+
+
+def encode_ndjson(dataset: Dataset, batches: Iterable[list]) -> Iterator[bytes]:
+    names, keys = dataset.names, _key_positions(dataset)
+    for batch in batches:
+        lines = []
+        for row in batch:
+            item = dict(zip(names, row))
+            item[CURSOR_FIELD] = encode_cursor([row[i] for i in keys])
+            lines.append(orjson.dumps(item, default=_json_default))
+        lines.append(b"")
+        yield b"\n".join(lines)
+
+
+def encode_csv(dataset: Dataset, batches: Iterable[list]) -> Iterator[bytes]:
+    keys = _key_positions(dataset)
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow([*dataset.names, CURSOR_FIELD])
+    for batch in batches:
+        for row in batch:
+            writer.writerow([*map(_csv_value, row), encode_cursor([row[i] for i in keys])])
+        yield buf.getvalue().encode()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode()
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)   # 31 : en-tête gzip
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
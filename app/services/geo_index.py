@@ -0,0 +1,123 @@
+import math
+import threading
+import time
+
+EARTH_RADIUS_KM = 6371.0
+# Taille d'une cellule de la grille (en degrés) : ~55 km en latitude
+CELL_DEG = 0.5
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _cell(lat: float, lon: float) -> tuple[int, int]:
+    return int(math.floor(lat / CELL_DEG)), int(math.floor(lon / CELL_DEG))
+
+
+class GeoGridIndex:
+    """
+    Grille spatiale en mémoire : user_id -> (lat, lon), plus un index
+    département -> user_ids. Les mises à jour sont unitaires (upsert / remove).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._built_at = 0.0
+        self._points: dict[str, tuple[float, float]] = {}
+        self._cells: dict[tuple[int, int], set[str]] = {}
+        self._departments: dict[str, set[str]] = {}
+        self._user_department: dict[str, str] = {}
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    @property
+    def age(self) -> float:
+        """
+        Secondes depuis la dernière construction complète
+        """
+        return time.monotonic() - self._built_at
+
+    def clear(self):
+        with self._lock:
+            self._built = False
+            self._points.clear()
+            self._cells.clear()
+            self._departments.clear()
+            self._user_department.clear()
+
+    def build(self, rows):
+        """
+        rows : itérable de (user_id, (lat, lon) | None, département | None)
+        """
+        with self._lock:
+            self.clear()
+            for user_id, point, department in rows:
+                self._upsert(user_id, point, department)
+            self._built = True
+            self._built_at = time.monotonic()
+
+    def upsert(self, user_id: str, point: tuple[float, float] | None, department: str | None):
+        with self._lock:
+            if self._built:
+                self._upsert(user_id, point, department)
+
+    def remove(self, user_id: str):
+        with self._lock:
+            self._remove(user_id)
+
+    def _upsert(self, user_id, point, department):
+        self._remove(user_id)
+        if department:
+            self._departments.setdefault(department, set()).add(user_id)
+            self._user_department[user_id] = department
+        if point:
+            self._points[user_id] = point
+            self._cells.setdefault(_cell(*point), set()).add(user_id)
+
+    def _remove(self, user_id):
+        department = self._user_department.pop(user_id, None)
+        if department and department in self._departments:
+            self._departments[department].discard(user_id)
+        point = self._points.pop(user_id, None)
+        if point:
+            cell = self._cells.get(_cell(*point))
+            if cell is not None:
+                cell.discard(user_id)
+
+    def in_department(self, department: str) -> set[str]:
+        with self._lock:
+            return set(self._departments.get(department, ()))
+
+    def departments_of(self, user_ids) -> set[str]:
+        with self._lock:
+            return {self._user_department[u] for u in user_ids if u in self._user_department}
+
+    def within_radius(self, lat: float, lon: float, radius_km: float) -> list[tuple[str, float]]:
+        """
+        Retourne [(user_id, distance_km)] triés par distance croissante.
+        """
+        dlat = radius_km / 111.0
+        dlon = radius_km / (111.0 * max(math.cos(math.radians(lat)), 0.01))
+        i_min, j_min = _cell(lat - dlat, lon - dlon)
+        i_max, j_max = _cell(lat + dlat, lon + dlon)
+
+        found = []
+        with self._lock:
+            for i in range(i_min, i_max + 1):
+                for j in range(j_min, j_max + 1):
+                    for user_id in self._cells.get((i, j), ()):
+                        plat, plon = self._points[user_id]
+                        d = haversine_km(lat, lon, plat, plon)
+                        if d <= radius_km:
+                            found.append((user_id, round(d, 2)))
+        found.sort(key=lambda r: (r[1], r[0]))
+        return found
+
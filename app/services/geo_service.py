@@ -1,7 +1,15 @@
-import pandas as pd
+import csv
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.models.tutor_profile import TutorProfile
 from app.models.user import User, UserRole
+from app.services.geo_index import GeoGridIndex
+
+# code postal (5 chiffres) ou code département -> (lat, lon)
+CENTROIDS_FILE = Path(__file__).resolve().parent.parent / "data" / "postal_centroids.csv"
 
 def _extract_department(postal_code: str) -> str | None:
     """
@@ -21,6 +29,10 @@ def _extract_department(postal_code: str) -> str | None:
             return '2A' if int(dep_str) < 20200 else '2B'
         except ValueError:
             return None
+
+    # Outre-mer : département sur 3 chiffres (971, 972, ...)
+    if dep_str.startswith('97') and len(dep_str) >= 3:
+        return dep_str[:3]
         
     return dep_str[:2]
 
@@ -32,47 +44,92 @@ def postal_code_to_department(postal_code: str | None) -> str | None:
     return _extract_department(postal_code)
 
 
-def get_tutors_by_department(db: Session, postal_code: str) -> list[dict]:
+@lru_cache(maxsize=1)
+def _centroids() -> dict[str, tuple[float, float]]:
+    with open(CENTROIDS_FILE, newline="", encoding="utf-8") as f:
+        return {row["code"]: (float(row["lat"]), float(row["lon"])) for row in csv.DictReader(f)}
+
+
+def centroid_for_postal_code(postal_code: str | None) -> tuple[float, float] | None:
+    """
+    Centroïde du code postal s'il est connu, sinon celui de son département
+    """
+    if not postal_code:
+        return None
+    table = _centroids()
+    code = str(postal_code).strip()
+    if code in table:
+        return table[code]
+    department = _extract_department(code)
+    return table.get(department) if department else None
+
+
+# ---- Index géographique des tuteurs ----
+# Un index par processus, mis à jour par les écritures de ce processus : les
+# changements faits par les autres workers (tuteur créé, déplacé, supprimé)
+# n'y arrivent qu'à la reconstruction, toutes les GEO_INDEX_REBUILD_SECONDS.
+
+GEO_INDEX_REBUILD_SECONDS = float(os.getenv("GEO_INDEX_REBUILD_SECONDS", "60"))
+
+tutor_geo_index = GeoGridIndex()
+
+
+def _ensure_geo_index(db: Session):
+    if tutor_geo_index.built and tutor_geo_index.age < GEO_INDEX_REBUILD_SECONDS:
+        return
+    rows = db.execute(
+        select(User.id, User.postal_code, User.department).where(User.role == UserRole.tutor)
+    ).all()
+    tutor_geo_index.build(
+        (user_id, centroid_for_postal_code(postal_code), department or _extract_department(postal_code))
+        for user_id, postal_code, department in rows
+    )
+
+
+def on_user_saved(user: User):
+    """
+    Mise à jour incrémentale de l'index après création / modification d'un utilisateur
+    """
+    if user.role == UserRole.tutor:
+        tutor_geo_index.upsert(user.id, centroid_for_postal_code(user.postal_code), user.department)
+    else:
+        tutor_geo_index.remove(user.id)
+
+
+def on_user_deleted(user_id: str):
+    tutor_geo_index.remove(user_id)
+
+
+# ---- Recherche ----
+# Filtres, facettes, tri et pagination : app.services.tutor_facets (importé à la
+# première recherche, NumPy n'est pas chargé au démarrage) ; la page servie est
+# lue dans le modèle tutor_search.
+
+def search_tutors(db: Session, postal_code: str, radius_km: float | None = None, *,
+                  sort: str | None = None, limit: int | None = None, cursor: str | None = None,
+                  **filters) -> dict | None:
     """
-    Récupère les tuteurs d'un département via le code postal
+    Tuteurs du département du code postal, ou à moins de `radius_km` (triés par
+    distance par défaut) : {count, facets, items, next_cursor, departments},
+    departments étant les départements couverts par la zone de recherche.
+    Retourne None si le code postal n'est pas reconnu / localisable ; lève
+    ValueError si le curseur est invalide.
     """
-    try:
+    from app.services import tutor_facets
+
+    if radius_km is None:
         target_dept = _extract_department(postal_code)
         if not target_dept:
-            return []
-
-        # Jointure User + TutorProfile
-        # On filtre sur User.department 
-        results = db.query(User, TutorProfile)\
-                    .join(TutorProfile, User.id == TutorProfile.user_id)\
-                    .filter(User.role == UserRole.tutor)\
-                    .filter(User.department == target_dept)\
-                    .all()
-        
-        if not results:
-            return []
-
-        # Formatage des résultats
-        tutors = []
-        for user, profile in results:
-            tutors.append({
-                "id": profile.id,
-                "user_id": user.id,
-                "first_name": user.first_name or "",
-                "last_name": user.last_name or "",
-                "email": user.email,
-                "department": user.department or "",
-                "postal_code": user.postal_code or "",
-                "bio": profile.bio or "",
-                "photo_url": profile.photo_url or "",
-                "subjects": profile.subjects or "",
-                "hourly_rate": profile.hourly_rate,
-                "years_experience": profile.years_experience
-            })
-
-        return tutors
-        
-    except Exception as e:
-        print(f"Erreur dans get_tutors_by_department: {str(e)}")
-        return []
+            return None
+        result = tutor_facets.search(db, departments=[target_dept], sort=sort or "name",
+                                     limit=limit, cursor=cursor, **filters)
+        return {**result, "departments": {target_dept}}
 
+    center = centroid_for_postal_code(postal_code)
+    if not center:
+        return None
+    _ensure_geo_index(db)
+    nearby = dict(tutor_geo_index.within_radius(center[0], center[1], radius_km))
+    result = tutor_facets.search(db, distances=nearby, sort=sort or "distance",
+                                 limit=limit, cursor=cursor, **filters)
+    return {**result, "departments": tutor_geo_index.departments_of(nearby)}
@@ -0,0 +1,110 @@
+"""
+État du worker pour /health/ready : base joignable, pool de connexions,
+version du schéma et latence récente des requêtes.
+
+Le SELECT 1 est mis en cache HEALTH_CHECK_TTL secondes et n'est jamais
+exécuté par deux sondes à la fois : des sondes rapprochées (load balancer,
+orchestrateur) ne consomment pas de connexions supplémentaires.
+"""
+import hashlib
+import os
+import threading
+import time
+from functools import lru_cache
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import QueuePool
+
+from app.database import BaseSQL, DB_MAX_OVERFLOW
+from app.services.metrics import request_latency
+
+HEALTH_CHECK_TTL = float(os.getenv("HEALTH_CHECK_TTL", "2"))
+LATENCY_WINDOW_SECONDS = 60
+
+
+class DatabaseCheck:
+    def __init__(self, ttl: float = HEALTH_CHECK_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._last: dict | None = None
+        self._checked_at = 0.0
+
+    def clear(self):
+        with self._lock:
+            self._last, self._checked_at = None, 0.0
+
+    @property
+    def last(self) -> dict | None:
+        """
+        Dernier résultat connu, sans vérifier
+        """
+        return self._last
+
+    def status(self, ping) -> dict:
+        """
+        Dernier résultat s'il a moins de `ttl` secondes ou si une autre sonde est
+        déjà en train de vérifier ; sinon appelle `ping()` (SELECT 1).
+        """
+        last = self._last
+        if last is not None and time.monotonic() - self._checked_at < self.ttl:
+            return last
+        if not self._lock.acquire(blocking=last is None):
+            return last
+        try:
+            if self._last is not last:          # vérifié pendant l'attente du verrou
+                return self._last
+            t0 = time.perf_counter()
+            try:
+                ping()
+                result = {"ok": True, "latency_ms": round((time.perf_counter() - t0) * 1000, 2)}
+            except SQLAlchemyError as e:
+                result = {"ok": False, "error": e.__class__.__name__}
+            self._last, self._checked_at = result, time.monotonic()
+            return result
+        finally:
+            self._lock.release()
+
+
+database_check = DatabaseCheck()
+
+
+def pool_stats(pool) -> dict:
+    """
+    Connexions du pool (QueuePool) ; `saturated` quand toutes sont prises :
+    une nouvelle requête attendrait DB_POOL_TIMEOUT avant d'échouer.
+    """
+    if not isinstance(pool, QueuePool):
+        return {"class": type(pool).__name__}
+    size, checked_out = pool.size(), pool.checkedout()
+    return {
+        "class": "QueuePool",
+        "size": size,
+        "checked_out": checked_out,
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "saturated": checked_out >= size + DB_MAX_OVERFLOW,
+    }
+
+
+@lru_cache(maxsize=1)
+def schema_version() -> str:
+    """
+    Empreinte du schéma déclaré par les modèles (tables, colonnes, index) : pas
+    d'outil de migration, create_all + create_missing_indexes au démarrage.
+    Deux workers qui renvoient la même valeur tournent sur le même schéma.
+    """
+    parts = []
+    for table in BaseSQL.metadata.sorted_tables:
+        parts.append(table.name)
+        parts.extend(f"{c.name}:{c.type}" for c in table.columns)
+        parts.extend(sorted(i.name for i in table.indexes))
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:12]
+
+
+def recent_latency() -> dict:
+    snap = request_latency.snapshot(since_seconds=LATENCY_WINDOW_SECONDS)
+    return {
+        "window_seconds": LATENCY_WINDOW_SECONDS,
+        "p50_ms": round(snap["p50"] * 1000, 2) if snap["p50"] is not None else None,
+        "p99_ms": round(snap["p99"] * 1000, 2) if snap["p99"] is not None else None,
+    }
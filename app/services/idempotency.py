@@ -0,0 +1,146 @@
+"""
+Écritures idempotentes (en-tête Idempotency-Key).
+
+La première requête réserve la clé (INSERT d'une ligne sans réponse, validé
+immédiatement), exécute le traitement sans valider (flush) puis enregistre
+statut + corps dans la même transaction que ses écritures : un seul commit,
+la réponse n'existe que si l'écriture a été validée, et inversement. Une
+requête répétée avec la même clé :
+- rejoue la réponse enregistrée sans réexécuter le traitement ;
+- attend (jusqu'à IDEMPOTENCY_WAIT_SECONDS) si la première est encore en cours ;
+- est refusée si la clé a servi pour une autre requête (empreinte différente).
+
+La clé primaire (user_id, key) sert de verrou : deux workers ne peuvent pas
+réserver la même clé. Une erreur inattendue ou une réponse 5xx libère la clé
+(la requête pourra être rejouée). Une réservation sans réponse depuis
+IDEMPOTENCY_STALE_SECONDS (worker tué, traitement très lent) est reprise : son
+écriture n'a pas été validée, puisqu'elle l'aurait été avec la réponse. Si le
+premier traitement termine malgré tout, sa réservation a changé : il annule
+son écriture et rejoue la réponse de la reprise.
+"""
+import hashlib
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+import orjson
+from sqlalchemy import Row, delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.exceptions.idempotency import IdempotencyKeyInProgress, IdempotencyKeyMismatch
+from app.models.idempotency_key import IdempotencyKey
+
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+IDEMPOTENCY_STALE_SECONDS = float(os.getenv("IDEMPOTENCY_STALE_SECONDS", "60"))
+# Purge des clés expirées au plus une fois par intervalle et par worker
+PURGE_INTERVAL_SECONDS = 3600
+MAX_KEY_LENGTH = 255
+
+_last_purge = 0.0
+
+
+def fingerprint(method: str, path: str, payload: Any) -> str:
+    data = orjson.dumps([method, path, payload], option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(data).hexdigest()
+
+
+def purge_expired(db: Session, now: datetime | None = None) -> int:
+    result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= (now or datetime.utcnow())))
+    db.commit()
+    return result.rowcount
+
+
+def _maybe_purge(db: Session):
+    global _last_purge
+    if time.monotonic() - _last_purge >= PURGE_INTERVAL_SECONDS:
+        _last_purge = time.monotonic()
+        purge_expired(db)
+
+
+def _is(user_id: str, key: str):
+    return (IdempotencyKey.user_id == user_id) & (IdempotencyKey.key == key)
+
+
+def _claim(db: Session, user_id: str, key: str, fp: str) -> tuple[datetime | None, Row | None]:
+    """
+    (date de réservation, None) si la clé est à nous ; (None, ligne existante)
+    sinon ; (None, None) si la ligne a disparu ou vient d'être libérée : réessayer.
+    """
+    now = datetime.utcnow()
+    try:
+        db.execute(insert(IdempotencyKey).values(
+            user_id=user_id, key=key, fingerprint=fp, created_at=now,
+            expires_at=now + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS)))
+        db.commit()
+        return now, None
+    except IntegrityError:
+        db.rollback()
+    row = db.execute(
+        select(IdempotencyKey.fingerprint, IdempotencyKey.status_code, IdempotencyKey.body,
+               IdempotencyKey.created_at, IdempotencyKey.expires_at).where(_is(user_id, key))
+    ).first()
+    db.commit()     # pas de transaction ouverte pendant l'attente
+    if row is None:
+        return None, None
+    stale = row.status_code is None and row.created_at <= now - timedelta(seconds=IDEMPOTENCY_STALE_SECONDS)
+    if row.expires_at <= now or stale:
+        # conditionnel : ne supprime pas une réservation prise entre-temps par un autre worker
+        db.execute(delete(IdempotencyKey).where(_is(user_id, key), IdempotencyKey.created_at == row.created_at))
+        db.commit()
+        return None, None
+    return None, row
+
+
+def _release(db: Session, user_id: str, key: str, claimed_at: datetime):
+    db.rollback()
+    db.execute(delete(IdempotencyKey).where(_is(user_id, key), IdempotencyKey.created_at == claimed_at))
+    db.commit()
+
+
+def execute(db: Session, user_id: str, key: str, fp: str, handler: Callable[[], tuple[int, Any]],
+            wait_seconds: float = IDEMPOTENCY_WAIT_SECONDS, sleep=time.sleep) -> tuple[int, Any, bool]:
+    """
+    Exécute `handler` (-> (statut, corps JSON)) au plus une fois par (user_id, key).
+    `handler` ne valide pas ses écritures : elles le sont ici, avec la réponse.
+    Renvoie (statut, corps, rejoué). Lève IdempotencyKeyMismatch si la clé a servi
+    pour une autre requête, IdempotencyKeyInProgress si la première n'a pas
+    abouti dans le délai d'attente.
+    """
+    deadline = time.monotonic() + wait_seconds
+    delay = 0.02
+    while True:
+        claimed_at, existing = _claim(db, user_id, key, fp)
+        if claimed_at is None:
+            if existing is None:
+                continue
+            if existing.fingerprint != fp:
+                raise IdempotencyKeyMismatch
+            if existing.status_code is not None:
+                return existing.status_code, orjson.loads(existing.body), True
+            if time.monotonic() >= deadline:
+                raise IdempotencyKeyInProgress
+            sleep(delay)
+            delay = min(delay * 2, 0.5)
+            continue
+
+        try:
+            status_code, body = handler()
+        except BaseException:
+            _release(db, user_id, key, claimed_at)
+            raise
+        if status_code >= 500:
+            _release(db, user_id, key, claimed_at)
+            return status_code, body, False
+        stored = db.execute(update(IdempotencyKey)
+                            .where(_is(user_id, key), IdempotencyKey.created_at == claimed_at)
+                            .values(status_code=status_code, body=orjson.dumps(body).decode())).rowcount
+        if stored == 1:
+            db.commit()
+            _maybe_purge(db)
+            return status_code, body, False
+        # réservation reprise pendant le traitement (jugée abandonnée) : l'écriture
+        # est annulée, la réponse de la reprise sera rejouée
+        db.rollback()
@@ -0,0 +1,96 @@
+"""
+Instrumentation des requêtes HTTP : durée, nombre et temps des requêtes SQL,
+temps de hachage des mots de passe et taille de la réponse, agrégés par route
+(app.services.metrics.route_metrics, exposés sur /metrics).
+
+Les événements SQL sont écoutés sur la classe Engine : le moteur sync, le
+sync_engine du moteur async et ceux des tests passent tous par là. L'heure de
+début est portée par le contexte d'exécution (un par requête SQL) : une requête
+en erreur, sans after_cursor_execute, ne laisse rien sur la connexion.
+"""
+import logging
+import os
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.services.metrics import RequestStats, current_request, record_sql, request_latency, route_metrics
+
+# Requêtes SQL plus lentes que ce seuil journalisées avec leurs paramètres (0 = désactivé)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# En-tête Server-Timing sur chaque réponse (débogage depuis le navigateur)
+SERVER_TIMING = os.getenv("SERVER_TIMING", "1") == "1"
+SLOW_QUERY_MAX_CHARS = 2000
+
+logger = logging.getLogger(__name__)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.query_started_at = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_at = getattr(context, "query_started_at", None)
+    if started_at is None:
+        return
+    elapsed = time.perf_counter() - started_at
+    record_sql(elapsed)
+    if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+        logger.warning("requête SQL lente (%.1f ms) : %s | paramètres : %s",
+                       elapsed * 1000, statement, repr(parameters)[:SLOW_QUERY_MAX_CHARS])
+
+
+def server_timing(stats: RequestStats) -> str:
+    total = (time.perf_counter() - stats.started_at) * 1000
+    parts = [f'db;dur={stats.sql_seconds * 1000:.1f};desc="{stats.sql_count} queries"']
+    if stats.hash_seconds:
+        parts.append(f"hash;dur={stats.hash_seconds * 1000:.1f}")
+    parts.append(f"app;dur={total:.1f}")
+    return ", ".join(parts)
+
+
+class InstrumentationMiddleware:
+    """
+    Middleware ASGI pur (pas BaseHTTPMiddleware) : compte les octets des
+    réponses en streaming (exports) et mesure jusqu'au dernier morceau envoyé.
+    Server-Timing reflète l'état au moment des en-têtes : pour un export en
+    streaming, seules les requêtes SQL déjà exécutées y figurent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status, sent = 500, 0
+
+        async def send_wrapper(message):
+            nonlocal status, sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if SERVER_TIMING:
+                    message.setdefault("headers", [])
+                    message["headers"] = [*message["headers"], (b"server-timing", server_timing(stats).encode())]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request.reset(token)
+            elapsed = time.perf_counter() - stats.started_at
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "<unmatched>"
+            route_metrics.observe(scope["method"], path, status, elapsed, stats, sent)
+            # Latence récente du worker pour /health/ready : les sondes elles-mêmes ne comptent pas
+            if not scope["path"].startswith("/health"):
+                request_latency.observe(elapsed)
@@ -0,0 +1,218 @@
+import math
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+
+def percentile(sorted_values: list[float], q: float) -> float | None:
+    """
+    Percentile (0..100) par rang le plus proche sur une liste déjà triée
+    """
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+class LatencyStats:
+    """
+    Compteurs cumulés + fenêtre glissante des derniers échantillons (en secondes)
+    pour calculer des percentiles récents. Thread-safe.
+    """
+
+    def __init__(self, window: int = 2048):
+        self._lock = threading.Lock()
+        self._samples: deque[tuple[float, float]] = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self._samples.append((time.monotonic(), seconds))
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self.count = 0
+            self.total = 0.0
+            self.max = 0.0
+
+    def snapshot(self, since_seconds: float | None = None) -> dict:
+        with self._lock:
+            samples = list(self._samples)
+            count, total, max_ = self.count, self.total, self.max
+        if since_seconds is not None:
+            horizon = time.monotonic() - since_seconds
+            samples = [s for s in samples if s[0] >= horizon]
+        values = sorted(v for _, v in samples)
+        return {
+            "count": count,
+            "sum": total,
+            "max": max_,
+            "p50": percentile(values, 50),
+            "p99": percentile(values, 99),
+        }
+
+
+# Durée des requêtes HTTP du worker (middleware de app.main), hors sondes /health
+request_latency = LatencyStats(window=4096)
+
+
+# ---- Mesures par requête ----
+
+@dataclass
+class RequestStats:
+    """
+    Coûts accumulés pendant une requête HTTP (voir app.services.instrumentation).
+    Objet mutable : les threads du threadpool reçoivent une copie du contexte,
+    mais partagent cet objet.
+    """
+    sql_count: int = 0
+    sql_seconds: float = 0.0
+    hash_seconds: float = 0.0
+    started_at: float = field(default_factory=time.perf_counter)
+
+
+current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+
+def record_sql(seconds: float):
+    stats = current_request.get()
+    if stats is not None:
+        stats.sql_count += 1
+        stats.sql_seconds += seconds
+
+
+def record_hash(seconds: float):
+    stats = current_request.get()
+    if stats is not None:
+        stats.hash_seconds += seconds
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)     # dernier = +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+
+class RouteMetrics:
+    """
+    Agrégats par (méthode, route) — la route est le gabarit ("/offers/{offer_id}"),
+    jamais le chemin réel, pour borner le nombre de séries. Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: dict[tuple[str, str], dict] = {}
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+    def observe(self, method: str, route: str, status: int, seconds: float,
+                stats: RequestStats, response_bytes: int):
+        with self._lock:
+            entry = self._routes.get((method, route))
+            if entry is None:
+                entry = self._routes[(method, route)] = {
+                    "statuses": {},
+                    "latency": Histogram(LATENCY_BUCKETS),
+                    "sql": Histogram(SQL_COUNT_BUCKETS),
+                    "sql_seconds": 0.0,
+                    "hash_seconds": 0.0,
+                    "response_bytes": 0,
+                }
+            entry["statuses"][status] = entry["statuses"].get(status, 0) + 1
+            entry["latency"].observe(seconds)
+            entry["sql"].observe(stats.sql_count)
+            entry["sql_seconds"] += stats.sql_seconds
+            entry["hash_seconds"] += stats.hash_seconds
+            entry["response_bytes"] += response_bytes
+
+    def totals(self) -> dict:
+        """
+        Cumul toutes routes confondues (benchmarks).
+        """
+        with self._lock:
+            entries = list(self._routes.values())
+        return {
+            "requests": sum(e["latency"].count for e in entries),
+            "sql_statements": sum(e["sql"].sum for e in entries),
+            "sql_seconds": sum(e["sql_seconds"] for e in entries),
+            "hash_seconds": sum(e["hash_seconds"] for e in entries),
+            "response_bytes": sum(e["response_bytes"] for e in entries),
+        }
+
+    def render(self) -> str:
+        """
+        Format texte Prometheus (exposition 0.0.4).
+        """
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = []
+
+            def family(name: str, kind: str, help_: str):
+                lines.append(f"# HELP {name} {help_}")
+                lines.append(f"# TYPE {name} {kind}")
+
+            family("http_requests_total", "counter", "Requêtes HTTP par route et statut")
+            for (method, route), e in routes:
+                for status, n in sorted(e["statuses"].items()):
+                    lines.append(f"http_requests_total{{{_labels(method, route)},status=\"{status}\"}} {n}")
+
+            for name, key, help_ in (
+                ("http_request_duration_seconds", "latency", "Durée des requêtes HTTP"),
+                ("http_request_sql_statements", "sql", "Requêtes SQL émises par requête HTTP"),
+            ):
+                family(name, "histogram", help_)
+                for (method, route), e in routes:
+                    h, labels, cumulative = e[key], _labels(method, route), 0
+                    for bound, n in zip(h.buckets, h.counts):
+                        cumulative += n
+                        lines.append(f"{name}_bucket{{{labels},le=\"{_number(bound)}\"}} {cumulative}")
+                    lines.append(f"{name}_bucket{{{labels},le=\"+Inf\"}} {h.count}")
+                    lines.append(f"{name}_sum{{{labels}}} {_number(h.sum)}")
+                    lines.append(f"{name}_count{{{labels}}} {h.count}")
+
+            for name, key, help_ in (
+                ("http_request_sql_seconds_total", "sql_seconds", "Temps passé en base"),
+                ("http_request_password_hash_seconds_total", "hash_seconds", "Temps de hachage des mots de passe"),
+                ("http_response_bytes_total", "response_bytes", "Octets de corps de réponse envoyés"),
+            ):
+                family(name, "counter", help_)
+                for (method, route), e in routes:
+                    lines.append(f"{name}{{{_labels(method, route)}}} {_number(e[key])}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(method: str, route: str) -> str:
+    route = route.replace("\\", "\\\\").replace('"', '\\"')
+    return f'method="{method}",route="{route}"'
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+route_metrics = RouteMetrics()
@@ -1,6 +1,9 @@
+import uuid
+
 from sqlalchemy.orm import Session
 from app.models.offer import Offer
 from app.models.user import User, UserRole
+from app.services import offer_search, tutor_search
 
 def get_offers_by_department(db: Session, department: str, limit: int = 3) -> list[Offer]:
     """
@@ -17,4 +20,19 @@ def get_offers_by_department(db: Session, department: str, limit: int = 3) -> li
                .limit(limit)\
                .all()
     
-    return offers
\ No newline at end of file
+    return offers
+
+def create_offers(db: Session, *, tutor_id: str, items) -> list[dict]:
+    """
+    Création en lot des offres d'un tuteur : bio lue une fois, une insertion
+    multi-lignes, un commit. `items` : objets avec subject, description, price_hour.
+    """
+    rows = [
+        {"id": str(uuid.uuid4()), "tutor_id": tutor_id, "subject": item.subject,
+         "description": item.description, "price_hour": item.price_hour}
+        for item in items
+    ]
+    offer_search.insert_offers(db, tutor_id, rows)
+    tutor_search.tutor_changed(db, tutor_id)
+    db.commit()
+    return rows
@@ -0,0 +1,323 @@
+import bisect
+import math
+import re
+import threading
+import unicodedata
+from decimal import Decimal
+
+from sqlalchemy import Numeric, and_, bindparam, cast, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.offer import Offer
+from app.models.tutor_profile import TutorProfile
+from app.services.pagination import encode_cursor, decode_cursor, keyset_page, MAX_PAGE_SIZE
+
+# Poids de chaque champ dans le score (sujet > description > bio du tuteur)
+FIELD_WEIGHTS = {"subject": 3.0, "description": 1.0, "bio": 0.5}
+# Un terme qui ne correspond que par préfixe ("math" -> "mathematiques") compte moins
+PREFIX_FACTOR = 0.5
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_LIGATURES = str.maketrans({"œ": "oe", "æ": "ae", "ß": "ss"})
+
+
+# ---- Normalisation ----
+
+def normalize_text(text: str | None) -> str:
+    """
+    Minuscules + suppression des accents ("Mathématiques" -> "mathematiques")
+    """
+    if not text:
+        return ""
+    text = text.lower().translate(_LIGATURES)
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str | None) -> list[str]:
+    return _TOKEN_RE.findall(normalize_text(text))
+
+
+# ---- Index inversé en mémoire (repli hors Postgres) ----
+
+class OfferSearchIndex:
+    """
+    Index inversé token -> {offer_id: poids}, avec un vocabulaire trié
+    pour la recherche par préfixe. Construit paresseusement depuis la base
+    puis tenu à jour par index_offer / reindex_tutor / remove_offers.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._docs: dict[str, dict[str, float]] = {}
+        self._postings: dict[str, dict[str, float]] = {}
+        self._vocab: list[str] = []
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    def clear(self):
+        with self._lock:
+            self._built = False
+            self._docs.clear()
+            self._postings.clear()
+            self._vocab.clear()
+
+    def build(self, db: Session):
+        rows = db.execute(
+            select(Offer.id, Offer.subject, Offer.description, TutorProfile.bio)
+            .outerjoin(TutorProfile, TutorProfile.user_id == Offer.tutor_id)
+        ).all()
+        with self._lock:
+            self.clear()
+            for offer_id, subject, description, bio in rows:
+                self._add(offer_id, subject, description, bio)
+            self._built = True
+
+    def add(self, offer_id: str, subject: str | None, description: str | None, bio: str | None):
+        with self._lock:
+            if self._built:
+                self._add(offer_id, subject, description, bio)
+
+    def remove(self, offer_id: str):
+        with self._lock:
+            self._remove(offer_id)
+
+    def _add(self, offer_id, subject, description, bio):
+        self._remove(offer_id)
+        weights: dict[str, float] = {}
+        for field, text in (("subject", subject), ("description", description), ("bio", bio)):
+            for token in tokenize(text):
+                weights[token] = weights.get(token, 0.0) + FIELD_WEIGHTS[field]
+        self._docs[offer_id] = weights
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                bisect.insort(self._vocab, token)
+            postings[offer_id] = weight
+
+    def _remove(self, offer_id):
+        weights = self._docs.pop(offer_id, None)
+        if not weights:
+            return
+        for token in weights:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(offer_id, None)
+            if not postings:
+                del self._postings[token]
+                i = bisect.bisect_left(self._vocab, token)
+                if i < len(self._vocab) and self._vocab[i] == token:
+                    self._vocab.pop(i)
+
+    def _expand(self, term: str) -> list[str]:
+        # Tous les tokens du vocabulaire qui commencent par `term`
+        i = bisect.bisect_left(self._vocab, term)
+        out = []
+        while i < len(self._vocab) and self._vocab[i].startswith(term):
+            out.append(self._vocab[i])
+            i += 1
+        return out
+
+    def search(self, terms: list[str]) -> list[tuple[float, str]]:
+        """
+        Retourne [(score, offer_id)] trié par score décroissant puis id.
+        Chaque terme doit correspondre (ET logique), exactement ou par préfixe.
+        """
+        with self._lock:
+            n_docs = len(self._docs) or 1
+            scores: dict[str, float] | None = None
+            for term in terms:
+                term_scores: dict[str, float] = {}
+                for token in self._expand(term):
+                    postings = self._postings[token]
+                    idf = math.log(1 + n_docs / len(postings))
+                    factor = 1.0 if token == term else PREFIX_FACTOR
+                    for offer_id, weight in postings.items():
+                        s = weight * idf * factor
+                        if s > term_scores.get(offer_id, 0.0):
+                            term_scores[offer_id] = s
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {k: v + term_scores[k] for k, v in scores.items() if k in term_scores}
+                if not scores:
+                    return []
+        ranked = [(round(s, 6), offer_id) for offer_id, s in (scores or {}).items()]
+        ranked.sort(key=lambda r: (-r[0], r[1]))
+        return ranked
+
+
+offer_index = OfferSearchIndex()
+
+
+# ---- Maintenance (appelée par les handlers d'écriture) ----
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _search_vector(subject, description, bio, normalize: bool = True):
+    def part(text, weight):
+        return func.setweight(func.to_tsvector("simple", normalize_text(text) if normalize else text), weight)
+    return part(subject, "A").op("||")(part(description, "B")).op("||")(part(bio, "C"))
+
+
+def _tutor_bio(db: Session, tutor_id: str) -> str | None:
+    return db.execute(select(TutorProfile.bio).where(TutorProfile.user_id == tutor_id)).scalar()
+
+
+def index_offer(db: Session, offer: Offer, bio: str | None = None):
+    """
+    Met à jour le document de recherche d'une offre (à appeler avant le commit,
+    après un flush pour que offer.id soit connu).
+    """
+    if bio is None:
+        bio = _tutor_bio(db, offer.tutor_id)
+    if _is_postgres(db):
+        offer.search_vector = _search_vector(offer.subject, offer.description, bio)
+    else:
+        offer_index.add(offer.id, offer.subject, offer.description, bio)
+
+
+def insert_offers(db: Session, tutor_id: str, rows: list[dict]):
+    """
+    Insertion multi-lignes d'offres d'un même tuteur (dicts avec id), document
+    de recherche compris : sous Postgres il est calculé dans l'INSERT.
+    """
+    if not rows:
+        return
+    bio = _tutor_bio(db, tutor_id)
+    if not _is_postgres(db):
+        db.execute(insert(Offer), rows)
+        for row in rows:
+            offer_index.add(row["id"], row["subject"], row.get("description"), bio)
+        return
+    stmt = insert(Offer.__table__).values(
+        search_vector=_search_vector(bindparam("doc_subject"), bindparam("doc_description"), bindparam("doc_bio"),
+                                     normalize=False)
+    )
+    db.execute(stmt, [
+        {**row, "doc_subject": normalize_text(row["subject"]),
+         "doc_description": normalize_text(row.get("description")), "doc_bio": normalize_text(bio)}
+        for row in rows
+    ])
+
+
+def reindex_tutor(db: Session, tutor_id: str, bio: str | None = None):
+    """
+    La bio fait partie du document : à appeler quand le profil d'un tuteur change.
+    """
+    if bio is None:
+        bio = _tutor_bio(db, tutor_id)
+    for offer in db.query(Offer).filter(Offer.tutor_id == tutor_id).all():
+        index_offer(db, offer, bio=bio)
+
+
+def remove_offers(offer_ids: list[str]):
+    for offer_id in offer_ids:
+        offer_index.remove(offer_id)
+
+
+def reindex_all(db: Session, batch_size: int = 5000) -> int:
+    """
+    Recalcule search_vector pour toutes les offres (après un chargement en masse).
+    Hors Postgres, l'index en mémoire est simplement invalidé (reconstruit au besoin).
+    """
+    if not _is_postgres(db):
+        offer_index.clear()
+        return 0
+    stmt = (
+        update(Offer.__table__)
+        .where(Offer.__table__.c.id == bindparam("offer_id"))
+        .values(search_vector=_search_vector(bindparam("subject"), bindparam("description"), bindparam("bio"),
+                                             normalize=False))
+    )
+    rows = db.execute(
+        select(Offer.id, Offer.subject, Offer.description, TutorProfile.bio)
+        .outerjoin(TutorProfile, TutorProfile.user_id == Offer.tutor_id)
+    ).all()
+    for start in range(0, len(rows), batch_size):
+        db.execute(stmt, [
+            {"offer_id": offer_id, "subject": normalize_text(subject),
+             "description": normalize_text(description), "bio": normalize_text(bio)}
+            for offer_id, subject, description, bio in rows[start:start + batch_size]
+        ])
+    db.commit()
+    return len(rows)
+
+
+# ---- Recherche ----
+
+def search_offers(db: Session, q: str | None, limit: int = 20, cursor: str | None = None,
+                  columns: tuple | None = None) -> tuple[list, str | None]:
+    """
+    Recherche classée des offres + pagination par curseur.
+    Retourne (offres, next_cursor) ; avec `columns`, des Row sur ces colonnes
+    (qui doivent inclure Offer.id) au lieu d'objets Offer.
+    Lève ValueError si le curseur est invalide.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    entities = columns or (Offer,)
+    terms = tokenize(q)
+    if not terms:
+        # Pas de recherche : simple parcours par id
+        return keyset_page(db.query(*entities), [Offer.id], limit, cursor)
+
+    after = None
+    if cursor:
+        score, offer_id = decode_cursor(cursor, size=2)
+        try:
+            after = (str(Decimal(score)), str(offer_id))
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+    if _is_postgres(db):
+        return _search_postgres(db, terms, limit, after, entities)
+    return _search_in_memory(db, terms, limit, after, entities)
+
+
+def _search_postgres(db: Session, terms: list[str], limit: int, after: tuple[str, str] | None, entities):
+    tsquery = func.to_tsquery("simple", " & ".join(f"{t}:*" for t in terms))
+    rank = func.round(cast(func.ts_rank(Offer.search_vector, tsquery), Numeric(12, 6)), 6)
+    stmt = (
+        select(rank.label("rank"), Offer.id.label("offer_id"), *entities)
+        .where(Offer.search_vector.op("@@")(tsquery))
+    )
+    if after:
+        score, offer_id = Decimal(after[0]), after[1]
+        stmt = stmt.where(or_(rank < score, and_(rank == score, Offer.id > offer_id)))
+    rows = db.execute(stmt.order_by(rank.desc(), Offer.id.asc()).limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor([f"{last.rank:.6f}", last.offer_id])
+    if entities == (Offer,):
+        return [row[2] for row in rows[:limit]], next_cursor
+    return [row[2:] for row in rows[:limit]], next_cursor
+
+
+def _search_in_memory(db: Session, terms: list[str], limit: int, after: tuple[str, str] | None, entities):
+    if not offer_index.built:
+        offer_index.build(db)
+    ranked = offer_index.search(terms)
+    if after:
+        key = (-float(after[0]), after[1])
+        ranked = [r for r in ranked if (-r[0], r[1]) > key]
+
+    page = ranked[:limit]
+    if not page:
+        return [], None
+    by_id = {o.id: o for o in db.query(*entities).filter(Offer.id.in_([oid for _, oid in page])).all()}
+    offers = [by_id[oid] for _, oid in page if oid in by_id]
+
+    next_cursor = None
+    if len(ranked) > limit:
+        score, offer_id = page[-1]
+        next_cursor = encode_cursor([f"{score:.6f}", offer_id])
+    return offers, next_cursor
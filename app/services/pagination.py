@@ -0,0 +1,78 @@
+"""
+Pagination par clé (keyset) partagée par les routes de liste.
+
+Le curseur est opaque pour le client : base64 d'un JSON contenant les valeurs
+de la clé de tri du dernier élément servi. La page suivante filtre avec
+(k1, k2, ...) > (v1, v2, ...) au lieu d'un OFFSET : le coût ne dépend pas
+de la profondeur, pourvu qu'un index couvre la clé de tri.
+"""
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def _to_json(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    return value
+
+
+def _from_json(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "dec" in value:
+            return Decimal(value["dec"])
+        raise ValueError("Invalid cursor")
+    return value
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps([_to_json(v) for v in values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int | None = None) -> list:
+    """
+    Lève ValueError si le curseur est mal formé (ou n'a pas `size` valeurs).
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = [_from_json(v) for v in json.loads(raw)]
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or (size is not None and len(values) != size):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def keyset_page(query, keys, limit: int, cursor: str | None = None, descending: bool = False):
+    """
+    Applique tri + filtre keyset sur une Query ORM et renvoie (items, next_cursor).
+
+    keys : colonnes de tri, la dernière doit être unique (ex. (Timeslot.start_utc, Timeslot.id)).
+    Les éléments retournés doivent porter ces attributs (même nom que les colonnes).
+    Lève ValueError si le curseur est invalide.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if cursor:
+        after = decode_cursor(cursor, size=len(keys))
+        key_tuple, value_tuple = tuple_(*keys), tuple_(*after)
+        query = query.filter(key_tuple < value_tuple if descending else key_tuple > value_tuple)
+
+    query = query.order_by(*[k.desc() if descending else k.asc() for k in keys])
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor([getattr(last, k.key) for k in keys])
+    return rows[:limit], next_cursor
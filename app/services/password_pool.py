@@ -0,0 +1,115 @@
+"""
+Pool de processus dédié au hachage des mots de passe.
+
+PBKDF2 (600k itérations) coûte des centaines de ms : exécuté dans le threadpool
+de FastAPI, une rafale de logins monopolise tous les workers. Ici le calcul part
+dans des processus séparés, et le nombre d'opérations en attente est borné :
+au-delà, PasswordPoolSaturated est levée (-> 503 + Retry-After) au lieu d'empiler.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from app.exceptions.auth import PasswordPoolSaturated
+from app.services.metrics import LatencyStats, record_hash
+
+# 0 = pas de pool, hachage dans le thread appelant (scripts, debug)
+PASSWORD_POOL_WORKERS = int(os.getenv("PASSWORD_POOL_WORKERS", str(min(os.cpu_count() or 2, 4))))
+PASSWORD_POOL_MAX_PENDING = int(os.getenv("PASSWORD_POOL_MAX_PENDING", str(max(PASSWORD_POOL_WORKERS, 1) * 2)))
+PASSWORD_POOL_RETRY_AFTER = int(os.getenv("PASSWORD_POOL_RETRY_AFTER", "1"))
+
+
+def _timed_call(fn, args, submitted_at: float):
+    # Exécuté dans le processus worker
+    started = time.time()
+    result = fn(*args)
+    return result, started - submitted_at, time.time() - started
+
+
+class PasswordPool:
+    def __init__(self, workers: int, max_pending: int, retry_after: int = 1):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+        self.queue_wait = LatencyStats()
+        self.hash_time = LatencyStats()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("forkserver"),
+                )
+            return self._executor
+
+    def _acquire(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordPoolSaturated(retry_after=self.retry_after)
+            self._pending += 1
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    def run(self, fn, *args):
+        """
+        Exécute fn(*args) dans le pool et attend le résultat.
+        Lève PasswordPoolSaturated si trop d'opérations sont déjà en attente.
+        """
+        self._acquire()
+        try:
+            if self.workers <= 0:
+                result, waited, took = _timed_call(fn, args, time.time())
+            else:
+                future = self._get_executor().submit(_timed_call, fn, args, time.time())
+                result, waited, took = future.result()
+        finally:
+            self._release()
+        self.queue_wait.observe(max(waited, 0.0))
+        self.hash_time.observe(took)
+        record_hash(took)
+        return result
+
+    def configure(self, workers: int | None = None, max_pending: int | None = None):
+        self.shutdown()
+        if workers is not None:
+            self.workers = workers
+        if max_pending is not None:
+            self.max_pending = max_pending
+        self.rejected = 0
+        self.queue_wait.reset()
+        self.hash_time.reset()
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = self._pending
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": pending,
+            "rejected": self.rejected,
+            "queue_wait_seconds": self.queue_wait.snapshot(),
+            "hash_seconds": self.hash_time.snapshot(),
+        }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+password_pool = PasswordPool(
+    workers=PASSWORD_POOL_WORKERS,
+    max_pending=PASSWORD_POOL_MAX_PENDING,
+    retry_after=PASSWORD_POOL_RETRY_AFTER,
+)
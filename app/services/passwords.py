@@ -0,0 +1,45 @@
+"""
+Hachage PBKDF2-HMAC-SHA256 pur (stdlib uniquement).
+Module volontairement léger : il est importé par les processus du pool de hachage.
+"""
+import base64
+import hashlib
+import hmac
+import os
+
+PASSWORD_HASH_ALGORITHM = "pbkdf2_sha256"
+PASSWORD_HASH_ITERATIONS = int(os.getenv("PASSWORD_HASH_ITERATIONS", "600000"))
+
+
+def hash_password(password: str, iterations: int | None = None) -> str:
+    iterations = iterations or PASSWORD_HASH_ITERATIONS
+    salt = os.urandom(16)
+    dk = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return f"{PASSWORD_HASH_ALGORITHM}${iterations}${base64.b64encode(salt).decode()}${base64.b64encode(dk).decode()}"
+
+
+def _parse(stored_hash: str) -> tuple[str, int, bytes, bytes]:
+    try:
+        algorithm, iterations, salt_b64, hash_b64 = stored_hash.split("$")
+        assert algorithm == PASSWORD_HASH_ALGORITHM
+        return algorithm, int(iterations), base64.b64decode(salt_b64), base64.b64decode(hash_b64)
+    except Exception:
+        raise ValueError("Invalid hash format")
+
+
+def check_password(password: str, stored_hash: str) -> bool:
+    _, iterations, salt, stored_dk = _parse(stored_hash)
+    new_dk = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return hmac.compare_digest(stored_dk, new_dk)
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    """
+    Vrai si le hash a été produit avec un autre algorithme / nombre d'itérations
+    que la configuration courante.
+    """
+    try:
+        algorithm, iterations, _, _ = _parse(stored_hash)
+    except ValueError:
+        return True
+    return algorithm != PASSWORD_HASH_ALGORITHM or iterations != PASSWORD_HASH_ITERATIONS
@@ -0,0 +1,127 @@
+from datetime import datetime
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.review import Review
+from app.models.tutor_rating import TutorRating
+from app.services import tutor_search
+
+STARS = (1, 2, 3, 4, 5)
+
+
+def _upsert_insert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    return None
+
+
+def record_review(db: Session, review: Review):
+    """
+    Ajoute un avis à l'agrégat du tuteur, dans la transaction de l'appelant
+    (INSERT ... ON CONFLICT DO UPDATE : pas de lecture préalable, pas de course).
+    """
+    star_col = f"stars_{int(review.rating)}"
+    created_at = review.created_at or datetime.utcnow()
+    dialect_insert = _upsert_insert(db)
+
+    if dialect_insert is None:
+        agg = db.get(TutorRating, review.tutor_id, with_for_update=True)
+        if agg is None:
+            agg = TutorRating(tutor_id=review.tutor_id, rating_count=0, rating_sum=0,
+                              **{f"stars_{s}": 0 for s in STARS})
+            db.add(agg)
+        agg.rating_count += 1
+        agg.rating_sum += int(review.rating)
+        setattr(agg, star_col, getattr(agg, star_col) + 1)
+        agg.last_review_at = max(filter(None, [agg.last_review_at, created_at]))
+        return
+
+    stmt = dialect_insert(TutorRating).values(
+        tutor_id=review.tutor_id,
+        rating_count=1,
+        rating_sum=int(review.rating),
+        last_review_at=created_at,
+        **{f"stars_{s}": int(s == review.rating) for s in STARS},
+    )
+    # un avis plus ancien (import, horloges décalées) ne recule pas last_review_at
+    current, incoming = TutorRating.last_review_at, stmt.excluded.last_review_at
+    if db.get_bind().dialect.name == "postgresql":
+        last_review_at = func.greatest(current, incoming)     # ignore NULL
+    else:
+        last_review_at = case((current.is_(None) | (incoming > current), incoming), else_=current)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TutorRating.tutor_id],
+        set_={
+            "rating_count": TutorRating.rating_count + 1,
+            "rating_sum": TutorRating.rating_sum + int(review.rating),
+            star_col: getattr(TutorRating, star_col) + 1,
+            "last_review_at": last_review_at,
+        },
+    )
+    db.execute(stmt)
+
+
+def _summary(tutor_id: str, agg: TutorRating | None) -> dict:
+    count = agg.rating_count if agg else 0
+    return {
+        "tutor_id": tutor_id,
+        "rating_count": count,
+        "rating_avg": (agg.rating_sum / count) if count else None,
+        "histogram": {str(s): (getattr(agg, f"stars_{s}") if agg else 0) for s in STARS},
+        "last_review_at": agg.last_review_at if agg else None,
+    }
+
+
+def get_summary(db: Session, tutor_id: str) -> dict:
+    return _summary(tutor_id, db.get(TutorRating, tutor_id))
+
+
+def get_summaries(db: Session, tutor_ids: list[str]) -> dict[str, dict]:
+    """
+    Résumés de plusieurs tuteurs en une seule requête (clé primaire IN)
+    """
+    ids = list(dict.fromkeys(tutor_ids))
+    rows = db.execute(select(TutorRating).where(TutorRating.tutor_id.in_(ids))).scalars().all() if ids else []
+    by_id = {r.tutor_id: r for r in rows}
+    return {tid: _summary(tid, by_id.get(tid)) for tid in ids}
+
+
+def rebuild_ratings(db: Session, tutor_ids: list[str] | None = None) -> int:
+    """
+    Recalcule les agrégats depuis la table reviews (réparation / données existantes).
+    Retourne le nombre de tuteurs recalculés.
+    """
+    delete_stmt = delete(TutorRating)
+    source = (
+        select(
+            Review.tutor_id,
+            func.count(Review.id),
+            func.coalesce(func.sum(Review.rating), 0),
+            *[func.coalesce(func.sum(case((Review.rating == s, 1), else_=0)), 0) for s in STARS],
+            func.max(Review.created_at),
+        )
+        .group_by(Review.tutor_id)
+    )
+    if tutor_ids is not None:
+        delete_stmt = delete_stmt.where(TutorRating.tutor_id.in_(tutor_ids))
+        source = source.where(Review.tutor_id.in_(tutor_ids))
+        for tutor_id in tutor_ids:
+            tutor_search.tutor_changed(db, tutor_id, tutor_search.RATING)
+
+    db.execute(delete_stmt)
+    result = db.execute(
+        insert(TutorRating).from_select(
+            ["tutor_id", "rating_count", "rating_sum", *[f"stars_{s}" for s in STARS], "last_review_at"],
+            source,
+        )
+    )
+    if tutor_ids is None:
+        # tous les tuteurs : un UPDATE du modèle de recherche plutôt qu'un événement chacun
+        tutor_search.refresh_all_ratings(db)
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,267 @@
+"""
+Recommandation d'offres pour un utilisateur connecté.
+
+Le score d'une offre mélange cinq signaux, chacun ramené dans [0, 1] :
+- distance   : proximité du tuteur (centroïdes des codes postaux), décroissance exponentielle ;
+- rating     : moyenne bayésienne des notes (agrégats tutor_ratings) ;
+- price      : écart (log) entre le prix et le prix habituel de l'élève ;
+- subject    : affinité avec les matières déjà réservées par l'élève ;
+- availability : créneaux libres du tuteur dans les RECOMMENDATION_HORIZON_DAYS prochains jours.
+
+Les caractéristiques des offres sont précalculées dans des tableaux NumPy
+(FeatureSnapshot), reconstruits au plus toutes les RECOMMENDATION_REFRESH_SECONDS :
+une requête ne lit que le profil et l'historique de l'élève, puis score tous
+les candidats d'un bloc.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.exceptions.user import UserNotFound
+from app.models.booking import Booking
+from app.models.offer import Offer
+from app.models.timeslot import Timeslot
+from app.models.tutor_rating import TutorRating
+from app.models.user import User
+from app.services.geo_index import EARTH_RADIUS_KM
+from app.services.geo_service import centroid_for_postal_code
+from app.services.offer_search import normalize_text
+from app.services.single_flight import SingleFlight
+
+REFRESH_SECONDS = float(os.getenv("RECOMMENDATION_REFRESH_SECONDS", "300"))
+HORIZON_DAYS = int(os.getenv("RECOMMENDATION_HORIZON_DAYS", "14"))
+
+WEIGHTS = {"distance": 0.35, "rating": 0.20, "price": 0.15, "subject": 0.20, "availability": 0.10}
+DISTANCE_SCALE_KM = 15.0
+# Moyenne bayésienne : RATING_PRIOR_COUNT avis fictifs à RATING_PRIOR_MEAN
+RATING_PRIOR_MEAN, RATING_PRIOR_COUNT = 3.5, 5
+# Au-delà de ce nombre de créneaux libres, la disponibilité est pleine
+AVAILABILITY_TARGET = 5
+
+
+@dataclass(frozen=True)
+class FeatureSnapshot:
+    offer_ids: np.ndarray        # object
+    tutor_codes: np.ndarray      # int32, indice dans `tutors`
+    lat: np.ndarray              # radians, NaN si inconnue
+    lon: np.ndarray
+    cos_lat: np.ndarray
+    log_price: np.ndarray
+    rating: np.ndarray           # [0, 1]
+    availability: np.ndarray     # [0, 1]
+    subject_codes: np.ndarray    # int32, indice dans `subjects`
+    subjects: dict[str, int]     # matière normalisée -> code
+    tutors: dict[str, int]       # tutor_id -> code
+    positions: dict[str, int]    # offer_id -> indice
+    median_price: float
+    built_at: float = field(default_factory=time.monotonic)
+
+    def __len__(self) -> int:
+        return len(self.offer_ids)
+
+    @classmethod
+    def from_rows(cls, offers, free_slots: dict[str, int]) -> "FeatureSnapshot":
+        """
+        offers : (offer_id, tutor_id, subject, price_hour, postal_code, department, rating_count, rating_sum)
+        free_slots : tutor_id -> nombre de créneaux libres dans l'horizon
+        """
+        subjects: dict[str, int] = {}
+        tutors: dict[str, int] = {}
+        n = len(offers)
+        lat, lon = np.full(n, np.nan), np.full(n, np.nan)
+        counts, sums = np.zeros(n), np.zeros(n)
+        price, free = np.zeros(n), np.zeros(n)
+        codes, tutor_codes = np.zeros(n, dtype=np.int32), np.zeros(n, dtype=np.int32)
+        centroids: dict[str, tuple[float, float] | None] = {}
+        for i, (_, tutor_id, subject, price_hour, postal_code, department, r_count, r_sum) in enumerate(offers):
+            if tutor_id not in centroids:
+                centroids[tutor_id] = centroid_for_postal_code(postal_code or department)
+            if centroids[tutor_id]:
+                lat[i], lon[i] = centroids[tutor_id]
+            price[i] = float(price_hour)
+            codes[i] = subjects.setdefault(normalize_text(subject), len(subjects))
+            tutor_codes[i] = tutors.setdefault(tutor_id, len(tutors))
+            counts[i], sums[i] = r_count or 0, r_sum or 0
+            free[i] = free_slots.get(tutor_id, 0)
+
+        bayes = (sums + RATING_PRIOR_MEAN * RATING_PRIOR_COUNT) / (counts + RATING_PRIOR_COUNT)
+        lat, lon = np.radians(lat), np.radians(lon)
+        return cls(
+            offer_ids=np.array([o[0] for o in offers], dtype=object),
+            tutor_codes=tutor_codes,
+            lat=lat, lon=lon, cos_lat=np.cos(lat),
+            log_price=np.log(np.maximum(price, 0.01)),
+            rating=(bayes - 1) / 4,
+            availability=np.minimum(free / AVAILABILITY_TARGET, 1.0),
+            subject_codes=codes,
+            subjects=subjects,
+            tutors=tutors,
+            positions={o[0]: i for i, o in enumerate(offers)},
+            median_price=float(np.median(price)) if n else 0.0,
+        )
+
+
+@dataclass
+class StudentContext:
+    user_id: str
+    location: tuple[float, float] | None = None           # (lat, lon) en degrés
+    subject_counts: dict[str, int] = field(default_factory=dict)  # matière normalisée -> réservations
+    prices: list[float] = field(default_factory=list)     # prix des offres déjà réservées
+    booked_offer_ids: set[str] = field(default_factory=set)
+
+
+def score(snapshot: FeatureSnapshot, ctx: StudentContext, weights: dict[str, float] = WEIGHTS) -> np.ndarray:
+    """
+    Score de chaque offre du snapshot pour cet élève (tableau aligné sur snapshot.offer_ids).
+    """
+    total = np.zeros(len(snapshot))
+    if ctx.location is not None:
+        lat0, lon0 = np.radians(ctx.location[0]), np.radians(ctx.location[1])
+        a = (np.sin((snapshot.lat - lat0) / 2) ** 2
+             + np.cos(lat0) * snapshot.cos_lat * np.sin((snapshot.lon - lon0) / 2) ** 2)
+        distance_km = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+        total += weights["distance"] * np.nan_to_num(np.exp(-distance_km / DISTANCE_SCALE_KM), nan=0.0)
+
+    total += weights["rating"] * snapshot.rating
+    total += weights["availability"] * snapshot.availability
+
+    reference = float(np.median(ctx.prices)) if ctx.prices else snapshot.median_price
+    if reference > 0:
+        total += weights["price"] * np.exp(-np.abs(snapshot.log_price - np.log(reference)))
+
+    if ctx.subject_counts:
+        affinity = np.zeros(len(snapshot.subjects) + 1)
+        top = max(ctx.subject_counts.values())
+        for subject, count in ctx.subject_counts.items():
+            code = snapshot.subjects.get(subject)
+            if code is not None:
+                affinity[code] = count / top
+        total += weights["subject"] * affinity[snapshot.subject_codes]
+    return total
+
+
+def rank(snapshot: FeatureSnapshot, ctx: StudentContext, limit: int,
+         weights: dict[str, float] = WEIGHTS) -> list[str]:
+    """
+    Ids des `limit` meilleures offres, hors offres déjà réservées et offres de l'utilisateur lui-même.
+    """
+    if not len(snapshot):
+        return []
+    scores = score(snapshot, ctx, weights)
+    own = snapshot.tutors.get(ctx.user_id)
+    if own is not None:
+        scores[snapshot.tutor_codes == own] = -np.inf
+    booked = [snapshot.positions[i] for i in ctx.booked_offer_ids if i in snapshot.positions]
+    scores[booked] = -np.inf
+    k = min(limit, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    # ordre stable : score décroissant puis id
+    top = sorted(top, key=lambda i: (-scores[i], snapshot.offer_ids[i]))
+    return [snapshot.offer_ids[i] for i in top if np.isfinite(scores[i])]
+
+
+# ---- Chargement ----
+
+def load_snapshot(db: Session, now: datetime | None = None) -> FeatureSnapshot:
+    now = now or datetime.utcnow()
+    offers = db.execute(
+        select(Offer.id, Offer.tutor_id, Offer.subject, Offer.price_hour, User.postal_code, User.department,
+               TutorRating.rating_count, TutorRating.rating_sum)
+        .join(User, User.id == Offer.tutor_id)
+        .outerjoin(TutorRating, TutorRating.tutor_id == Offer.tutor_id)
+        .order_by(Offer.id)
+    ).all()
+    free = db.execute(
+        select(Offer.tutor_id, func.count(Timeslot.id))
+        .join(Offer, Offer.id == Timeslot.offer_id)
+        .where(Timeslot.is_booked.is_(False),
+               Timeslot.start_utc >= now, Timeslot.start_utc < now + timedelta(days=HORIZON_DAYS))
+        .group_by(Offer.tutor_id)
+    ).all()
+    return FeatureSnapshot.from_rows(offers, dict(free))
+
+
+def load_student_context(db: Session, user_id: str) -> StudentContext:
+    """
+    Profil + historique de réservations en une requête. Lève UserNotFound.
+    """
+    rows = db.execute(
+        select(User.postal_code, User.department, Offer.id, Offer.subject, Offer.price_hour)
+        .outerjoin(Booking, Booking.student_id == User.id)
+        .outerjoin(Offer, Offer.id == Booking.offer_id)
+        .where(User.id == user_id)
+    ).all()
+    if not rows:
+        raise UserNotFound
+    postal_code, department = rows[0][0], rows[0][1]
+    ctx = StudentContext(user_id=user_id, location=centroid_for_postal_code(postal_code or department))
+    for _, _, offer_id, subject, price_hour in rows:
+        if offer_id is None:
+            continue
+        ctx.booked_offer_ids.add(offer_id)
+        key = normalize_text(subject)
+        ctx.subject_counts[key] = ctx.subject_counts.get(key, 0) + 1
+        ctx.prices.append(float(price_hour))
+    return ctx
+
+
+class Recommender:
+    """
+    Détient le snapshot courant ; reconstruit à la demande quand il a plus de
+    REFRESH_SECONDS (un seul rechargement à la fois, les autres requêtes
+    continuent sur l'ancien snapshot). Le premier snapshot est construit par
+    `ensure` (routes async) : snapshot() n'attend jamais un verrou.
+    """
+
+    def __init__(self, refresh_seconds: float = REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._cold_start = SingleFlight()
+        self._snapshot: FeatureSnapshot | None = None
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = None
+
+    def snapshot(self, db: Session) -> FeatureSnapshot:
+        current = self._snapshot
+        if current is not None and time.monotonic() - current.built_at < self.refresh_seconds:
+            return current
+        if not self._lock.acquire(blocking=False):
+            # rechargement en cours : ancien snapshot ; au démarrage, hors
+            # route async (script, autre thread), construit sans le partager
+            return current if current is not None else load_snapshot(db)
+        try:
+            if self._snapshot is current:
+                self._snapshot = load_snapshot(db)
+            return self._snapshot
+        finally:
+            self._lock.release()
+
+    async def ensure(self, db: AsyncSession):
+        """
+        Construit le premier snapshot une seule fois pour des requêtes concurrentes.
+        """
+        await self._cold_start.run(lambda: self._snapshot is None, lambda: db.run_sync(self.snapshot))
+
+    def recommend(self, db: Session, user_id: str, limit: int) -> list[Offer]:
+        """
+        Offres recommandées, dans l'ordre du score. Lève UserNotFound.
+        """
+        ctx = load_student_context(db, user_id)
+        offer_ids = rank(self.snapshot(db), ctx, limit)
+        if not offer_ids:
+            return []
+        # relues en base : une offre supprimée depuis le dernier snapshot disparaît
+        offers = {o.id: o for o in db.query(Offer).filter(Offer.id.in_(offer_ids)).all()}
+        return [offers[i] for i in offer_ids if i in offers]
+
+
+recommender = Recommender()
@@ -0,0 +1,201 @@
+"""
+Cache des réponses des lectures publiques (offres, profils, avis, recherche).
+Une entrée = corps JSON déjà sérialisé + ETag, rangée sous une clé
+(route + paramètres normalisés) et rattachée à des tags ("tutor:{id}",
+"dept:{code}", ...). Les handlers d'écriture invalident par tag après commit.
+
+Deux backends : LRU/TTL en mémoire (par processus, défaut) ou Redis
+(RESPONSE_CACHE_URL=redis://..., partagé entre workers ; paquet `redis` requis).
+RESPONSE_CACHE_URL=off désactive le cache.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable
+
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "memory")
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "2000"))
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "60"))
+
+logger = logging.getLogger(__name__)
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    # comparaison faible (RFC 9110) : W/"x" correspond à "x"
+    return "*" in candidates or etag in (c[2:] if c.startswith("W/") else c for c in candidates)
+
+
+# ---- Backends ----
+
+class MemoryBackend:
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, str, bytes, frozenset]] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+
+    def get(self, key: str) -> tuple[str, bytes] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, etag, body, _ = entry
+            if expires_at <= time.time():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return etag, body
+
+    def set(self, key: str, etag: str, body: bytes, tags: Iterable[str], ttl: int):
+        tags = frozenset(tags)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (time.time() + ttl, etag, body, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, tags: Iterable[str]):
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    self._drop(key)
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[3]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+
+class RedisBackend:
+    """
+    Entrée : chaîne "<etag> <corps>" avec expiration ; tag : ensemble des clés
+    qui en dépendent (expire avec la plus longue de ses entrées).
+    """
+
+    PREFIX = "superprof:cache:"
+
+    def __init__(self, url: str):
+        import redis  # dépendance optionnelle, seulement si ce backend est configuré
+
+        self._redis = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+
+    def get(self, key: str) -> tuple[str, bytes] | None:
+        raw = self._redis.get(self.PREFIX + key)
+        if raw is None:
+            return None
+        etag, _, body = raw.partition(b" ")
+        return etag.decode(), body
+
+    def set(self, key: str, etag: str, body: bytes, tags: Iterable[str], ttl: int):
+        pipe = self._redis.pipeline()
+        pipe.set(self.PREFIX + key, etag.encode() + b" " + body, ex=ttl)
+        for tag in tags:
+            pipe.sadd(self.PREFIX + "tag:" + tag, key)
+            pipe.expire(self.PREFIX + "tag:" + tag, ttl, gt=True)
+            pipe.expire(self.PREFIX + "tag:" + tag, ttl, nx=True)
+        pipe.execute()
+
+    def invalidate(self, tags: Iterable[str]):
+        for tag in tags:
+            tag_key = self.PREFIX + "tag:" + tag
+            keys = self._redis.smembers(tag_key)
+            self._redis.delete(tag_key, *(self.PREFIX + k.decode() for k in keys))
+
+    def clear(self):
+        keys = list(self._redis.scan_iter(self.PREFIX + "*"))
+        if keys:
+            self._redis.delete(*keys)
+
+
+# ---- Cache ----
+
+class ResponseCache:
+    """
+    Façade : une erreur du backend (Redis indisponible) est journalisée et
+    traitée comme un défaut de cache, jamais remontée à la requête.
+    """
+
+    def __init__(self, backend=None, ttl: int = RESPONSE_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def get(self, key: str) -> tuple[str, bytes] | None:
+        if self.backend is None:
+            return None
+        try:
+            entry = self.backend.get(key)
+        except Exception:
+            logger.exception("response cache: lecture impossible")
+            entry = None
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def set(self, key: str, etag: str, body: bytes, tags: Iterable[str]):
+        if self.backend is None:
+            return
+        try:
+            self.backend.set(key, etag, body, tags, self.ttl)
+        except Exception:
+            logger.exception("response cache: écriture impossible")
+
+    def invalidate(self, *tags: str):
+        if self.backend is None or not tags:
+            return
+        try:
+            self.backend.invalidate(tags)
+        except Exception:
+            logger.exception("response cache: invalidation impossible (%s)", ", ".join(tags))
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+        self.hits = self.misses = 0
+
+
+def make_backend(url: str = RESPONSE_CACHE_URL):
+    if url in ("", "off", "none"):
+        return None
+    if url == "memory":
+        return MemoryBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"RESPONSE_CACHE_URL inconnu : {url}")
+
+
+response_cache = ResponseCache(make_backend())
+
+
+def invalidate(*tags: str):
+    response_cache.invalidate(*tags)
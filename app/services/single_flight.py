@@ -0,0 +1,36 @@
+"""
+Construction unique d'un index en mémoire depuis les routes de lecture async.
+
+Ces routes appellent le code synchrone par AsyncSession.run_sync : il tourne
+sur le thread de la boucle d'événements, chaque E/S de la base rendant la
+main à la boucle. Un threading.Lock bloquant y gèle la boucle (la requête
+qui le détient ne peut plus avancer) et un RLock n'exclut rien (même
+thread). Les requêtes concurrentes attendent donc la construction en cours
+sur un asyncio.Lock, un par boucle d'événements.
+"""
+import asyncio
+import weakref
+from typing import Awaitable, Callable
+
+
+class SingleFlight:
+    def __init__(self):
+        self._locks: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def _lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        lock = self._locks.get(loop)
+        if lock is None:
+            lock = self._locks[loop] = asyncio.Lock()
+        return lock
+
+    async def run(self, needed: Callable[[], bool], build: Callable[[], Awaitable]):
+        """
+        Appelle build() si needed() ; les appels concurrents attendent la
+        construction en cours puis revérifient needed().
+        """
+        if not needed():
+            return
+        async with self._lock():
+            if needed():
+                await build()
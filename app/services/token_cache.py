@@ -0,0 +1,122 @@
+"""
+Cache LRU/TTL des JWT déjà vérifiés + liste de révocation (par processus).
+Évite de refaire la vérification de signature à chaque requête ; une révocation
+(logout, suppression d'utilisateur, changement de rôle) purge immédiatement les
+entrées concernées.
+
+La liste de révocation est en mémoire, propre au processus : avec plusieurs
+workers, les autres acceptent le token révoqué jusqu'à son expiration
+(JWT_ACCESS_TOKEN_TTL), et un redémarrage l'oublie.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_TTL = int(os.getenv("TOKEN_CACHE_TTL", "300"))
+# Durée de vie des JWT (app.services.auth) : une révocation par utilisateur plus
+# ancienne ne concerne plus aucun token valide
+JWT_ACCESS_TOKEN_TTL = int(os.getenv("JWT_ACCESS_TOKEN_TTL", str(12 * 3600)))
+
+
+class VerifiedTokenCache:
+    def __init__(self, maxsize: int = TOKEN_CACHE_SIZE, ttl: int = TOKEN_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._revoked_jti: dict[str, float] = {}       # jti -> exp
+        self._revoked_users: dict[str, int] = {}       # user_id -> tokens émis avant cette seconde refusés
+        self.hits = 0
+        self.misses = 0
+
+    # ---- cache ----
+
+    def get(self, token: str) -> dict | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, claims = entry
+            if expires_at <= now:
+                del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return claims
+
+    def put(self, token: str, claims: dict):
+        now = time.time()
+        expires_at = now + self.ttl
+        if "exp" in claims:
+            expires_at = min(expires_at, float(claims["exp"]))
+        if expires_at <= now:
+            return
+        with self._lock:
+            self._entries[token] = (expires_at, claims)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    # ---- révocation ----
+
+    def is_revoked(self, claims: dict) -> bool:
+        with self._lock:
+            if claims.get("jti") in self._revoked_jti:
+                return True
+            revoked_at = self._revoked_users.get(str(claims.get("user_id")))
+            return revoked_at is not None and int(claims.get("iat", 0)) < revoked_at
+
+    def revoke(self, claims: dict):
+        jti = claims.get("jti")
+        if not jti:
+            return
+        with self._lock:
+            self._revoked_jti[jti] = float(claims.get("exp", time.time() + self.ttl))
+            self._purge(lambda c: c.get("jti") == jti)
+            self._forget_expired()
+
+    def revoke_user(self, user_id: str):
+        """
+        Refuse les tokens de l'utilisateur émis avant la seconde courante. `iat`
+        est à la seconde : un token réémis dans la même seconde (reconnexion
+        après un changement de rôle) reste valide ; ceux de cette seconde déjà
+        vus par ce processus sont révoqués par jti.
+        """
+        now = time.time()
+        revoked_at = int(now)
+        with self._lock:
+            self._revoked_users[str(user_id)] = revoked_at
+            for _, claims in self._entries.values():
+                if str(claims.get("user_id")) == str(user_id) and int(claims.get("iat", 0)) >= revoked_at \
+                        and claims.get("jti"):
+                    self._revoked_jti[claims["jti"]] = float(claims.get("exp", now + self.ttl))
+            self._purge(lambda c: str(c.get("user_id")) == str(user_id))
+            self._forget_expired()
+
+    def _purge(self, predicate):
+        for token in [t for t, (_, c) in self._entries.items() if predicate(c)]:
+            del self._entries[token]
+
+    def _forget_expired(self):
+        # Un jti révoqué n'a plus besoin d'être retenu une fois le token expiré,
+        # ni une révocation par utilisateur plus ancienne que la durée de vie des tokens
+        now = time.time()
+        for jti in [j for j, exp in self._revoked_jti.items() if exp <= now]:
+            del self._revoked_jti[jti]
+        for user_id in [u for u, at in self._revoked_users.items() if at + JWT_ACCESS_TOKEN_TTL <= now]:
+            del self._revoked_users[user_id]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._revoked_jti.clear()
+            self._revoked_users.clear()
+            self.hits = self.misses = 0
+
+
+token_cache = VerifiedTokenCache()
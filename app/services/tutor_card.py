@@ -0,0 +1,88 @@
+"""
+Fiche « carte » d'un tuteur : identité, profil, résumé des notes, offres et
+prochains créneaux libres de chaque offre, en un appel.
+
+Nombre de requêtes fixe quel que soit le nombre de tuteurs et d'offres :
+1. tuteurs + profil + agrégat de notes (jointures externes, id IN ...) ;
+2. offres de ces tuteurs (tutor_id IN ...) ;
+3. prochains créneaux libres, CARD_SLOTS_PER_OFFER par offre (ROW_NUMBER par offre).
+"""
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.offer import Offer
+from app.models.timeslot import Timeslot
+from app.models.tutor_profile import TutorProfile
+from app.models.tutor_rating import TutorRating
+from app.models.user import User, UserRole
+from app.services.rating import _summary
+
+CARD_SLOTS_PER_OFFER = int(os.getenv("CARD_SLOTS_PER_OFFER", "3"))
+CARD_SLOTS_HORIZON_DAYS = int(os.getenv("CARD_SLOTS_HORIZON_DAYS", "30"))
+
+
+def next_free_slots(db: Session, tutor_ids: list[str], now: datetime, per_offer: int = CARD_SLOTS_PER_OFFER) -> dict[str, list]:
+    """
+    offer_id -> `per_offer` premiers créneaux libres dans [now, now + horizon), par date de début.
+    """
+    rank = func.row_number().over(partition_by=Timeslot.offer_id, order_by=(Timeslot.start_utc, Timeslot.id))
+    ranked = (
+        select(Timeslot.id, Timeslot.offer_id, Timeslot.start_utc, Timeslot.end_utc,
+               Timeslot.is_booked, Timeslot.booking_id, rank.label("rank"))
+        .join(Offer, Offer.id == Timeslot.offer_id)
+        .where(Offer.tutor_id.in_(tutor_ids), Timeslot.is_booked.is_(False),
+               Timeslot.start_utc >= now, Timeslot.start_utc < now + timedelta(days=CARD_SLOTS_HORIZON_DAYS))
+        .subquery()
+    )
+    rows = db.execute(
+        select(ranked.c.id, ranked.c.offer_id, ranked.c.start_utc, ranked.c.end_utc,
+               ranked.c.is_booked, ranked.c.booking_id)
+        .where(ranked.c.rank <= per_offer)
+        .order_by(ranked.c.offer_id, ranked.c.start_utc, ranked.c.id)
+    ).mappings().all()
+    slots: dict[str, list] = {}
+    for row in rows:
+        slots.setdefault(row["offer_id"], []).append(dict(row))
+    return slots
+
+
+def load_cards(db: Session, tutor_ids: list[str], now: datetime | None = None) -> dict[str, dict]:
+    """
+    tutor_id -> carte, pour les ids qui désignent un tuteur (les autres sont absents).
+    """
+    ids = list(dict.fromkeys(tutor_ids))
+    if not ids:
+        return {}
+    now = now or datetime.utcnow()
+    tutors = db.execute(
+        select(User.id, User.first_name, User.last_name, User.department, TutorProfile, TutorRating)
+        .outerjoin(TutorProfile, TutorProfile.user_id == User.id)
+        .outerjoin(TutorRating, TutorRating.tutor_id == User.id)
+        .where(User.id.in_(ids), User.role == UserRole.tutor)
+    ).all()
+    if not tutors:
+        return {}
+    found = [t.id for t in tutors]
+
+    offers: dict[str, list] = {}
+    for offer in db.execute(select(Offer).where(Offer.tutor_id.in_(found)).order_by(Offer.tutor_id, Offer.id)).scalars():
+        offers.setdefault(offer.tutor_id, []).append(offer)
+    slots = next_free_slots(db, found, now)
+
+    cards = {}
+    for t in tutors:
+        cards[t.id] = {
+            "tutor_id": t.id,
+            "first_name": t.first_name,
+            "last_name": t.last_name,
+            "department": t.department,
+            "profile": t.TutorProfile,
+            "rating": _summary(t.id, t.TutorRating),
+            "offers": [{"id": o.id, "tutor_id": o.tutor_id, "subject": o.subject, "description": o.description,
+                        "price_hour": o.price_hour, "next_slots": slots.get(o.id, [])}
+                       for o in offers.get(t.id, [])],
+        }
+    return {tid: cards[tid] for tid in ids if tid in cards}
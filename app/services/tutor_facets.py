@@ -0,0 +1,476 @@
+"""
+Filtres, facettes, tri et pagination de /search/tutors sur un index en mémoire
+du modèle tutor_search (une position par tuteur).
+
+- Valeurs de facette (matière normalisée, langue) : un bitmap par valeur,
+  précalculé ; filtrer revient à combiner des bitmaps.
+- Département, prix de départ, expérience, note, prochain créneau : tableaux
+  NumPy alignés sur les positions, filtres par comparaison vectorisée.
+- Comptes de facettes en une passe sur le résultat (ET + popcount des
+  bitmaps, bincount des tranches).
+- Tri keyset sur le résultat filtré ; seule la page servie est relue en base.
+
+Fraîcheur : les tuteurs recalculés par ce processus (événements de
+app.services.tutor_search) sont relus à la recherche suivante ; les lignes
+modifiées par les autres workers sont relues toutes les FACET_SYNC_SECONDS
+(updated_at), et l'index est reconstruit toutes les FACET_REBUILD_SECONDS
+(tuteurs supprimés). Un prochain créneau enregistré déjà passé (la ligne
+n'est recalculée qu'aux écritures) est remplacé à la recherche par le suivant,
+relu en base pour les seuls tuteurs concernés.
+
+Importé à la première recherche : NumPy n'est pas chargé au démarrage.
+"""
+import bisect
+import heapq
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.tutor_search import TutorSearch, TutorSearchSubject
+from app.services import tutor_search
+from app.services.offer_search import normalize_text
+from app.services.pagination import decode_cursor, encode_cursor
+from app.services.single_flight import SingleFlight
+
+SYNC_SECONDS = float(os.getenv("FACET_SYNC_SECONDS", "5"))
+REBUILD_SECONDS = float(os.getenv("FACET_REBUILD_SECONDS", "600"))
+# transactions encore ouvertes lors de la synchronisation précédente
+SYNC_OVERLAP = timedelta(seconds=30)
+
+PRICE_EDGES = (20, 30, 40, 50)
+EXPERIENCE_THRESHOLDS = (1, 3, 5, 10)
+RATING_THRESHOLDS = (3, 4, 4.5)
+MAX_FACET_VALUES = 20
+
+_COLUMNS = (TutorSearch.tutor_id, TutorSearch.first_name, TutorSearch.last_name, TutorSearch.department,
+            TutorSearch.languages, TutorSearch.years_experience, TutorSearch.min_price,
+            TutorSearch.rating_avg, TutorSearch.rating_count, TutorSearch.next_available_at)
+
+
+# nombre de bits à 1 de chaque octet (np.bitwise_count à partir de NumPy 2.0)
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+_popcount = getattr(np, "bitwise_count", _POPCOUNT_TABLE.__getitem__)
+
+
+class _MultiValued:
+    """
+    Facette à plusieurs valeurs par tuteur : un bitmap par valeur (bits des
+    positions, 8 par octet ; capacité multiple de 8).
+    """
+
+    def __init__(self, capacity: int):
+        self.codes: dict[str, int] = {}
+        self.values: list[str] = []
+        self.bitmaps = np.zeros((8, capacity // 8), dtype=np.uint8)
+
+    def grow(self, capacity: int):
+        grown = np.zeros((self.bitmaps.shape[0], capacity // 8), dtype=np.uint8)
+        grown[:, :self.bitmaps.shape[1]] = self.bitmaps
+        self.bitmaps = grown
+
+    def set(self, pos: int, values):
+        byte, bit = pos >> 3, np.uint8(0x80 >> (pos & 7))     # ordre de np.packbits
+        self.bitmaps[:, byte] &= ~bit
+        for value in values:
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.values)
+                self.values.append(value)
+                if code >= self.bitmaps.shape[0]:
+                    grown = np.zeros((self.bitmaps.shape[0] * 2, self.bitmaps.shape[1]), dtype=np.uint8)
+                    grown[:code] = self.bitmaps
+                    self.bitmaps = grown
+            self.bitmaps[code, byte] |= bit
+
+    def having(self, values) -> np.ndarray:
+        """
+        Masque des positions ayant au moins une de ces valeurs.
+        """
+        codes = [self.codes[v] for v in values if v in self.codes]
+        if not codes:
+            return np.zeros(self.bitmaps.shape[1] * 8, dtype=bool)
+        return np.unpackbits(np.bitwise_or.reduce(self.bitmaps[codes], axis=0)).astype(bool)
+
+    def counts(self, packed_mask: np.ndarray) -> dict[str, int]:
+        bitmaps = self.bitmaps[:len(self.values)]
+        # octets non vides du résultat seulement (résultat d'un département : quelques centaines)
+        nonzero = np.flatnonzero(packed_mask)
+        if len(nonzero) < len(packed_mask) // 2:
+            bitmaps, packed_mask = bitmaps[:, nonzero], packed_mask[nonzero]
+        totals = _popcount(bitmaps & packed_mask).sum(axis=1, dtype=np.int64)
+        top = sorted((-int(n), value) for value, n in zip(self.values, totals) if n)
+        return {value: -n for n, value in top[:MAX_FACET_VALUES]}
+
+
+class TutorFacetIndex:
+    def __init__(self, sync_seconds: float = SYNC_SECONDS, rebuild_seconds: float = REBUILD_SECONDS):
+        self.sync_seconds = sync_seconds
+        self.rebuild_seconds = rebuild_seconds
+        # données de l'index : tenu sans E/S, jamais pendant une requête SQL
+        self._lock = threading.Lock()
+        # un seul rechargement à la fois (E/S), les autres recherches servent l'index courant
+        self._refreshing = threading.Lock()
+        self._cold_start = SingleFlight()
+        self._stale: set[str] = set()
+        # prochain créneau relu après expiration de celui de la ligne (None : aucun)
+        self._next_available: dict[str, datetime | None] = {}
+        self._reset(0)
+
+    def _reset(self, capacity: int):
+        capacity = max(capacity, 64)
+        self._built_at: float | None = None
+        self._synced_at = 0.0
+        self._watermark: datetime | None = None
+        self._positions: dict[str, int] = {}
+        self._ids: list[str | None] = [None] * capacity
+        self._names: list[tuple[str, str]] = [("", "")] * capacity
+        # tri par nom : rang de chaque position, recalculé après un changement de nom
+        self._name_keys: list[tuple] | None = None
+        self._name_rank = np.zeros(capacity)
+        self._free: list[int] = []
+        self._size = 0
+        self._departments: dict[str, int] = {}
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.department = np.full(capacity, -1, dtype=np.int32)
+        self.price = np.full(capacity, np.nan)
+        self.experience = np.full(capacity, np.nan)
+        self.rating = np.full(capacity, np.nan)
+        self.rating_count = np.zeros(capacity, dtype=np.int32)
+        self.next_at = np.full(capacity, np.nan)
+        self.subjects = _MultiValued(capacity)
+        self.languages = _MultiValued(capacity)
+
+    def clear(self):
+        with self._lock:
+            self._stale.clear()
+            self._next_available.clear()
+            self._reset(0)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def mark_stale(self, tutor_ids):
+        with self._lock:
+            self._stale.update(tutor_ids)
+
+    # ---- Chargement ----
+
+    def _grow(self):
+        capacity = len(self._ids) * 2
+        extra = capacity - len(self._ids)
+        self._ids.extend([None] * extra)
+        self._names.extend([("", "")] * extra)
+        for name, fill in (("_name_rank", 0.0), ("alive", False), ("department", -1), ("price", np.nan), ("experience", np.nan),
+                           ("rating", np.nan), ("rating_count", 0), ("next_at", np.nan)):
+            old = getattr(self, name)
+            grown = np.full(capacity, fill, dtype=old.dtype)
+            grown[:len(old)] = old
+            setattr(self, name, grown)
+        self.subjects.grow(capacity)
+        self.languages.grow(capacity)
+
+    def _remove(self, tutor_id: str):
+        self._next_available.pop(tutor_id, None)
+        pos = self._positions.pop(tutor_id, None)
+        if pos is not None:
+            self.alive[pos] = False
+            self._ids[pos] = None
+            self._free.append(pos)
+
+    def _upsert(self, row, subjects):
+        pos = self._positions.get(row.tutor_id)
+        if pos is None or self._names[pos] != (row.last_name, row.first_name):
+            self._name_keys = None
+        if pos is None:
+            if self._free:
+                pos = self._free.pop()
+            else:
+                if self._size == len(self._ids):
+                    self._grow()
+                pos, self._size = self._size, self._size + 1
+            self._positions[row.tutor_id] = pos
+            self._ids[pos] = row.tutor_id
+        self._names[pos] = (row.last_name, row.first_name)
+        self.alive[pos] = True
+        self.department[pos] = self._departments.setdefault(row.department or "", len(self._departments))
+        self.price[pos] = float(row.min_price) if row.min_price is not None else np.nan
+        self.experience[pos] = row.years_experience if row.years_experience is not None else np.nan
+        self.rating[pos] = row.rating_avg if row.rating_avg is not None else np.nan
+        self.rating_count[pos] = row.rating_count
+        self.next_at[pos] = row.next_available_at.timestamp() if row.next_available_at else np.nan
+        self._next_available.pop(row.tutor_id, None)
+        self.subjects.set(pos, subjects)
+        self.languages.set(pos, tutor_search.language_codes(row.languages))
+
+    def _fetch(self, db: Session, where=None) -> tuple[dict, dict]:
+        """
+        Lignes qui vérifient `where` (toutes si None), matières comprises : une
+        requête. Renvoie ({id: ligne}, {id: [matières]}).
+        """
+        q = (select(*_COLUMNS, TutorSearchSubject.subject)
+             .outerjoin(TutorSearchSubject, TutorSearchSubject.tutor_id == TutorSearch.tutor_id))
+        if where is not None:
+            q = q.where(where)
+        rows, subjects = {}, {}
+        for row in db.execute(q):
+            rows[row.tutor_id] = row
+            if row.subject:
+                subjects.setdefault(row.tutor_id, []).append(row.subject)
+        return rows, subjects
+
+    def _apply(self, rows: dict, subjects: dict):
+        for tutor_id, row in rows.items():
+            self._upsert(row, subjects.get(tutor_id, ()))
+
+    def _refresh(self, db: Session):
+        """
+        Construction, reconstruction périodique, synchronisation et relecture
+        des tuteurs recalculés. Les requêtes SQL sont faites hors de self._lock :
+        sous run_sync, elles rendent la main à la boucle d'événements.
+        Un rechargement déjà en cours n'est pas attendu (index courant servi),
+        sauf à froid : les routes async passent d'abord par `ensure`.
+        """
+        cold = self._built_at is None
+        now = time.monotonic()
+        full = cold or now - self._built_at >= self.rebuild_seconds
+        sync = not full and now - self._synced_at >= self.sync_seconds
+        if not (full or sync or self._stale):
+            return
+        if not self._refreshing.acquire(blocking=cold):
+            return
+        try:
+            if cold and self._built_at is not None:
+                return      # construit pendant l'attente
+            with self._lock:
+                marked = set(self._stale)
+            watermark = datetime.utcnow()
+            if full:
+                rows, subjects = self._fetch(db)
+                with self._lock:
+                    self._reset(len(self._ids))
+                    self._apply(rows, subjects)
+                    self._stale -= marked
+                    self._built_at = self._synced_at = now
+                    self._watermark = watermark
+                return
+            if sync:
+                rows, subjects = self._fetch(db, TutorSearch.updated_at >= self._watermark - SYNC_OVERLAP)
+                with self._lock:
+                    self._apply(rows, subjects)
+                    self._stale -= rows.keys()
+                    marked -= rows.keys()
+                    self._synced_at, self._watermark = now, watermark
+            if marked:
+                rows, subjects = self._fetch(db, TutorSearch.tutor_id.in_(marked))
+                with self._lock:
+                    self._apply(rows, subjects)
+                    for tutor_id in marked - rows.keys():
+                        self._remove(tutor_id)
+                    self._stale -= marked
+        finally:
+            self._refreshing.release()
+
+    def _renew_expired(self, db: Session):
+        """
+        Remplace les prochains créneaux passés par le suivant en base (une
+        requête, seulement s'il y en a). Requête hors de self._lock.
+        """
+        now = datetime.utcnow()
+        with self._lock:
+            expired = np.flatnonzero(self.alive & (self.next_at < now.timestamp()))
+            if not len(expired):
+                return
+            tutor_ids = [self._ids[pos] for pos in expired]
+        slots = tutor_search.next_free_slots(db, tutor_ids, now)
+        with self._lock:
+            for tutor_id in tutor_ids:
+                pos = self._positions.get(tutor_id)
+                if pos is None or not self.next_at[pos] < now.timestamp():
+                    continue        # relu ou supprimé entre-temps
+                slot = slots.get(tutor_id)
+                self.next_at[pos] = slot.timestamp() if slot else np.nan
+                self._next_available[tutor_id] = slot
+
+    def next_available(self, tutor_id: str, stored: datetime | None) -> datetime | None:
+        """
+        Prochain créneau à servir pour ce tuteur, `stored` étant celui de sa ligne.
+        """
+        with self._lock:
+            return self._next_available.get(tutor_id, stored)
+
+    async def ensure(self, db: AsyncSession):
+        """
+        Première construction, une seule fois pour des recherches concurrentes.
+        """
+        await self._cold_start.run(lambda: self._built_at is None, lambda: db.run_sync(self._refresh))
+
+    # ---- Recherche ----
+
+    def _mask(self, departments, positions, subject, min_price, max_price, languages,
+              min_experience, min_rating) -> np.ndarray:
+        mask = self.alive.copy()
+        if departments is not None:
+            codes = [self._departments[d] for d in departments if d in self._departments]
+            mask &= np.isin(self.department, codes)
+        if positions is not None:
+            selected = np.zeros(len(mask), dtype=bool)
+            selected[positions] = True
+            mask &= selected
+        if subject:
+            key = normalize_text(subject).strip()
+            mask &= self.subjects.having([value for value in self.subjects.codes if value.startswith(key)])
+        for language in languages:
+            mask &= self.languages.having([language])
+        # NaN (pas d'offre, non renseigné, pas de note) : exclu dès qu'un seuil est demandé
+        with np.errstate(invalid="ignore"):
+            if min_price is not None:
+                mask &= self.price >= min_price
+            if max_price is not None:
+                mask &= self.price <= max_price
+            if min_experience is not None:
+                mask &= self.experience >= min_experience
+            if min_rating is not None:
+                mask &= self.rating >= min_rating
+        return mask
+
+    def _facets(self, mask: np.ndarray, positions: np.ndarray) -> dict:
+        packed = np.packbits(mask)
+        names = {code: name for name, code in self._departments.items()}
+        departments = np.bincount(self.department[positions], minlength=len(names))
+        price = self.price[positions]
+        price = price[~np.isnan(price)]
+        buckets = np.bincount(np.searchsorted(PRICE_EDGES, price, side="right"), minlength=len(PRICE_EDGES) + 1)
+        labels = [f"0-{PRICE_EDGES[0]}",
+                  *(f"{a}-{b}" for a, b in zip(PRICE_EDGES, PRICE_EDGES[1:])),
+                  f"{PRICE_EDGES[-1]}+"]
+        experience, rating = self.experience[positions], self.rating[positions]
+        with np.errstate(invalid="ignore"):
+            return {
+                "subject": self.subjects.counts(packed),
+                "language": self.languages.counts(packed),
+                "department": {names[code]: int(n) for code, n in enumerate(departments) if n and names[code]},
+                "price": dict(zip(labels, map(int, buckets))),
+                "experience": {f"{t}+": int(np.count_nonzero(experience >= t)) for t in EXPERIENCE_THRESHOLDS},
+                "rating": {f"{t}+": int(np.count_nonzero(rating >= t)) for t in RATING_THRESHOLDS},
+            }
+
+    def _primary(self, positions: np.ndarray, sort: str, distances: dict | None) -> np.ndarray:
+        """
+        Première clé de tri, numérique (valeur absente : en dernier ; nom : rang).
+        """
+        if sort == "price":
+            values = self.price[positions]
+        elif sort == "rating":
+            values = -self.rating[positions]
+        elif sort == "availability":
+            # créneau passé depuis le dernier recalcul de la ligne : absent
+            values = self.next_at[positions]
+            values = np.where(values >= datetime.utcnow().timestamp(), values, np.nan)
+        elif sort == "distance":
+            values = np.fromiter((distances[self._ids[pos]] for pos in positions), float, len(positions))
+        else:
+            return self._name_ranks()[positions]
+        return np.where(np.isnan(values), np.inf, values)
+
+    def _name_ranks(self) -> np.ndarray:
+        if self._name_keys is None:
+            order = sorted(self._positions.values(), key=lambda pos: (*self._names[pos], self._ids[pos]))
+            self._name_keys = [(*self._names[pos], self._ids[pos]) for pos in order]
+            self._name_rank[order] = np.arange(len(order))
+        return self._name_rank
+
+    def _key(self, pos: int, sort: str, primary: float) -> tuple:
+        tutor_id = self._ids[pos]
+        if sort == "name":
+            return (*self._names[pos], tutor_id)
+        if sort == "rating":
+            return (primary, -int(self.rating_count[pos]), tutor_id)
+        return (primary, tutor_id)
+
+    def _page(self, positions: np.ndarray, sort: str, distances: dict | None,
+              after: tuple | None, limit: int | None) -> list[tuple]:
+        """
+        [(clé, position)] triés, après `after`, au plus limit + 1. Filtre du
+        curseur et sélection des limit + 1 premières valeurs vectorisés sur la
+        première clé ; clés complètes calculées pour les seuls candidats.
+        """
+        primary = self._primary(positions, sort, distances)
+        if after is not None:
+            if sort == "name":
+                keep = primary >= bisect.bisect_right(self._name_keys, after)
+            else:
+                keep = primary > after[0]
+                ties = np.flatnonzero(primary == after[0])
+                if len(ties):
+                    keep[ties] = [self._key(int(positions[i]), sort, after[0]) > after for i in ties]
+            positions, primary = positions[keep], primary[keep]
+        if limit is not None and len(positions) > limit + 1:
+            keep = primary <= np.partition(primary, limit)[limit]
+            positions, primary = positions[keep], primary[keep]
+        keys = [(self._key(int(pos), sort, float(primary[i])), int(pos)) for i, pos in enumerate(positions)]
+        return sorted(keys) if limit is None else heapq.nsmallest(limit + 1, keys)
+
+    def search(self, db: Session, *, departments=None, distances: dict[str, float] | None = None,
+               subject: str | None = None, min_price: float | None = None, max_price: float | None = None,
+               languages=(), min_experience: int | None = None, min_rating: float | None = None,
+               sort: str = "name", limit: int | None = None, cursor: str | None = None) -> dict:
+        """
+        {count, facets, tutor_ids (page, dans l'ordre), next_cursor}.
+        `distances` (recherche par rayon) : tuteur -> km, restreint le résultat.
+        Lève ValueError si le curseur est invalide.
+        """
+        self._refresh(db)
+        self._renew_expired(db)
+        with self._lock:
+            positions = None
+            if distances is not None:
+                positions = [self._positions[t] for t in distances if t in self._positions]
+            mask = self._mask(departments, positions, subject, min_price, max_price,
+                              [code.upper() for code in languages], min_experience, min_rating)
+            found = np.flatnonzero(mask)
+            facets = self._facets(mask, found)
+            after = None
+            if cursor:
+                after = tuple(decode_cursor(cursor, size=2 if sort in ("price", "availability", "distance") else 3))
+            try:
+                page = self._page(found, sort, distances, after, limit)
+            except TypeError:
+                # curseur d'un autre tri
+                raise ValueError("Invalid cursor")
+            next_cursor = None
+            if limit is not None and len(page) > limit:
+                next_cursor = encode_cursor(page[limit - 1][0])
+                page = page[:limit]
+            return {"count": len(found), "facets": facets,
+                    "tutor_ids": [self._ids[pos] for _, pos in page], "next_cursor": next_cursor}
+
+
+tutor_facet_index = TutorFacetIndex()
+tutor_search.subscribe(tutor_facet_index.mark_stale)
+
+
+def search(db: Session, *, departments=None, distances: dict[str, float] | None = None,
+           limit: int | None = None, **filters) -> dict:
+    """
+    Page de résultats formatés (mêmes champs que tutor_search, + distance_km)
+    : index de facettes puis lecture de la page par clé primaire.
+    """
+    result = tutor_facet_index.search(db, departments=departments, distances=distances, limit=limit, **filters)
+    ids = result.pop("tutor_ids")
+    rows = {row.tutor_id: row for row in db.execute(select(TutorSearch).where(TutorSearch.tutor_id.in_(ids))).scalars()} if ids else {}
+    items = []
+    for tutor_id in ids:
+        if tutor_id in rows:        # supprimé depuis la dernière synchronisation
+            row = rows[tutor_id]
+            item = tutor_search._format(row)
+            item["next_available_at"] = tutor_facet_index.next_available(tutor_id, item["next_available_at"])
+            if distances is not None:
+                item["distance_km"] = distances[tutor_id]
+            items.append(item)
+    return {**result, "items": items}
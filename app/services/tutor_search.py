@@ -0,0 +1,355 @@
+"""
+Modèle de lecture de la recherche de tuteurs : tables tutor_search (une ligne
+par tuteur ayant un profil) et tutor_search_subjects (une ligne par matière),
+lues par /search/tutors sans jointure ni formatage des offres.
+
+Tenu à jour par événements côté écriture, recalculés au commit dans la même
+transaction que l'écriture source, pour les sessions de SessionLocal (et des
+sessionmaker passés à `track`) :
+- les écritures ORM (User, TutorProfile, Offer, Review, TutorRating, Timeslot)
+  sont détectées au flush ;
+- les écritures Core qui contournent l'ORM (insertions en lot, réservation ou
+  libération de créneaux) appellent tutor_changed / offer_slots_changed.
+
+Types d'événements, du plus coûteux au moins coûteux :
+- FULL         : identité, département, profil, offres — ligne et matières réécrites ;
+- RATING       : nombre d'avis et note moyenne (un UPDATE) ;
+- AVAILABILITY : prochain créneau libre (un UPDATE).
+
+Le prochain créneau libre est celui du dernier recalcul : une fois passé, la
+recherche relit le suivant (app.services.tutor_facets) ; `rebuild --expired`
+(script scripts/rebuild_tutor_search.py) réécrit les lignes concernées.
+"""
+from datetime import datetime
+from itertools import chain
+
+from sqlalchemy import Float, cast, delete, event, func, insert, inspect, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import SessionLocal
+from app.models.offer import Offer
+from app.models.review import Review
+from app.models.timeslot import Timeslot
+from app.models.tutor_profile import TutorProfile
+from app.models.tutor_rating import TutorRating
+from app.models.tutor_search import TutorSearch, TutorSearchSubject
+from app.models.user import User, UserRole
+from app.services.offer_search import normalize_text
+from app.services.response_cache import invalidate
+
+FULL, RATING, AVAILABILITY = "full", "rating", "availability"
+SORTS = ("name", "price", "rating", "availability", "distance")
+
+_PENDING = "tutor_search.pending"
+_REFRESHED = "tutor_search.refreshed"
+
+# Appelés après commit avec les tuteurs recalculés (index en mémoire à rafraîchir)
+_subscribers: list = []
+
+
+def subscribe(callback):
+    _subscribers.append(callback)
+
+
+# ---- Événements ----
+
+def _pending(db: Session) -> dict[str, set]:
+    return db.info.setdefault(_PENDING, {FULL: set(), RATING: set(), AVAILABILITY: set(), "offers": set()})
+
+
+def tutor_changed(db: Session, tutor_id: str, kind: str = FULL):
+    """
+    Les données `kind` du tuteur ont changé : sa ligne est recalculée au prochain commit.
+    """
+    _pending(db)[kind].add(tutor_id)
+
+
+def offer_slots_changed(db: Session, *offer_ids: str):
+    """
+    Créneaux réservés / libérés sur ces offres (tuteur résolu au commit).
+    """
+    _pending(db)["offers"].update(offer_ids)
+
+
+def _collect(session: Session, flush_context):
+    # après le flush : les ids générés côté Python sont renseignés
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, User):
+            # tuteur, ou rôle modifié (ancienne valeur pas forcément chargée)
+            role_changed = obj not in session.new and inspect(obj).attrs.role.history.has_changes()
+            if obj.role == UserRole.tutor or role_changed:
+                tutor_changed(session, obj.id)
+        elif isinstance(obj, TutorProfile):
+            tutor_changed(session, obj.user_id)
+        elif isinstance(obj, Offer):
+            tutor_changed(session, obj.tutor_id)
+        elif isinstance(obj, (Review, TutorRating)):
+            tutor_changed(session, obj.tutor_id, RATING)
+        elif isinstance(obj, Timeslot):
+            offer_slots_changed(session, obj.offer_id)
+
+
+def _apply_pending(session: Session):
+    session.flush()     # le commit flushe ensuite : ici pour collecter ses événements
+    if not session.info.get(_PENDING):
+        return
+    tutors, departments = apply(session, session.info.pop(_PENDING))
+    refreshed = session.info.setdefault(_REFRESHED, (set(), set()))
+    refreshed[0].update(tutors)
+    refreshed[1].update(departments)
+
+
+def _invalidate_refreshed(session: Session):
+    refreshed = session.info.pop(_REFRESHED, None)
+    if refreshed and refreshed[0]:
+        tutors, departments = refreshed
+        # recherches (facettes comprises) des départements touchés, avant et après
+        invalidate(*(f"dept:{d}" for d in departments if d), *(f"tutor:{tutor_id}" for tutor_id in tutors))
+        for callback in _subscribers:
+            callback(tutors)
+
+
+def _discard_pending(session: Session, previous_transaction):
+    session.info.pop(_PENDING, None)
+    session.info.pop(_REFRESHED, None)
+
+
+_LISTENERS = (("after_flush", _collect), ("before_commit", _apply_pending),
+              ("after_commit", _invalidate_refreshed), ("after_soft_rollback", _discard_pending))
+
+
+def track(factory: sessionmaker):
+    """
+    Tient le modèle à jour pour les sessions de `factory` (une fois par
+    sessionmaker). Les autres sessions (lectures, scripts de chargement en
+    masse suivis d'un rebuild) ne paient pas la collecte au flush.
+    """
+    for name, listener in _LISTENERS:
+        event.listen(factory, name, listener)
+
+
+track(SessionLocal)
+
+
+def apply(db: Session, pending: dict[str, set], now: datetime | None = None) -> tuple[set[str], set[str]]:
+    """
+    Applique les événements en attente ; renvoie les tuteurs recalculés et
+    leurs départements (ancien et nouveau). Un recalcul FULL couvre les deux
+    autres types.
+    """
+    now = now or datetime.utcnow()
+    full = pending[FULL]
+    availability = set(pending[AVAILABILITY])
+    if pending["offers"]:
+        availability.update(db.execute(
+            select(Offer.tutor_id).where(Offer.id.in_(pending["offers"]))
+        ).scalars())
+    rating, availability = pending[RATING] - full, availability - full
+
+    departments: set[str] = set()
+    if full:
+        _refresh(db, full, now, departments)
+    if rating:
+        departments.update(department for _, department in _update_ratings(db, rating, now))
+    if availability:
+        departments.update(db.execute(
+            update(TutorSearch).where(TutorSearch.tutor_id.in_(availability))
+            .values(next_available_at=_next_available(TutorSearch.tutor_id, now), updated_at=now)
+            .returning(TutorSearch.department)
+        ).scalars())
+    return full | rating | availability, departments
+
+
+# ---- Recalcul ----
+
+def _update_ratings(db: Session, tutor_ids: set[str] | None, now: datetime) -> list:
+    # note et nombre d'avis depuis tutor_ratings ; renvoie [(tuteur, département)]
+    stmt = update(TutorSearch)
+    if tutor_ids is not None:
+        stmt = stmt.where(TutorSearch.tutor_id.in_(tutor_ids))
+    return db.execute(
+        stmt.values(rating_count=func.coalesce(_rating_count(TutorSearch.tutor_id), 0),
+                    rating_avg=_rating_avg(TutorSearch.tutor_id), updated_at=now)
+        .returning(TutorSearch.tutor_id, TutorSearch.department)
+    ).all()
+
+
+def refresh_all_ratings(db: Session, now: datetime | None = None) -> int:
+    """
+    Recalcule note et nombre d'avis de toutes les lignes en un UPDATE (après une
+    réparation complète de tutor_ratings), dans la transaction de l'appelant ;
+    caches et index de facettes mis à jour au commit. Renvoie le nombre de lignes.
+    """
+    rows = _update_ratings(db, None, now or datetime.utcnow())
+    refreshed = db.info.setdefault(_REFRESHED, (set(), set()))
+    refreshed[0].update(tutor_id for tutor_id, _ in rows)
+    refreshed[1].update(department for _, department in rows)
+    return len(rows)
+
+def _rating_count(tutor_id):
+    return select(TutorRating.rating_count).where(TutorRating.tutor_id == tutor_id).scalar_subquery()
+
+
+def _rating_avg(tutor_id):
+    return (
+        select(cast(TutorRating.rating_sum, Float) / func.nullif(TutorRating.rating_count, 0))
+        .where(TutorRating.tutor_id == tutor_id)
+        .scalar_subquery()
+    )
+
+
+def _next_available(tutor_id, now: datetime):
+    # index (tutor_id, id) des offres puis (offer_id, start_utc) des créneaux
+    return (
+        select(func.min(Timeslot.start_utc))
+        .join(Offer, Offer.id == Timeslot.offer_id)
+        .where(Offer.tutor_id == tutor_id, Timeslot.is_booked.is_(False), Timeslot.start_utc >= now)
+        .scalar_subquery()
+    )
+
+
+def next_free_slots(db: Session, tutor_ids, now: datetime) -> dict[str, datetime]:
+    """
+    Prochain créneau libre à partir de `now` de ces tuteurs (absents : aucun),
+    en une requête : lecture des lignes dont le créneau enregistré est passé.
+    """
+    return dict(db.execute(
+        select(Offer.tutor_id, func.min(Timeslot.start_utc))
+        .join(Timeslot, Timeslot.offer_id == Offer.id)
+        .where(Offer.tutor_id.in_(tutor_ids), Timeslot.is_booked.is_(False), Timeslot.start_utc >= now)
+        .group_by(Offer.tutor_id)
+    ).all())
+
+
+def refresh(db: Session, tutor_ids: set[str] | None, now: datetime | None = None) -> int:
+    """
+    Réécrit les lignes de ces tuteurs (tous si None) depuis les tables sources,
+    dans la transaction de l'appelant. Un tuteur sans profil (ou qui n'est plus
+    tuteur) n'a pas de ligne. Renvoie le nombre de lignes écrites.
+    """
+    return _refresh(db, tutor_ids, now or datetime.utcnow())
+
+
+def _refresh(db: Session, tutor_ids: set[str] | None, now: datetime, departments: set[str] | None = None) -> int:
+    # departments : complété des départements des lignes supprimées et écrites
+    tutors = (
+        select(User.id, User.first_name, User.last_name, User.email, User.postal_code, User.department,
+               TutorProfile.id.label("profile_id"), TutorProfile.bio, TutorProfile.photo_url,
+               TutorProfile.languages, TutorProfile.years_experience,
+               func.coalesce(TutorRating.rating_count, 0).label("rating_count"),
+               (cast(TutorRating.rating_sum, Float) / func.nullif(TutorRating.rating_count, 0)).label("rating_avg"),
+               _next_available(User.id, now).label("next_available_at"))
+        .join(TutorProfile, TutorProfile.user_id == User.id)
+        .outerjoin(TutorRating, TutorRating.tutor_id == User.id)
+        .where(User.role == UserRole.tutor)
+    )
+    offers = select(Offer.tutor_id, Offer.subject, Offer.price_hour)
+    clear_rows, clear_subjects = delete(TutorSearch), delete(TutorSearchSubject)
+    if tutor_ids is not None:
+        ids = list(tutor_ids)
+        tutors = tutors.where(User.id.in_(ids))
+        offers = offers.where(Offer.tutor_id.in_(ids))
+        clear_rows = clear_rows.where(TutorSearch.tutor_id.in_(ids))
+        clear_subjects = clear_subjects.where(TutorSearchSubject.tutor_id.in_(ids))
+
+    rows = {t.id: t for t in db.execute(tutors)}
+    by_tutor: dict[str, list] = {}
+    if rows:
+        for o in db.execute(offers):
+            if o.tutor_id in rows:
+                by_tutor.setdefault(o.tutor_id, []).append(o)
+
+    search_rows, subject_rows = [], []
+    for tutor_id, t in rows.items():
+        tutor_offers = by_tutor.get(tutor_id, [])
+        prices = [o.price_hour for o in tutor_offers]
+        subjects: dict[str, object] = {}
+        for o in tutor_offers:
+            key = normalize_text(o.subject).strip()
+            if key and (key not in subjects or o.price_hour < subjects[key]):
+                subjects[key] = o.price_hour
+        search_rows.append({
+            "tutor_id": tutor_id, "profile_id": t.profile_id,
+            "first_name": t.first_name or "", "last_name": t.last_name or "", "email": t.email,
+            "postal_code": t.postal_code, "department": t.department,
+            "bio": t.bio, "photo_url": t.photo_url, "languages": t.languages, "years_experience": t.years_experience,
+            "subjects": ", ".join(sorted({o.subject for o in tutor_offers})),
+            "offer_count": len(tutor_offers),
+            "min_price": min(prices) if prices else None, "max_price": max(prices) if prices else None,
+            "rating_count": t.rating_count, "rating_avg": t.rating_avg,
+            "next_available_at": t.next_available_at, "updated_at": now,
+        })
+        subject_rows.extend({"tutor_id": tutor_id, "subject": key, "department": t.department, "min_price": price}
+                            for key, price in subjects.items())
+
+    if departments is None:
+        db.execute(clear_rows)
+    else:
+        departments.update(db.execute(clear_rows.returning(TutorSearch.department)).scalars())
+        departments.update(row["department"] for row in search_rows)
+    db.execute(clear_subjects)
+    if search_rows:
+        db.execute(insert(TutorSearch), search_rows)
+    if subject_rows:
+        db.execute(insert(TutorSearchSubject), subject_rows)
+    return len(search_rows)
+
+
+def rebuild(db: Session, tutor_ids: list[str] | None = None, expired: bool = False) -> int:
+    """
+    Recalcul complet (données existantes), ou des seules lignes dont le
+    prochain créneau est passé (`expired`, à planifier). Renvoie le nombre de
+    lignes écrites.
+    """
+    now = datetime.utcnow()
+    if expired:
+        q = select(TutorSearch.tutor_id).where(TutorSearch.next_available_at < now)
+        if tutor_ids is not None:
+            q = q.where(TutorSearch.tutor_id.in_(tutor_ids))
+        tutor_ids = list(db.execute(q).scalars())
+    n = refresh(db, set(tutor_ids) if tutor_ids is not None else None, now)
+    db.commit()
+    return n
+
+
+# ---- Lecture ----
+# Filtres, facettes et tri : app.services.tutor_facets (index en mémoire de ces lignes).
+
+def language_codes(languages) -> list[str]:
+    """
+    Codes de langue d'un profil ("fr, en" ou ["fr", "en"]) : majuscules, sans
+    doublon, dans l'ordre saisi.
+    """
+    if not languages:
+        return []
+    if isinstance(languages, str):
+        languages = languages.split(",")
+    return list(dict.fromkeys(code.strip().upper() for code in languages if code.strip()))
+
+
+def _format(row: TutorSearch, now: datetime | None = None) -> dict:
+    # next_available_at n'est recalculé qu'aux écritures : un créneau passé
+    # depuis n'est plus disponible (la recherche y substitue le suivant)
+    now = now or datetime.utcnow()
+    next_available_at = row.next_available_at
+    if next_available_at is not None and next_available_at < now:
+        next_available_at = None
+    return {
+        "id": row.profile_id,
+        "user_id": row.tutor_id,
+        "first_name": row.first_name,
+        "last_name": row.last_name,
+        "email": row.email,
+        "department": row.department or "",
+        "postal_code": row.postal_code or "",
+        "bio": row.bio or "",
+        "photo_url": row.photo_url or "",
+        "languages": row.languages or "",
+        "subjects": row.subjects,
+        "hourly_rate": float(row.min_price) if row.min_price is not None else None,
+        "max_hourly_rate": float(row.max_price) if row.max_price is not None else None,
+        "years_experience": row.years_experience,
+        "rating_count": row.rating_count,
+        "rating_avg": round(row.rating_avg, 2) if row.rating_avg is not None else None,
+        "next_available_at": next_available_at,
+    }
@@ -1,30 +1,46 @@
 from datetime import datetime
 
+from sqlalchemy import delete, select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
+from app.models.idempotency_key import IdempotencyKey
 from app.models.user import User as ModelsUser
 from app.serializers.user import User as SerializersUser
 from app.exceptions.user import UserNotFound, UserAlreadyExists
-from app.services.geo_service import postal_code_to_department  # ← AJOUT
+from app.services.geo_service import postal_code_to_department, on_user_saved, on_user_deleted  # ← AJOUT
+from app.services import offer_search
+from app.services.auth import revoke_user_tokens
+from app.services.response_cache import invalidate
 
 def get_all_users(db: Session, skip: int = 0, limit: int = 10) -> list[ModelsUser]:
-    records = db.query(ModelsUser).offset(skip).limit(limit).all()
+    records = db.query(ModelsUser).order_by(ModelsUser.id).offset(skip).limit(limit).all()
     for record in records:
         record.id = str(record.id)
     return records
 
 
-def get_user_by_id(user_id: str, db: Session) -> ModelsUser:
-    record = db.query(ModelsUser).filter(ModelsUser.id == user_id).first()
+def get_user_by_id(user_id: str, db: Session, *options) -> ModelsUser:
+    record = db.query(ModelsUser).options(*options).filter(ModelsUser.id == user_id).first()
     if not record:
         raise UserNotFound
     record.id = str(record.id)
     return record
 
 
+def get_user_department(user_id: str, db: Session) -> str | None:
+    """
+    Département seul (projection sur la colonne, sans charger l'utilisateur)
+    """
+    row = db.execute(select(ModelsUser.department).where(ModelsUser.id == user_id)).one_or_none()
+    if row is None:
+        raise UserNotFound
+    return row.department
+
+
 def update_user(user_id: str, db: Session, user: SerializersUser) -> ModelsUser:
     db_user = get_user_by_id(user_id=user_id, db=db)
+    old_department, old_role = db_user.department, db_user.role
     payload = user.model_dump(exclude_unset=True)
     
     # ← AJOUT: Recalculer le département si postal_code change
@@ -37,13 +53,29 @@ def update_user(user_id: str, db: Session, user: SerializersUser) -> ModelsUser:
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    if 'postal_code' in payload or 'role' in payload:
+        on_user_saved(db_user)
+        invalidate(f"tutor:{user_id}", f"dept:{old_department}", f"dept:{db_user.department}", "geo")
+    else:
+        invalidate(f"tutor:{user_id}")
+    if db_user.role != old_role:
+        # le rôle est une claim du token, crue par require_role sans relire la base
+        revoke_user_tokens(user_id)
     return db_user
 
 
 def delete_user(user_id: str, db: Session) -> ModelsUser:
-    db_user = get_user_by_id(user_id=user_id, db=db)
+    # cascade="all,delete" sur les offres, profil détaché : les deux doivent être chargés
+    db_user = get_user_by_id(user_id, db, selectinload(ModelsUser.offers), selectinload(ModelsUser.tutor_profile))
+    offer_ids = [o.id for o in db_user.offers]
+    # ON DELETE CASCADE absent des bases créées avant la contrainte : suppression explicite
+    db.execute(delete(IdempotencyKey).where(IdempotencyKey.user_id == user_id))
     db.delete(db_user)
     db.commit()
+    offer_search.remove_offers(offer_ids)
+    on_user_deleted(user_id)
+    invalidate(f"tutor:{user_id}", f"dept:{db_user.department}", "geo", "offers")
+    revoke_user_tokens(user_id)
     return db_user
 
 
@@ -63,4 +95,5 @@ def create_user(db: Session, user: SerializersUser) -> ModelsUser:
         raise UserAlreadyExists
     db.refresh(db_user)
     db_user.id = str(db_user.id)
+    on_user_saved(db_user)
     return db_user
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""
+Requêtes/s d'un worker uvicorn sous charge mixte (80 % lectures, 20 % créations d'offres).
+
+    python benchmarks/async_reads.py --clients 64 --duration 10
+
+"sync"  : routes de lecture en `def` sur la session synchrone (ancien comportement,
+          threadpool de 40 threads partagé avec les écritures)
+"async" : l'app réelle, lectures servies par get_async_db
+Les deux moteurs pointent sur la même base SQLite temporaire (aiosqlite côté async).
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from decimal import Decimal
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.orm import Session
+
+from common import serve, sqlite_engine, use_async_engine, use_engine
+
+from app.database import get_db
+from app.main import app
+from app.models.offer import Offer
+from app.models.review import Review
+from app.models.user import User, UserRole
+from app.routers.utils import paginate
+from app.services import offer_search, rating as rating_service, user as user_service
+from app.services.auth import create_access_token
+from app.services.pagination import DEFAULT_PAGE_SIZE
+
+SUBJECTS = ["Mathématiques", "Physique", "Anglais", "Piano", "Python", "Histoire", "Chimie", "Guitare"]
+
+
+def seed(SessionBench, n_tutors: int, n_offers: int):
+    db = SessionBench()
+    try:
+        tutors = [User(first_name="T", last_name=str(i), email=f"t{i}@bench.fr", role=UserRole.tutor,
+                       postal_code="75011", department="75") for i in range(n_tutors)]
+        student = User(first_name="S", last_name="S", email="s@bench.fr", role=UserRole.student)
+        db.add_all([*tutors, student]); db.flush()
+        rnd = random.Random(1)
+        db.add_all(Offer(tutor_id=rnd.choice(tutors).id, subject=f"{rnd.choice(SUBJECTS)} {i}",
+                         description="Cours particuliers", price_hour=Decimal("25")) for i in range(n_offers))
+        db.add_all(Review(tutor_id=t.id, student_id=student.id, rating=rnd.randint(1, 5)) for t in tutors)
+        db.commit()
+        rating_service.rebuild_ratings(db)
+        return [t.id for t in tutors], tutors[0]
+    finally:
+        db.close()
+
+
+def legacy_app() -> FastAPI:
+    """
+    Mêmes lectures en `def` + session synchrone, puis les routes réelles (écritures).
+    """
+    legacy = FastAPI()
+
+    @legacy.get("/offers/")
+    def list_offers(q: str | None = None, limit: int = 20, db: Session = Depends(get_db)):
+        items, next_cursor = offer_search.search_offers(db, q=q, limit=limit)
+        return {"items": [{"id": o.id, "subject": o.subject} for o in items], "next_cursor": next_cursor}
+
+    @legacy.get("/offers/by-tutor/{tutor_id}")
+    def list_offers_by_tutor(tutor_id: str, db: Session = Depends(get_db)):
+        page = paginate(db.query(Offer).filter(Offer.tutor_id == tutor_id), (Offer.id,), DEFAULT_PAGE_SIZE, None)
+        return {"items": [o.id for o in page["items"]]}
+
+    @legacy.get("/users/{user_id}")
+    def get_user(user_id: str, db: Session = Depends(get_db)):
+        return {"email": user_service.get_user_by_id(user_id=user_id, db=db).email}
+
+    @legacy.get("/reviews/of-tutor/{tutor_id}/summary")
+    def summary(tutor_id: str, db: Session = Depends(get_db)):
+        return rating_service.get_summary(db, tutor_id)
+
+    for route in app.router.routes:
+        legacy.router.routes.append(route)
+    legacy.dependency_overrides = app.dependency_overrides
+    return legacy
+
+
+async def load(base_url: str, clients: int, duration: float, tutor_ids: list[str], token: str) -> dict:
+    done = {"ok": 0, "error": 0}
+    deadline = time.perf_counter() + duration
+
+    async def client_loop(seed: int):
+        rnd = random.Random(seed)
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as c:
+            while time.perf_counter() < deadline:
+                roll = rnd.random()
+                if roll < 0.3:
+                    r = await c.get("/offers/", params={"q": rnd.choice(SUBJECTS)[:4]})
+                elif roll < 0.5:
+                    r = await c.get(f"/offers/by-tutor/{rnd.choice(tutor_ids)}")
+                elif roll < 0.65:
+                    r = await c.get(f"/users/{rnd.choice(tutor_ids)}")
+                elif roll < 0.8:
+                    r = await c.get(f"/reviews/of-tutor/{rnd.choice(tutor_ids)}/summary")
+                else:
+                    r = await c.post("/offers/", headers={"Authorization": f"Bearer {token}"},
+                                     json={"subject": rnd.choice(SUBJECTS), "price_hour": 20})
+                done["ok" if r.status_code < 400 else "error"] += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client_loop(i) for i in range(clients)))
+    elapsed = time.perf_counter() - t0
+    return {**done, "requests_per_second": round((done["ok"] + done["error"]) / elapsed, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--tutors", type=int, default=200)
+    parser.add_argument("--offers", type=int, default=5000)
+    args = parser.parse_args()
+
+    engine = sqlite_engine()
+    SessionBench = use_engine(app, engine)
+    tutor_ids, tutor = seed(SessionBench, args.tutors, args.offers)
+    token = create_access_token(tutor)
+
+    use_async_engine(app, engine)
+
+    results = {}
+    for mode, target in (("sync", legacy_app()), ("async", app)):
+        offer_search.offer_index.clear()
+        with serve(target) as base_url:
+            results[mode] = asyncio.run(load(base_url, args.clients, args.duration, tutor_ids, token))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
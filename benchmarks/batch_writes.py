@@ -0,0 +1,86 @@
+"""
+Publication d'un planning : N créneaux en N appels POST /timeslots/ vs un POST /timeslots/batch.
+
+    python benchmarks/batch_writes.py --slots 500
+
+Chaque mode remplit sa propre offre sur une plage de dates distincte (les
+chevauchements sont contrôlés par tuteur) ; on mesure le temps total côté
+client, le nombre de créneaux créés et les requêtes SQL émises côté serveur.
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import httpx
+from sqlalchemy import event
+
+from common import serve, sqlite_engine, use_engine
+
+from app.main import app
+from app.models.offer import Offer
+from app.models.user import User, UserRole
+from app.services.auth import create_access_token
+
+
+def seed(SessionBench) -> tuple[str, list[str]]:
+    db = SessionBench()
+    try:
+        tutor = User(first_name="T", last_name="T", email="tutor@bench.fr", role=UserRole.tutor)
+        db.add(tutor)
+        db.flush()
+        offers = [Offer(tutor_id=tutor.id, subject=f"Sujet {i}", price_hour=Decimal("20")) for i in range(2)]
+        db.add_all(offers)
+        db.commit()
+        return create_access_token(tutor), [o.id for o in offers]
+    finally:
+        db.close()
+
+
+def slots(offer_id: str, n: int, first: int = 0) -> list[dict]:
+    start = datetime(2030, 1, 7, 8) + timedelta(hours=2 * first)
+    return [
+        {"offer_id": offer_id, "start_utc": (start + timedelta(hours=2 * i)).isoformat(),
+         "end_utc": (start + timedelta(hours=2 * i + 1)).isoformat()}
+        for i in range(n)
+    ]
+
+
+def run(base_url: str, token: str, requests: list[tuple[str, dict]], statements: list) -> dict:
+    statements.clear()
+    with httpx.Client(base_url=base_url, timeout=120, headers={"Authorization": f"Bearer {token}"}) as c:
+        created = 0
+        t0 = time.perf_counter()
+        for path, body in requests:
+            r = c.post(path, json=body)
+            r.raise_for_status()
+            body = r.json()
+            created += len(body["items"]) if "items" in body else 1
+        elapsed = time.perf_counter() - t0
+    return {"requests": len(requests), "created": created, "total_ms": round(elapsed * 1000, 1),
+            "sql_statements": len(statements)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--slots", type=int, default=500)
+    args = parser.parse_args()
+
+    engine = sqlite_engine()
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+    token, (single_offer, batch_offer) = seed(use_engine(app, engine))
+
+    results = {}
+    with serve(app) as base_url:
+        results["single"] = run(base_url, token, [("/timeslots/", s) for s in slots(single_offer, args.slots)],
+                                statements)
+        results["batch"] = run(base_url, token, [("/timeslots/batch", {"items": slots(batch_offer, args.slots, first=args.slots)})],
+                               statements)
+    results["speedup"] = round(results["single"]["total_ms"] / results["batch"]["total_ms"], 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
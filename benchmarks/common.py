@@ -0,0 +1,120 @@
+"""
+Outils partagés des benchmarks : base SQLite fichier, serveur uvicorn
+en arrière-plan sur l'app réelle, et calcul des percentiles.
+"""
+import contextlib
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database import BaseSQL, get_async_db, get_db
+from app.services.metrics import percentile
+
+
+def sqlite_engine(path: str | None = None):
+    """
+    Moteur SQLite fichier (partageable entre threads) avec toutes les tables créées.
+    """
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix="superprof-bench-", suffix=".db")
+        os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30})
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_conn, _):
+        cur = dbapi_conn.cursor()
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute("PRAGMA synchronous=NORMAL")
+        cur.close()
+
+    BaseSQL.metadata.create_all(bind=engine)
+    return engine
+
+
+def use_engine(app, engine):
+    """
+    Fait pointer la dépendance get_db de l'app sur `engine`.
+    """
+    from app.services.tutor_search import track
+
+    SessionBench = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    track(SessionBench)
+
+    def override_get_db():
+        db = SessionBench()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    return SessionBench
+
+
+def use_async_engine(app, engine):
+    """
+    Fait pointer get_async_db sur la même base que `engine` (aiosqlite / asyncpg).
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    url = engine.url
+    driver = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}[url.get_backend_name()]
+    async_engine = create_async_engine(url.set(drivername=driver))
+    AsyncSessionBench = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with AsyncSessionBench() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    return async_engine
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def serve(app):
+    """
+    Lance l'app dans un serveur uvicorn (thread d'arrière-plan, lifespan désactivé)
+    et renvoie son URL de base.
+    """
+    import uvicorn
+
+    port = _free_port()
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, lifespan="off", log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+
+def summarize(latencies: list[float]) -> dict:
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "p50_ms": round((percentile(values, 50) or 0) * 1000, 2),
+        "p95_ms": round((percentile(values, 95) or 0) * 1000, 2),
+        "p99_ms": round((percentile(values, 99) or 0) * 1000, 2),
+        "max_ms": round((values[-1] if values else 0) * 1000, 2),
+    }
@@ -0,0 +1,91 @@
+"""
+Comparaison de deux résultats de benchmarks/suite.py (JSON).
+
+    python benchmarks/compare.py baseline.json results.json --tolerance 0.2
+
+Seules les métriques dont le sens est connu sont comparées (suffixe du nom) :
+latences, temps par opération, requêtes SQL par requête, taux d'erreur et de
+délestage doivent baisser ; débits doivent monter. Code de sortie 1 si une
+métrique se dégrade de plus de `tolerance` (relatif). Autonome (pas d'import
+de common) : importable depuis les tests.
+"""
+import argparse
+import json
+import sys
+
+LOWER_IS_BETTER = ("_ms", "_us", "queries_per_request", "error_rate", "shed_rate")
+HIGHER_IS_BETTER = ("rps", "ops_per_s")
+
+
+def flatten(results: dict, prefix: str = "") -> dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def direction(name: str) -> int:
+    """
+    -1 : plus petit = mieux ; +1 : plus grand = mieux ; 0 : pas comparé.
+    """
+    leaf = name.rsplit(".", 1)[-1]
+    if leaf.endswith(LOWER_IS_BETTER):
+        return -1
+    if leaf.endswith(HIGHER_IS_BETTER):
+        return 1
+    return 0
+
+
+def compare(baseline: dict, current: dict, tolerance: float = 0.2) -> list[dict]:
+    """
+    Une ligne par métrique comparable présente des deux côtés :
+    {metric, baseline, current, change (relatif), regression}.
+    """
+    before, after = flatten(baseline), flatten(current)
+    rows = []
+    for name in sorted(before.keys() & after.keys()):
+        sense = direction(name)
+        if not sense:
+            continue
+        old, new = before[name], after[name]
+        if old == 0:
+            change = 0.0 if new == 0 else float("inf")
+        else:
+            change = (new - old) / abs(old)
+        worse = -change if sense > 0 else change
+        rows.append({"metric": name, "baseline": old, "current": new,
+                     "change": round(change, 4), "regression": worse > tolerance})
+    return rows
+
+
+def report(rows: list[dict]) -> str:
+    width = max((len(r["metric"]) for r in rows), default=10)
+    lines = [f"{'métrique':<{width}}  {'référence':>12}  {'actuel':>12}  {'écart':>8}"]
+    for r in rows:
+        flag = "  ← régression" if r["regression"] else ""
+        lines.append(f"{r['metric']:<{width}}  {r['baseline']:>12.2f}  {r['current']:>12.2f}  "
+                     f"{r['change']:>+8.1%}{flag}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="dégradation relative tolérée (0.2 = 20 %%)")
+    args = parser.parse_args(argv)
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.tolerance)
+    print(report(rows))
+    return 1 if any(r["regression"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Latence de GET /offers/ pendant une rafale de logins, avant / après le pool de hachage.
+
+    python benchmarks/login_storm.py --logins 64 --duration 10
+
+"before" : hachage dans le threadpool de la requête, sans limite (PASSWORD_POOL_WORKERS=0)
+"after"  : pool de processus borné, 503 + Retry-After au-delà de la file
+"""
+import argparse
+import json
+import threading
+import time
+from decimal import Decimal
+
+import httpx
+
+from common import serve, sqlite_engine, summarize, use_engine
+
+from app.main import app
+from app.models.offer import Offer
+from app.models.user import User, UserRole
+from app.services.passwords import hash_password
+from app.services.password_pool import password_pool
+
+
+def seed(SessionBench, n_offers: int):
+    db = SessionBench()
+    try:
+        tutor = User(first_name="T", last_name="T", email="tutor@bench.fr", role=UserRole.tutor,
+                     hashed_password=hash_password("pass"))
+        student = User(first_name="S", last_name="S", email="student@bench.fr", role=UserRole.student,
+                       hashed_password=hash_password("pass"))
+        db.add_all([tutor, student])
+        db.flush()
+        db.add_all(Offer(tutor_id=tutor.id, subject=f"Sujet {i}", price_hour=Decimal("20")) for i in range(n_offers))
+        db.commit()
+    finally:
+        db.close()
+
+
+def run_mode(base_url: str, n_logins: int, n_readers: int, duration: float) -> dict:
+    stop = threading.Event()
+    offer_latencies: list[float] = []
+    login_status: dict[int, int] = {}
+    lock = threading.Lock()
+
+    def login_worker():
+        with httpx.Client(base_url=base_url, timeout=60) as c:
+            while not stop.is_set():
+                r = c.post("/auth/token", json={"email": "student@bench.fr", "password": "pass"})
+                with lock:
+                    login_status[r.status_code] = login_status.get(r.status_code, 0) + 1
+                if r.status_code == 503:
+                    time.sleep(float(r.headers.get("Retry-After", "1")) / 10)
+
+    def reader():
+        with httpx.Client(base_url=base_url, timeout=60) as c:
+            while not stop.is_set():
+                t0 = time.perf_counter()
+                c.get("/offers/", params={"limit": 20})
+                with lock:
+                    offer_latencies.append(time.perf_counter() - t0)
+                time.sleep(0.01)
+
+    threads = [threading.Thread(target=login_worker) for _ in range(n_logins)]
+    threads += [threading.Thread(target=reader) for _ in range(n_readers)]
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    return {"offers": summarize(offer_latencies), "login_status": login_status}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=64, help="clients qui se connectent en boucle")
+    parser.add_argument("--readers", type=int, default=4, help="clients qui lisent /offers/")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--offers", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=password_pool.workers)
+    args = parser.parse_args()
+
+    engine = sqlite_engine()
+    seed(use_engine(app, engine), args.offers)
+
+    results = {}
+    with serve(app) as base_url:
+        password_pool.configure(workers=0, max_pending=10**9)
+        results["before"] = run_mode(base_url, args.logins, args.readers, args.duration)
+        password_pool.configure(workers=args.workers, max_pending=max(args.workers, 1) * 2)
+        results["after"] = run_mode(base_url, args.logins, args.readers, args.duration)
+        results["after"]["pool"] = password_pool.stats()
+        password_pool.shutdown()
+    print(json.dumps(results, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
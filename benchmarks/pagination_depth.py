@@ -0,0 +1,95 @@
+"""
+Coût d'une page de GET /bookings/ selon la profondeur : OFFSET vs curseur keyset.
+
+    python benchmarks/pagination_depth.py --rows 1000000 --depths 0 10000 100000 500000 900000
+
+"offset" : ancienne requête (ORDER BY created_at DESC, id DESC OFFSET n LIMIT 50)
+"keyset" : keyset_page avec le curseur du dernier élément de la page précédente
+Les deux s'appuient sur l'index (created_at, id) ; seul le keyset évite de parcourir les n premières lignes.
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from common import sqlite_engine, summarize
+
+import app.main  # noqa: F401  (enregistre tous les modèles)
+from app.models.booking import Booking, BookingStatus
+from app.models.offer import Offer
+from app.models.user import User, UserRole
+from app.services.pagination import DEFAULT_PAGE_SIZE, encode_cursor, keyset_page
+
+ORDER = (Booking.created_at, Booking.id)
+
+
+def seed(engine, n_rows: int, chunk: int = 50_000):
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    tutor = User(first_name="T", last_name="T", email="tutor@bench.fr", role=UserRole.tutor)
+    student = User(first_name="S", last_name="S", email="student@bench.fr", role=UserRole.student)
+    db.add_all([tutor, student]); db.flush()
+    offer = Offer(tutor_id=tutor.id, subject="Maths", price_hour=20)
+    db.add(offer); db.commit()
+    offer_id, student_id = offer.id, student.id
+    db.close()
+
+    t0 = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        for start in range(0, n_rows, chunk):
+            conn.execute(insert(Booking), [
+                {"id": str(uuid.uuid4()), "offer_id": offer_id, "student_id": student_id,
+                 "status": BookingStatus.PENDING, "created_at": t0 + timedelta(seconds=i)}
+                for i in range(start, min(start + chunk, n_rows))
+            ])
+    return Session
+
+
+def _time(fn, repeat: int) -> list[float]:
+    out = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        out.append(time.perf_counter() - t)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--depths", type=int, nargs="+", default=[0, 10_000, 100_000, 500_000, 900_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = sqlite_engine()
+    t = time.perf_counter()
+    Session = seed(engine, args.rows)
+    print(f"seed: {args.rows} bookings en {time.perf_counter() - t:.1f}s")
+
+    results = {}
+    db = Session()
+    for depth in [d for d in args.depths if d < args.rows]:
+        ordered = db.query(Booking).order_by(*[k.desc() for k in ORDER])
+        cursor = None
+        if depth:
+            prev = ordered.offset(depth - 1).limit(1).one()
+            cursor = encode_cursor([prev.created_at, prev.id])
+
+        offset_page = lambda: ordered.offset(depth).limit(DEFAULT_PAGE_SIZE).all()
+        keyset = lambda: keyset_page(db.query(Booking), ORDER, DEFAULT_PAGE_SIZE, cursor, descending=True)[0]
+        assert [b.id for b in offset_page()] == [b.id for b in keyset()]
+        results[depth] = {
+            "offset": summarize(_time(offset_page, args.repeat)),
+            "keyset": summarize(_time(keyset, args.repeat)),
+        }
+        db.expunge_all()
+    db.close()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Latence du classement de /offers/recommendations (sans la base) selon le nombre d'offres candidates.
+
+    python benchmarks/recommendations.py --sizes 1000 10000 50000
+
+"build" : construction du FeatureSnapshot (une fois par rafraîchissement)
+"rank"  : score NumPy de toutes les offres + top-k pour un élève avec historique
+"""
+import argparse
+import json
+import random
+import time
+
+from common import summarize
+
+from app.services.geo_service import _centroids
+from app.services.recommendations import FeatureSnapshot, StudentContext, rank
+
+SUBJECTS = ["Mathématiques", "Anglais", "Physique-Chimie", "Français", "Piano", "Guitare", "Espagnol", "Python"]
+
+
+def rows(n: int, rnd: random.Random) -> tuple[list[tuple], dict[str, int]]:
+    codes = [c for c in _centroids() if len(c) == 5]
+    n_tutors = max(1, n // 3)
+    tutors = [(f"t{i}", rnd.choice(codes), rnd.randint(0, 40)) for i in range(n_tutors)]
+    out = []
+    for i in range(n):
+        tutor_id, postal_code, reviews = tutors[i % n_tutors]
+        out.append((f"o{i}", tutor_id, rnd.choice(SUBJECTS), round(rnd.uniform(12, 70), 1), postal_code,
+                    postal_code[:2], reviews, reviews * rnd.randint(3, 5)))
+    return out, {t[0]: rnd.randint(0, 10) for t in tutors}
+
+
+def student(rnd: random.Random, snapshot: FeatureSnapshot) -> StudentContext:
+    booked = rnd.sample(list(snapshot.offer_ids), k=min(3, len(snapshot)))
+    return StudentContext(
+        user_id="s", location=rnd.choice(list(_centroids().values())),
+        subject_counts={"mathematiques": 2, "piano": 1}, prices=[25.0, 30.0], booked_offer_ids=set(booked),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    rnd = random.Random(7)
+    results = {}
+    for n in args.sizes:
+        offers, free = rows(n, rnd)
+        t0 = time.perf_counter()
+        snapshot = FeatureSnapshot.from_rows(offers, free)
+        build = time.perf_counter() - t0
+        contexts = [student(rnd, snapshot) for _ in range(args.requests)]
+        latencies = []
+        for ctx in contexts:
+            t0 = time.perf_counter()
+            rank(snapshot, ctx, args.limit)
+            latencies.append(time.perf_counter() - t0)
+        results[n] = {"build_ms": round(build * 1000, 1), "rank": summarize(latencies)}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Coût de sérialisation d'une liste d'offres : validation Pydantic vs chemin rapide.
+
+    python benchmarks/serialization.py --sizes 10 1000 50000
+
+"validated" : objets ORM -> Page[OfferOut] (from_attributes) -> dump JSON -> json.dumps,
+              comme FastAPI avec un response_model
+"fast"      : Row sur les colonnes du schéma -> dicts -> orjson (app.serializers.fast)
+Chaque mode est mesuré avec la lecture en base ("fetch+encode") et sans ("encode").
+"""
+import argparse
+import json
+import time
+import uuid
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from common import sqlite_engine, summarize
+
+import app.main  # noqa: F401  (enregistre tous les modèles)
+from app.models.offer import Offer
+from app.models.user import User, UserRole
+from app.serializers.offer import OfferOut, OFFER_ROWS
+from app.serializers.pagination import Page
+
+PAGE = TypeAdapter(Page[OfferOut])
+
+
+def seed(engine, n_rows: int):
+    with engine.begin() as conn:
+        tutor_id = str(uuid.uuid4())
+        conn.execute(insert(User), [{"id": tutor_id, "email": "tutor@bench.fr", "role": UserRole.tutor}])
+        conn.execute(insert(Offer), [
+            {"id": str(uuid.uuid4()), "tutor_id": tutor_id, "subject": f"Sujet {i}",
+             "description": "Cours particuliers, tous niveaux" if i % 3 else None, "price_hour": 15 + i % 40 + 0.5}
+            for i in range(n_rows)
+        ])
+    return sessionmaker(bind=engine)
+
+
+def validated(objects) -> bytes:
+    page = PAGE.validate_python({"items": objects, "next_cursor": None}, from_attributes=True)
+    return json.dumps(PAGE.dump_python(page, mode="json"), separators=(",", ":")).encode()
+
+
+def fast(rows) -> bytes:
+    return OFFER_ROWS.page(rows, None).body
+
+
+def _time(fn, repeat: int) -> list[float]:
+    out = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        out.append(time.perf_counter() - t)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1_000, 50_000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    engine = sqlite_engine()
+    Session = seed(engine, max(args.sizes))
+
+    results = {}
+    for n in args.sizes:
+        db = Session()
+        fetch_objects = lambda: db.query(Offer).order_by(Offer.id).limit(n).all()
+        fetch_rows = lambda: db.query(*OFFER_ROWS.columns).order_by(Offer.id).limit(n).all()
+        objects, rows = fetch_objects(), fetch_rows()
+        assert json.loads(validated(objects)) == json.loads(fast(rows))
+
+        def fetch_validated():
+            db.expunge_all()
+            return validated(fetch_objects())
+
+        results[n] = {
+            "validated_encode": summarize(_time(lambda: validated(objects), args.repeat)),
+            "fast_encode": summarize(_time(lambda: fast(rows), args.repeat)),
+            "validated_fetch_encode": summarize(_time(fetch_validated, args.repeat)),
+            "fast_fetch_encode": summarize(_time(lambda: fast(fetch_rows()), args.repeat)),
+        }
+        r = results[n]
+        r["speedup_encode"] = round(r["validated_encode"]["p50_ms"] / max(r["fast_encode"]["p50_ms"], 0.01), 1)
+        r["speedup_fetch_encode"] = round(
+            r["validated_fetch_encode"]["p50_ms"] / max(r["fast_fetch_encode"]["p50_ms"], 0.01), 1
+        )
+        db.close()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
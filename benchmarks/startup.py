@@ -0,0 +1,85 @@
+"""
+Coût de démarrage d'un worker : temps de `import app.main` et mémoire résidente,
+mesurés dans un processus neuf. Code de sortie 1 si un budget est dépassé.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 5 --max-import-ms 1500 --max-rss-mb 120
+
+Vérifie aussi qu'aucun module lourd optionnel (pandas, numpy, redis) n'est
+chargé au démarrage : ils doivent être importés à la première utilisation.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1500"))
+RSS_BUDGET_MB = float(os.getenv("STARTUP_RSS_BUDGET_MB", "120"))
+HEAVY_MODULES = ("pandas", "numpy", "redis")
+
+# RSS courant (/proc, Linux) : ru_maxrss survit à fork + exec et compterait le pic du parent
+PROBE = f"""
+import json, resource, sys, time
+t0 = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - t0
+try:
+    with open("/proc/self/status") as f:
+        rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+except OSError:
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    "import_ms": elapsed * 1000,
+    "rss_mb": rss_kb / 1024,
+    "heavy_modules": [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def measure_once() -> dict:
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure(runs: int = 3) -> dict:
+    samples = [measure_once() for _ in range(runs)]
+    return {
+        "runs": runs,
+        "import_ms": round(statistics.median(s["import_ms"] for s in samples), 1),
+        "rss_mb": round(statistics.median(s["rss_mb"] for s in samples), 1),
+        "heavy_modules": sorted({m for s in samples for m in s["heavy_modules"]}),
+    }
+
+
+def over_budget(result: dict, max_import_ms: float = IMPORT_BUDGET_MS, max_rss_mb: float = RSS_BUDGET_MB) -> list[str]:
+    problems = []
+    if result["import_ms"] > max_import_ms:
+        problems.append(f"import app.main : {result['import_ms']} ms > {max_import_ms} ms")
+    if result["rss_mb"] > max_rss_mb:
+        problems.append(f"RSS : {result['rss_mb']} Mo > {max_rss_mb} Mo")
+    if result["heavy_modules"]:
+        problems.append(f"modules lourds chargés au démarrage : {', '.join(result['heavy_modules'])}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--max-import-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--max-rss-mb", type=float, default=RSS_BUDGET_MB)
+    args = parser.parse_args()
+
+    result = measure(args.runs)
+    problems = over_budget(result, args.max_import_ms, args.max_rss_mb)
+    print(json.dumps({**result, "budget": {"import_ms": args.max_import_ms, "rss_mb": args.max_rss_mb},
+                      "problems": problems}, indent=2, ensure_ascii=False))
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
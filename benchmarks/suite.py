@@ -0,0 +1,329 @@
+"""
+Suite de performance : microbenchmarks + scénarios de charge sur l'app réelle,
+résultats en JSON pour comparaison avec une référence (benchmarks/compare.py).
+
+    python benchmarks/suite.py --output results.json                 # SQLite fichier temporaire
+    python benchmarks/suite.py --url postgresql://u:p@localhost/bench --output results.json
+    python benchmarks/suite.py --output results.json --baseline baseline.json   # exit 1 si régression
+
+Microbenchmarks (temps par opération) : sérialisation d'une page d'offres
+(Pydantic vs chemin rapide orjson), _extract_department, décodage JWT
+(avec et sans cache) et PBKDF2 (hachage, vérification).
+
+Scénarios (clients HTTP concurrents sur un serveur uvicorn en arrière-plan) :
+- search_heavy      : recherche d'offres, de tuteurs par zone, créneaux ouverts, avis, recommandations ;
+- booking_rush      : des élèves se disputent une centaine de créneaux (409 attendus) ;
+- tutor_onboarding  : inscription (PBKDF2), profil, offre, créneaux en lot.
+Pour chacun : requêtes/s, p50/p95/p99, taux d'erreur et requêtes SQL par
+requête HTTP (compteurs de app.services.metrics.route_metrics).
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from datetime import timedelta
+
+import httpx
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, func, select
+
+from common import serve, sqlite_engine, summarize, use_async_engine, use_engine
+
+from app.database import BaseSQL
+from app.main import app
+from app.models.offer import Offer
+from app.models.timeslot import Timeslot
+from app.models.user import User, UserRole
+from app.serializers.offer import OFFER_ROWS, OfferOut
+from app.serializers.pagination import Page
+from app.services.auth import create_access_token, decode_jwt
+from app.services.geo_service import _extract_department
+from app.services.metrics import route_metrics
+from app.services.offer_search import offer_index
+from app.services.password_pool import password_pool
+from app.services.passwords import check_password, hash_password
+from app.services.token_cache import token_cache
+from scripts.datagen import SUBJECTS, GeneratorConfig, generate
+
+DATA_NOW = GeneratorConfig.now      # date de référence du jeu généré (créneaux autour de cette date)
+
+
+# ---- Microbenchmarks ----
+
+def _per_op(fn, number: int, repeat: int) -> dict:
+    """
+    Médiane sur `repeat` séries de `number` appels.
+    """
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - t0) / number)
+    timings.sort()
+    per_op = timings[len(timings) // 2]
+    return {"per_op_us": round(per_op * 1e6, 2), "ops_per_s": round(1 / per_op, 1) if per_op else None}
+
+
+def micro(Session, repeat: int) -> dict:
+    db = Session()
+    try:
+        objects = db.query(Offer).order_by(Offer.id).limit(100).all()
+        rows = db.query(*OFFER_ROWS.columns).order_by(Offer.id).limit(100).all()
+        postal_codes = [pc for (pc,) in db.query(User.postal_code).filter(User.postal_code.isnot(None)).limit(1000)]
+        tutor = db.query(User).filter(User.role == UserRole.tutor).first()
+    finally:
+        db.close()
+    page = TypeAdapter(Page[OfferOut])
+    token = create_access_token(tutor)
+
+    def decode_uncached():
+        token_cache.clear()
+        decode_jwt(token)
+
+    stored = hash_password("bench-password")
+    return {
+        "serialize_offers_100_validated": _per_op(
+            lambda: page.dump_json(page.validate_python({"items": objects, "next_cursor": None},
+                                                        from_attributes=True)), 20, repeat),
+        "serialize_offers_100_fast": _per_op(lambda: OFFER_ROWS.page(rows, None), 20, repeat),
+        "extract_department_1000": _per_op(lambda: [_extract_department(pc) for pc in postal_codes], 20, repeat),
+        "jwt_decode_cached": _per_op(lambda: decode_jwt(token), 1000, repeat),
+        "jwt_decode_uncached": _per_op(decode_uncached, 200, repeat),
+        "pbkdf2_hash": _per_op(lambda: hash_password("bench-password"), 1, min(repeat, 3)),
+        "pbkdf2_check": _per_op(lambda: check_password("bench-password", stored), 1, min(repeat, 3)),
+    }
+
+
+# ---- Scénarios ----
+
+@dataclass
+class Dataset:
+    tutor_ids: list[str]
+    offer_ids: list[str]
+    postal_codes: list[str]
+    student_tokens: list[str]
+    hot_slots: list[tuple[str, str]]        # (offer_id, timeslot_id) libres, disputés pendant booking_rush
+
+
+def load_dataset(Session, hot_slots: int) -> Dataset:
+    db = Session()
+    try:
+        tutors = db.scalars(select(User.id).where(User.role == UserRole.tutor).order_by(User.id).limit(500)).all()
+        students = db.scalars(select(User).where(User.role == UserRole.student).order_by(User.id).limit(200)).all()
+        return Dataset(
+            tutor_ids=list(tutors),
+            offer_ids=list(db.scalars(select(Offer.id).order_by(Offer.id).limit(2000))),
+            postal_codes=[pc for pc in db.scalars(
+                select(User.postal_code).where(func.length(User.postal_code) == 5).distinct().limit(200))],
+            student_tokens=[create_access_token(s) for s in students],
+            hot_slots=[tuple(r) for r in db.execute(
+                select(Timeslot.offer_id, Timeslot.id).where(Timeslot.is_booked.is_(False))
+                .order_by(Timeslot.id).limit(hot_slots))],
+        )
+    finally:
+        db.close()
+
+
+class Recorder:
+    """
+    Client HTTP qui chronomètre chaque requête et compte les statuts.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, latencies: list[float], statuses: Counter):
+        self.client = client
+        self.latencies = latencies
+        self.statuses = statuses
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        t0 = time.perf_counter()
+        r = await self.client.request(method, url, **kwargs)
+        self.latencies.append(time.perf_counter() - t0)
+        self.statuses[r.status_code] += 1
+        return r
+
+
+def _auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def search_heavy(c: Recorder, rnd: random.Random, data: Dataset, client_id: int):
+    roll = rnd.random()
+    if roll < 0.30:
+        subject = rnd.choice(list(SUBJECTS))
+        await c.request("GET", "/offers/", params={"q": subject[:rnd.randint(3, len(subject))]})
+    elif roll < 0.45:
+        params = {"postal_code": rnd.choice(data.postal_codes)}
+        if rnd.random() < 0.5:
+            params["radius_km"] = rnd.choice([5, 10, 25])
+        await c.request("GET", "/search/tutors", params=params)
+    elif roll < 0.60:
+        await c.request("GET", f"/offers/by-tutor/{rnd.choice(data.tutor_ids)}")
+    elif roll < 0.70:
+        await c.request("GET", f"/reviews/of-tutor/{rnd.choice(data.tutor_ids)}/summary")
+    elif roll < 0.80:
+        await c.request("GET", "/timeslots/search", params={
+            "subject": rnd.choice(list(SUBJECTS)), "from": DATA_NOW.isoformat(),
+            "to": (DATA_NOW + timedelta(days=30)).isoformat()})
+    elif roll < 0.90:
+        await c.request("GET", f"/tutors/{rnd.choice(data.tutor_ids)}/profile")
+    else:
+        await c.request("GET", "/offers/recommendations", headers=_auth(rnd.choice(data.student_tokens)))
+
+
+async def booking_rush(c: Recorder, rnd: random.Random, data: Dataset, client_id: int):
+    token = data.student_tokens[client_id % len(data.student_tokens)]
+    offer_id, slot_id = rnd.choice(data.hot_slots)
+    roll = rnd.random()
+    if roll < 0.25:
+        await c.request("GET", "/timeslots/free", params={"offer_id": offer_id, "from": DATA_NOW.isoformat()})
+    elif roll < 0.85:
+        await c.request("POST", "/bookings/", headers=_auth(token), json={"offer_id": offer_id, "timeslot_id": slot_id})
+    else:
+        await c.request("GET", "/bookings/list/mine", headers=_auth(token))
+
+
+async def tutor_onboarding(c: Recorder, rnd: random.Random, data: Dataset, client_id: int):
+    email = f"onboarding-{uuid.uuid4().hex[:12]}@bench.fr"
+    while True:
+        r = await c.request("POST", "/auth/register", json={
+            "email": email, "password": "bench-password", "first_name": "Nouveau", "last_name": "Tuteur",
+            "role": "tutor"})
+        if r.status_code != 503:
+            break
+        # pool de hachage saturé : le client respecte Retry-After comme le front
+        await asyncio.sleep(float(r.headers.get("Retry-After", 1)))
+    if r.status_code != 200:
+        return
+    headers = _auth(r.json()["access_token"])
+    await c.request("PUT", "/tutors/me/profile", headers=headers, json={
+        "bio": "Professeur certifié", "city": "Paris", "languages": rnd.choice(["fr", "fr, en", "FR,ES"]),
+        "years_experience": rnd.randint(1, 20)})
+    r = await c.request("POST", "/offers/", headers=headers, json={
+        "subject": rnd.choice(list(SUBJECTS)), "description": "Cours particuliers", "price_hour": rnd.randint(15, 45)})
+    if r.status_code != 201:
+        return
+    first = DATA_NOW + timedelta(days=rnd.randint(1, 30), hours=9)
+    await c.request("POST", "/timeslots/batch", headers=headers, json={"items": [
+        {"offer_id": r.json()["id"], "start_utc": (first + timedelta(days=d)).isoformat(),
+         "end_utc": (first + timedelta(days=d, hours=1)).isoformat()} for d in range(5)]})
+    await c.request("GET", "/offers/mine", headers=headers)
+
+
+SCENARIOS = {
+    "search_heavy": (search_heavy, set()),
+    "booking_rush": (booking_rush, {409}),      # créneau déjà pris : issue normale d'une course
+    "tutor_onboarding": (tutor_onboarding, {503}),  # délestage du pool de hachage, compté dans shed_rate
+}
+
+
+async def run_scenario(base_url: str, step, tolerated: set[int], data: Dataset, clients: int,
+                       duration: float, seed: int) -> dict:
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    deadline = time.perf_counter() + duration
+    route_metrics.clear()
+
+    async def client_loop(client_id: int):
+        rnd = random.Random(seed * 1000 + client_id)
+        async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+            recorder = Recorder(client, latencies, statuses)
+            while time.perf_counter() < deadline:
+                await step(recorder, rnd, data, client_id)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client_loop(i) for i in range(clients)))
+    elapsed = time.perf_counter() - t0
+
+    totals = route_metrics.totals()
+    served = max(totals["requests"], 1)
+    errors = sum(n for status, n in statuses.items() if status >= 400 and status not in tolerated)
+    return {
+        **summarize(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "error_rate": round(errors / max(len(latencies), 1), 4),
+        "shed_rate": round(statuses[503] / max(len(latencies), 1), 4),
+        "queries_per_request": round(totals["sql_statements"] / served, 2),
+        "db_ms_per_request": round(totals["sql_seconds"] * 1000 / served, 2),
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+    }
+
+
+# ---- Point d'entrée ----
+
+def prepare_engine(url: str | None, config: GeneratorConfig):
+    """
+    Base SQLite temporaire, ou base fournie (Postgres local) : le jeu n'est
+    généré que si elle ne contient encore aucun utilisateur.
+    """
+    engine = sqlite_engine() if url is None else create_engine(url, pool_size=20, max_overflow=20)
+    BaseSQL.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        empty = not conn.execute(select(func.count()).select_from(User)).scalar()
+    if empty:
+        generate(engine, config)
+    return engine
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="URL SQLAlchemy synchrone (défaut : SQLite fichier temporaire)")
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--tutors", type=int, default=500)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="secondes par scénario")
+    parser.add_argument("--repeat", type=int, default=5, help="séries par microbenchmark")
+    parser.add_argument("--hot-slots", type=int, default=100)
+    parser.add_argument("--only", nargs="+", choices=["micro", *SCENARIOS], help="sous-ensemble à exécuter")
+    parser.add_argument("--output", help="fichier JSON des résultats (défaut : stdout)")
+    parser.add_argument("--baseline", help="résultats de référence : écarts affichés, exit 1 si régression")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+    selected = args.only or ["micro", *SCENARIOS]
+
+    engine = prepare_engine(args.url, GeneratorConfig(users=args.users, tutors=args.tutors))
+    Session = use_engine(app, engine)
+    use_async_engine(app, engine)
+    offer_index.clear()
+
+    results: dict = {"config": {"database": engine.url.get_backend_name(), "users": args.users,
+                                "tutors": args.tutors, "clients": args.clients, "duration_s": args.duration}}
+    try:
+        if "micro" in selected:
+            results["micro"] = micro(Session, args.repeat)
+        scenarios = [name for name in SCENARIOS if name in selected]
+        if scenarios:
+            data = load_dataset(Session, args.hot_slots)
+            results["scenarios"] = {}
+            with serve(app) as base_url:
+                for i, name in enumerate(scenarios):
+                    step, tolerated = SCENARIOS[name]
+                    results["scenarios"][name] = asyncio.run(
+                        run_scenario(base_url, step, tolerated, data, args.clients, args.duration, seed=i))
+    finally:
+        password_pool.shutdown()
+        engine.dispose()
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        from compare import compare, report
+        with open(args.baseline) as f:
+            rows = compare(json.load(f), results, args.tolerance)
+        print(report(rows))
+        return 1 if any(r["regression"] for r in rows) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+# scripts/datagen.py
+# Générateur de données synthétiques à grande échelle (tests de charge, audits).
+# Chargement en masse par lots : COPY sous Postgres, executemany ailleurs.
+# Même graine -> mêmes données (ids compris).
+import csv
+import io
+import random
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import sessionmaker
+
+from app.models.booking import Booking, BookingStatus
+from app.models.offer import Offer
+from app.models.review import Review
+from app.models.timeslot import Timeslot
+from app.models.tutor_profile import TutorProfile
+from app.models.user import User, UserRole
+from app.services import offer_search, tutor_search
+from app.services.geo_service import _centroids, postal_code_to_department
+from app.services.passwords import hash_password
+from app.services.rating import rebuild_ratings
+
+# Ordre de chargement (clés étrangères) : un lot enfant n'est écrit qu'après ses parents
+TABLES = (User, TutorProfile, Offer, Booking, Timeslot, Review)
+
+# Sujet -> (popularité relative, prix horaire médian)
+SUBJECTS = {
+    "Mathématiques": (30, 28), "Anglais": (18, 25), "Physique-Chimie": (12, 28), "Français": (10, 24),
+    "Piano": (7, 32), "Guitare": (6, 27), "Espagnol": (6, 23), "Python": (5, 38), "SVT": (4, 25),
+    "Histoire-Géographie": (4, 22), "Allemand": (3, 25), "Philosophie": (3, 30), "Économie": (2, 30),
+    "Solfège": (2, 24), "Informatique": (3, 35), "Chant": (2, 33), "Dessin": (2, 26), "Italien": (1, 24),
+}
+LEVELS = ["primaire", "collège", "lycée", "prépa", "licence", "adultes débutants", "remise à niveau"]
+FIRST_NAMES = ["Camille", "Léa", "Louis", "Hugo", "Chloé", "Lucas", "Manon", "Inès", "Nathan", "Jade",
+               "Gabriel", "Emma", "Jules", "Sarah", "Adam", "Alice", "Yanis", "Lina", "Noah", "Zoé"]
+LAST_NAMES = ["Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand", "Leroy",
+              "Moreau", "Simon", "Laurent", "Lefebvre", "Michel", "Garcia", "David", "Bertrand", "Roux"]
+# Départements les plus peuplés d'abord : le poids suit un Zipf sur ce rang
+BIG_DEPARTMENTS = ["75", "59", "13", "69", "92", "93", "33", "94", "78", "62", "44", "31", "76", "77",
+                   "91", "38", "67", "95", "34", "06", "35", "57", "83", "60", "974"]
+BOOKING_STATUSES = ([BookingStatus.ACCEPTED] * 7) + ([BookingStatus.PENDING] * 2) + [BookingStatus.REJECTED]
+RATING_WEIGHTS = [2, 3, 8, 30, 57]   # notes 1..5 : très majoritairement positives
+
+
+@dataclass
+class GeneratorConfig:
+    users: int = 10_000
+    tutors: int = 1_000
+    seed: int = 42
+    batch_size: int = 10_000
+    max_offers_per_tutor: int = 12
+    offers_zipf: float = 1.6           # exposant de la loi de Zipf du nombre d'offres par tuteur
+    bookings_per_student: float = 1.0  # moyenne
+    slots_per_offer: int = 4
+    review_rate: float = 0.4           # part des réservations acceptées suivies d'un avis
+    password: str = "pass"
+    now: datetime = datetime(2025, 1, 1)
+
+
+def _zipf_cum_weights(n: int, s: float) -> list[float]:
+    return list(accumulate(1.0 / (k ** s) for k in range(1, n + 1)))
+
+
+class BulkWriter:
+    """
+    Accumule les lignes par table et les écrit par lots, toujours dans l'ordre
+    de TABLES pour respecter les clés étrangères.
+    """
+
+    def __init__(self, engine, batch_size: int, out=sys.stderr):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.out = out
+        self.copy = engine.dialect.name == "postgresql"
+        self.buffers = {model: [] for model in TABLES}
+        self.counts = {model.__tablename__: 0 for model in TABLES}
+        self.started = time.perf_counter()
+
+    def add(self, model, row: dict):
+        buffer = self.buffers[model]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        with self.engine.begin() as conn:
+            for model in TABLES:
+                rows = self.buffers[model]
+                if not rows:
+                    continue
+                if self.copy:
+                    self._copy(conn, model, rows)
+                else:
+                    conn.execute(insert(model), rows)
+                self.counts[model.__tablename__] += len(rows)
+                self.buffers[model] = []
+        self.report()
+
+    def _copy(self, conn, model, rows: list[dict]):
+        columns = list(rows[0])
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for row in rows:
+            writer.writerow([_copy_value(row[c]) for c in columns])
+        buf.seek(0)
+        cursor = conn.connection.cursor()
+        cursor.copy_expert(f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buf)
+
+    def report(self, final: bool = False):
+        elapsed = time.perf_counter() - self.started
+        total = sum(self.counts.values())
+        detail = " ".join(f"{name}={n}" for name, n in self.counts.items())
+        end = "\n" if final else "\r"
+        print(f"{total} lignes en {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f}/s) {detail}",
+              end=end, file=self.out, flush=True)
+
+
+def _copy_value(value):
+    # Format CSV de COPY : champ vide = NULL
+    if value is None:
+        return ""
+    if isinstance(value, (UserRole, BookingStatus)):
+        return value.name
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return value
+
+
+class DataGenerator:
+    def __init__(self, config: GeneratorConfig):
+        self.cfg = config
+        self.rnd = random.Random(config.seed)
+        self.password_hash = hash_password(config.password)   # un seul PBKDF2 pour tous les comptes
+        self._postal_codes, self._postal_cum = self._postal_code_weights()
+        self._subjects = list(SUBJECTS)
+        self._subject_cum = list(accumulate(w for w, _ in SUBJECTS.values()))
+
+    # ---- tirages ----
+
+    def uid(self) -> str:
+        return str(uuid.UUID(int=self.rnd.getrandbits(128), version=4))
+
+    def _postal_code_weights(self):
+        departments = sorted({code for code in _centroids() if len(code) <= 3})
+        rank = {d: i + 1 for i, d in enumerate(BIG_DEPARTMENTS)}
+        weights = [1.0 / rank.get(d, len(BIG_DEPARTMENTS) + 10) ** 0.9 for d in departments]
+        return departments, list(accumulate(weights))
+
+    def postal_code(self) -> str:
+        department = self.rnd.choices(self._postal_codes, cum_weights=self._postal_cum)[0]
+        if department == "75":
+            return f"750{self.rnd.randint(1, 20):02d}"
+        if department == "2A":
+            return f"20{self.rnd.randint(0, 190):03d}"
+        if department == "2B":
+            return f"20{self.rnd.randint(200, 620):03d}"
+        if len(department) == 3:
+            return f"{department}{self.rnd.randint(0, 9)}0"
+        return f"{department}{self.rnd.randint(0, 9)}{self.rnd.choice(['00', '10', '20', '50', '70'])}"
+
+    def subject(self) -> str:
+        return self.rnd.choices(self._subjects, cum_weights=self._subject_cum)[0]
+
+    # ---- génération ----
+
+    def run(self, writer: BulkWriter):
+        cfg, rnd = self.cfg, self.rnd
+        n_tutors = min(cfg.tutors, cfg.users)
+        student_ids: list[str] = []
+        tutor_ids: list[str] = []
+
+        for i in range(cfg.users):
+            is_tutor = i < n_tutors
+            postal_code = self.postal_code()
+            user_id = self.uid()
+            writer.add(User, {
+                "id": user_id, "first_name": rnd.choice(FIRST_NAMES), "last_name": rnd.choice(LAST_NAMES),
+                "email": f"user{i}@gen.superprof.fr", "role": UserRole.tutor if is_tutor else UserRole.student,
+                "city": None, "photo_url": None, "hashed_password": self.password_hash,
+                "postal_code": postal_code, "department": postal_code_to_department(postal_code),
+            })
+            (tutor_ids if is_tutor else student_ids).append(user_id)
+
+        # Offres : nombre par tuteur selon Zipf ; popularité du tuteur aussi (quelques stars, une longue traîne)
+        offers_cum = _zipf_cum_weights(cfg.max_offers_per_tutor, cfg.offers_zipf)
+        offer_ids, offer_tutor, offer_popularity = [], {}, []
+        for rank, tutor_id in enumerate(tutor_ids, start=1):
+            subject = self.subject()
+            writer.add(TutorProfile, {
+                "id": self.uid(), "user_id": tutor_id,
+                "bio": f"Professeur de {subject.lower()}, cours {rnd.choice(LEVELS)} et {rnd.choice(LEVELS)}.",
+                "city": None, "languages": rnd.choice(["FR", "FR,EN", "FR,ES", "FR,EN,DE"]),
+                "years_experience": rnd.randint(0, 25), "photo_url": None,
+            })
+            n_offers = rnd.choices(range(1, cfg.max_offers_per_tutor + 1), cum_weights=offers_cum)[0]
+            popularity = 1.0 / rank ** 0.8
+            for k in range(n_offers):
+                subj = subject if k == 0 else self.subject()
+                median = SUBJECTS[subj][1]
+                price = Decimal(str(round(max(10.0, rnd.gauss(median, median * 0.25)) * 2) / 2))
+                offer_id = self.uid()
+                writer.add(Offer, {
+                    "id": offer_id, "tutor_id": tutor_id, "subject": subj,
+                    "description": f"Cours {rnd.choice(LEVELS)} en {subj.lower()}", "price_hour": price,
+                    "search_vector": None,
+                })
+                offer_ids.append(offer_id)
+                offer_tutor[offer_id] = tutor_id
+                offer_popularity.append(popularity)
+        if not offer_ids or not student_ids:
+            writer.flush()
+            return
+
+        # Réservations : historique passé (sans créneau) tiré selon la popularité des offres
+        popularity_cum = list(accumulate(offer_popularity))
+        n_bookings = int(len(student_ids) * cfg.bookings_per_student)
+        history_start = cfg.now - timedelta(days=730)
+        for offer_id in rnd.choices(offer_ids, cum_weights=popularity_cum, k=n_bookings):
+            student_id = rnd.choice(student_ids)
+            status = rnd.choice(BOOKING_STATUSES)
+            created_at = history_start + timedelta(seconds=rnd.randint(0, 730 * 86400))
+            writer.add(Booking, {"id": self.uid(), "offer_id": offer_id, "student_id": student_id,
+                                 "status": status, "created_at": created_at})
+            if status == BookingStatus.ACCEPTED and rnd.random() < cfg.review_rate:
+                writer.add(Review, {
+                    "id": self.uid(), "tutor_id": offer_tutor[offer_id], "student_id": student_id,
+                    "rating": rnd.choices(range(1, 6), weights=RATING_WEIGHTS)[0], "comment": None,
+                    "created_at": created_at + timedelta(days=rnd.randint(1, 20)),
+                })
+
+        # Créneaux à venir, dont une partie déjà réservée
+        for offer_id in offer_ids:
+            for _ in range(rnd.randint(0, cfg.slots_per_offer * 2)):
+                start = (cfg.now + timedelta(days=rnd.randint(1, 60))).replace(hour=rnd.randint(8, 20))
+                booking_id = None
+                if rnd.random() < 0.3:
+                    booking_id = self.uid()
+                    writer.add(Booking, {"id": booking_id, "offer_id": offer_id, "student_id": rnd.choice(student_ids),
+                                         "status": rnd.choice([BookingStatus.PENDING, BookingStatus.ACCEPTED]),
+                                         "created_at": cfg.now - timedelta(minutes=rnd.randint(1, 20000))})
+                writer.add(Timeslot, {"id": self.uid(), "offer_id": offer_id, "start_utc": start,
+                                      "end_utc": start + timedelta(hours=1), "is_booked": booking_id is not None,
+                                      "booking_id": booking_id})
+        writer.flush()
+
+
+def generate(engine, config: GeneratorConfig, out=sys.stderr) -> dict[str, int]:
+    """
+    Génère et charge le jeu complet, puis recalcule les données dérivées
+    (agrégats de notes, vecteurs de recherche, modèle tutor_search, statistiques
+    du planificateur).
+    """
+    writer = BulkWriter(engine, config.batch_size, out=out)
+    DataGenerator(config).run(writer)
+    writer.report(final=True)
+
+    db = sessionmaker(bind=engine)()
+    try:
+        rebuild_ratings(db)
+        offer_search.reindex_all(db)
+        tutor_search.rebuild(db)
+    finally:
+        db.close()
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    return dict(writer.counts)
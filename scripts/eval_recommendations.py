@@ -0,0 +1,167 @@
+# scripts/eval_recommendations.py
+# Évaluation hors ligne du classement de /offers/recommendations (leave-one-out) :
+# pour chaque élève ayant au moins --min-history réservations, la plus récente est
+# masquée, le contexte est construit avec les autres, puis on mesure le rang de
+# l'offre masquée parmi toutes les offres candidates.
+#
+#   python scripts/eval_recommendations.py                       # SQLite temporaire + jeu généré
+#   python scripts/eval_recommendations.py --url postgresql://u:p@db:5432/superprof
+#   python scripts/eval_recommendations.py --weight distance=0.6 --weight subject=0.1
+#
+# Comparé à deux références : "department" (ancien comportement : offres du même
+# département, ordre arbitraire) et "random".
+import argparse
+import json
+import os
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import numpy as np
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import BaseSQL
+from app.models.booking import Booking
+from app.models.offer import Offer
+from app.models.user import User, UserRole
+from app.services.geo_service import centroid_for_postal_code
+from app.services.offer_search import normalize_text
+from app.services.recommendations import WEIGHTS, StudentContext, load_snapshot, score
+from scripts.datagen import GeneratorConfig, generate
+
+
+def load_histories(db, min_history: int):
+    """
+    élève -> (code postal, département, [(offer_id, matière, prix), ...] du plus ancien au plus récent)
+    """
+    rows = db.execute(
+        select(Booking.student_id, Booking.offer_id, Offer.subject, Offer.price_hour,
+               User.postal_code, User.department)
+        .join(Offer, Offer.id == Booking.offer_id)
+        .join(User, User.id == Booking.student_id)
+        .where(User.role == UserRole.student)
+        .order_by(Booking.student_id, Booking.created_at, Booking.id)
+    ).all()
+    histories = defaultdict(list)
+    places = {}
+    for student_id, offer_id, subject, price, postal_code, department in rows:
+        places[student_id] = (postal_code, department)
+        histories[student_id].append((offer_id, subject, float(price)))
+    return {s: (*places[s], h) for s, h in histories.items() if len(h) >= min_history}
+
+
+def context_for(student_id: str, postal_code: str | None, department: str | None, history) -> StudentContext:
+    ctx = StudentContext(user_id=student_id, location=centroid_for_postal_code(postal_code or department))
+    for offer_id, subject, price in history:
+        ctx.booked_offer_ids.add(offer_id)
+        key = normalize_text(subject)
+        ctx.subject_counts[key] = ctx.subject_counts.get(key, 0) + 1
+        ctx.prices.append(price)
+    return ctx
+
+
+def rank_of(scores: np.ndarray, eligible: np.ndarray, target: int) -> int:
+    # rang (1 = premier) ; ex æquo comptés au milieu
+    above = np.count_nonzero(eligible & (scores > scores[target]))
+    ties = np.count_nonzero(eligible & (scores == scores[target])) - 1
+    return above + ties // 2 + 1
+
+
+def evaluate(db, k: int, min_history: int, weights: dict[str, float], seed: int = 0) -> dict:
+    snapshot = load_snapshot(db)
+    position = snapshot.positions
+    departments = np.array([
+        d for (d,) in db.execute(
+            select(User.department).join(Offer, Offer.tutor_id == User.id).order_by(Offer.id)
+        ).all()
+    ], dtype=object)
+    rng = np.random.default_rng(seed)
+
+    ranks: dict[str, list[int]] = {"engine": [], "department": [], "random": []}
+    for student_id, (postal_code, department, history) in load_histories(db, min_history).items():
+        *past, (held_out, _, _) = history
+        if held_out not in position:
+            continue
+        ctx = context_for(student_id, postal_code, department, past)
+        target = position[held_out]
+        eligible = np.ones(len(snapshot), dtype=bool)
+        eligible[[position[i] for i in ctx.booked_offer_ids - {held_out} if i in position]] = False
+        ranks["engine"].append(rank_of(score(snapshot, ctx, weights), eligible, target))
+
+        # même département d'abord, ordre arbitraire dans chaque groupe
+        baseline = (departments == department).astype(float)
+        ranks["department"].append(rank_of(baseline + rng.random(len(snapshot)) * 0.5, eligible, target))
+        ranks["random"].append(rank_of(rng.random(len(snapshot)), eligible, target))
+
+    return {name: _metrics(values, k) for name, values in ranks.items()}
+
+
+def _metrics(ranks: list[int], k: int) -> dict:
+    if not ranks:
+        return {"students": 0}
+    r = np.array(ranks, dtype=float)
+    return {
+        "students": len(ranks),
+        f"hit_rate@{k}": round(float(np.mean(r <= k)), 4),
+        "mrr": round(float(np.mean(1 / r)), 4),
+        f"ndcg@{k}": round(float(np.mean(np.where(r <= k, 1 / np.log2(r + 1), 0))), 4),
+        "median_rank": int(np.median(r)),
+    }
+
+
+def parse_weights(values: list[str]) -> dict[str, float]:
+    weights = dict(WEIGHTS)
+    for item in values:
+        name, _, value = item.partition("=")
+        if name not in weights:
+            raise SystemExit(f"poids inconnu : {name} (attendus : {', '.join(weights)})")
+        weights[name] = float(value)
+    return weights
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="URL SQLAlchemy synchrone (défaut : SQLite temporaire + jeu généré)")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--tutors", type=int, default=1_000)
+    parser.add_argument("--bookings-per-student", type=float, default=3.0)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--min-history", type=int, default=2)
+    parser.add_argument("--weight", action="append", default=[], metavar="NOM=VALEUR")
+    args = parser.parse_args(argv)
+    weights = parse_weights(args.weight)
+
+    tmp_path = None
+    if args.url:
+        url = args.url
+    else:
+        fd, tmp_path = tempfile.mkstemp(prefix="superprof-reco-", suffix=".db")
+        os.close(fd)
+        url = f"sqlite:///{tmp_path}"
+    engine = create_engine(url)
+    try:
+        if not args.url:
+            BaseSQL.metadata.create_all(bind=engine)
+            generate(engine, GeneratorConfig(users=args.users, tutors=args.tutors,
+                                             bookings_per_student=args.bookings_per_student))
+        db = sessionmaker(bind=engine)()
+        try:
+            results = evaluate(db, args.k, args.min_history, weights)
+        finally:
+            db.close()
+        print(json.dumps({"weights": weights, "results": results}, indent=2))
+        return 0
+    finally:
+        engine.dispose()
+        if tmp_path:
+            os.remove(tmp_path)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+# scripts/explain_audit.py
+# Audit des plans d'exécution : appelle chaque route GET de l'API sur un jeu de
+# données, capture les requêtes SQL émises puis les passe à EXPLAIN.
+# Échec (code 1) si une table de plus de --min-rows lignes est lue en entier
+# (Seq Scan sous Postgres, "SCAN <table>" sans index sous SQLite).
+#
+#   python scripts/explain_audit.py                      # SQLite temporaire + jeu généré
+#   python scripts/explain_audit.py --url postgresql://u:p@db:5432/superprof --seed
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.main import app
+from app.database import BaseSQL, create_missing_indexes, get_async_db, get_db
+from app.models.booking import Booking
+from app.models.offer import Offer
+from app.models.user import User, UserRole
+from app.services.auth import create_access_token
+from app.services.tutor_search import track
+from scripts.datagen import GeneratorConfig, generate
+
+# Lectures complètes assumées : chargement des index en mémoire, une fois par processus
+ALLOWED_SCANS = {
+    ("offers", "/offers/"),          # construction de l'index plein-texte hors Postgres
+    ("tutor_search", "/search/tutors"),              # construction de l'index de facettes
+    ("tutor_search_subjects", "/search/tutors"),
+}
+
+# -------------------------
+# EXPLAIN
+# -------------------------
+def _sqlite_scans(conn, sql, params):
+    rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql, params).all()
+    scans = []
+    for row in rows:
+        detail = row[-1]
+        m = re.match(r"SCAN (\w+)", detail)
+        if m and "USING" not in detail:
+            scans.append(m.group(1))
+    return scans
+
+
+def _postgres_scans(conn, sql, params):
+    plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql, params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    scans, stack = [], [plan[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        if node.get("Node Type") == "Seq Scan":
+            scans.append(node["Relation Name"])
+        stack.extend(node.get("Plans", []))
+    return scans
+
+
+def seq_scans(conn, sql, params) -> list[str]:
+    if conn.dialect.name == "postgresql":
+        return _postgres_scans(conn, sql, params)
+    return _sqlite_scans(conn, sql, params)
+
+
+def table_sizes(engine) -> dict[str, int]:
+    with engine.connect() as conn:
+        return {name: conn.execute(select(func.count()).select_from(table)).scalar()
+                for name, table in BaseSQL.metadata.tables.items()}
+
+
+def resolve_table(name: str, sizes: dict[str, int]) -> str:
+    # Les alias SQLAlchemy ("users_1") désignent la table de base
+    return name if name in sizes else re.sub(r"_\d+$", "", name)
+
+
+# -------------------------
+# PARCOURS DES ROUTES
+# -------------------------
+def sample_requests(engine) -> tuple[list[tuple[str, str, dict]], dict[str, str]]:
+    with engine.connect() as conn:
+        booking = conn.execute(select(Booking.id, Booking.offer_id, Booking.student_id).limit(1)).one()
+        tutor_id = conn.execute(select(Offer.tutor_id).where(Offer.id == booking.offer_id)).scalar()
+        tutor_ids = conn.execute(select(User.id).where(User.role == UserRole.tutor).limit(5)).scalars().all()
+    path_values = {"tutor_id": tutor_id, "user_id": tutor_id, "offer_id": booking.offer_id,
+                   "student_id": booking.student_id, "booking_id": booking.id}
+    query_values = {
+        "/search/tutors": [{"postal_code": "75011"}, {"postal_code": "75011", "radius_km": 30},
+                           {"postal_code": "75011", "subject": "math", "max_price": 30, "sort": "price"},
+                           {"postal_code": "75011", "sort": "rating"},
+                           {"postal_code": "75011", "radius_km": 30, "languages": "FR", "min_rating": 4,
+                            "min_experience": 3, "min_price": 20, "limit": 10}],
+        "/reviews/summaries": [{"tutor_ids": tutor_ids}],
+        "/tutors/cards": [{"ids": tutor_ids}],
+        "/bookings/": [{}, {"status": "ACCEPTED"}],
+        "/offers/": [{}, {"q": "math"}],
+        "/timeslots/free": [{"offer_id": booking.offer_id}, {"tutor_id": tutor_id}],
+        "/timeslots/search": [{}, {"subject": "math", "department": "75"}],
+    }
+    requests = []
+    for path, methods in app.openapi()["paths"].items():
+        if "get" not in methods:
+            continue
+        url = re.sub(r"\{(\w+)\}", lambda m: str(path_values.get(m.group(1), "unknown")), path)
+        for params in query_values.get(path, [{}]):
+            requests.append((path, url, params))
+    return requests, {"tutor": tutor_id, "student": booking.student_id}
+
+
+def run_routes(client, requests, tokens: dict[str, str], capture: list):
+    for path, url, params in requests:
+        for token in tokens.values():
+            capture.append(("route", path))
+            r = client.get(url, params=params, headers={"Authorization": f"Bearer {token}"})
+            # Page suivante : exerce aussi le filtre keyset
+            body = r.json() if r.headers.get("content-type", "").startswith("application/json") else None
+            if isinstance(body, dict) and body.get("next_cursor"):
+                client.get(url, params={**params, "cursor": body["next_cursor"]},
+                           headers={"Authorization": f"Bearer {token}"})
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="URL SQLAlchemy synchrone (défaut : SQLite temporaire)")
+    parser.add_argument("--seed", action="store_true", help="Générer le jeu de données dans --url")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--tutors", type=int, default=2_000)
+    parser.add_argument("--min-rows", type=int, default=1000,
+                        help="Une lecture complète n'est signalée que si la table dépasse ce nombre de lignes")
+    args = parser.parse_args(argv)
+
+    tmp_path = None
+    if args.url:
+        url = args.url
+        async_url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    else:
+        fd, tmp_path = tempfile.mkstemp(prefix="superprof-audit-", suffix=".db")
+        os.close(fd)
+        url, async_url = f"sqlite:///{tmp_path}", f"sqlite+aiosqlite:///{tmp_path}"
+
+    engine = create_engine(url, connect_args={"check_same_thread": False} if url.startswith("sqlite") else {})
+    # NullPool : le TestClient ouvre une boucle d'événements par requête
+    async_engine = create_async_engine(async_url, poolclass=NullPool)
+    try:
+        return audit(engine, async_engine, args)
+    finally:
+        engine.dispose()
+        if tmp_path:
+            os.remove(tmp_path)
+
+
+def audit(engine, async_engine, args) -> int:
+
+    BaseSQL.metadata.create_all(bind=engine)
+    create_missing_indexes(engine)
+    if args.seed or not args.url:
+        # generate() termine par ANALYZE
+        generate(engine, GeneratorConfig(users=args.users, tutors=args.tutors), out=sys.stdout)
+
+    # Capture : marqueurs de route puis (moteur, SQL, paramètres) ; ce qui précède
+    # le premier marqueur (préparation de l'audit) est ignoré
+    capture: list = []
+
+    def listener(kind):
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if not executemany and statement.lstrip().upper().startswith("SELECT"):
+                capture.append(("sql", kind, statement, parameters))
+        return before_cursor_execute
+
+    event.listen(engine, "before_cursor_execute", listener("sync"))
+    event.listen(async_engine.sync_engine, "before_cursor_execute", listener("async"))
+
+    SessionAudit = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    track(SessionAudit)
+    AsyncSessionAudit = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_db():
+        db = SessionAudit()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with AsyncSessionAudit() as db:
+            yield db
+
+    previous_overrides = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    try:
+        requests, users = sample_requests(engine)
+        with SessionAudit() as db:
+            tokens = {role: create_access_token(db.get(User, user_id)) for role, user_id in users.items()}
+        run_routes(TestClient(app), requests, tokens, capture)
+    finally:
+        app.dependency_overrides = previous_overrides
+
+    # Une requête par (route, SQL) suffit
+    statements, route = {}, None
+    for entry in capture:
+        if entry[0] == "route":
+            route = entry[1]
+        elif route is not None:
+            _, kind, sql, params = entry
+            statements.setdefault((route, sql), (kind, params))
+
+    sizes = table_sizes(engine)
+
+    def explain_all(sync_conn, kind):
+        found = []
+        for (route_path, sql), (k, params) in statements.items():
+            if k != kind:
+                continue
+            for table in seq_scans(sync_conn, sql, params):
+                table = resolve_table(table, sizes)
+                if sizes.get(table, 0) > args.min_rows and (table, route_path) not in ALLOWED_SCANS:
+                    found.append((route_path, table, sizes[table], sql))
+        return found
+
+    with engine.connect() as conn:
+        violations = explain_all(conn, "sync")
+
+    async def explain_async():
+        async with async_engine.connect() as conn:
+            return await conn.run_sync(explain_all, "async")
+
+    violations += asyncio.run(explain_async())
+
+    print(f"{len(statements)} requêtes analysées sur {len(requests)} appels de routes")
+    if not violations:
+        print("Aucune lecture complète au-delà du seuil ✅")
+        return 0
+    for route_path, table, n_rows, sql in violations:
+        print(f"❌ {route_path} : lecture complète de {table} ({n_rows} lignes)")
+        print("   " + " ".join(sql.split())[:300])
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+# scripts/migrate_columns.py
+# Ajoute aux tables existantes les colonnes déclarées après leur création
+# (create_all ne modifie pas une table déjà présente), avec leur remplissage.
+# À lancer avant de démarrer l'app sur une base existante : les index de ces
+# colonnes (create_missing_indexes) en ont besoin. Relançable sans effet.
+from datetime import datetime
+
+from sqlalchemy import inspect, text, update
+from sqlalchemy.orm import Session
+
+from app.database import BaseSQL, create_missing_indexes, engine
+from app.models.booking import Booking
+from app.models.offer import Offer
+from app.services import offer_search
+
+
+def _add_column(conn, column) -> bool:
+    existing = {c["name"] for c in inspect(conn).get_columns(column.table.name)}
+    if column.name in existing:
+        return False
+    # ajoutée nullable : la contrainte NOT NULL est posée après le remplissage
+    conn.execute(text(f"ALTER TABLE {column.table.name} ADD COLUMN {column.name} "
+                      f"{column.type.compile(dialect=conn.dialect)}"))
+    return True
+
+
+def migrate(bind) -> list[str]:
+    """
+    Renvoie les colonnes ajoutées ("table.colonne").
+    """
+    BaseSQL.metadata.create_all(bind=bind)
+    added = []
+    with bind.begin() as conn:
+        # Réservations existantes : date de la migration (ordre d'origine inconnu,
+        # départagé par id dans la pagination)
+        created_at = Booking.__table__.c.created_at
+        if _add_column(conn, created_at):
+            added.append("bookings.created_at")
+        conn.execute(update(Booking.__table__).where(created_at.is_(None)).values(created_at=datetime.utcnow()))
+        if conn.dialect.name == "postgresql":
+            # SQLite ne modifie pas la contrainte d'une colonne : le défaut ORM remplit les nouvelles lignes
+            conn.execute(text("ALTER TABLE bookings ALTER COLUMN created_at SET NOT NULL"))
+
+        if _add_column(conn, Offer.__table__.c.search_vector):
+            added.append("offers.search_vector")
+
+    if "offers.search_vector" in added:
+        with Session(bind=bind) as db:
+            offer_search.reindex_all(db)
+    create_missing_indexes(bind)
+    return added
+
+
+if __name__ == "__main__":
+    columns = migrate(engine)
+    print(f"Colonnes ajoutées ✅ ({', '.join(columns) or 'aucune'})")
@@ -0,0 +1,25 @@
+# scripts/rebuild_ratings.py
+# Recalcule la table tutor_ratings depuis reviews (données existantes / réparation)
+import argparse
+
+from app.database import BaseSQL, engine, SessionLocal
+from app.services.rating import rebuild_ratings
+
+
+def run(tutor_ids: list[str] | None = None):
+    BaseSQL.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        n = rebuild_ratings(db, tutor_ids=tutor_ids)
+        print(f"Agrégats recalculés ✅ ({n} tuteur(s))")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tutor-id", action="append", dest="tutor_ids",
+                        help="Ne recalculer que ce tuteur (répétable). Par défaut : tous")
+    args = parser.parse_args()
+
+    run(tutor_ids=args.tutor_ids)
@@ -0,0 +1,28 @@
+# scripts/rebuild_tutor_search.py
+# Recalcule le modèle de lecture tutor_search (données existantes, réparation,
+# rafraîchissement périodique des prochains créneaux libres : --expired)
+import argparse
+
+from app.database import BaseSQL, engine, SessionLocal
+from app.services.tutor_search import rebuild
+
+
+def run(tutor_ids: list[str] | None = None, expired: bool = False):
+    BaseSQL.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        n = rebuild(db, tutor_ids=tutor_ids, expired=expired)
+        print(f"Modèle de recherche recalculé ✅ ({n} tuteur(s))")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tutor-id", action="append", dest="tutor_ids",
+                        help="Ne recalculer que ce tuteur (répétable). Par défaut : tous")
+    parser.add_argument("--expired", action="store_true",
+                        help="Ne recalculer que les lignes dont le prochain créneau est passé")
+    args = parser.parse_args()
+
+    run(tutor_ids=args.tutor_ids, expired=args.expired)
@@ -1,8 +1,14 @@
 # scripts/seed.py (ou ton chemin actuel)
 from decimal import Decimal
 from datetime import datetime, timedelta
+from pathlib import Path
 from sqlalchemy.orm import Session
 import argparse
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
 
 from app.database import BaseSQL, engine, SessionLocal
 from app.models.user import User, UserRole
@@ -12,6 +18,10 @@ from app.models.tutor_profile import TutorProfile
 from app.models.review import Review
 from app.models.timeslot import Timeslot
 from app.services.auth import hash_password
+from app.services import offer_search
+from app.services.rating import rebuild_ratings
+from app.models.tutor_rating import TutorRating
+from scripts.datagen import GeneratorConfig, generate
 
 
 # -------------------------
@@ -46,11 +56,14 @@ def upsert_offer(db: Session, tutor_id: str, subject: str, price: Decimal,
         # Optionnel: mettre à jour price/desc si changés
         o.price_hour = price
         o.description = desc
+        offer_search.index_offer(db, o)
         db.commit()
         db.refresh(o)
         return o
     o = Offer(tutor_id=tutor_id, subject=subject, description=desc, price_hour=price)
     db.add(o)
+    db.flush()
+    offer_search.index_offer(db, o)
     db.commit()
     db.refresh(o)
     return o
@@ -150,6 +163,7 @@ def reset_data(db: Session, keep_users: bool = False):
     # FK: TutorProfile.user_id -> User.id
     # FK: Review.tutor_id/student_id -> User.id
     db.query(Review).delete()
+    db.query(TutorRating).delete()
     db.query(Timeslot).delete()
     db.query(Booking).delete()
     db.query(Offer).delete()
@@ -246,6 +260,7 @@ def run(keep_users: bool = False, do_reset: bool = False):
         # REVIEWS student -> tutor
         r1 = upsert_review(db, tutor_id=tutor.id, student_id=student.id, rating=5, comment="Super pédagogue !")
         r2 = upsert_review(db, tutor_id=tutor.id, student_id=student.id, rating=4, comment="Très clair, je recommande.")
+        rebuild_ratings(db, tutor_ids=[tutor.id])
 
         print("Seed OK ✅")
         print(f"Tutor:   {tutor.id}  {tutor.email}")
@@ -262,10 +277,39 @@ def run(keep_users: bool = False, do_reset: bool = False):
         db.close()
 
 
+# -------------------------
+# GÉNÉRATEUR (volume)
+# -------------------------
+def run_generator(config: GeneratorConfig, do_reset: bool = False):
+    BaseSQL.metadata.create_all(bind=engine)
+    if do_reset:
+        db = SessionLocal()
+        try:
+            reset_data(db)
+        finally:
+            db.close()
+    counts = generate(engine, config)
+    print("Génération OK ✅ " + ", ".join(f"{n} {table}" for table, n in counts.items()))
+    print(f"Mot de passe de tous les comptes : {config.password!r} (user<N>@gen.superprof.fr)")
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--reset", action="store_true", help="Supprimer les données avant de reseeder")
     parser.add_argument("--keep-users", action="store_true", help="Conserver les users lors du reset (ne supprime que offers + bookings + timeslots + reviews)")
+    gen = parser.add_argument_group("générateur", "Jeu synthétique en volume (activé par --users)")
+    gen.add_argument("--users", type=int, help="Nombre total d'utilisateurs (élèves + tuteurs)")
+    gen.add_argument("--tutors", type=int, default=GeneratorConfig.tutors, help="Dont tuteurs")
+    gen.add_argument("--seed", type=int, default=GeneratorConfig.seed, help="Graine (même graine -> mêmes données)")
+    gen.add_argument("--batch-size", type=int, default=GeneratorConfig.batch_size, help="Lignes par lot (COPY / executemany)")
+    gen.add_argument("--bookings-per-student", type=float, default=GeneratorConfig.bookings_per_student)
+    gen.add_argument("--max-offers-per-tutor", type=int, default=GeneratorConfig.max_offers_per_tutor)
     args = parser.parse_args()
 
-    run(keep_users=args.keep_users, do_reset=args.reset)
+    if args.users:
+        run_generator(GeneratorConfig(
+            users=args.users, tutors=args.tutors, seed=args.seed, batch_size=args.batch_size,
+            bookings_per_student=args.bookings_per_student, max_offers_per_tutor=args.max_offers_per_tutor,
+        ), do_reset=args.reset)
+    else:
+        run(keep_users=args.keep_users, do_reset=args.reset)
@@ -1,26 +1,53 @@
 # app/tests/conftest.py
+import asyncio
+import threading
+from contextlib import contextmanager
+
+import httpx
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
 from app.main import app
-from app.database import BaseSQL, get_db
+from app.database import BaseSQL, get_db, get_async_db
 from app.services.auth import hash_password
 from app.models.user import User, UserRole
 from app.models.offer import Offer
 from app.models.booking import Booking
+from app.services.offer_search import offer_index
+from app.services.geo_service import tutor_geo_index
+from app.services.token_cache import token_cache
+from app.services.response_cache import response_cache
+from app.services.recommendations import recommender
+from app.services.tutor_facets import tutor_facet_index
+from app.services.tutor_search import track
+from app.services.health import database_check
+from app.services.metrics import request_latency, route_metrics
+
+@pytest.fixture(scope="session")
+def test_db_path(tmp_path_factory):
+    # Base fichier : partagée entre le moteur sync (fixtures, routes d'écriture)
+    # et le moteur async (routes de lecture)
+    return tmp_path_factory.mktemp("db") / "test.db"
 
 @pytest.fixture(scope="session")
-def test_engine():
-    # ✅ Une SEULE connexion partagée pour toute la session de tests
+def test_engine(test_db_path):
     engine = create_engine(
-        "sqlite://",  # ⬅️ pas /:memory:/ avec StaticPool
+        f"sqlite:///{test_db_path}",
         connect_args={"check_same_thread": False},
-        poolclass=StaticPool,  # ⬅️ clé : même connexion pour tous
     )
-    return engine
+    yield engine
+    engine.dispose()
+
+@pytest.fixture(scope="session")
+def async_test_engine(test_db_path):
+    # NullPool : le TestClient ouvre une boucle d'événements par requête,
+    # une connexion aiosqlite ne doit pas survivre à la sienne
+    return create_async_engine(f"sqlite+aiosqlite:///{test_db_path}", poolclass=NullPool)
 
 @pytest.fixture(scope="function")
 def db_session(test_engine):
@@ -29,23 +56,98 @@ def db_session(test_engine):
     BaseSQL.metadata.create_all(bind=test_engine)
 
     TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+    track(TestingSessionLocal)
     session = TestingSessionLocal()
     try:
         yield session
     finally:
         session.close()
 
+@pytest.fixture(autouse=True)
+def reset_in_memory_indexes():
+    # Les index en mémoire survivent aux drop_all : on les vide entre deux tests
+    offer_index.clear()
+    tutor_geo_index.clear()
+    token_cache.clear()
+    response_cache.clear()
+    recommender.clear()
+    tutor_facet_index.clear()
+    database_check.clear()
+    request_latency.reset()
+    route_metrics.clear()
+    yield
+
+@pytest.fixture
+def query_budget(test_engine, async_test_engine):
+    """
+    `with query_budget(n) as statements: ...` échoue si le bloc émet plus de n
+    requêtes SQL (moteurs sync et async confondus).
+    """
+    engines = (test_engine, async_test_engine.sync_engine)
+
+    @contextmanager
+    def budget(max_statements: int):
+        statements: list[str] = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            for engine in engines:
+                event.remove(engine, "before_cursor_execute", record)
+        assert len(statements) <= max_statements, (
+            f"{len(statements)} requêtes SQL (budget : {max_statements}) :\n"
+            + "\n".join(" ".join(sql.split()) for sql in statements)
+        )
+
+    return budget
+
 # Override FastAPI dependency pour utiliser NOTRE session de test
 @pytest.fixture(scope="function")
-def client(db_session):
+def client(db_session, async_test_engine):
     def override_get_db():
         try:
             yield db_session
         finally:
             pass
+
+    AsyncTestingSession = async_sessionmaker(async_test_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with AsyncTestingSession() as db:
+            yield db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     return TestClient(app)
 
+@pytest.fixture
+def concurrent_get(client):
+    """
+    `concurrent_get(url, n, headers=...)` : n GET lancés ensemble sur une même
+    boucle d'événements (asyncio.gather). Échoue si la boucle reste bloquée.
+    """
+    def run(url: str, n: int, timeout: float = 20, **kwargs) -> list[httpx.Response]:
+        responses: list = []
+
+        async def main():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+                responses.extend(await asyncio.gather(*(ac.get(url, **kwargs) for _ in range(n))))
+
+        # thread à part : une boucle gelée ne bloque pas la session pytest
+        thread = threading.Thread(target=asyncio.run, args=(main(),), daemon=True)
+        thread.start()
+        thread.join(timeout)
+        assert not thread.is_alive(), f"{n} requêtes concurrentes sur {url} : boucle bloquée"
+        return responses
+
+    return run
+
 @pytest.fixture(scope="function")
 def tutor_user(db_session):
     u = User(
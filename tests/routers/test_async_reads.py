@@ -0,0 +1,36 @@
+import inspect
+
+from app.routers import offer, reviews, search, tutor_profiles, user
+from app.services.auth import create_access_token
+
+ASYNC_READS = [
+    offer.list_offers, offer.list_offers_by_tutor, offer.list_my_offers, offer.get_recommended_offers,
+    reviews.list_reviews_of_tutor, reviews.rating_summary, reviews.rating_summaries,
+    user.get_all_users, user.get_user_public_by_id, search.search_tutors_by_location,
+    tutor_profiles.get_public_profile,
+]
+
+def test_read_routes_are_coroutines():
+    # Routes de lecture servies par le moteur async : elles ne doivent pas
+    # passer par le threadpool ni bloquer la boucle d'événements
+    for endpoint in ASYNC_READS:
+        assert inspect.iscoroutinefunction(endpoint), endpoint.__name__
+    # Les écritures synchrones restent des `def` (exécutées dans le threadpool)
+    assert not inspect.iscoroutinefunction(user.create_user)
+
+def test_async_reads_see_sync_writes(client, tutor_user, student_user):
+    hdr = {"Authorization": f"Bearer {create_access_token(tutor_user)}"}
+    r = client.post("/offers/", headers=hdr, json={"subject": "Piano", "description": "Solfège", "price_hour": 25})
+    assert r.status_code == 201
+    offer_id = r.json()["id"]
+
+    assert [o["id"] for o in client.get("/offers/", params={"q": "pian"}).json()["items"]] == [offer_id]
+    assert [o["id"] for o in client.get("/offers/mine", headers=hdr).json()["items"]] == [offer_id]
+    assert client.get(f"/users/{tutor_user.id}").json()["email"] == tutor_user.email
+    assert client.get("/users/does-not-exist").status_code == 404
+
+    stu = {"Authorization": f"Bearer {create_access_token(student_user)}"}
+    assert client.post(f"/reviews/for/{tutor_user.id}", headers=stu, json={"rating": 4}).status_code == 200
+    summary = client.get(f"/reviews/of-tutor/{tutor_user.id}/summary").json()
+    assert summary["rating_count"] == 1 and summary["rating_avg"] == 4
+    assert len(client.get(f"/reviews/of-tutor/{tutor_user.id}").json()["items"]) == 1
@@ -0,0 +1,76 @@
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.user import UserRole
+from app.serializers.user import User as SerializersUser
+from app.services.auth import _encode_jwt, create_access_token, decode_jwt
+from app.services.token_cache import JWT_ACCESS_TOKEN_TTL, token_cache
+from app.services.user import update_user
+
+def auth_hdr(token): return {"Authorization": f"Bearer {token}"}
+
+def test_token_carries_role_and_expiry(tutor_user):
+    claims = decode_jwt(create_access_token(tutor_user))
+    assert claims["role"] == "tutor"
+    assert claims["exp"] > claims["iat"]
+    assert claims["jti"]
+
+def test_decode_uses_cache(tutor_user):
+    token = create_access_token(tutor_user)
+    decode_jwt(token)
+    hits = token_cache.hits
+    decode_jwt(token)
+    assert token_cache.hits == hits + 1
+
+def test_require_role_without_db_lookup(client, student_user, tutor_user):
+    r = client.post("/offers/", headers=auth_hdr(create_access_token(student_user)),
+                    json={"subject": "JS", "price_hour": 20})
+    assert r.status_code == 403
+    assert r.json()["detail"] == "Only tutors can create offers"
+    r = client.post("/offers/", headers=auth_hdr(create_access_token(tutor_user)),
+                    json={"subject": "JS", "price_hour": 20})
+    assert r.status_code == 201
+
+def test_legacy_token_without_role_falls_back_to_db(client, tutor_user):
+    legacy = _encode_jwt(tutor_user.id)
+    r = client.post("/offers/", headers=auth_hdr(legacy), json={"subject": "JS", "price_hour": 20})
+    assert r.status_code == 201
+
+def test_logout_revokes_cached_token(client, tutor_user):
+    token = create_access_token(tutor_user)
+    assert client.get("/offers/mine", headers=auth_hdr(token)).status_code == 200
+    assert client.post("/auth/logout", headers=auth_hdr(token)).status_code == 204
+    r = client.get("/offers/mine", headers=auth_hdr(token))
+    assert r.status_code == 401
+    assert r.json()["detail"] == "Token revoked"
+
+def test_role_change_revokes_tokens(client, db_session, tutor_user):
+    token = create_access_token(tutor_user)
+    assert client.get("/offers/mine", headers=auth_hdr(token)).status_code == 200
+    update_user(tutor_user.id, db_session, SerializersUser(first_name=tutor_user.first_name, last_name=tutor_user.last_name,
+                                                           email=tutor_user.email, role=UserRole.student))
+    r = client.post("/offers/", headers=auth_hdr(token), json={"subject": "JS", "price_hour": 20})
+    assert r.status_code == 401
+    assert r.json()["detail"] == "Token revoked"
+
+def test_token_reissued_in_the_revocation_second_is_valid(tutor_user, monkeypatch):
+    now = int(time.time()) + 0.5
+    monkeypatch.setattr(time, "time", lambda: now)
+    old = create_access_token(tutor_user)
+    decode_jwt(old)                                         # vu par ce processus
+    token_cache.revoke_user(tutor_user.id)
+    fresh = create_access_token(tutor_user)                 # même seconde (iat)
+    assert decode_jwt(fresh)["user_id"] == tutor_user.id
+    with pytest.raises(HTTPException) as err:
+        decode_jwt(old)
+    assert err.value.detail == "Token revoked"
+
+def test_old_user_revocations_are_forgotten(monkeypatch):
+    token_cache.revoke_user("gone")
+    later = time.time() + JWT_ACCESS_TOKEN_TTL + 1
+    monkeypatch.setattr(time, "time", lambda: later)
+    token_cache.revoke_user("other")
+    assert not token_cache.is_revoked({"user_id": "gone", "iat": 0})
+    assert token_cache.is_revoked({"user_id": "other", "iat": 0})
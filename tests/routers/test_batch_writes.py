@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.booking import Booking, BookingStatus
+from app.models.offer import Offer
+from app.models.timeslot import Timeslot
+from app.models.user import User, UserRole
+from app.services.auth import create_access_token
+
+START = datetime(2030, 1, 7, 9)
+
+
+def _auth(user) -> dict:
+    return {"Authorization": f"Bearer {create_access_token(user)}"}
+
+
+@pytest.fixture
+def offers(db_session, tutor_user):
+    other = User(email="other.tutor@test.com", role=UserRole.tutor)
+    db_session.add(other); db_session.flush()
+    mine = Offer(tutor_id=tutor_user.id, subject="Maths", price_hour=25)
+    theirs = Offer(tutor_id=other.id, subject="Piano", price_hour=30)
+    db_session.add_all([mine, theirs]); db_session.commit()
+    return mine.id, theirs.id
+
+
+def _slot(offer_id, hours_from_start, length=1):
+    start = START + timedelta(hours=hours_from_start)
+    return {"offer_id": offer_id, "start_utc": start.isoformat(), "end_utc": (start + timedelta(hours=length)).isoformat()}
+
+
+def test_timeslot_batch_reports_item_errors(client, db_session, tutor_user, offers):
+    mine, theirs = offers
+    db_session.add(Timeslot(offer_id=mine, start_utc=START, end_utc=START + timedelta(hours=1)))
+    db_session.commit()
+    items = [
+        _slot(mine, 24),
+        _slot(mine, 0.5),          # chevauche le créneau existant
+        _slot(theirs, 48),         # offre d'un autre tuteur
+        _slot("unknown", 48),
+        _slot(mine, 49, length=-1),
+        _slot(mine, 24.5),         # chevauche le 1er élément du lot
+        _slot(mine, 25),           # bout à bout avec le 1er : accepté
+    ]
+    r = client.post("/timeslots/batch", headers=_auth(tutor_user), json={"items": items})
+    assert r.status_code == 200
+    body = r.json()
+    assert [e["index"] for e in body["errors"]] == [1, 2, 3, 4, 5]
+    assert [e["status"] for e in body["errors"]] == [409, 403, 404, 400, 409]
+    assert [i["start_utc"] for i in body["items"]] == [items[0]["start_utc"], items[6]["start_utc"]]
+    assert db_session.query(Timeslot).filter(Timeslot.offer_id == mine).count() == 3
+
+
+def test_timeslot_batch_statement_count_is_constant(client, tutor_user, offers, query_budget):
+    mine, _ = offers
+    headers = _auth(tutor_user)
+    items = [_slot(mine, 2 * i) for i in range(200)]
+    # propriété, verrou, lecture de l'existant, insertion, commit : indépendant de la taille du lot
+    with query_budget(6):
+        r = client.post("/timeslots/batch", headers=headers, json={"items": items})
+    assert len(r.json()["items"]) == 200
+
+
+def test_timeslot_batch_limits(client, tutor_user, student_user, offers):
+    mine, _ = offers
+    assert client.post("/timeslots/batch", headers=_auth(tutor_user), json={"items": []}).status_code == 422
+    r = client.post("/timeslots/batch", headers=_auth(student_user), json={"items": [_slot(mine, 0)]})
+    assert r.status_code == 403
+
+
+def test_offer_batch(client, tutor_user):
+    items = [{"subject": f"Solfège {i}", "description": "Débutants", "price_hour": 20 + i} for i in range(3)]
+    r = client.post("/offers/batch", headers=_auth(tutor_user), json={"items": items})
+    assert r.status_code == 201
+    created = r.json()["items"]
+    assert [o["subject"] for o in created] == ["Solfège 0", "Solfège 1", "Solfège 2"]
+    assert {o["tutor_id"] for o in created} == {tutor_user.id}
+    mine = client.get("/offers/mine", headers=_auth(tutor_user)).json()["items"]
+    assert {o["id"] for o in mine} == {o["id"] for o in created}
+    # indexées pour la recherche
+    found = client.get("/offers/", params={"q": "solfege"}).json()["items"]
+    assert len(found) == 3
+
+
+def test_decide_batch(client, db_session, tutor_user, student_user, offers):
+    mine, theirs = offers
+    bookings = [Booking(offer_id=mine, student_id=student_user.id) for _ in range(3)]
+    foreign = Booking(offer_id=theirs, student_id=student_user.id)
+    db_session.add_all([*bookings, foreign]); db_session.flush()
+    slot = Timeslot(offer_id=mine, start_utc=START, end_utc=START + timedelta(hours=1),
+                    is_booked=True, booking_id=bookings[1].id)
+    db_session.add(slot); db_session.commit()
+    ids = [b.id for b in bookings]
+
+    items = [
+        {"booking_id": ids[0], "action": "accept"},
+        {"booking_id": ids[1], "action": "REJECT"},
+        {"booking_id": foreign.id, "action": "ACCEPT"},
+        {"booking_id": "unknown", "action": "ACCEPT"},
+        {"booking_id": ids[2], "action": "MAYBE"},
+        {"booking_id": ids[0], "action": "REJECT"},
+    ]
+    body = client.post("/bookings/decide-batch", headers=_auth(tutor_user), json={"items": items}).json()
+    assert [(b["id"], b["status"]) for b in body["items"]] == [(ids[0], "ACCEPTED"), (ids[1], "REJECTED")]
+    assert [(e["index"], e["status"]) for e in body["errors"]] == [(2, 403), (3, 404), (4, 400), (5, 400)]
+
+    db_session.expire_all()
+    assert [db_session.get(Booking, i).status for i in ids] == [
+        BookingStatus.ACCEPTED, BookingStatus.REJECTED, BookingStatus.PENDING]
+    assert db_session.get(Booking, foreign.id).status == BookingStatus.PENDING
+    freed = db_session.get(Timeslot, slot.id)
+    assert freed.is_booked is False and freed.booking_id is None
@@ -0,0 +1,79 @@
+from app.models.user import UserRole
+from app.serializers.user import User as SerializersUser
+from app.services.auth import create_access_token
+from app.services.user import update_user
+
+
+def _auth(user):
+    return {"Authorization": f"Bearer {create_access_token(user)}"}
+
+
+def test_repeat_reads_are_served_from_cache_with_etag(client, tutor_user, query_budget):
+    client.post("/offers/", headers=_auth(tutor_user), json={"subject": "Piano", "price_hour": 25})
+    url = f"/offers/by-tutor/{tutor_user.id}"
+
+    first = client.get(url)
+    assert first.status_code == 200 and len(first.json()["items"]) == 1
+    etag = first.headers["etag"]
+
+    with query_budget(0):
+        again = client.get(url, params={"cursor": ""})      # paramètre vide : même clé
+        not_modified = client.get(url, headers={"If-None-Match": etag})
+    assert again.content == first.content and again.headers["etag"] == etag
+    assert not_modified.status_code == 304 and not_modified.content == b""
+
+
+def test_writes_invalidate_by_tag(client, tutor_user, student_user):
+    tutor = _auth(tutor_user)
+    assert client.put("/tutors/me/profile", headers=tutor, json={"bio": "Pianiste"}).status_code == 200
+    offers_url, profile_url = f"/offers/by-tutor/{tutor_user.id}", f"/tutors/{tutor_user.id}/profile"
+    reviews_url = f"/reviews/of-tutor/{tutor_user.id}"
+    assert client.get(offers_url).json()["items"] == []
+    assert client.get(profile_url).json()["bio"] == "Pianiste"
+    assert client.get(reviews_url).json()["items"] == []
+    assert client.get("/offers/", params={"q": "piano"}).json()["items"] == []
+
+    client.post("/offers/", headers=tutor, json={"subject": "Piano", "price_hour": 25})
+    client.put("/tutors/me/profile", headers=tutor, json={"bio": "Pianiste et guitariste"})
+    client.post(f"/reviews/for/{tutor_user.id}", headers=_auth(student_user), json={"rating": 5})
+
+    assert len(client.get(offers_url).json()["items"]) == 1
+    assert client.get(profile_url).json()["bio"] == "Pianiste et guitariste"
+    assert len(client.get(reviews_url).json()["items"]) == 1
+    assert len(client.get("/offers/", params={"q": "guitar"}).json()["items"]) == 1
+
+
+def test_profile_languages_update_is_stored_and_served(client, tutor_user):
+    tutor = _auth(tutor_user)
+    assert client.put("/tutors/me/profile", headers=tutor, json={"bio": "Pianiste"}).status_code == 200
+    url = f"/tutors/{tutor_user.id}/profile"
+    assert client.get(url).json()["languages"] is None
+
+    r = client.put("/tutors/me/profile", headers=tutor, json={"languages": "fr, en, FR"})
+    assert r.status_code == 200 and r.json()["languages"] == "FR,EN"
+    assert client.get(url).json()["languages"] == "FR,EN"
+    r = client.put("/tutors/me/profile", headers=tutor, json={"languages": " , "})
+    assert r.status_code == 200 and r.json()["languages"] is None
+
+
+def test_search_follows_department_changes(client, db_session, tutor_user):
+    update_user(tutor_user.id, db_session, SerializersUser(first_name="Alice", last_name="Tutor", email=tutor_user.email,
+                                                           role=UserRole.tutor, postal_code="75011"))
+    assert client.get("/search/tutors", params={"postal_code": "75001"}).json()["count"] == 0
+
+    # un profil créé rend le tuteur visible dans son département
+    assert client.get("/tutors/me/profile", headers=_auth(tutor_user)).status_code == 200
+    assert client.get("/search/tutors", params={"postal_code": "75001"}).json()["count"] == 1
+    assert client.get("/search/tutors", params={"postal_code": "69001"}).json()["count"] == 0
+
+    update_user(tutor_user.id, db_session, SerializersUser(first_name="Alice", last_name="Tutor", email=tutor_user.email,
+                                                           role=UserRole.tutor, postal_code="69003"))
+    assert client.get("/search/tutors", params={"postal_code": "75001"}).json()["count"] == 0
+    assert client.get("/search/tutors", params={"postal_code": "69001"}).json()["count"] == 1
+
+
+def test_errors_are_not_cached(client, tutor_user):
+    url = f"/tutors/{tutor_user.id}/profile"
+    assert client.get(url).status_code == 404
+    client.get("/tutors/me/profile", headers=_auth(tutor_user))
+    assert client.get(url).status_code == 200
@@ -0,0 +1,96 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.booking import Booking, BookingStatus
+from app.models.offer import Offer
+from app.models.review import Review
+from app.models.user import User, UserRole
+from app.services import export as export_service
+
+
+@pytest.fixture
+def bookings(db_session, tutor_user, student_user):
+    other = User(first_name="C", last_name="Tutor", email="c.tutor@test.com", role=UserRole.tutor)
+    db_session.add(other); db_session.flush()
+    mine = Offer(tutor_id=tutor_user.id, subject="Maths", price_hour=19.5)
+    theirs = Offer(tutor_id=other.id, subject="Piano", price_hour=30)
+    db_session.add_all([mine, theirs]); db_session.flush()
+    t0 = datetime(2025, 1, 1)
+    for i in range(10):
+        db_session.add(Booking(offer_id=(mine if i % 2 else theirs).id, student_id=student_user.id,
+                               status=BookingStatus.ACCEPTED if i < 4 else BookingStatus.PENDING,
+                               created_at=t0 + timedelta(days=i)))
+    db_session.add(Review(tutor_id=tutor_user.id, student_id=student_user.id, rating=5, comment="Top, merci",
+                          created_at=t0))
+    db_session.commit()
+    return {"tutor": tutor_user.id, "t0": t0}
+
+
+def _ndjson(r):
+    return [json.loads(line) for line in r.text.splitlines()]
+
+
+def test_ndjson_export_is_ordered_and_filtered(client, bookings):
+    r = client.get("/export/bookings.ndjson")
+    assert r.status_code == 200 and r.headers["content-type"] == "application/x-ndjson"
+    rows = _ndjson(r)
+    assert len(rows) == 10
+    assert [row["created_at"] for row in rows] == sorted(row["created_at"] for row in rows)
+    assert set(rows[0]) == {"id", "offer_id", "tutor_id", "student_id", "status", "created_at", "_cursor"}
+
+    params = {"status": "PENDING", "tutor_id": bookings["tutor"], "since": (bookings["t0"] + timedelta(days=6)).isoformat()}
+    rows = _ndjson(client.get("/export/bookings.ndjson", params=params))
+    assert [row["created_at"][:10] for row in rows] == ["2025-01-08", "2025-01-10"]
+    assert {row["tutor_id"] for row in rows} == {bookings["tutor"]}
+
+
+def test_resume_from_cursor(client, bookings, monkeypatch):
+    monkeypatch.setattr(export_service, "EXPORT_BATCH_SIZE", 3)
+    full = _ndjson(client.get("/export/bookings.ndjson"))
+    rest = _ndjson(client.get("/export/bookings.ndjson", params={"cursor": full[3]["_cursor"]}))
+    assert [row["id"] for row in rest] == [row["id"] for row in full[4:]]
+
+
+def test_csv_export(client, bookings):
+    r = client.get("/export/offers.csv", headers={"Accept-Encoding": "identity"})
+    assert r.headers["content-type"].startswith("text/csv")
+    assert "content-encoding" not in r.headers
+    assert r.headers["content-disposition"] == 'attachment; filename="offers.csv"'
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert sorted(row["price_hour"] for row in rows) == ["19.50", "30.00"]
+
+    reviews = list(csv.DictReader(io.StringIO(client.get("/export/reviews.csv").text)))
+    assert reviews[0]["comment"] == "Top, merci" and reviews[0]["rating"] == "5"
+    status = list(csv.DictReader(io.StringIO(client.get("/export/bookings.csv").text)))[0]["status"]
+    assert status == "ACCEPTED"
+
+
+def test_gzip_on_the_fly(client, bookings):
+    r = client.get("/export/bookings.ndjson", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert len(_ndjson(r)) == 10          # httpx décompresse
+
+    raw = b"".join(export_service.gzip_chunks([b'{"a":1}\n', b'{"a":2}\n']))
+    assert gzip.decompress(raw) == b'{"a":1}\n{"a":2}\n'
+
+
+def test_gzip_refused_with_a_zero_weight(client, bookings):
+    r = client.get("/export/bookings.ndjson", headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert "content-encoding" not in r.headers
+    assert len(_ndjson(r)) == 10
+
+    r = client.get("/export/bookings.ndjson", headers={"Accept-Encoding": "br;q=1.0, gzip;q=0.5"})
+    assert r.headers["content-encoding"] == "gzip"
+
+
+def test_bad_requests(client, bookings):
+    assert client.get("/export/bookings.ndjson", params={"cursor": "nope"}).status_code == 400
+    assert client.get("/export/offers.ndjson", params={"since": "2025-01-01T00:00:00"}).status_code == 400
+    assert client.get("/export/offers.ndjson", params={"status": "PENDING"}).status_code == 400
+    assert client.get("/export/users.ndjson").status_code == 422
+    assert client.get("/export/bookings.xml").status_code == 422
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.main import app
+from app.serializers import fast
+from app.services.auth import create_access_token
+from app.services.response_cache import response_cache
+
+LIST_URLS = [
+    "/offers/", "/offers/?q=solfe", "/offers/by-tutor/{tutor}", "/offers/mine",
+    "/bookings/", "/bookings/by-offer/{offer}", "/bookings/list/on-my-offers",
+    "/timeslots/of-offer/{offer}", "/timeslots/mine",
+]
+
+
+@pytest.fixture
+def catalogue(client, tutor_user, student_user):
+    tutor = {"Authorization": f"Bearer {create_access_token(tutor_user)}"}
+    student = {"Authorization": f"Bearer {create_access_token(student_user)}"}
+    offer_ids = [
+        client.post("/offers/", headers=tutor, json={"subject": f"Piano {i}", "description": "Solfège" if i else None,
+                                                     "price_hour": 19.99 + i}).json()["id"]
+        for i in range(3)
+    ]
+    start = datetime(2030, 1, 1, 9, 30, 15, 250000, tzinfo=timezone.utc)
+    for i in range(3):
+        slot = client.post("/timeslots/", headers=tutor, json={
+            "offer_id": offer_ids[0], "start_utc": (start + timedelta(days=i)).isoformat(),
+            "end_utc": (start + timedelta(days=i, hours=1)).isoformat()}).json()
+        if i == 0:
+            client.post("/bookings/", headers=student, json={"offer_id": offer_ids[0], "timeslot_id": slot["id"]})
+    client.post("/bookings/", headers=student, json={"offer_id": offer_ids[1]})
+    return tutor, {"tutor": tutor_user.id, "offer": offer_ids[0]}
+
+
+def _get_all(client, headers, values):
+    out = {}
+    for url in LIST_URLS:
+        response_cache.clear()
+        r = client.get(url.format(**values), headers=headers, params={"limit": 2})
+        assert r.status_code == 200, (url, r.text)
+        out[url] = (r.headers["content-type"], r.json())
+    return out
+
+
+def test_fast_path_matches_validated_output(client, catalogue, monkeypatch):
+    headers, values = catalogue
+    fast_out = _get_all(client, headers, values)
+    monkeypatch.setattr(fast, "FAST_JSON_RESPONSES", False)
+    slow_out = _get_all(client, headers, values)
+    assert fast_out == slow_out
+    # Numeric -> float, comme la validation
+    assert {o["price_hour"] for o in fast_out["/offers/mine"][1]["items"]} <= {19.99, 20.99, 21.99}
+    assert fast_out["/timeslots/mine"][1]["items"][0]["is_booked"] is True
+
+
+def test_cursor_and_schema_unchanged(client, catalogue):
+    headers, values = catalogue
+    page = client.get(f"/timeslots/of-offer/{values['offer']}", params={"limit": 2}).json()
+    rest = client.get(f"/timeslots/of-offer/{values['offer']}", params={"limit": 2, "cursor": page["next_cursor"]}).json()
+    assert len(page["items"]) == 2 and len(rest["items"]) == 1 and rest["next_cursor"] is None
+
+    schema = app.openapi()["paths"]["/bookings/"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert schema["$ref"].endswith("Page_BookingOut_")
@@ -0,0 +1,134 @@
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy.pool import NullPool, QueuePool
+
+import app.database as database
+import app.main as main
+from app.database import DB_MAX_OVERFLOW, get_db
+from app.main import app
+from app.services import health
+
+
+class FlakyEngine:
+    def __init__(self, failures: int):
+        self.failures = failures
+
+    def connect(self):
+        if self.failures:
+            self.failures -= 1
+            raise OperationalError("SELECT 1", {}, Exception("connection refused"))
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement):
+        return None
+
+
+def test_wait_for_db_returns_at_once_when_db_is_up(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(main, "engine", FlakyEngine(0))
+    assert main.wait_for_db(sleep=sleeps.append) == 1
+    assert sleeps == []
+
+
+def test_wait_for_db_backs_off_exponentially(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(main, "engine", FlakyEngine(6))
+    assert main.wait_for_db(first_delay=0.05, max_delay=1.0, sleep=sleeps.append) == 7
+    assert sleeps == [0.05, 0.1, 0.2, 0.4, 0.8, 1.0]
+
+
+def test_wait_for_db_gives_up_after_timeout(monkeypatch):
+    monkeypatch.setattr(main, "engine", FlakyEngine(10**6))
+    with pytest.raises(RuntimeError):
+        main.wait_for_db(timeout=0.05, first_delay=0.01)
+
+
+def test_liveness_does_not_touch_the_database(client, query_budget):
+    with query_budget(0):
+        r = client.get("/health/live")
+    assert r.status_code == 200 and r.json() == {"status": "alive"}
+
+
+def test_readiness(client):
+    r = client.get("/health/ready")
+    body = r.json()
+    assert r.status_code == 200 and body["status"] == "ready"
+    assert body["database"]["ok"] is True
+    assert len(body["schema_version"]) == 12
+    assert set(body["latency"]) == {"window_seconds", "p50_ms", "p99_ms"}
+
+    class DownSession:
+        def execute(self, statement):
+            raise SQLAlchemyError("down")
+
+        def get_bind(self):
+            return main.engine
+
+    health.database_check.clear()
+    app.dependency_overrides[get_db] = lambda: DownSession()
+    r = client.get("/health/ready")
+    assert r.status_code == 503 and r.json()["status"] == "unavailable"
+    assert r.json()["database"] == {"ok": False, "error": "SQLAlchemyError"}
+
+
+def test_readiness_check_is_cached(client, query_budget):
+    client.get("/health/ready")
+    # les sondes suivantes, dans le TTL, n'ouvrent pas de connexion
+    with query_budget(0):
+        for _ in range(5):
+            assert client.get("/health/ready").status_code == 200
+
+
+def test_readiness_reports_request_latency(client):
+    assert client.get("/health/ready").json()["latency"]["p50_ms"] is None
+    client.get("/")
+    client.get("/api")
+    latency = client.get("/health/ready").json()["latency"]
+    assert latency["p50_ms"] is not None and latency["p99_ms"] >= latency["p50_ms"]
+
+
+def test_pool_stats_flags_saturation():
+    pool = QueuePool(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=DB_MAX_OVERFLOW)
+    held = [pool.connect() for _ in range(1 + DB_MAX_OVERFLOW)]
+    stats = health.pool_stats(pool)
+    assert stats["checked_out"] == 1 + DB_MAX_OVERFLOW and stats["overflow"] == DB_MAX_OVERFLOW
+    assert stats["saturated"] is True
+    held.pop().close()
+    assert health.pool_stats(pool)["saturated"] is False
+    for c in held:
+        c.close()
+    assert health.pool_stats(NullPool(lambda: sqlite3.connect(":memory:"))) == {"class": "NullPool"}
+
+
+def test_readiness_is_503_when_the_pool_is_saturated(client, monkeypatch):
+    assert client.get("/health/ready").status_code == 200
+    monkeypatch.setattr(health, "pool_stats", lambda pool: {"class": "QueuePool", "saturated": True})
+    r = client.get("/health/ready")
+    assert r.status_code == 503 and r.json()["database"]["ok"] is True      # dernier résultat connu
+
+
+def test_readiness_is_503_when_the_async_pool_is_saturated(client, monkeypatch, query_budget):
+    pool = QueuePool(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=DB_MAX_OVERFLOW)
+    held = [pool.connect() for _ in range(1 + DB_MAX_OVERFLOW)]
+    monkeypatch.setattr(database, "_async_engine", SimpleNamespace(pool=pool))
+    try:
+        # pas de SELECT 1 : il attendrait une connexion libre
+        with query_budget(0):
+            r = client.get("/health/ready")
+        body = r.json()
+        assert r.status_code == 503 and body["status"] == "unavailable"
+        assert body["async_pool"]["saturated"] is True and body["pool"]["saturated"] is False
+        assert body["database"] is None
+    finally:
+        for c in held:
+            c.close()
+    assert client.get("/health/ready").json()["async_pool"]["saturated"] is False
@@ -0,0 +1,80 @@
+from app.models.booking import Booking
+from app.models.offer import Offer
+from app.models.timeslot import Timeslot
+from app.services.auth import create_access_token
+
+
+def auth_hdr(user, key=None):
+    headers = {"Authorization": f"Bearer {create_access_token(user)}"}
+    if key:
+        headers["Idempotency-Key"] = key
+    return headers
+
+
+OFFER = {"subject": "Maths", "price_hour": 25}
+
+
+def test_retried_offer_is_created_once(client, db_session, tutor_user):
+    first = client.post("/offers/", headers=auth_hdr(tutor_user, "k-1"), json=OFFER)
+    retry = client.post("/offers/", headers=auth_hdr(tutor_user, "k-1"), json=OFFER)
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert "idempotent-replayed" not in first.headers
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert db_session.query(Offer).count() == 1
+
+
+def test_without_key_each_call_creates(client, db_session, tutor_user):
+    for _ in range(2):
+        assert client.post("/offers/", headers=auth_hdr(tutor_user), json=OFFER).status_code == 201
+    assert db_session.query(Offer).count() == 2
+
+
+def test_key_reused_for_another_request_is_rejected(client, tutor_user):
+    assert client.post("/offers/", headers=auth_hdr(tutor_user, "k-1"), json=OFFER).status_code == 201
+    r = client.post("/offers/", headers=auth_hdr(tutor_user, "k-1"), json={**OFFER, "price_hour": 30})
+    assert r.status_code == 422
+
+
+def test_keys_are_scoped_per_user(client, db_session, tutor_user):
+    from app.models.user import User, UserRole
+    other = User(first_name="C", last_name="Tutor", email="c.tutor@test.com", role=UserRole.tutor)
+    db_session.add(other); db_session.commit()
+    for user in (tutor_user, other):
+        r = client.post("/offers/", headers=auth_hdr(user, "same-key"), json=OFFER)
+        assert r.status_code == 201 and "idempotent-replayed" not in r.headers
+    assert db_session.query(Offer).count() == 2
+
+
+def test_retried_booking_replays_the_first_outcome(client, db_session, tutor_user, student_user):
+    from datetime import datetime
+    offer = Offer(tutor_id=tutor_user.id, subject="Maths", price_hour=25)
+    db_session.add(offer); db_session.flush()
+    slot = Timeslot(offer_id=offer.id, start_utc=datetime(2030, 1, 1, 10), end_utc=datetime(2030, 1, 1, 11))
+    db_session.add(slot); db_session.commit()
+    body = {"offer_id": offer.id, "timeslot_id": slot.id}
+
+    first = client.post("/bookings/", headers=auth_hdr(student_user, "b-1"), json=body)
+    retry = client.post("/bookings/", headers=auth_hdr(student_user, "b-1"), json=body)
+    assert first.status_code == retry.status_code == 201
+    assert retry.json()["id"] == first.json()["id"]
+    assert db_session.query(Booking).count() == 1
+
+    # une erreur 4xx est rejouée elle aussi, sans retenter l'écriture
+    conflict = client.post("/bookings/", headers=auth_hdr(student_user, "b-2"), json=body)
+    assert conflict.status_code == 409
+    replay = client.post("/bookings/", headers=auth_hdr(student_user, "b-2"), json=body)
+    assert replay.status_code == 409 and replay.json() == conflict.json()
+    assert replay.headers["idempotent-replayed"] == "true"
+
+
+def test_invalid_key(client, tutor_user):
+    r = client.post("/offers/", headers=auth_hdr(tutor_user, "x" * 300), json=OFFER)
+    assert r.status_code == 400
+
+
+def test_deleting_a_user_removes_their_keys(client, db_session, tutor_user):
+    from app.models.idempotency_key import IdempotencyKey
+    assert client.post("/offers/", headers=auth_hdr(tutor_user, "k-1"), json=OFFER).status_code == 201
+    assert client.delete(f"/users/{tutor_user.id}").status_code == 200
+    assert db_session.query(IdempotencyKey).count() == 0
@@ -0,0 +1,84 @@
+import logging
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.models.offer import Offer
+from app.services import instrumentation
+from app.services.auth import create_access_token
+from app.services.metrics import route_metrics
+
+
+def sample(text: str, line_prefix: str) -> float:
+    values = [float(l.rsplit(" ", 1)[1]) for l in text.splitlines() if l.startswith(line_prefix)]
+    assert len(values) == 1, line_prefix
+    return values[0]
+
+
+def test_metrics_are_grouped_by_route_template(client, tutor_user, student_user):
+    for user in (tutor_user, student_user):
+        assert client.get(f"/offers/by-tutor/{user.id}").status_code == 200
+    assert client.get("/offers/by-tutor/x", params={"limit": 0}).status_code == 422
+
+    text = client.get("/metrics").text
+    labels = 'method="GET",route="/offers/by-tutor/{tutor_id}"'
+    assert sample(text, f'http_requests_total{{{labels},status="200"}}') == 2
+    assert sample(text, f'http_requests_total{{{labels},status="422"}}') == 1
+    assert sample(text, f'http_request_duration_seconds_count{{{labels}}}') == 3
+    assert sample(text, f'http_request_sql_statements_sum{{{labels}}}') >= 2
+    assert sample(text, f'http_response_bytes_total{{{labels}}}') > 0
+    assert tutor_user.id not in text
+
+
+def test_server_timing_reports_sql(client, tutor_user):
+    r = client.get(f"/offers/by-tutor/{tutor_user.id}")
+    timing = r.headers["server-timing"]
+    assert timing.startswith("db;dur=") and 'desc="1 queries"' in timing and "app;dur=" in timing
+
+
+def test_streamed_responses_are_measured(client, db_session, tutor_user):
+    db_session.add(Offer(tutor_id=tutor_user.id, subject="Maths", price_hour=20))
+    db_session.commit()
+    r = client.get("/export/offers.ndjson", headers={"Authorization": f"Bearer {create_access_token(tutor_user)}",
+                                                       "Accept-Encoding": "identity"})
+    assert r.status_code == 200
+    text = client.get("/metrics").text
+    assert sample(text, 'http_response_bytes_total{method="GET",route="/export/{dataset}.{fmt}"}') == len(r.content)
+
+
+def test_password_hash_time_is_recorded(client):
+    r = client.post("/auth/register", json={"email": "new@test.com", "password": "secret",
+                                            "first_name": "N", "last_name": "U", "role": "student"})
+    assert r.status_code == 200
+    assert "hash;dur=" in r.headers["server-timing"]
+    text = client.get("/metrics").text
+    assert sample(text, 'http_request_password_hash_seconds_total{method="POST",route="/auth/register"}') > 0
+
+
+def test_slow_queries_are_logged_with_parameters(client, tutor_user, monkeypatch, caplog):
+    monkeypatch.setattr(instrumentation, "SLOW_QUERY_MS", 1e-6)
+    with caplog.at_level(logging.WARNING, logger=instrumentation.__name__):
+        client.get(f"/offers/by-tutor/{tutor_user.id}")
+    assert any(tutor_user.id in r.getMessage() for r in caplog.records)
+
+    monkeypatch.setattr(instrumentation, "SLOW_QUERY_MS", 0)
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger=instrumentation.__name__):
+        client.get(f"/offers/by-tutor/{tutor_user.id}")
+    assert not caplog.records
+
+
+def test_unknown_paths_share_one_series(client):
+    client.get("/nope/1")
+    client.get("/nope/2")
+    assert sample(route_metrics.render(), 'http_requests_total{method="GET",route="<unmatched>",status="404"}') == 2
+
+
+def test_failed_queries_leave_nothing_on_the_connection(test_engine):
+    with test_engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing_table"))
+        conn.rollback()
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+        assert "query_started_at" not in conn.info
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+import pytest
+from app.models.booking import Booking
+from app.models.offer import Offer
+from app.models.timeslot import Timeslot
+from app.services.auth import create_access_token
+from app.services.pagination import encode_cursor, decode_cursor
+
+def _walk(client, path, limit, headers=None):
+    # Parcourt toutes les pages en suivant next_cursor
+    ids, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        r = client.get(path, params=params, headers=headers)
+        assert r.status_code == 200, r.text
+        body = r.json()
+        ids += [it["id"] for it in body["items"]]
+        pages += 1
+        cursor = body["next_cursor"]
+        if not cursor:
+            return ids, pages
+
+def test_cursor_roundtrip_keeps_types():
+    values = [datetime(2030, 1, 1, 9, 30), "abc"]
+    assert decode_cursor(encode_cursor(values)) == values
+    with pytest.raises(ValueError):
+        decode_cursor("pas-un-curseur")
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(["a"]), size=2)
+
+def test_bookings_newest_first_without_gaps(client, db_session, tutor_user, student_user):
+    offer = Offer(tutor_id=tutor_user.id, subject="Maths", price_hour=20)
+    db_session.add(offer); db_session.commit()
+    t0 = datetime(2030, 1, 1)
+    # Deux réservations par instant : l'id doit départager sans doublon ni trou
+    bookings = [Booking(offer_id=offer.id, student_id=student_user.id, created_at=t0 + timedelta(minutes=i // 2))
+                for i in range(11)]
+    db_session.add_all(bookings); db_session.commit()
+    expected = [b.id for b in sorted(bookings, key=lambda b: (b.created_at, b.id), reverse=True)]
+
+    ids, pages = _walk(client, f"/bookings/by-offer/{offer.id}", limit=3)
+    assert ids == expected and pages == 4
+
+    hdr = {"Authorization": f"Bearer {create_access_token(student_user)}"}
+    ids, _ = _walk(client, "/bookings/list/mine", limit=4, headers=hdr)
+    assert ids == expected
+
+def test_timeslots_in_start_order(client, db_session, tutor_user):
+    offer = Offer(tutor_id=tutor_user.id, subject="Maths", price_hour=20)
+    db_session.add(offer); db_session.commit()
+    start = datetime(2030, 1, 1, 9)
+    slots = [Timeslot(offer_id=offer.id, start_utc=start + timedelta(hours=h), end_utc=start + timedelta(hours=h + 1))
+             for h in (5, 1, 3, 0, 4, 2)]
+    db_session.add_all(slots); db_session.commit()
+
+    ids, _ = _walk(client, f"/timeslots/of-offer/{offer.id}", limit=4)
+    assert ids == [s.id for s in sorted(slots, key=lambda s: s.start_utc)]
+
+def test_invalid_cursor_and_limit(client, tutor_user):
+    assert client.get(f"/offers/by-tutor/{tutor_user.id}", params={"cursor": "%%%"}).status_code == 400
+    assert client.get(f"/offers/by-tutor/{tutor_user.id}", params={"limit": 1000}).status_code == 422
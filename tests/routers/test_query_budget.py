@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+
+from app.models.offer import Offer
+from app.models.tutor_profile import TutorProfile
+from app.models.user import User
+from app.services.auth import create_access_token
+
+
+@pytest.fixture
+def tutor_with_offers(db_session, tutor_user):
+    tutor_user.postal_code, tutor_user.department = "75011", "75"
+    db_session.add(TutorProfile(user_id=tutor_user.id, bio="Prof de maths"))
+    db_session.add_all(Offer(tutor_id=tutor_user.id, subject=f"Sujet {i}", price_hour=20 + i) for i in range(5))
+    db_session.commit()
+    return tutor_user
+
+
+def test_relationships_are_never_loaded_implicitly(db_session, tutor_with_offers):
+    tutor_id = tutor_with_offers.id
+    db_session.expunge_all()
+    user = db_session.get(User, tutor_id)
+    with pytest.raises(InvalidRequestError):
+        user.offers
+    with pytest.raises(InvalidRequestError):
+        user.tutor_profile
+
+
+@pytest.mark.parametrize("path, budget", [
+    ("/auth/me", 1),
+    ("/users/", 1),
+    ("/users/{id}", 1),
+    ("/offers/recommendations", 4),           # profil + historique, snapshot (2), offres retenues
+    ("/search/tutors?postal_code=75011", 2),   # index de facettes (construction) + page tutor_search
+    ("/search/tutors?postal_code=75011&radius_km=10", 3),   # + construction de l'index géo
+    ("/search/tutors?postal_code=75011&subject=sujet&max_price=22&sort=price&min_rating=0", 2),
+])
+def test_read_routes_stay_within_budget(client, tutor_with_offers, query_budget, path, budget):
+    hdr = {"Authorization": f"Bearer {create_access_token(tutor_with_offers)}"}
+    with query_budget(budget):
+        r = client.get(path.format(id=tutor_with_offers.id), headers=hdr)
+    assert r.status_code == 200, r.text
+
+
+def test_search_reads_offers_from_the_read_model(client, tutor_with_offers, query_budget):
+    client.get("/search/tutors", params={"postal_code": "75011"})      # construit l'index de facettes
+    # index construit : seule la page est lue
+    with query_budget(1):
+        tutors = client.get("/search/tutors", params={"postal_code": "75011", "sort": "price"}).json()["data"]
+    assert tutors[0]["hourly_rate"] == 20
+    assert tutors[0]["subjects"].startswith("Sujet 0")
+
+
+def test_login_and_review_budgets(client, tutor_with_offers, student_user, query_budget):
+    with query_budget(1):
+        r = client.post("/auth/token", json={"email": student_user.email, "password": "pass"})
+    assert r.status_code == 200
+    hdr = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    url = f"/reviews/for/{tutor_with_offers.id}"
+    # rôle du tuteur (projection) + insertion + agrégat de notes + note de tutor_search + relecture
+    with query_budget(5):
+        r = client.post(url, headers=hdr, json={"rating": 5})
+    assert r.status_code == 200, r.text
+
+
+def test_delete_user_loads_offers_explicitly(client, db_session, tutor_user):
+    db_session.add_all(Offer(tutor_id=tutor_user.id, subject=f"Sujet {i}", price_hour=20) for i in range(3))
+    db_session.commit()
+    r = client.delete(f"/users/{tutor_user.id}")
+    assert r.status_code == 200 and r.json()["email"] == tutor_user.email
+    assert db_session.query(Offer).count() == 0
@@ -0,0 +1,113 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models.offer import Offer
+from app.models.timeslot import Timeslot
+from app.models.user import User, UserRole
+from app.services.auth import create_access_token
+
+START = datetime(2030, 1, 7, 9)      # lundi
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat()
+
+@pytest.fixture
+def tutor(client, db_session, tutor_user):
+    tutor_user.department = "75"
+    maths = Offer(tutor_id=tutor_user.id, subject="Maths", price_hour=25)
+    piano = Offer(tutor_id=tutor_user.id, subject="Piano", price_hour=30)
+    db_session.add_all([maths, piano]); db_session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(tutor_user)}"}
+    return headers, maths.id, piano.id
+
+def _create(client, headers, offer_id, start, hours=1):
+    return client.post("/timeslots/", headers=headers, json={
+        "offer_id": offer_id, "start_utc": _iso(start), "end_utc": _iso(start + timedelta(hours=hours))})
+
+def test_overlap_is_rejected_across_offers(client, tutor):
+    headers, maths, piano = tutor
+    assert _create(client, headers, maths, START, hours=2).status_code == 200
+    r = _create(client, headers, piano, START + timedelta(hours=1))
+    assert r.status_code == 409
+    # bout à bout : accepté
+    assert _create(client, headers, piano, START + timedelta(hours=2)).status_code == 200
+    # fuseau converti en UTC : 10h+01:00 = 9h UTC -> chevauche
+    r = client.post("/timeslots/", headers=headers, json={
+        "offer_id": piano, "start_utc": "2030-01-07T10:30:00+01:00", "end_utc": "2030-01-07T11:00:00+01:00"})
+    assert r.status_code == 409
+
+def test_create_validation(client, tutor):
+    headers, maths, _ = tutor
+    assert _create(client, headers, maths, START, hours=-1).status_code == 400
+    assert _create(client, headers, maths, START, hours=13).status_code == 400
+    assert _create(client, headers, "unknown", START).status_code == 404
+
+def test_free_slots_window(client, db_session, tutor):
+    headers, maths, piano = tutor
+    db_session.add_all([
+        Timeslot(offer_id=maths, start_utc=START, end_utc=START + timedelta(hours=1), is_booked=True),
+        Timeslot(offer_id=maths, start_utc=START + timedelta(days=1), end_utc=START + timedelta(days=1, hours=1)),
+        Timeslot(offer_id=piano, start_utc=START + timedelta(days=2), end_utc=START + timedelta(days=2, hours=1)),
+        Timeslot(offer_id=maths, start_utc=START + timedelta(days=60), end_utc=START + timedelta(days=60, hours=1)),
+    ])
+    db_session.commit()
+
+    params = {"from": _iso(START - timedelta(days=1))}
+    items = client.get("/timeslots/free", params={**params, "offer_id": maths}).json()["items"]
+    assert [i["start_utc"][:10] for i in items] == ["2030-01-08"]
+    items = client.get("/timeslots/free", params={**params, "offer_id": maths, "to": _iso(START + timedelta(days=90))}).json()["items"]
+    assert len(items) == 2
+    tutor_id = db_session.get(Offer, maths).tutor_id
+    items = client.get("/timeslots/free", params={**params, "tutor_id": tutor_id}).json()["items"]
+    assert {i["offer_id"] for i in items} == {maths, piano}
+
+    assert client.get("/timeslots/free").status_code == 400
+    assert client.get("/timeslots/free", params={"offer_id": maths, "from": _iso(START), "to": _iso(START)}).status_code == 400
+
+def test_search_open_slots(client, db_session, tutor):
+    headers, maths, piano = tutor
+    other = User(email="lyon@test.com", role=UserRole.tutor, department="69")
+    db_session.add(other); db_session.flush()
+    lyon = Offer(tutor_id=other.id, subject="Mathématiques", price_hour=20)
+    db_session.add(lyon); db_session.flush()
+    for i, offer_id in enumerate([maths, piano, lyon.id]):
+        db_session.add(Timeslot(offer_id=offer_id, start_utc=START + timedelta(hours=i),
+                                end_utc=START + timedelta(hours=i + 1)))
+    db_session.commit()
+
+    params = {"from": _iso(START - timedelta(days=1))}
+    items = client.get("/timeslots/search", params={**params, "subject": "math"}).json()["items"]
+    assert [(i["subject"], i["department"]) for i in items] == [("Maths", "75"), ("Mathématiques", "69")]
+    assert items[0]["price_hour"] == 25.0
+    items = client.get("/timeslots/search", params={**params, "subject": "math", "department": "69"}).json()["items"]
+    assert [i["offer_id"] for i in items] == [lyon.id]
+
+    page = client.get("/timeslots/search", params={**params, "limit": 2}).json()
+    rest = client.get("/timeslots/search", params={**params, "limit": 2, "cursor": page["next_cursor"]}).json()
+    assert len(page["items"]) == 2 and len(rest["items"]) == 1 and rest["next_cursor"] is None
+
+def test_recurring_generation(client, db_session, tutor):
+    headers, maths, piano = tutor
+    # un créneau existant le mercredi 09/01 à 17h UTC (18h Paris)
+    _create(client, headers, piano, datetime(2030, 1, 9, 17))
+    payload = {"offer_id": maths, "weekdays": [0, 2], "start_time": "18:00", "duration_minutes": 60,
+               "from_date": "2030-01-07", "to_date": "2030-01-20"}
+    r = client.post("/timeslots/recurring", headers=headers, json=payload)
+    assert r.status_code == 201 and r.json() == {"created": 3, "skipped": 1}
+    # relancer la même génération ne crée rien
+    assert client.post("/timeslots/recurring", headers=headers, json=payload).json() == {"created": 0, "skipped": 4}
+
+    starts = sorted(s for (s,) in db_session.query(Timeslot.start_utc).filter(Timeslot.offer_id == maths))
+    assert starts == [datetime(2030, 1, 7, 17), datetime(2030, 1, 14, 17), datetime(2030, 1, 16, 17)]
+
+def test_recurring_validation(client, tutor, student_user):
+    headers, maths, _ = tutor
+    payload = {"offer_id": maths, "weekdays": [7], "start_time": "18:00", "duration_minutes": 60,
+               "from_date": _iso(date(2030, 1, 7)), "to_date": _iso(date(2030, 1, 20))}
+    assert client.post("/timeslots/recurring", headers=headers, json=payload).status_code == 400
+    payload["weekdays"] = [0]
+    assert client.post("/timeslots/recurring", headers=headers, json={**payload, "timezone": "Mars/Olympus"}).status_code == 400
+    assert client.post("/timeslots/recurring", headers=headers, json={**payload, "to_date": "2032-01-01"}).status_code == 400
+    student = {"Authorization": f"Bearer {create_access_token(student_user)}"}
+    assert client.post("/timeslots/recurring", headers=student, json=payload).status_code == 403
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.offer import Offer
+from app.models.timeslot import Timeslot
+from app.models.tutor_profile import TutorProfile
+from app.models.user import User, UserRole
+from app.services.auth import create_access_token
+
+
+def _auth(user):
+    return {"Authorization": f"Bearer {create_access_token(user)}"}
+
+
+def _slot(offer_id, start, **kw):
+    return Timeslot(offer_id=offer_id, start_utc=start, end_utc=start + timedelta(hours=1), **kw)
+
+
+@pytest.fixture
+def tutors(db_session, tutor_user):
+    """
+    Alice (profil, 2 offres, créneaux passés/réservés/lointains) et Carl (sans profil ni créneau).
+    """
+    soon = datetime.utcnow().replace(microsecond=0) + timedelta(days=1)
+    carl = User(first_name="Carl", last_name="Tutor", email="carl@test.com", role=UserRole.tutor)
+    db_session.add_all([carl, TutorProfile(user_id=tutor_user.id, bio="Pianiste")]); db_session.flush()
+    maths = Offer(tutor_id=tutor_user.id, subject="Maths", price_hour=25)
+    piano = Offer(tutor_id=tutor_user.id, subject="Piano", price_hour=30)
+    db_session.add_all([maths, piano, Offer(tutor_id=carl.id, subject="Chimie", price_hour=20)]); db_session.flush()
+    db_session.add_all([
+        _slot(maths.id, soon - timedelta(days=2)),                  # passé
+        _slot(maths.id, soon, is_booked=True),                      # réservé
+        *(_slot(maths.id, soon + timedelta(hours=h)) for h in range(1, 6)),
+        _slot(piano.id, soon + timedelta(days=60)),                 # hors horizon
+    ])
+    db_session.commit()
+    return tutor_user, carl, maths, piano, soon
+
+
+def test_card_content(client, tutors):
+    alice, _, maths, piano, soon = tutors
+    card = client.get(f"/tutors/{alice.id}/card").json()
+    assert (card["first_name"], card["profile"]["bio"]) == ("Alice", "Pianiste")
+    assert card["rating"]["rating_count"] == 0
+    offers = {o["id"]: o for o in card["offers"]}
+    assert set(offers) == {maths.id, piano.id}
+    starts = [s["start_utc"] for s in offers[maths.id]["next_slots"]]
+    assert starts == [(soon + timedelta(hours=h)).isoformat() for h in (1, 2, 3)]
+    assert offers[piano.id]["next_slots"] == []
+
+    assert client.get("/tutors/unknown/card").status_code == 404
+
+
+def test_batch_keeps_order_and_fixed_query_count(client, student_user, tutors, query_budget):
+    alice, carl = (t.id for t in tutors[:2])
+    student = student_user.id
+    with query_budget(3):
+        r = client.get("/tutors/cards", params={"ids": [carl, "unknown", student, alice]})
+    assert r.status_code == 200
+    cards = r.json()
+    assert [c["tutor_id"] for c in cards] == [carl, alice]
+    assert cards[0]["profile"] is None and cards[0]["offers"][0]["next_slots"] == []
+
+    # cartes en cache une par tuteur : 0 requête, même sous-ensemble via la forme "a,b"
+    with query_budget(0):
+        again = client.get("/tutors/cards", params={"ids": f"{alice},{carl}"})
+        single = client.get(f"/tutors/{alice}/card", headers={"If-None-Match": again.headers["etag"]})
+    assert [c["tutor_id"] for c in again.json()] == [alice, carl]
+    assert single.status_code == 200
+    assert client.get(f"/tutors/{alice}/card", headers={"If-None-Match": single.headers["etag"]}).status_code == 304
+
+    assert client.get("/tutors/cards", params={"ids": ",".join(map(str, range(101)))}).status_code == 400
+
+
+def test_writes_refresh_cards(client, student_user, tutors):
+    alice, _, maths, piano, soon = tutors
+    url = f"/tutors/{alice.id}/card"
+
+    def next_slots(offer_id):
+        return {o["id"]: o["next_slots"] for o in client.get(url).json()["offers"]}[offer_id]
+
+    first = next_slots(maths.id)[0]
+    r = client.post("/bookings/", headers=_auth(student_user), json={"offer_id": maths.id, "timeslot_id": first["id"]})
+    assert r.status_code == 201
+    assert first["id"] not in [s["id"] for s in next_slots(maths.id)]
+
+    start = soon + timedelta(days=2)
+    r = client.post("/timeslots/", headers=_auth(alice), json={
+        "offer_id": piano.id, "start_utc": start.isoformat(), "end_utc": (start + timedelta(hours=1)).isoformat()})
+    assert r.status_code == 200
+    assert [s["start_utc"] for s in next_slots(piano.id)] == [start.isoformat()]
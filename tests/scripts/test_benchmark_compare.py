@@ -0,0 +1,57 @@
+import json
+
+from benchmarks import compare
+
+BASELINE = {
+    "config": {"database": "sqlite", "clients": 32},
+    "micro": {"jwt_decode_cached": {"per_op_us": 2.0, "ops_per_s": 500_000.0}},
+    "scenarios": {"search_heavy": {"count": 1000, "p95_ms": 50.0, "rps": 200.0, "queries_per_request": 1.2,
+                                   "error_rate": 0.0, "statuses": {"200": 1000}}},
+}
+
+
+def with_changes(**changes) -> dict:
+    current = json.loads(json.dumps(BASELINE))
+    current["scenarios"]["search_heavy"].update(changes)
+    return current
+
+
+def by_metric(rows):
+    return {r["metric"]: r for r in rows}
+
+
+def test_only_metrics_with_a_known_direction_are_compared():
+    metrics = set(by_metric(compare.compare(BASELINE, BASELINE)))
+    assert metrics == {
+        "micro.jwt_decode_cached.per_op_us", "micro.jwt_decode_cached.ops_per_s",
+        "scenarios.search_heavy.p95_ms", "scenarios.search_heavy.rps",
+        "scenarios.search_heavy.queries_per_request", "scenarios.search_heavy.error_rate",
+    }
+
+
+def test_regressions_respect_the_direction_of_each_metric():
+    rows = by_metric(compare.compare(BASELINE, with_changes(p95_ms=70.0, rps=150.0, queries_per_request=1.0)))
+    assert rows["scenarios.search_heavy.p95_ms"]["regression"]           # +40 % de latence
+    assert rows["scenarios.search_heavy.rps"]["regression"]              # -25 % de débit
+    assert not rows["scenarios.search_heavy.queries_per_request"]["regression"]   # amélioration
+    assert rows["scenarios.search_heavy.p95_ms"]["change"] == 0.4
+
+
+def test_changes_within_tolerance_pass():
+    rows = compare.compare(BASELINE, with_changes(p95_ms=55.0, rps=190.0), tolerance=0.2)
+    assert not any(r["regression"] for r in rows)
+
+
+def test_new_errors_are_a_regression():
+    rows = by_metric(compare.compare(BASELINE, with_changes(error_rate=0.01)))
+    assert rows["scenarios.search_heavy.error_rate"]["regression"]
+
+
+def test_cli_exit_code(tmp_path, capsys):
+    baseline, current = tmp_path / "baseline.json", tmp_path / "current.json"
+    baseline.write_text(json.dumps(BASELINE))
+    current.write_text(json.dumps(BASELINE))
+    assert compare.main([str(baseline), str(current)]) == 0
+    current.write_text(json.dumps(with_changes(p95_ms=100.0)))
+    assert compare.main([str(baseline), str(current)]) == 1
+    assert "régression" in capsys.readouterr().out
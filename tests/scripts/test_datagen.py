@@ -0,0 +1,44 @@
+import io
+from collections import Counter
+
+from sqlalchemy import create_engine, func, select
+
+from app.database import BaseSQL
+from app.models.offer import Offer
+from app.models.timeslot import Timeslot
+from app.models.tutor_rating import TutorRating
+from app.models.user import User, UserRole
+from app.services.geo_service import postal_code_to_department
+from app.services.passwords import check_password
+from scripts.datagen import GeneratorConfig, generate
+
+def _generate(path, **kwargs):
+    engine = create_engine(f"sqlite:///{path}")
+    BaseSQL.metadata.create_all(bind=engine)
+    counts = generate(engine, GeneratorConfig(users=600, tutors=120, batch_size=250, **kwargs), out=io.StringIO())
+    return engine, counts
+
+def test_generator_is_deterministic_and_consistent(tmp_path):
+    e1, counts = _generate(tmp_path / "a.db")
+    e2, _ = _generate(tmp_path / "b.db")
+    with e1.connect() as c1, e2.connect() as c2:
+        ids = select(User.id).order_by(User.email)
+        assert c1.execute(ids).scalars().all() == c2.execute(ids).scalars().all()
+
+        assert counts["users"] == 600
+        assert c1.execute(select(func.count()).where(User.role == UserRole.tutor)).scalar() == 120
+        users = c1.execute(select(User.postal_code, User.department, User.hashed_password)).all()
+        assert all(dep == postal_code_to_department(pc) for pc, dep, _ in users)
+        # Un seul hachage réutilisé, valide pour le mot de passe configuré
+        hashes = {h for _, _, h in users}
+        assert len(hashes) == 1 and check_password("pass", hashes.pop())
+
+        # Zipf : la plupart des tuteurs ont une seule offre, quelques-uns beaucoup plus
+        per_tutor = Counter(c1.execute(select(Offer.tutor_id)).scalars())
+        assert len(per_tutor) == 120
+        assert sum(1 for n in per_tutor.values() if n == 1) > 120 / 3 and max(per_tutor.values()) >= 4
+
+        # Créneaux réservés <-> réservation existante ; agrégats de notes recalculés
+        booked = c1.execute(select(func.count()).where(Timeslot.is_booked, Timeslot.booking_id.is_not(None))).scalar()
+        assert booked == c1.execute(select(func.count()).where(Timeslot.is_booked)).scalar()
+        assert c1.execute(select(func.sum(TutorRating.rating_count))).scalar() == counts["reviews"]
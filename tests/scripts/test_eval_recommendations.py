@@ -0,0 +1,12 @@
+import json
+
+from scripts import eval_recommendations
+
+def test_offline_evaluation_reports_all_rankers(capsys):
+    assert eval_recommendations.main(["--users", "600", "--tutors", "80", "--k", "5",
+                                      "--weight", "distance=0.5"]) == 0
+    out = json.loads(capsys.readouterr().out)
+    assert out["weights"]["distance"] == 0.5
+    assert set(out["results"]) == {"engine", "department", "random"}
+    engine = out["results"]["engine"]
+    assert engine["students"] > 0 and 0 <= engine["hit_rate@5"] <= 1
@@ -0,0 +1,5 @@
+from scripts import explain_audit
+
+def test_no_full_scan_on_list_routes(capsys):
+    # Jeu réduit : assez de lignes pour que chaque table dépasse le seuil
+    assert explain_audit.main(["--users", "1500", "--tutors", "300", "--min-rows", "200"]) == 0, capsys.readouterr().out
@@ -0,0 +1,28 @@
+from sqlalchemy import create_engine, inspect, select, text
+
+from app.database import BaseSQL
+from app.models.booking import Booking
+from scripts.migrate_columns import migrate
+
+def _legacy_engine(path):
+    # base créée avant bookings.created_at et offers.search_vector
+    engine = create_engine(f"sqlite:///{path}")
+    BaseSQL.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for index in Booking.__table__.indexes:
+            if "created_at" in index.columns:
+                conn.execute(text(f"DROP INDEX {index.name}"))
+        conn.execute(text("ALTER TABLE bookings DROP COLUMN created_at"))
+        conn.execute(text("ALTER TABLE offers DROP COLUMN search_vector"))
+        conn.execute(text("INSERT INTO bookings (id, offer_id, student_id, status) VALUES ('b-1', 'o-1', 'u-1', 'PENDING')"))
+    return engine
+
+def test_adds_and_backfills_missing_columns(tmp_path):
+    engine = _legacy_engine(tmp_path / "legacy.db")
+    assert migrate(engine) == ["bookings.created_at", "offers.search_vector"]
+
+    with engine.connect() as conn:
+        assert conn.execute(select(Booking.created_at)).scalar() is not None
+    indexes = {i["name"] for i in inspect(engine).get_indexes("bookings")}
+    assert "ix_bookings_created_at_id" in indexes
+    assert migrate(engine) == []            # relançable
@@ -0,0 +1,5 @@
+from benchmarks import startup
+
+def test_import_time_and_rss_stay_within_budget():
+    result = startup.measure(runs=1)
+    assert startup.over_budget(result) == [], result
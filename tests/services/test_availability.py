@@ -0,0 +1,47 @@
+import random
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.exceptions.timeslot import InvalidTimeslot
+from app.services import availability
+from app.services.availability import IntervalIndex
+
+T0 = datetime(2030, 1, 1)
+
+def _h(hours: float) -> datetime:
+    return T0 + timedelta(hours=hours)
+
+def test_interval_index_matches_brute_force():
+    rng = random.Random(7)
+    intervals = []
+    for _ in range(200):
+        s = rng.uniform(0, 500)
+        intervals.append((_h(s), _h(s + rng.uniform(0.25, 12))))
+    index = IntervalIndex(intervals)
+    for _ in range(500):
+        s = rng.uniform(-10, 510)
+        start, end = _h(s), _h(s + rng.uniform(0.25, 4))
+        assert index.overlaps(start, end) == any(a < end and start < b for a, b in intervals)
+
+def test_interval_index_is_half_open():
+    index = IntervalIndex([(_h(9), _h(10))])
+    assert not index.overlaps(_h(10), _h(11))      # bout à bout : pas de chevauchement
+    assert not index.overlaps(_h(8), _h(9))
+    assert index.overlaps(_h(9.5), _h(9.75))
+    assert not IntervalIndex([]).overlaps(_h(0), _h(1))
+
+def test_weekly_occurrences_follow_local_time_across_dst():
+    # Passage à l'heure d'été le dimanche 31/03/2030 : 18h locale = 17h puis 16h UTC
+    occ = list(availability.weekly_occurrences([0, 2], time(18), timedelta(hours=1),
+                                                date(2030, 3, 25), date(2030, 4, 3), ZoneInfo("Europe/Paris")))
+    assert [s for s, _ in occ] == [datetime(2030, 3, 25, 17), datetime(2030, 3, 27, 17),
+                                   datetime(2030, 4, 1, 16), datetime(2030, 4, 3, 16)]
+    assert all(e - s == timedelta(hours=1) for s, e in occ)
+
+def test_window_defaults_and_validation():
+    start, end = availability.window(T0, None)
+    assert end - start == timedelta(days=30)
+    with pytest.raises(InvalidTimeslot):
+        availability.window(T0, T0)
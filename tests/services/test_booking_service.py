@@ -0,0 +1,96 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import BaseSQL
+from app.exceptions.booking import TimeslotAlreadyBooked, TimeslotOfferMismatch
+from app.models.booking import Booking, BookingStatus
+from app.models.offer import Offer
+from app.models.timeslot import Timeslot
+from app.models.user import User, UserRole
+from app.services import booking as booking_service
+
+N_STUDENTS = 16
+
+def _slot(db, offer):
+    start = datetime(2030, 1, 1, 9)
+    ts = Timeslot(offer_id=offer.id, start_utc=start, end_utc=start + timedelta(hours=1))
+    db.add(ts); db.commit()
+    return ts
+
+def test_parallel_bookings_single_winner(tmp_path):
+    # Base fichier + une session par thread : de vraies transactions concurrentes
+    engine = create_engine(f"sqlite:///{tmp_path / 'race.db'}",
+                           connect_args={"check_same_thread": False, "timeout": 30})
+    BaseSQL.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = Session()
+    tutor = User(email="t@race.fr", role=UserRole.tutor)
+    students = [User(email=f"s{i}@race.fr", role=UserRole.student) for i in range(N_STUDENTS)]
+    db.add_all([tutor, *students]); db.commit()
+    offer = Offer(tutor_id=tutor.id, subject="Maths", price_hour=20)
+    db.add(offer); db.commit()
+    ts = _slot(db, offer)
+    student_ids, offer_id, ts_id = [s.id for s in students], offer.id, ts.id
+    db.close()
+
+    barrier = threading.Barrier(N_STUDENTS)
+    outcomes = []
+
+    def attempt(student_id):
+        s = Session()
+        try:
+            barrier.wait()
+            booking_service.create_booking(s, student_id=student_id, offer_id=offer_id, timeslot_id=ts_id)
+            outcomes.append("won")
+        except TimeslotAlreadyBooked:
+            outcomes.append("conflict")
+        finally:
+            s.close()
+
+    threads = [threading.Thread(target=attempt, args=(sid,)) for sid in student_ids]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+    assert sorted(outcomes) == ["conflict"] * (N_STUDENTS - 1) + ["won"]
+    db = Session()
+    assert db.query(Booking).count() == 1
+    slot = db.get(Timeslot, ts_id)
+    assert slot.is_booked and slot.booking_id == db.query(Booking).one().id
+    db.close()
+    engine.dispose()
+
+def test_timeslot_of_other_offer_rejected(db_session, tutor_user, student_user):
+    o1 = Offer(tutor_id=tutor_user.id, subject="A", price_hour=10)
+    o2 = Offer(tutor_id=tutor_user.id, subject="B", price_hour=10)
+    db_session.add_all([o1, o2]); db_session.commit()
+    ts = _slot(db_session, o2)
+    with pytest.raises(TimeslotOfferMismatch):
+        booking_service.create_booking(db_session, student_id=student_user.id, offer_id=o1.id, timeslot_id=ts.id)
+    assert db_session.query(Booking).count() == 0
+
+def test_reject_releases_slot(db_session, tutor_user, student_user):
+    offer = Offer(tutor_id=tutor_user.id, subject="A", price_hour=10)
+    db_session.add(offer); db_session.commit()
+    ts = _slot(db_session, offer)
+    bk = booking_service.create_booking(db_session, student_id=student_user.id, offer_id=offer.id, timeslot_id=ts.id)
+
+    bk = booking_service.decide_booking(db_session, booking_id=bk.id, tutor_id=tutor_user.id, action="reject")
+    assert bk.status == BookingStatus.REJECTED
+    db_session.refresh(ts)
+    assert ts.is_booked is False and ts.booking_id is None
+
+def test_booking_conflict_endpoint(client, db_session, tutor_user, student_user):
+    from app.services.auth import create_access_token
+    offer = Offer(tutor_id=tutor_user.id, subject="A", price_hour=10)
+    db_session.add(offer); db_session.commit()
+    ts = _slot(db_session, offer)
+    hdr = {"Authorization": f"Bearer {create_access_token(student_user)}"}
+    body = {"offer_id": offer.id, "timeslot_id": ts.id}
+    assert client.post("/bookings/", headers=hdr, json=body).status_code == 201
+    r = client.post("/bookings/", headers=hdr, json=body)
+    assert r.status_code == 409 and r.json()["detail"] == "Timeslot already booked"
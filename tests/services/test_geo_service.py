@@ -0,0 +1,65 @@
+from app.models.user import User, UserRole
+from app.services import geo_service
+from app.models.tutor_profile import TutorProfile
+from app.serializers.user import User as SerializersUser
+from app.services.geo_service import postal_code_to_department, centroid_for_postal_code, search_tutors
+from app.services.user import update_user
+
+def _tutor(db, email, postal_code):
+    u = User(first_name="T", last_name=email, email=email, role=UserRole.tutor,
+             postal_code=postal_code, department=postal_code_to_department(postal_code))
+    db.add(u); db.commit()
+    db.add(TutorProfile(user_id=u.id)); db.commit()
+    return u
+
+def _ids(db, postal_code, radius_km=None):
+    result = search_tutors(db, postal_code, radius_km)
+    return None if result is None else [t["user_id"] for t in result["items"]]
+
+def test_departments_and_centroids():
+    assert postal_code_to_department("75011") == "75"
+    assert postal_code_to_department("20000") == "2A"
+    assert postal_code_to_department("97400") == "974"
+    assert centroid_for_postal_code("75011") != centroid_for_postal_code("75")
+    assert centroid_for_postal_code("69123") == centroid_for_postal_code("69000")
+    assert centroid_for_postal_code("00000") is None
+
+def test_radius_crosses_department_border(db_session):
+    paris = _tutor(db_session, "paris@t.fr", "75011")
+    creteil = _tutor(db_session, "creteil@t.fr", "94000")
+    _tutor(db_session, "lyon@t.fr", "69001")
+
+    assert _ids(db_session, "75001") == [paris.id]
+
+    tutors = search_tutors(db_session, "75001", radius_km=20)["items"]
+    assert [t["user_id"] for t in tutors] == [paris.id, creteil.id]
+    assert tutors[0]["distance_km"] <= tutors[1]["distance_km"]
+    assert search_tutors(db_session, "00000", radius_km=20) is None
+
+def test_update_user_moves_tutor_in_index(db_session):
+    u = _tutor(db_session, "moving@t.fr", "13001")
+    assert _ids(db_session, "75001", radius_km=30) == []
+
+    update_user(u.id, db_session, SerializersUser(first_name="T", last_name="moving@t.fr",
+                                                  email="moving@t.fr", role=UserRole.tutor, postal_code="92000"))
+    assert _ids(db_session, "75001", radius_km=30) == [u.id]
+    assert _ids(db_session, "13001") == []
+
+def test_index_rebuilt_for_other_workers_writes(db_session, monkeypatch):
+    u = _tutor(db_session, "elsewhere@t.fr", "13001")
+    assert _ids(db_session, "75001", radius_km=30) == []
+    # déplacé par un autre worker : pas de on_user_saved dans ce processus
+    db_session.query(User).filter_by(id=u.id).update({"postal_code": "92000", "department": "92"})
+    db_session.commit()
+    assert _ids(db_session, "75001", radius_km=30) == []
+
+    monkeypatch.setattr(geo_service, "GEO_INDEX_REBUILD_SECONDS", 0)
+    assert _ids(db_session, "75001", radius_km=30) == [u.id]
+
+def test_search_endpoint_radius(client, db_session):
+    u = _tutor(db_session, "near@t.fr", "94000")
+    r = client.get("/search/tutors", params={"postal_code": "75001", "radius_km": 25})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["count"] == 1 and body["data"][0]["user_id"] == u.id
+    assert "distance_km" in body["data"][0]
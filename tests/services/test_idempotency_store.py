@@ -0,0 +1,125 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.exceptions.idempotency import IdempotencyKeyInProgress
+from app.models.idempotency_key import IdempotencyKey
+from app.models.offer import Offer
+from app.services import idempotency
+from app.services.tutor_search import track
+
+
+@pytest.fixture
+def sessions(test_engine, db_session):
+    factory = sessionmaker(bind=test_engine, autoflush=False)
+    track(factory)
+    return factory
+
+
+def test_concurrent_duplicates_wait_for_the_first(sessions, student_user):
+    calls = []
+
+    def handler():
+        calls.append(1)
+        time.sleep(0.3)
+        return 201, {"id": "b-1"}
+
+    results = []
+
+    def run():
+        with sessions() as db:
+            results.append(idempotency.execute(db, student_user.id, "k", "fp", handler))
+
+    threads = [threading.Thread(target=run) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert sorted(replayed for _, _, replayed in results) == [False, True, True]
+    assert all(body == {"id": "b-1"} for _, body, _ in results)
+
+
+def test_failure_releases_the_key(db_session, student_user):
+    def boom():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        idempotency.execute(db_session, student_user.id, "k", "fp", boom)
+    assert idempotency.execute(db_session, student_user.id, "k", "fp", lambda: (201, {"ok": 1})) == (201, {"ok": 1}, False)
+
+
+def test_server_errors_are_not_stored(db_session, student_user):
+    idempotency.execute(db_session, student_user.id, "k", "fp", lambda: (503, {"detail": "busy"}))
+    assert db_session.get(IdempotencyKey, (student_user.id, "k")) is None
+
+
+def test_in_flight_request_times_out(db_session, student_user):
+    now = datetime.utcnow()
+    db_session.add(IdempotencyKey(user_id=student_user.id, key="k", fingerprint="fp", created_at=now,
+                                  expires_at=now + timedelta(hours=1)))
+    db_session.commit()
+    with pytest.raises(IdempotencyKeyInProgress):
+        idempotency.execute(db_session, student_user.id, "k", "fp", lambda: (201, {}), wait_seconds=0.05)
+
+
+def test_expired_and_abandoned_keys_are_taken_over(db_session, student_user):
+    old = datetime.utcnow() - timedelta(hours=2)
+    db_session.add_all([
+        IdempotencyKey(user_id=student_user.id, key="expired", fingerprint="fp", status_code=201, body="{}",
+                       created_at=old, expires_at=old + timedelta(minutes=1)),
+        # en cours depuis plus de IDEMPOTENCY_STALE_SECONDS : worker mort
+        IdempotencyKey(user_id=student_user.id, key="abandoned", fingerprint="fp", created_at=old,
+                       expires_at=old + timedelta(days=1)),
+    ])
+    db_session.commit()
+    for key in ("expired", "abandoned"):
+        assert idempotency.execute(db_session, student_user.id, key, "fp", lambda: (201, {"new": 1}), wait_seconds=0) \
+            == (201, {"new": 1}, False)
+
+
+def test_write_and_response_are_committed_together(sessions, db_session, student_user, tutor_user):
+    # le traitement n'a pas validé : une reprise de la clé ne peut pas doubler l'écriture
+    def crash():
+        db_session.add(Offer(tutor_id=tutor_user.id, subject="Maths", price_hour=20))
+        db_session.flush()
+        raise KeyboardInterrupt     # worker interrompu entre l'écriture et la réponse
+
+    with pytest.raises(KeyboardInterrupt):
+        idempotency.execute(db_session, student_user.id, "k", "fp", crash)
+    with sessions() as other:
+        assert other.query(Offer).count() == 0
+
+
+def test_slow_first_request_yields_to_the_takeover(sessions, db_session, student_user, tutor_user):
+    def slow():
+        # pendant le traitement, une répétition a jugé la réservation abandonnée et l'a reprise
+        # (avant l'écriture : SQLite n'admet qu'une transaction d'écriture)
+        with sessions() as other:
+            other.query(IdempotencyKey).delete()
+            now = datetime.utcnow()
+            other.add(IdempotencyKey(user_id=student_user.id, key="k", fingerprint="fp", status_code=201,
+                                     body='{"id": "retry"}', created_at=now, expires_at=now + timedelta(hours=1)))
+            other.commit()
+        db_session.add(Offer(tutor_id=tutor_user.id, subject="Maths", price_hour=20))
+        db_session.flush()
+        return 201, {"id": "first"}
+
+    assert idempotency.execute(db_session, student_user.id, "k", "fp", slow) == (201, {"id": "retry"}, True)
+    assert db_session.query(Offer).count() == 0
+
+
+def test_purge_expired(db_session, student_user):
+    now = datetime.utcnow()
+    db_session.add_all([
+        IdempotencyKey(user_id=student_user.id, key="a", fingerprint="fp", created_at=now,
+                       expires_at=now - timedelta(seconds=1)),
+        IdempotencyKey(user_id=student_user.id, key="b", fingerprint="fp", created_at=now,
+                       expires_at=now + timedelta(hours=1)),
+    ])
+    db_session.commit()
+    assert idempotency.purge_expired(db_session) == 1
+    assert [k.key for k in db_session.query(IdempotencyKey)] == ["b"]
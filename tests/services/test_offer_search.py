@@ -0,0 +1,60 @@
+import pytest
+from app.models.offer import Offer
+from app.models.tutor_profile import TutorProfile
+from app.services.offer_search import normalize_text, tokenize, search_offers, index_offer
+
+def _offer(db, tutor, subject, description=None, price=20):
+    o = Offer(tutor_id=tutor.id, subject=subject, description=description, price_hour=price)
+    db.add(o); db.flush()
+    index_offer(db, o)
+    db.commit()
+    return o
+
+def test_normalize_strips_accents_and_case():
+    assert normalize_text("Mathématiques Cœur") == "mathematiques coeur"
+    assert tokenize("Français / Anglais (B2)") == ["francais", "anglais", "b2"]
+
+def test_search_accent_insensitive_and_prefix(db_session, tutor_user):
+    maths = _offer(db_session, tutor_user, "Mathématiques", "Analyse L1")
+    _offer(db_session, tutor_user, "Python", "Bases")
+
+    items, _ = search_offers(db_session, "mathematiques")
+    assert [o.id for o in items] == [maths.id]
+    items, _ = search_offers(db_session, "math")
+    assert [o.id for o in items] == [maths.id]
+    items, _ = search_offers(db_session, "MATH anal")
+    assert [o.id for o in items] == [maths.id]
+    assert search_offers(db_session, "math python")[0] == []
+
+def test_search_ranks_subject_before_description_and_bio(db_session, tutor_user):
+    db_session.add(TutorProfile(user_id=tutor_user.id, bio="Passionnée de physique"))
+    db_session.commit()
+    in_bio = _offer(db_session, tutor_user, "Chimie")
+    in_desc = _offer(db_session, tutor_user, "Sciences", "Physique-chimie niveau lycée")
+    in_subject = _offer(db_session, tutor_user, "Physique")
+
+    items, _ = search_offers(db_session, "physique")
+    assert [o.id for o in items] == [in_subject.id, in_desc.id, in_bio.id]
+
+def test_search_cursor_pagination(db_session, tutor_user):
+    ids = {_offer(db_session, tutor_user, f"Guitare {i}").id for i in range(5)}
+    seen, cursor = [], None
+    while True:
+        items, cursor = search_offers(db_session, "guitare", limit=2, cursor=cursor)
+        seen += [o.id for o in items]
+        if not cursor:
+            break
+    assert len(seen) == 5 and set(seen) == ids
+
+def test_search_invalid_cursor(db_session):
+    with pytest.raises(ValueError):
+        search_offers(db_session, "x", cursor="not-a-cursor")
+
+def test_list_offers_endpoint(client, db_session, tutor_user):
+    _offer(db_session, tutor_user, "Mathématiques")
+    r = client.get("/offers/", params={"q": "mathem", "limit": 1})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert [o["subject"] for o in body["items"]] == ["Mathématiques"]
+    assert body["next_cursor"] is None
+    assert client.get("/offers/", params={"cursor": "@@"}).status_code == 400
@@ -0,0 +1,42 @@
+import pytest
+from app.exceptions.auth import PasswordPoolSaturated
+from app.models.user import User, UserRole
+from app.services.auth import generate_access_token
+from app.services.passwords import hash_password, check_password, needs_rehash, PASSWORD_HASH_ITERATIONS
+from app.services.password_pool import PasswordPool, password_pool
+
+def test_pool_runs_and_records_metrics():
+    pool = PasswordPool(workers=1, max_pending=2)
+    try:
+        hp = pool.run(hash_password, "abc", 1000)
+        assert pool.run(check_password, "abc", hp) is True
+        stats = pool.stats()
+        assert stats["hash_seconds"]["count"] == 2
+        assert stats["pending"] == 0
+    finally:
+        pool.shutdown()
+
+def test_pool_rejects_when_saturated():
+    pool = PasswordPool(workers=0, max_pending=0, retry_after=3)
+    with pytest.raises(PasswordPoolSaturated) as exc:
+        pool.run(hash_password, "abc", 1000)
+    assert exc.value.retry_after == 3
+    assert pool.stats()["rejected"] == 1
+
+def test_login_rehashes_outdated_hash(db_session):
+    old = hash_password("pw", iterations=1000)
+    assert needs_rehash(old)
+    u = User(first_name="A", last_name="B", email="old@hash.fr", role=UserRole.student, hashed_password=old)
+    db_session.add(u); db_session.commit()
+
+    generate_access_token(db_session, email="old@hash.fr", password="pw")
+    db_session.refresh(u)
+    assert u.hashed_password != old
+    assert u.hashed_password.split("$")[1] == str(PASSWORD_HASH_ITERATIONS)
+    assert not needs_rehash(u.hashed_password)
+
+def test_token_endpoint_returns_503_when_saturated(client, student_user, monkeypatch):
+    monkeypatch.setattr(password_pool, "max_pending", 0)
+    r = client.post("/auth/token", json={"email": student_user.email, "password": "pass"})
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == str(password_pool.retry_after)
@@ -0,0 +1,74 @@
+from datetime import datetime
+
+from app.models.review import Review
+from app.models.tutor_profile import TutorProfile
+from app.models.tutor_rating import TutorRating
+from app.models.user import User, UserRole
+from app.services.auth import create_access_token
+from app.services.rating import record_review, get_summary, get_summaries, rebuild_ratings
+
+def _review(db, tutor, student, rating, when=None):
+    r = Review(tutor_id=tutor.id, student_id=student.id, rating=rating, created_at=when)
+    db.add(r); db.flush()
+    record_review(db, r)
+    db.commit()
+    return r
+
+def test_record_review_updates_aggregate(db_session, tutor_user, student_user):
+    _review(db_session, tutor_user, student_user, 5, datetime(2030, 1, 1))
+    _review(db_session, tutor_user, student_user, 4, datetime(2030, 1, 2))
+    _review(db_session, tutor_user, student_user, 4, datetime(2030, 1, 3))
+    _review(db_session, tutor_user, student_user, 3, datetime(2029, 12, 31))     # plus ancien
+
+    s = get_summary(db_session, tutor_user.id)
+    assert s["rating_count"] == 4
+    assert abs(s["rating_avg"] - 16 / 4) < 1e-9
+    assert s["histogram"] == {"1": 0, "2": 0, "3": 1, "4": 2, "5": 1}
+    assert s["last_review_at"] == datetime(2030, 1, 3)
+
+def test_rebuild_matches_incremental(db_session, tutor_user, student_user):
+    for rating in (1, 3, 5, 5):
+        _review(db_session, tutor_user, student_user, rating)
+    before = get_summary(db_session, tutor_user.id)
+
+    db_session.query(TutorRating).delete(); db_session.commit()
+    assert get_summary(db_session, tutor_user.id)["rating_count"] == 0
+    assert rebuild_ratings(db_session) == 1
+    assert get_summary(db_session, tutor_user.id) == before
+
+def test_full_rebuild_reaches_the_search_model(client, db_session, tutor_user, student_user):
+    tutor_user.postal_code, tutor_user.department = "75011", "75"
+    db_session.add(TutorProfile(user_id=tutor_user.id))
+    # avis existants sans agrégat (données antérieures à tutor_ratings)
+    db_session.add_all(Review(tutor_id=tutor_user.id, student_id=student_user.id, rating=r) for r in (4, 5))
+    db_session.commit()
+    params = {"postal_code": "75011", "min_rating": 4}
+    assert client.get("/search/tutors", params=params).json()["count"] == 0
+
+    assert rebuild_ratings(db_session) == 1
+    data = client.get("/search/tutors", params=params).json()["data"]
+    assert [(t["user_id"], t["rating_count"], t["rating_avg"]) for t in data] == [(tutor_user.id, 2, 4.5)]
+
+def test_batch_summaries_single_query(db_session, tutor_user, student_user, query_budget):
+    other = User(email="other@t.fr", role=UserRole.tutor)
+    db_session.add(other); db_session.commit()
+    _review(db_session, tutor_user, student_user, 2)
+    ids = [tutor_user.id, other.id, tutor_user.id]
+    db_session.expire_all()         # résumés lus en base, pas dans la session
+
+    with query_budget(1) as statements:
+        out = get_summaries(db_session, ids)
+    assert len(statements) == 1
+    assert list(out) == [tutor_user.id, other.id]
+    assert out[tutor_user.id]["rating_count"] == 1
+    assert out[other.id] == {"tutor_id": other.id, "rating_count": 0, "rating_avg": None,
+                             "histogram": {str(s): 0 for s in range(1, 6)}, "last_review_at": None}
+
+def test_review_endpoints(client, db_session, tutor_user, student_user):
+    hdr = {"Authorization": f"Bearer {create_access_token(student_user)}"}
+    assert client.post(f"/reviews/for/{tutor_user.id}", headers=hdr, json={"rating": 5}).status_code == 200
+    r = client.get(f"/reviews/of-tutor/{tutor_user.id}/summary")
+    assert r.json()["rating_count"] == 1 and r.json()["rating_avg"] == 5.0
+    r = client.get("/reviews/summaries", params={"tutor_ids": [tutor_user.id, "unknown"]})
+    assert r.status_code == 200
+    assert [s["rating_count"] for s in r.json()] == [1, 0]
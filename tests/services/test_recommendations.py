@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.models.booking import Booking
+from app.models.offer import Offer
+from app.models.review import Review
+from app.models.timeslot import Timeslot
+from app.models.user import User, UserRole
+from app.services.auth import create_access_token
+from app.services.rating import rebuild_ratings
+from app.services import recommendations
+from app.services.recommendations import FeatureSnapshot, StudentContext, rank, recommender, score
+
+PARIS, LILLE = (48.8566, 2.3522), (50.6292, 3.0573)
+
+
+def _snapshot(rows, free=None):
+    # (offer_id, tutor_id, subject, price, postal_code, department, rating_count, rating_sum)
+    return FeatureSnapshot.from_rows(rows, free or {})
+
+
+def test_each_signal_moves_the_ranking():
+    base = ("Maths", 30, "75011", "75", 0, 0)
+    snap = _snapshot([("near", "t1", *base), ("far", "t2", "Maths", 30, "59000", "59", 0, 0)])
+    ctx = StudentContext(user_id="s", location=PARIS)
+    assert rank(snap, ctx, 2) == ["near", "far"]
+
+    snap = _snapshot([("meh", "t1", *base[:4], 10, 25), ("top", "t2", *base[:4], 10, 50)])
+    assert rank(snap, StudentContext(user_id="s"), 2) == ["top", "meh"]
+
+    snap = _snapshot([("piano", "t1", "Piano", 30, "75011", "75", 0, 0), ("maths", "t2", *base)])
+    ctx = StudentContext(user_id="s", subject_counts={"maths": 2}, prices=[30])
+    assert rank(snap, ctx, 2) == ["maths", "piano"]
+
+    snap = _snapshot([("cheap", "t1", "Maths", 15, "75011", "75", 0, 0), ("usual", "t2", "Maths", 60, "75011", "75", 0, 0)])
+    assert rank(snap, StudentContext(user_id="s", prices=[55, 65]), 2) == ["usual", "cheap"]
+
+    snap = _snapshot([("busy", "t1", *base), ("free", "t2", *base)], free={"t2": 8})
+    assert rank(snap, StudentContext(user_id="s"), 2) == ["free", "busy"]
+
+
+def test_rank_excludes_booked_and_own_offers():
+    snap = _snapshot([(f"o{i}", f"t{i % 3}", "Maths", 20 + i, "75011", "75", 0, 0) for i in range(9)])
+    ctx = StudentContext(user_id="t0", booked_offer_ids={"o1"})
+    ids = rank(snap, ctx, 10)
+    assert len(ids) == 5 and "o1" not in ids and not {"o0", "o3", "o6"} & set(ids)
+    assert rank(_snapshot([]), ctx, 3) == []
+
+
+def test_scores_are_vectorized_and_bounded():
+    rng = np.random.default_rng(1)
+    rows = [(f"o{i}", f"t{i}", f"S{i % 20}", float(rng.uniform(10, 80)), "75011" if i % 2 else None,
+             "75", int(rng.integers(0, 30)), 0) for i in range(2000)]
+    rows = [(*r[:7], r[6] * 4) for r in rows]
+    snap = _snapshot(rows)
+    s = score(snap, StudentContext(user_id="s", location=LILLE, subject_counts={"s3": 1}, prices=[25]))
+    assert s.shape == (2000,) and np.all(np.isfinite(s)) and s.min() >= 0 and s.max() <= 1
+
+
+@pytest.fixture
+def market(db_session, student_user):
+    student_user.postal_code, student_user.department = "75011", "75"
+    tutors = [User(email=f"t{i}@test.com", role=UserRole.tutor, postal_code=pc, department=pc[:2])
+              for i, pc in enumerate(["75012", "75015", "59000"])]
+    db_session.add_all(tutors); db_session.flush()
+    offers = {
+        "history": Offer(tutor_id=tutors[0].id, subject="Piano", price_hour=30),
+        "piano_near": Offer(tutor_id=tutors[1].id, subject="Piano", price_hour=32),
+        "maths_near": Offer(tutor_id=tutors[1].id, subject="Maths", price_hour=90),
+        "piano_far": Offer(tutor_id=tutors[2].id, subject="Piano", price_hour=30),
+    }
+    db_session.add_all(offers.values()); db_session.flush()
+    db_session.add(Booking(offer_id=offers["history"].id, student_id=student_user.id))
+    start = datetime.utcnow() + timedelta(days=2)
+    db_session.add(Timeslot(offer_id=offers["piano_near"].id, start_utc=start, end_utc=start + timedelta(hours=1)))
+    db_session.add(Review(tutor_id=tutors[1].id, student_id=student_user.id, rating=5))
+    db_session.commit()
+    rebuild_ratings(db_session)
+    return {name: o.id for name, o in offers.items()}
+
+
+def test_recommendations_route(client, market, student_user, query_budget):
+    headers = {"Authorization": f"Bearer {create_access_token(student_user)}"}
+    r = client.get("/offers/recommendations", headers=headers, params={"limit": 3})
+    assert r.status_code == 200
+    # même matière au prix habituel > offre proche d'une autre matière, trois fois plus chère
+    assert [o["id"] for o in r.json()] == [market["piano_near"], market["piano_far"], market["maths_near"]]
+    # snapshot en mémoire : profil + historique, puis offres retenues
+    with query_budget(2):
+        assert len(client.get("/offers/recommendations", headers=headers).json()) == 3
+
+
+def test_snapshot_refresh(db_session, market, monkeypatch):
+    first = recommender.snapshot(db_session)
+    assert recommender.snapshot(db_session) is first
+    monkeypatch.setattr(recommender, "refresh_seconds", 0)
+    assert recommender.snapshot(db_session) is not first
+
+
+def test_concurrent_cold_start_builds_once(client, market, student_user, concurrent_get, monkeypatch):
+    builds = []
+    monkeypatch.setattr(recommendations, "load_snapshot",
+                        lambda db, _load=recommendations.load_snapshot: builds.append(1) or _load(db))
+    headers = {"Authorization": f"Bearer {create_access_token(student_user)}"}
+    responses = concurrent_get("/offers/recommendations", 4, headers=headers)
+    assert [r.status_code for r in responses] == [200] * 4
+    assert len(builds) == 1
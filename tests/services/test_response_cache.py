@@ -0,0 +1,54 @@
+import time
+
+from app.services.response_cache import MemoryBackend, ResponseCache, etag_matches, make_etag
+
+
+def test_lru_evicts_oldest_and_forgets_its_tags():
+    backend = MemoryBackend(maxsize=2)
+    backend.set("a", '"1"', b"A", ["tutor:1"], ttl=60)
+    backend.set("b", '"2"', b"B", ["tutor:2"], ttl=60)
+    backend.get("a")                       # "a" redevient la plus récente
+    backend.set("c", '"3"', b"C", ["tutor:1"], ttl=60)
+    assert backend.get("b") is None
+    assert backend.get("a") == ('"1"', b"A")
+    assert "tutor:2" not in backend._tags
+
+
+def test_invalidate_by_tag():
+    cache = ResponseCache(MemoryBackend())
+    cache.set("offers-t1", '"1"', b"x", ["tutor:1", "offers"])
+    cache.set("offers-t2", '"2"', b"y", ["tutor:2"])
+    cache.set("search-75", '"3"', b"z", ["dept:75", "tutor:1"])
+    cache.invalidate("tutor:1")
+    assert cache.get("offers-t1") is None and cache.get("search-75") is None
+    assert cache.get("offers-t2") == ('"2"', b"y")
+
+
+def test_ttl_expiry():
+    backend = MemoryBackend()
+    backend.set("k", '"1"', b"x", [], ttl=0)
+    time.sleep(0.01)
+    assert backend.get("k") is None
+
+
+def test_disabled_cache_and_failing_backend_are_misses():
+    assert ResponseCache(None).get("k") is None
+
+    class Down:
+        def get(self, key): raise ConnectionError
+        def set(self, *args): raise ConnectionError
+        def invalidate(self, tags): raise ConnectionError
+
+    cache = ResponseCache(Down())
+    cache.set("k", '"1"', b"x", ["t"])
+    assert cache.get("k") is None
+    cache.invalidate("t")
+
+
+def test_etag_matching():
+    etag = make_etag(b"body")
+    assert etag == make_etag(b"body") != make_etag(b"other")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"old", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag) and not etag_matches('"old"', etag)
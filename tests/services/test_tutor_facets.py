@@ -0,0 +1,142 @@
+import pytest
+
+from app.models.offer import Offer
+from app.models.tutor_profile import TutorProfile
+from app.models.tutor_rating import TutorRating
+from app.models.user import User, UserRole
+from app.services.auth import create_access_token
+from app.services.tutor_facets import TutorFacetIndex, tutor_facet_index
+
+
+def _tutor(db, last_name, postal_code="75011", languages=None, years=None, offers=(), rating=None):
+    u = User(first_name="T", last_name=last_name, email=f"{last_name}@t.fr", role=UserRole.tutor,
+             postal_code=postal_code, department=postal_code[:2])
+    db.add(u); db.flush()
+    db.add(TutorProfile(user_id=u.id, languages=languages, years_experience=years))
+    db.add_all(Offer(tutor_id=u.id, subject=subject, price_hour=price) for subject, price in offers)
+    if rating:
+        db.add(TutorRating(tutor_id=u.id, rating_sum=rating[0] * rating[1], rating_count=rating[1]))
+    db.commit()
+    return u
+
+
+def _search(client, **params):
+    r = client.get("/search/tutors", params={"postal_code": "75011", **params})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _ids(client, **params):
+    return [t["last_name"] for t in _search(client, **params)["data"]]
+
+
+@pytest.fixture
+def tutors(db_session):
+    return [
+        _tutor(db_session, "Alpha", languages="FR,EN", years=2, offers=[("Maths", 25), ("Piano", 60)], rating=(4.8, 10)),
+        _tutor(db_session, "Bravo", languages="fr", years=8, offers=[("Mathématiques", 35)], rating=(3.5, 2)),
+        _tutor(db_session, "Charlie", languages="EN,ES", years=12, offers=[("Anglais", 45)]),
+        _tutor(db_session, "Delta", postal_code="69001", languages="FR", years=20, offers=[("Maths", 15)]),
+    ]
+
+
+def test_filters(client, tutors):
+    assert _ids(client) == ["Alpha", "Bravo", "Charlie"]
+    assert _ids(client, subject="math") == ["Alpha", "Bravo"]
+    assert _ids(client, min_price=30) == ["Bravo", "Charlie"]
+    assert _ids(client, min_price=20, max_price=40) == ["Alpha", "Bravo"]
+    assert _ids(client, languages="fr") == ["Alpha", "Bravo"]
+    assert _ids(client, languages=["FR", "EN"]) == ["Alpha"]
+    assert _ids(client, languages="fr,en") == ["Alpha"]
+    assert _ids(client, min_experience=5) == ["Bravo", "Charlie"]
+    assert _ids(client, min_rating=4) == ["Alpha"]            # sans note : exclu
+    assert _ids(client, languages="DE") == []
+
+
+def test_facet_counts_follow_filters(client, tutors):
+    body = _search(client)
+    assert body["count"] == 3
+    facets = body["facets"]
+    assert facets["subject"] == {"maths": 1, "mathematiques": 1, "piano": 1, "anglais": 1}
+    assert facets["language"] == {"FR": 2, "EN": 2, "ES": 1}
+    assert facets["department"] == {"75": 3}
+    assert facets["price"] == {"0-20": 0, "20-30": 1, "30-40": 1, "40-50": 1, "50+": 0}
+    assert facets["experience"] == {"1+": 3, "3+": 2, "5+": 2, "10+": 1}
+    assert facets["rating"] == {"3+": 2, "4+": 1, "4.5+": 1}
+
+    facets = _search(client, languages="EN")["facets"]
+    assert facets["language"] == {"EN": 2, "FR": 1, "ES": 1}
+    assert facets["price"]["20-30"] == 1 and facets["price"]["30-40"] == 0
+
+
+def test_sorts_and_cursor_pagination(client, tutors):
+    assert _ids(client, sort="price") == ["Alpha", "Bravo", "Charlie"]
+    assert _ids(client, sort="rating") == ["Alpha", "Bravo", "Charlie"]
+    assert _ids(client, radius_km=5, sort="price") == ["Alpha", "Bravo", "Charlie"]
+    assert client.get("/search/tutors", params={"postal_code": "75011", "sort": "distance"}).status_code == 400
+
+    page = _search(client, sort="price", limit=2)
+    assert [t["last_name"] for t in page["data"]] == ["Alpha", "Bravo"] and page["count"] == 3
+    page = _search(client, sort="price", limit=2, cursor=page["next_cursor"])
+    assert [t["last_name"] for t in page["data"]] == ["Charlie"] and page["next_cursor"] is None
+
+    # page par page (ex-aequo, valeurs absentes) : même ordre qu'en une page
+    for sort in ("name", "price", "rating", "availability"):
+        seen, cursor = [], None
+        while True:
+            page = _search(client, sort=sort, limit=1, **({"cursor": cursor} if cursor else {}))
+            seen += [t["last_name"] for t in page["data"]]
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        assert seen == _ids(client, sort=sort), sort
+
+    r = client.get("/search/tutors", params={"postal_code": "75011", "cursor": "nope"})
+    assert r.status_code == 400
+    name_cursor = _search(client, limit=1)["next_cursor"]        # curseur d'un autre tri
+    r = client.get("/search/tutors", params={"postal_code": "75011", "sort": "rating", "cursor": name_cursor})
+    assert r.status_code == 400
+
+
+def test_writes_reach_the_index(client, db_session, tutors):
+    alpha = tutors[0]
+    assert _ids(client, languages="DE") == []
+    r = client.put("/tutors/me/profile", headers={"Authorization": f"Bearer {create_access_token(alpha)}"},
+                   json={"languages": "de, fr"})
+    assert r.status_code == 200 and r.json()["languages"] == "DE,FR"
+    assert _ids(client, languages="DE") == ["Alpha"]
+
+    tutors[1].role = UserRole.student
+    db_session.commit()
+    assert _ids(client) == ["Alpha", "Charlie"]
+    assert len(tutor_facet_index) == 3
+
+
+def test_concurrent_cold_searches_build_once(client, tutors, concurrent_get, monkeypatch):
+    fetches = []
+    original = TutorFacetIndex._fetch
+
+    def counting_fetch(self, db, where=None):
+        fetches.append(where is None)
+        return original(self, db, where)
+
+    monkeypatch.setattr(TutorFacetIndex, "_fetch", counting_fetch)
+    responses = concurrent_get("/search/tutors", 8, params={"postal_code": "75011"})
+    assert [r.status_code for r in responses] == [200] * 8
+    assert all(r.json()["count"] == 3 for r in responses)
+    assert fetches == [True]
+
+
+def test_write_evicts_only_searches_of_its_department(client, db_session, tutors):
+    lyon = client.get("/search/tutors", params={"postal_code": "69001"})
+    paris = client.get("/search/tutors", params={"postal_code": "75011", "radius_km": 5})
+    r = client.put("/tutors/me/profile", headers={"Authorization": f"Bearer {create_access_token(tutors[0])}"},
+                   json={"languages": "de"})
+    assert r.status_code == 200
+
+    # autre département : la réponse en cache reste servie (304)
+    r = client.get("/search/tutors", params={"postal_code": "69001"}, headers={"If-None-Match": lyon.headers["ETag"]})
+    assert r.status_code == 304
+    r = client.get("/search/tutors", params={"postal_code": "75011", "radius_km": 5},
+                   headers={"If-None-Match": paris.headers["ETag"]})
+    assert r.status_code == 200 and r.json()["facets"]["language"] == {"FR": 1, "EN": 1, "ES": 1, "DE": 1}
@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models.offer import Offer
+from app.models.timeslot import Timeslot
+from app.models.tutor_profile import TutorProfile
+from app.models.tutor_search import TutorSearch, TutorSearchSubject
+from app.models.user import User, UserRole
+from app.services import tutor_search
+from app.services.auth import create_access_token
+
+
+def _auth(user):
+    return {"Authorization": f"Bearer {create_access_token(user)}"}
+
+
+def _row(db, tutor_id) -> TutorSearch | None:
+    db.expire_all()
+    return db.get(TutorSearch, tutor_id)
+
+
+def _search(client, **params):
+    r = client.get("/search/tutors", params={"postal_code": "75011", **params})
+    assert r.status_code == 200, r.text
+    return [t["user_id"] for t in r.json()["data"]]
+
+
+@pytest.fixture
+def paris(db_session, tutor_user):
+    tutor_user.postal_code, tutor_user.department = "75011", "75"
+    db_session.add(TutorProfile(user_id=tutor_user.id, languages="FR,EN"))
+    db_session.add_all([Offer(tutor_id=tutor_user.id, subject="Mathématiques", price_hour=30),
+                        Offer(tutor_id=tutor_user.id, subject="Piano", price_hour=45)])
+    db_session.commit()
+    return tutor_user
+
+
+def test_orm_writes_maintain_the_row(db_session, paris):
+    row = _row(db_session, paris.id)
+    assert (row.department, row.subjects, row.languages) == ("75", "Mathématiques, Piano", "FR,EN")
+    assert (float(row.min_price), float(row.max_price), row.offer_count) == (30, 45, 2)
+    subjects = db_session.query(TutorSearchSubject).filter_by(tutor_id=paris.id).all()
+    assert {(s.subject, s.department) for s in subjects} == {("mathematiques", "75"), ("piano", "75")}
+
+    # changement de département, puis plus tuteur : ligne déplacée puis supprimée
+    paris.department = "69"
+    db_session.commit()
+    assert _row(db_session, paris.id).department == "69"
+    paris.role = UserRole.student
+    db_session.commit()
+    assert _row(db_session, paris.id) is None
+    assert db_session.query(TutorSearchSubject).count() == 0
+
+
+def test_only_tracked_sessions_maintain_the_row(test_engine, db_session, paris):
+    # session hors SessionLocal / track : pas de collecte ni de recalcul
+    with Session(bind=test_engine) as other:
+        other.add(Offer(tutor_id=paris.id, subject="Chimie", price_hour=10))
+        other.commit()
+    assert _row(db_session, paris.id).offer_count == 2
+
+
+def test_rollback_discards_events(db_session, paris):
+    db_session.add(Offer(tutor_id=paris.id, subject="Chimie", price_hour=10))
+    db_session.flush()
+    db_session.rollback()
+    db_session.commit()
+    assert float(_row(db_session, paris.id).min_price) == 30
+
+
+def test_core_writes_emit_events(client, db_session, paris, student_user):
+    tutor = _auth(paris)
+    r = client.post("/offers/batch", headers=tutor, json={"items": [{"subject": "Chimie", "price_hour": 20}]})
+    assert r.status_code == 201
+    assert _row(db_session, paris.id).offer_count == 3
+    offer_id = r.json()["items"][0]["id"]
+
+    soon = datetime.utcnow().replace(microsecond=0) + timedelta(days=1)
+    r = client.post("/timeslots/batch", headers=tutor, json={"items": [
+        {"offer_id": offer_id, "start_utc": (soon + timedelta(hours=h)).isoformat(),
+         "end_utc": (soon + timedelta(hours=h + 1)).isoformat()} for h in (0, 2)]})
+    assert r.status_code == 200, r.text
+    assert _row(db_session, paris.id).next_available_at == soon
+    first = min(r.json()["items"], key=lambda s: s["start_utc"])["id"]
+
+    r = client.post("/bookings/", headers=_auth(student_user), json={"offer_id": offer_id, "timeslot_id": first})
+    assert r.status_code == 201
+    assert _row(db_session, paris.id).next_available_at == soon + timedelta(hours=2)
+
+    r = client.post("/bookings/decide-batch", headers=tutor, json={"items": [{"booking_id": r.json()["id"], "action": "REJECT"}]})
+    assert r.status_code == 200, r.text
+    assert _row(db_session, paris.id).next_available_at == soon
+
+    assert client.post(f"/reviews/for/{paris.id}", headers=_auth(student_user), json={"rating": 4}).status_code == 200
+    row = _row(db_session, paris.id)
+    assert (row.rating_count, row.rating_avg) == (1, 4.0)
+
+
+def test_search_filters_and_sorts(client, db_session, paris):
+    other = User(first_name="Zoé", last_name="Zola", email="zoe@test.com", role=UserRole.tutor,
+                 postal_code="75012", department="75")
+    db_session.add(other); db_session.flush()
+    db_session.add_all([TutorProfile(user_id=other.id),
+                        Offer(tutor_id=other.id, subject="Maths", price_hour=20)])
+    db_session.commit()
+
+    assert _search(client) == [paris.id, other.id]                      # nom
+    assert _search(client, subject="MATH") == [paris.id, other.id]      # préfixe, sans accents ni casse
+    assert _search(client, subject="piano") == [paris.id]
+    assert _search(client, subject="math", max_price=25) == [other.id]
+    assert _search(client, max_price=25) == [other.id]
+    assert _search(client, sort="price") == [other.id, paris.id]
+    assert _search(client, subject="piano", radius_km=10) == [paris.id]
+    assert client.get("/search/tutors", params={"postal_code": "75011", "sort": "age"}).status_code == 400
+
+    data = client.get("/search/tutors", params={"postal_code": "75011", "subject": "piano"}).json()["data"]
+    assert (data[0]["hourly_rate"], data[0]["max_hourly_rate"], data[0]["rating_count"]) == (30, 45, 0)
+
+
+def test_rebuild_restores_rows(db_session, paris):
+    db_session.query(TutorSearch).delete()
+    db_session.commit()
+    assert tutor_search.rebuild(db_session) == 1
+    assert _row(db_session, paris.id).subjects == "Mathématiques, Piano"
+
+
+def test_past_next_slot_is_replaced_by_the_next_one(client, db_session, paris):
+    soon = datetime.utcnow().replace(microsecond=0) + timedelta(days=1)
+    offer = db_session.query(Offer).filter_by(tutor_id=paris.id).first()
+    db_session.add(Timeslot(offer_id=offer.id, start_utc=soon, end_utc=soon + timedelta(hours=1)))
+    db_session.commit()
+    # créneau passé depuis le dernier recalcul de la ligne
+    db_session.query(TutorSearch).update({"next_available_at": datetime.utcnow() - timedelta(hours=1)})
+    db_session.commit()
+
+    data = client.get("/search/tutors", params={"postal_code": "75011", "sort": "availability"}).json()["data"]
+    assert data[0]["next_available_at"] == soon.isoformat()
+    # relu en base une seule fois : la ligne reste à réécrire
+    assert _row(db_session, paris.id).next_available_at < datetime.utcnow()
+
+    assert tutor_search.rebuild(db_session, expired=True) == 1
+    assert _row(db_session, paris.id).next_available_at == soon
+    assert tutor_search.rebuild(db_session, expired=True) == 0